@@ -25,6 +25,7 @@ from pydantic import BaseModel
 from api.routes.features import ALL_FEATURES, ALL_FEATURE_KEYS
 
 from core.auth import decode_token, create_access_token
+from core.auth_cache import get_auth_cache
 from core.errors import bad_request, forbidden, not_found, unauthorized
 
 logger = logging.getLogger(__name__)
@@ -110,6 +111,7 @@ async def update_user(
         raise not_found("User not found.")
 
     await store.update_user(user_id, role=body.role, is_approved=body.is_approved, force_password_change=body.force_password_change, is_suspended=body.is_suspended, free_models_only=body.free_models_only)
+    get_auth_cache().invalidate_user(user_id)
     logger.info(
         "Admin %s updated user %s: role=%s approved=%s force_password_change=%s is_suspended=%s free_models_only=%s",
         payload["sub"],
@@ -145,6 +147,7 @@ async def change_user_password(
         body.new_password.encode("utf-8"),
         bcrypt.gensalt()).decode("utf-8")
     await store.update_user_password(user_id, new_hash, force_change=True)
+    get_auth_cache().invalidate_user(user_id)
     logger.info(
         "Admin %s reset password for user %s and forced change",
         payload["sub"],
@@ -171,6 +174,7 @@ async def delete_user(
         raise not_found("User not found.")
 
     await store.delete_user(user_id)
+    get_auth_cache().invalidate_user(user_id)
     logger.info("Admin %s terminated user %s", payload["sub"], user_id)
 
     return {"success": True, "message": "User terminated successfully."}
@@ -190,6 +194,7 @@ async def force_logout(
         raise not_found("User not found.")
 
     await store.force_logout(user_id)
+    get_auth_cache().invalidate_user(user_id)
     logger.info("Admin %s forced logout for user %s", payload["sub"], user_id)
 
     return {"success": True, "message": "User active sessions invalidated."}
@@ -25,6 +25,7 @@ from typing import Optional
 import httpx
 
 from core.auth import create_access_token, decode_token, create_totp_challenge_token, decode_challenge_token
+from core.auth_cache import get_auth_cache
 from core.csrf import clear_csrf_cookie, set_csrf_cookie
 from core.errors import bad_request, conflict, forbidden, not_found, unauthorized
 from config.settings import get_settings
@@ -493,6 +494,7 @@ async def logout(request: Request, response: Response,
         expires_at = datetime.fromtimestamp(exp, tz=timezone.utc) if exp else datetime.now(
             tz=timezone.utc) + timedelta(days=1)
         await store.revoke_token(jti, payload["sub"], expires_at)
+        get_auth_cache().revoked(jti, expires_at.timestamp())
 
     return
 
@@ -608,6 +610,7 @@ async def change_password(body: ChangePasswordBody, request: Request,
         body.new_password.encode("utf-8"),
         bcrypt.gensalt()).decode("utf-8")
     await store.update_user_password(user["id"], new_hash)
+    get_auth_cache().invalidate_user(user["id"])
 
     return {"status": "ok"}
 
@@ -632,6 +635,7 @@ async def force_change_password(body: ForceChangePasswordBody, request: Request,
         body.new_password.encode("utf-8"),
         bcrypt.gensalt()).decode("utf-8")
     await store.update_user_password(user["id"], new_hash)
+    get_auth_cache().invalidate_user(user["id"])
     logger.info("User %s completed mandatory password change", user["id"])
 
     return {"status": "ok"}
@@ -460,8 +460,9 @@ async def speak_briefing(
     text = text[:_MAX_SPEAK_CHARS]
 
     try:
-        from core.conversation_loop import _build_tts_provider
-        provider = _build_tts_provider()
+        from core.provider_pool import ProviderPool
+        pool = await ProviderPool.get_instance()
+        provider = await pool.get_tts()
         wav = await provider.synthesize(text)
     except (RuntimeError, FileNotFoundError, ValueError) as exc:
         logger.error("Briefing TTS failed for %s: %s", user_id, exc)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from typing import List, Dict, Any
 from pydantic import BaseModel
 
@@ -31,6 +31,20 @@ async def list_sessions(request: Request, scope: Optional[str] = None, user_id:
     sessions = await memory_manager._store.get_chat_sessions(user_id, scope=scope)
     return {"sessions": sessions}
 
+@router.get("/search")
+async def search_messages(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    user_id: str = Depends(_require_user),
+):
+    memory_manager = getattr(request.app.state, "memory_manager", None)
+    if not memory_manager:
+        raise HTTPException(status_code=500, detail="Memory manager not initialized")
+
+    return await memory_manager._store.search_chat_messages(user_id, q, cursor=cursor, limit=limit)
+
 @router.post("/sessions")
 async def create_session(request: Request, body: CreateSessionRequest, user_id: str = Depends(_require_user)):
     memory_manager = getattr(request.app.state, "memory_manager", None)
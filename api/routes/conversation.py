@@ -53,6 +53,8 @@ from starlette.websockets import WebSocketState
 from core.auth import decode_token
 from core.conversation_loop import ConversationLoop, _build_llm_provider, _build_stt_provider
 from core.token_tracker import set_usage_source, set_usage_user
+from providers.llm.agent_roles import Priority
+from providers.llm.scheduler import set_llm_priority
 from core.memory_manager import MemoryManager
 from core.wake_word_service import WakeWordService
 from config.settings import get_settings
@@ -67,6 +69,7 @@ router = APIRouter(tags=["conversation"])
 @router.websocket("/ws/conversation")
 async def conversation_websocket(websocket: WebSocket) -> None:
     set_usage_source("voice")
+    set_llm_priority(Priority.INTERACTIVE_VOICE)
     """
     WebSocket handler for the River Song conversation loop.
 
@@ -75,6 +78,12 @@ async def conversation_websocket(websocket: WebSocket) -> None:
     the server responds with "listening", then the client sends "audio_data"
     (browser finished recording), and the server processes it end-to-end.
 
+    Streaming turns start with {"type": "start", "stream": true}; the client
+    then sends raw 16 kHz 16-bit PCM chunks as binary frames while recording.
+    The server answers with "partial_transcript" events, sends "speech_end"
+    when it detects the end of the utterance and runs the turn immediately.
+    {"type": "audio_end"} ends the stream from the client side instead.
+
     Query params:
         user_id: Identifies the caller. Used to load per-user auth files
                  (Audible, Libby). Defaults to "default" when omitted.
@@ -210,6 +219,20 @@ async def conversation_websocket(websocket: WebSocket) -> None:
 
     # Track whether we're waiting for the audio_data that follows a "start"
     waiting_for_audio: bool = False
+    # Streaming turn in progress ({"type": "start", "stream": true}): binary
+    # frames are raw 16 kHz PCM chunks fed to this transcriber.
+    stream = None
+
+    async def _background_stream_turn(s):
+        try:
+            await loop.run_stream(s, on_event=lambda evt: _send(websocket, evt))
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error("Turn failed: %s", e)
+
+        if get_settings().llm_streaming_enabled:
+            await _send(websocket, {"type": "stream_done"})
 
     try:
         while True:
@@ -217,6 +240,14 @@ async def conversation_websocket(websocket: WebSocket) -> None:
 
             if "bytes" in ws_msg and ws_msg["bytes"]:
                 audio_bytes = ws_msg["bytes"]
+                if stream is not None:
+                    if await stream.feed(audio_bytes):
+                        # Server-side endpoint: start the turn now and tell
+                        # the client it can stop capturing.
+                        finished, stream = stream, None
+                        await _send(websocket, {"type": "speech_end"})
+                        asyncio.create_task(_background_stream_turn(finished))
+                    continue
                 if not waiting_for_audio:
                     continue
                 waiting_for_audio = False
@@ -284,9 +315,28 @@ async def conversation_websocket(websocket: WebSocket) -> None:
 
             elif msg_type == "start":
                 # Tell the browser to start recording
-                waiting_for_audio = True
+                if message.get("stream"):
+                    try:
+                        stream = loop.begin_stream(
+                            on_event=lambda evt: _send(websocket, evt))
+                    except Exception as exc:
+                        await _send(websocket, {
+                            "type": "error",
+                            "message": f"Streaming STT unavailable: {exc}",
+                        })
+                        await _send(websocket, {"type": "idle"})
+                        continue
+                else:
+                    waiting_for_audio = True
                 await _send(websocket, {"type": "listening"})
 
+            elif msg_type == "audio_end":
+                # Client stopped recording before the server heard the end
+                # of speech; finish the streaming turn with what we have.
+                if stream is not None:
+                    finished, stream = stream, None
+                    asyncio.create_task(_background_stream_turn(finished))
+
             elif msg_type == "audio_data":
                 # Fallback for base64
                 if not waiting_for_audio:
@@ -334,6 +384,7 @@ async def conversation_websocket(websocket: WebSocket) -> None:
 
             elif msg_type == "interrupt":
                 waiting_for_audio = False
+                stream = None
                 loop.cancel_generation()
                 await _send(websocket, {"type": "idle"})
 
@@ -43,13 +43,14 @@ from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 
 from core.auth import require_role
+from core.telemetry_ingest import ingest_telemetry
 from core.vortex_security import (
     hash_unit_token,
     is_hashed,
     mint_unit_token,
     verify_unit_token,
 )
-from providers.memory.sqlite_store import SQLiteStore
+from providers.memory.sqlite_store import SQLiteStore, get_store
 
 logger = logging.getLogger(__name__)
 
@@ -473,21 +474,21 @@ def build_fleet_router(program: str) -> APIRouter:
 
     @router.post("/telemetry")
     async def telemetry(body: TelemetryBody,
-                        x_unit_token: Optional[str] = Header(default=None)):
-        store = SQLiteStore()
+                        x_unit_token: Optional[str] = Header(default=None),
+                        store: SQLiteStore = Depends(get_store)):
         await _ensure_schema(store)
         await _verify_unit(store, program, body.unit_id, x_unit_token)
         if len(body.snapshots) > _MAX_TELEMETRY_BATCH:
             raise HTTPException(status_code=413,
                                 detail=f"Batch size limit exceeded (max {_MAX_TELEMETRY_BATCH})")
         now = _now()
-        for snap in body.snapshots:
-            ts = str(snap.get("timestamp") or now)
-            await store.execute_write_async(
-                "INSERT INTO fleet_telemetry (program, unit_id, timestamp, payload) "
-                "VALUES (?, ?, ?, ?)",
-                (program, body.unit_id, ts, json.dumps(snap)),
-            )
+        await ingest_telemetry(
+            store,
+            "INSERT INTO fleet_telemetry (program, unit_id, timestamp, payload) "
+            "VALUES (?, ?, ?, ?)",
+            [(program, body.unit_id, str(snap.get("timestamp") or now), json.dumps(snap))
+             for snap in body.snapshots],
+        )
         await store.execute_write_async(
             "UPDATE fleet_units SET online=1, last_seen=? WHERE program=? AND unit_id=?",
             (now, program, body.unit_id),
@@ -519,8 +520,8 @@ def build_fleet_router(program: str) -> APIRouter:
 
     @router.get("/commands")
     async def poll_commands(unit_id: str,
-                            x_unit_token: Optional[str] = Header(default=None)):
-        store = SQLiteStore()
+                            x_unit_token: Optional[str] = Header(default=None),
+                            store: SQLiteStore = Depends(get_store)):
         await _ensure_schema(store)
         await _verify_unit(store, program, unit_id, x_unit_token)
         row = await store.execute_read_one_async(
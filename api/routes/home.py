@@ -342,7 +342,7 @@ async def stream_home_events(request: Request):
                     entity_id)
             
         bus = get_home_bus()
-        bus.subscribe(_on_event)
+        bus.subscribe(_on_event, name="home_stream", coalesce=True)
         
         try:
             yield "data: {\"type\": \"connected\"}\n\n"
@@ -47,7 +47,8 @@ from fastapi import APIRouter, Depends, Header, HTTPException
 from pydantic import BaseModel, ConfigDict, Field
 
 from core.auth import require_role
-from providers.memory.sqlite_store import SQLiteStore
+from core.telemetry_ingest import ingest_telemetry
+from providers.memory.sqlite_store import SQLiteStore, get_store
 
 logger = logging.getLogger(__name__)
 
@@ -387,8 +388,8 @@ async def heartbeat(body: HeartbeatBody,
 @router.get("/units/{robot_id}/tasks")
 async def poll_tasks(robot_id: str,
                      x_kova_unit: Optional[str] = Header(default=None),
-                     authorization: Optional[str] = Header(default=None)):
-    store = SQLiteStore()
+                     authorization: Optional[str] = Header(default=None),
+                     store: SQLiteStore = Depends(get_store)):
     await _ensure_schema(store)
     unit = await _verify_device(store, x_kova_unit, authorization)
     _require_unit_match(unit, robot_id)
@@ -456,16 +457,17 @@ async def report_task_status(task_id: str, body: TaskStatusBody,
 @router.post("/telemetry")
 async def post_telemetry(body: TelemetryBody,
                          x_kova_unit: Optional[str] = Header(default=None),
-                         authorization: Optional[str] = Header(default=None)):
-    store = SQLiteStore()
+                         authorization: Optional[str] = Header(default=None),
+                         store: SQLiteStore = Depends(get_store)):
     await _ensure_schema(store)
     unit = await _verify_device(store, x_kova_unit, authorization)
     _require_unit_match(unit, body.robot_id)
     now = _now()
-    await store.execute_write_async(
+    await ingest_telemetry(
+        store,
         "INSERT INTO kova_telemetry (robot_id, timestamp, metrics) "
         "VALUES (?, ?, ?)",
-        (body.robot_id, now, json.dumps(body.metrics)),
+        [(body.robot_id, now, json.dumps(body.metrics))],
     )
     await store.execute_write_async(
         "UPDATE kova_units SET online=1, last_seen=? WHERE robot_id=?",
@@ -315,19 +315,10 @@ async def update_summary_ttl_setting(summary_id: str, body: SummaryUpdate, reque
     if not TTLOption.is_valid(body.ttl_setting):
         raise bad_request(f"Invalid ttl_setting. Allowed: {TTLOption.ALL}")
         
-    summary = await mm._store.get_summary_by_id(summary_id)
-    if not summary or summary.user_id != user_id:
+    # Through the manager, so the cached context block drops the old expiry.
+    if not await mm.set_summary_ttl(summary_id, user_id, body.ttl_setting):
         raise not_found("Summary not found")
-        
-    from providers.memory.ttl_engine import calculate_expires_at
-    new_expires_at = calculate_expires_at(body.ttl_setting)
-    
-    from core.utils import _dt_to_str
-    await mm._store.execute_write_async(
-        "UPDATE conversation_summaries SET ttl_setting = ?, expires_at = ? WHERE id = ? AND user_id = ?",
-        (body.ttl_setting, _dt_to_str(new_expires_at), summary_id, user_id)
-    )
-    
+
     return {"status": "ok"}
 
 
@@ -1786,7 +1786,11 @@ async def preview_voice(
         else:
             raise bad_request(f"Unsupported engine: {entry.engine}")
 
-        wav_bytes = await provider.synthesize(entry.preview_text)
+        try:
+            wav_bytes = await provider.synthesize(entry.preview_text)
+        finally:
+            # One-off provider: do not leave its engine resident.
+            await provider.close()
 
     except HTTPException:
         raise
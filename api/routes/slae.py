@@ -16,6 +16,7 @@ Until then this endpoint returns a known-empty shape so the frontend can render.
 
 Endpoints (admin role required):
   GET /api/admin/slae/status
+  GET /api/admin/slae/metrics   in-process hot-path counters (core/metrics.py)
 """
 
 from __future__ import annotations
@@ -27,6 +28,7 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, Header
 
 from config.settings import get_settings
+from core import metrics
 from core.auth import decode_token
 from core.errors import forbidden, unauthorized
 from core.observability import get_langfuse
@@ -63,6 +65,7 @@ def _agent_roles_section() -> dict[str, Any]:
             "temperature": cfg.temperature,
             "max_tokens": cfg.max_tokens,
             "json_mode": cfg.json_mode,
+            "priority": cfg.priority.name.lower(),
             "notes": cfg.notes,
             "last_invocation": (
                 {
@@ -188,3 +191,8 @@ async def get_status(_: str = Depends(_require_admin)) -> dict[str, Any]:
         "graphiti": _graphiti_section(),
         "recent_activity": _recent_activity_section(),
     }
+
+
+@router.get("/metrics")
+async def get_metrics(_: str = Depends(_require_admin)) -> dict[str, Any]:
+    return metrics.snapshot()
@@ -16,8 +16,9 @@ from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 from core.auth import require_role
+from core.telemetry_ingest import ingest_telemetry
 from config.settings import get_settings
-from providers.memory.sqlite_store import SQLiteStore, _safe_cols
+from providers.memory.sqlite_store import SQLiteStore, _safe_cols, get_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/vector", tags=["vector-fleet"])
@@ -172,9 +173,9 @@ async def get_config(unit_id: str, x_unit_token: str = Header(default=None)):
 
 @router.get("/command/stream/{unit_id}")
 async def command_stream(
-        unit_id: str, x_unit_token: str = Header(default=None)):
+        unit_id: str, x_unit_token: str = Header(default=None),
+        store: SQLiteStore = Depends(get_store)):
     await _verify_unit_token(unit_id, x_unit_token)
-    store = SQLiteStore()
 
     revision_row = await store.execute_read_one_async("SELECT revision FROM vector_config_revisions WHERE unit_id=?", (unit_id,))
     revision = revision_row["revision"] if revision_row else 1
@@ -369,25 +370,29 @@ class TelemetryBatchBody(BaseModel):
 
 @router.post("/telemetry")
 async def post_telemetry(body: TelemetryBatchBody,
-                         x_unit_token: str = Header(default=None)):
+                         x_unit_token: str = Header(default=None),
+                         store: SQLiteStore = Depends(get_store)):
     await _verify_unit_token(body.unit_id, x_unit_token)
     if len(body.snapshots) > 50:
         raise HTTPException(status_code=413,
                             detail="Batch size limit exceeded (max 50)")
 
-    store = SQLiteStore()
     now = datetime.now(timezone.utc).isoformat()
 
     latest_mode = None
     latest_faults = None
     latest_tier = None
 
+    rows = []
+    columns = None
     for snap in body.snapshots:
         fields = snap.model_dump()
         fields["unit_id"] = body.unit_id
         if fields["active_faults"] is not None:
             fields["active_faults"] = json.dumps(fields["active_faults"])
-        await store.insert_telemetry(fields)
+        if columns is None:
+            columns = list(fields)
+        rows.append(tuple(fields[c] for c in columns))
 
         if fields.get("operating_mode") is not None:
             latest_mode = fields["operating_mode"]
@@ -396,6 +401,10 @@ async def post_telemetry(body: TelemetryBatchBody,
         if fields.get("connectivity_tier") is not None:
             latest_tier = fields["connectivity_tier"]
 
+    # One group commit with every other unit's batch (core/telemetry_ingest).
+    if rows:
+        await ingest_telemetry(store, store.telemetry_insert_sql(columns), rows)
+
     await store.update_vector_unit(body.unit_id, {
         "last_seen": now,
         "operating_mode": latest_mode,
@@ -577,8 +586,8 @@ async def get_unit(id: str):
 
 @router.get("/units/{id}/stream")
 async def unit_sse_stream(id: str, request: Request, user: dict = Depends(
-        require_role("operator", "viewer"))):
-    store = SQLiteStore()
+        require_role("operator", "viewer")),
+        store: SQLiteStore = Depends(get_store)):
     event = _get_telemetry_event(id)
 
     async def event_generator():
@@ -45,8 +45,9 @@ from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from pydantic import BaseModel, Field
 
 from core.auth import require_role
+from core.telemetry_ingest import ingest_telemetry
 from core.vortex_security import hash_unit_token, mint_unit_token, verify_unit_token
-from providers.memory.sqlite_store import SQLiteStore
+from providers.memory.sqlite_store import SQLiteStore, get_store
 
 logger = logging.getLogger(__name__)
 
@@ -477,8 +478,8 @@ async def session_end(body: SessionEndBody,
 
 @router.post("/telemetry")
 async def post_telemetry(body: TelemetryBody,
-                         x_unit_token: Optional[str] = Header(default=None)):
-    store = SQLiteStore()
+                         x_unit_token: Optional[str] = Header(default=None),
+                         store: SQLiteStore = Depends(get_store)):
     await _ensure_schema(store)
     session = await store.execute_read_one_async(
         "SELECT unit_id FROM vexa_sessions WHERE session_id=?",
@@ -493,21 +494,22 @@ async def post_telemetry(body: TelemetryBody,
 
     # Closed sessions still accept samples — the client batches offline and
     # may flush after the ride ends.
-    for sample in body.samples:
-        await store.execute_write_async(
-            "INSERT INTO vexa_telemetry (session_id, unit_id, ts, lat, lon, "
-            "speed_mph, payload) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (body.session_id, session["unit_id"], sample.ts, sample.lat,
-             sample.lon, sample.speed_mph, json.dumps(sample.model_dump())),
-        )
+    await ingest_telemetry(
+        store,
+        "INSERT INTO vexa_telemetry (session_id, unit_id, ts, lat, lon, "
+        "speed_mph, payload) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(body.session_id, session["unit_id"], sample.ts, sample.lat,
+          sample.lon, sample.speed_mph, json.dumps(sample.model_dump()))
+         for sample in body.samples],
+    )
     await _touch_unit(store, session["unit_id"])
     return {"accepted": len(body.samples)}
 
 
 @router.get("/commands/poll")
 async def poll_commands(unit_id: str,
-                        x_unit_token: Optional[str] = Header(default=None)):
-    store = SQLiteStore()
+                        x_unit_token: Optional[str] = Header(default=None),
+                        store: SQLiteStore = Depends(get_store)):
     await _ensure_schema(store)
     await _verify_unit(store, unit_id, x_unit_token)
     rows = await store.execute_read_async(
@@ -69,6 +69,7 @@ from pydantic import BaseModel, Field
 # constant-time comparison to drift out of.
 from api.routes.fleet import _ensure_schema, _now, _verify_unit
 from core.auth import decode_token
+from core.vortex_audio import negotiate as negotiate_audio
 from core.vortex_hub import PRESENCE_STATES, get_vortex_hub
 from core.vortex_replica import get_replica_service
 from core.vortex_security import (
@@ -428,10 +429,13 @@ async def vortex_websocket(websocket: WebSocket) -> None:
 
     await websocket.accept()
 
-    unit_id = await _authenticate_socket(websocket, store)
-    if not unit_id:
+    auth = await _authenticate_socket(websocket, store)
+    if not auth:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
+    unit_id = auth["unit_id"]
+    # Binary speech for firmware that offers it; None keeps JSON `audio`.
+    audio_codec = negotiate_audio(auth.get("audio"))
 
     from core.vortex_units import get_profile
 
@@ -440,13 +444,16 @@ async def vortex_websocket(websocket: WebSocket) -> None:
     hub = get_vortex_hub()
     await hub.register(unit_id, websocket,
                        room=profile.get("room") or None,
-                       has_display=bool(profile.get("has_display", True)))
+                       has_display=bool(profile.get("has_display", True)),
+                       audio_codec=audio_codec)
 
     await websocket.send_json({
         "type": "auth_ok",
         "unit_id": unit_id,
         "room": profile.get("room") or "",
         "has_display": bool(profile.get("has_display", True)),
+        "audio": ({"transport": "binary", "codec": audio_codec}
+                  if audio_codec else {"transport": "json"}),
     })
     await hub.presence(unit_id, "idle")
 
@@ -468,9 +475,9 @@ async def vortex_websocket(websocket: WebSocket) -> None:
                 break
             text = message.get("text")
             if not text:
-                # Binary frames are not part of the contract; audio arrives
-                # base64-encoded inside an audio_chunk so one framing covers
-                # every message type.
+                # Binary frames only run server -> unit (speech, see
+                # core/vortex_audio.py). Microphone audio still arrives
+                # base64-encoded inside an audio_chunk.
                 continue
             try:
                 frame = json.loads(text)
@@ -483,6 +490,10 @@ async def vortex_websocket(websocket: WebSocket) -> None:
         logger.info("Vortex WS error for %s: %s", unit_id, exc)
     finally:
         await hub.unregister(unit_id, websocket)
+        if not hub.is_connected(unit_id):
+            # A stale ack would send the next connection deltas against a
+            # replica it no longer holds.
+            get_replica_service().forget(unit_id)
         # A unit that drops off WiFi mid-call leaves the other end holding a
         # camera light on. End it rather than leaving a half-open call.
         try:
@@ -511,10 +522,12 @@ async def _restore_and_replay(unit_id: str, owner: str) -> None:
 
 
 async def _authenticate_socket(websocket: WebSocket,
-                               store: SQLiteStore) -> Optional[str]:
+                               store: SQLiteStore) -> Optional[Dict[str, Any]]:
     """
     Consume the first frame and validate it as `{"type":"auth",...}`.
 
+    Returns the auth frame, whose `unit_id` is now verified, or None.
+
     Drops the socket if no valid auth frame arrives within five seconds, so a
     connection that opens and says nothing does not hold a slot open.
     """
@@ -553,7 +566,7 @@ async def _authenticate_socket(websocket: WebSocket,
         "UPDATE fleet_units SET online=1, last_seen=? WHERE program=? AND unit_id=?",
         (_now(), PROGRAM, unit_id),
     )
-    return unit_id
+    return frame
 
 
 async def _handle_unit_frame(unit_id: str, owner: str, frame: Dict[str, Any],
@@ -579,6 +592,11 @@ async def _handle_unit_frame(unit_id: str, owner: str, frame: Dict[str, Any],
         logger.debug("Vortex ack from %s: %s", unit_id, frame.get("command_id"))
         return
 
+    if kind == "replica_ack":
+        get_replica_service().acknowledge(unit_id, frame.get("version"),
+                                          frame.get("epoch"))
+        return
+
     if kind == "occupancy":
         await _handle_occupancy(unit_id, owner, frame)
         return
@@ -14,7 +14,7 @@ from __future__ import annotations
 
 import logging
 import sys
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -187,6 +187,38 @@ class Settings(BaseSettings):
             "once the GPU has headroom."
         ),
     )
+    stt_vad_threshold_db: float = Field(
+        default=-45.0,
+        description=(
+            "Streaming STT: a 30 ms frame louder than this (dBFS RMS) counts "
+            "as speech."
+        ),
+    )
+    stt_partial_interval_ms: int = Field(
+        default=600,
+        description=(
+            "Streaming STT: new speech needed before the open segment is "
+            "re-decoded for a partial transcript."
+        ),
+    )
+    stt_segment_silence_ms: int = Field(
+        default=300,
+        description=(
+            "Streaming STT: a pause this long closes a segment, which is "
+            "decoded for good while the user keeps talking."
+        ),
+    )
+    stt_endpoint_silence_ms: int = Field(
+        default=700,
+        description=(
+            "Streaming STT: silence after speech that ends the utterance and "
+            "starts the turn without waiting for the client to stop recording."
+        ),
+    )
+    stt_max_segment_seconds: float = Field(
+        default=20.0,
+        description="Streaming STT: force-close a segment after this much audio.",
+    )
     audio_input_device: Optional[int] = Field(
         default=None,
         description="Sounddevice input device index; None uses system default",
@@ -206,6 +238,34 @@ class Settings(BaseSettings):
         default="http://localhost:11434",
         description="Base URL for the Ollama REST API",
     )
+    ollama_num_parallel: int = Field(
+        default=1,
+        ge=1,
+        description=(
+            "Requests one local Ollama model serves at once. Match the server's "
+            "OLLAMA_NUM_PARALLEL; calls beyond it queue by priority in "
+            "providers/llm/scheduler.py."
+        ),
+    )
+    ollama_model_parallel: Dict[str, int] = Field(
+        default_factory=dict,
+        description='Per-model overrides of ollama_num_parallel, e.g. {"llama3.1:8b": 1}.',
+    )
+    ollama_keep_alive: str = Field(
+        default="30m",
+        description=(
+            "How long Ollama keeps a model (and its prompt KV cache) loaded after "
+            "a call, sent as keep_alive. Ollama's own default of 5m drops it "
+            "between the turns of a slow conversation; -1 keeps it forever."
+        ),
+    )
+    llm_prompt_cache_enabled: bool = Field(
+        default=True,
+        description=(
+            "Mark the stable part of the system prompt and the tool list as "
+            "cacheable on providers with explicit prompt caching (Anthropic)."
+        ),
+    )
     glances_url: str = Field(
         default="http://localhost:61208/api/3",
         description="Base URL of the local Glances REST API used by /api/health/system.",
@@ -243,6 +303,22 @@ class Settings(BaseSettings):
             "but stops the engine listening."
         ),
     )
+    routines_missed_run_policy: str = Field(
+        default="run_once_on_recovery",
+        description=(
+            "What to do with a scheduled routine whose time passed while the "
+            "server was down: 'skip' it, or 'run_once_on_recovery' (once, "
+            "however many times were missed) if it is no more than "
+            "ROUTINES_CATCHUP_MINUTES late."
+        ),
+    )
+    routines_catchup_minutes: int = Field(
+        default=60,
+        description=(
+            "How late a missed routine may still be caught up. A morning "
+            "briefing is no use at dinner time."
+        ),
+    )
     anthropic_enabled: bool = Field(
         default=False,
         description="Allow Anthropic Claude as a selectable LLM provider.",
@@ -408,7 +484,11 @@ class Settings(BaseSettings):
     )
     llm_context_window: int = Field(
         default=8192,
-        description="Maximum number of tokens the LLM can consider for context.",
+        description=(
+            "Upper bound on the prompt window, in tokens. Conversation history is "
+            "trimmed to min(this, the model's registry context window) minus "
+            "llm_max_tokens; older turns are folded into a rolling summary."
+        ),
     )
 
     # -------------------------------------------------------------------------
@@ -440,6 +520,28 @@ class Settings(BaseSettings):
         default="",
         description="Absolute path to the Piper .onnx voice model file",
     )
+    piper_engine: str = Field(
+        default="auto",
+        description=(
+            "How Piper is kept resident: binding (piper-tts package, in-process) | "
+            "process (one long-lived Piper binary per voice) | auto (binding when "
+            "installed, otherwise process)."
+        ),
+    )
+    tts_lookahead_sentences: int = Field(
+        default=2,
+        description=(
+            "How many synthesized sentences may queue ahead of the one being "
+            "sent to the browser. Higher smooths slow sockets; lower caps memory."
+        ),
+    )
+    tts_idle_shutdown_seconds: int = Field(
+        default=600,
+        description=(
+            "Stop a pooled voice's resident TTS engine after this many idle "
+            "seconds. It restarts on the next sentence. 0 keeps engines resident."
+        ),
+    )
     audio_output_device: Optional[int] = Field(
         default=None,
         description="Sounddevice output device index; None uses system default",
@@ -454,6 +556,15 @@ class Settings(BaseSettings):
     )
     jwt_algorithm: str = Field(default="HS256", description="JWT signing algorithm.")
     jwt_expire_minutes: int = Field(default=1440, description="JWT token lifetime in minutes (default 24 hours).")
+    auth_cache_ttl_seconds: float = Field(
+        default=30.0,
+        ge=0,
+        description=(
+            "How long decode_token trusts a cached suspension/forced-logout state "
+            "and revocation list (core/auth_cache.py). Changes made through the "
+            "API apply at once; ones made elsewhere take up to this long. 0 disables."
+        ),
+    )
     token_encryption_key: str = Field(
         default="",
         description=(
@@ -688,6 +799,21 @@ class Settings(BaseSettings):
         default="data/river_song.db",
         description="Path to the SQLite database file. Created automatically.",
     )
+    sqlite_pool_size: int = Field(
+        default=4,
+        description=(
+            "Worker threads (each with its own connection) in the shared "
+            "SQLiteStore pool. The isolated telemetry writer is extra."
+        ),
+    )
+    sqlite_cache_size_mb: int = Field(
+        default=16,
+        description="SQLite page cache per connection (PRAGMA cache_size), in MiB.",
+    )
+    sqlite_mmap_size_mb: int = Field(
+        default=256,
+        description="Bytes of the database SQLite may memory-map (PRAGMA mmap_size), in MiB. 0 disables.",
+    )
     memory_summaries_enabled: bool = Field(
         default=True,
         description="Generate and store conversation summaries (on by default).",
@@ -708,6 +834,21 @@ class Settings(BaseSettings):
         default=10,
         description="Maximum number of recent summaries injected into the LLM context.",
     )
+    memory_context_cache_seconds: int = Field(
+        default=300,
+        description=(
+            "How long a user's facts/preferences/summaries snapshot is reused "
+            "for prompt assembly. Memory writes drop it at once; this only "
+            "bounds staleness from out-of-band DB edits. 0 disables the cache."
+        ),
+    )
+    memory_ttl_flush_seconds: int = Field(
+        default=30,
+        description=(
+            "Summary TTL extensions from context builds are queued and written "
+            "in one batch this often (and at shutdown)."
+        ),
+    )
     embedding_model: str = Field(
         default="nomic-embed-text",
         description="Ollama model name used for generating semantic embeddings.",
@@ -731,6 +872,35 @@ class Settings(BaseSettings):
             "downloaded lazily on first use. Requires `pip install fastembed`."
         ),
     )
+    embedding_batch_size: int = Field(
+        default=32,
+        description=(
+            "Texts per embedding batch during bulk ingestion "
+            "(EmbeddingProvider.embed_many)."
+        ),
+    )
+    embedding_concurrency: int = Field(
+        default=4,
+        description="Embedding batches in flight at once during bulk ingestion.",
+    )
+    embedding_cache_enabled: bool = Field(
+        default=True,
+        description=(
+            "Cache embedding vectors by (backend, model, text hash) so unchanged "
+            "text is never embedded twice, including across restarts."
+        ),
+    )
+    embedding_cache_path: str = Field(
+        default="",
+        description=(
+            "SQLite file for the persistent embedding cache. Empty means "
+            "embedding_cache.db next to DB_PATH."
+        ),
+    )
+    embedding_cache_memory_items: int = Field(
+        default=4096,
+        description="Vectors kept in the in-memory LRU in front of the on-disk cache.",
+    )
     chroma_path: str = Field(
         default="/mnt/data/river-song/chroma",
         description="Absolute path to the ChromaDB persistent storage directory.",
@@ -1218,6 +1388,36 @@ class Settings(BaseSettings):
         default=True,
         description="Enable the Scribe daemon.",
     )
+    feed_cache_max_entries: int = Field(
+        default=512,
+        description="Feed responses kept in the shared in-memory LRU (providers/feeds/cache.py).",
+    )
+    feed_cache_persist: bool = Field(
+        default=True,
+        description=(
+            "Also keep feed responses in SQLite so a restart, and the Pulse "
+            "daemon, start with a warm cache."
+        ),
+    )
+    feed_cache_path: str = Field(
+        default="",
+        description="SQLite file for the feed cache. Empty means feed_cache.db next to DB_PATH.",
+    )
+    feed_cache_ttls: str = Field(
+        default="{}",
+        description=(
+            'JSON object of per-source TTL overrides in seconds, e.g. '
+            '{"weather": 900, "sports_scoreboard": 30}. Sources not listed keep '
+            "their defaults."
+        ),
+    )
+    feed_cache_stale_factor: float = Field(
+        default=5.0,
+        description=(
+            "An expired feed entry is still served, while one background refresh "
+            "runs, until it is this many TTLs old."
+        ),
+    )
     pulse_tick_seconds: int = Field(
         default=300,
         description="Pulse fetch interval (seconds)",
@@ -1254,6 +1454,22 @@ class Settings(BaseSettings):
     # approach is being replaced by native device-app development. See
     # docs/KNOWN_ISSUES.md (post-removal note) for context.
 
+    # Fleet telemetry ingest (core/telemetry_ingest.py)
+    telemetry_flush_interval_ms: int = Field(
+        default=25,
+        description=(
+            "How long telemetry batches from all units are gathered before "
+            "they are committed together in one transaction."
+        ),
+    )
+    telemetry_max_pending_rows: int = Field(
+        default=5000,
+        description=(
+            "Telemetry rows allowed to wait for a commit. Beyond this, "
+            "/telemetry endpoints answer 429 with Retry-After."
+        ),
+    )
+
     # Mechanic (Telemetry)
     mechanic_enabled: bool = Field(
         default=False,
@@ -4,10 +4,121 @@ import json
 import uuid
 from typing import Any, List, Dict, Callable, Optional, Tuple
 
+from core.tools import TOOL_CONCURRENCY_PARALLEL, tool_concurrency
+
 logger = logging.getLogger(__name__)
 
 MAX_TOOL_STEPS = 6
 TOOL_TIMEOUT = 30.0
+# Tools whose normal run is longer (or whose failure should be faster) than
+# the default. Anything not listed gets TOOL_TIMEOUT.
+TOOL_TIMEOUTS: Dict[str, float] = {
+    "deep_research": 120.0,
+    "generate_image": 120.0,
+    "design_3d_model": 120.0,
+    "get_weather": 15.0,
+    "web_search": 20.0,
+}
+# Upper bound on tool calls in flight at once within one step.
+MAX_CONCURRENT_TOOLS = 4
+
+
+def _calls_from_response(res: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every tool call in a model response, in the order the model made them.
+
+    Providers that can return several tool_use blocks put them all in
+    `tool_calls`; older single-call responses only carry the top-level keys.
+    """
+    calls = res.get("tool_calls") or [{
+        "tool_name": res["tool_name"],
+        "tool_input": res.get("tool_input") or {},
+        "tool_use_id": res.get("tool_use_id"),
+    }]
+    return [{
+        "tool_name": c["tool_name"],
+        "tool_input": c.get("tool_input") or {},
+        "tool_use_id": c.get("tool_use_id") or f"toolu_{uuid.uuid4().hex[:12]}",
+    } for c in calls]
+
+
+def _plan_waves(calls: List[Dict[str, Any]]) -> List[List[int]]:
+    """Group call indices into waves, run one after another in model order.
+
+    Consecutive parallel (read-only) calls share a wave and run
+    concurrently. Every serial or exclusive call is a wave of its own, so a
+    write never overlaps a read or another write, and the order the model
+    chose between them is kept.
+    """
+    waves: List[List[int]] = []
+    current: List[int] = []
+    for idx, call in enumerate(calls):
+        if tool_concurrency(call["tool_name"]) == TOOL_CONCURRENCY_PARALLEL:
+            current.append(idx)
+            continue
+        if current:
+            waves.append(current)
+            current = []
+        waves.append([idx])
+    if current:
+        waves.append(current)
+    return waves
+
+
+async def _run_calls(
+    calls: List[Dict[str, Any]],
+    execute_tool_fn: Callable,
+    on_event: Callable,
+    base_ctx: Dict[str, Any],
+) -> List[Tuple[str, bool]]:
+    """Run one step's tool calls under their concurrency classes.
+
+    Returns (result_text, ok) per call, indexed like `calls`, whatever order
+    they finished in. Duplicate read-only calls within the step run once and
+    share the result -- Claude still needs a tool_result for each tool_use
+    id. A write the model repeats runs every time it was asked for.
+    """
+    results: List[Optional[Tuple[str, bool]]] = [None] * len(calls)
+    first_by_sig: Dict[str, int] = {}
+    duplicates: Dict[int, int] = {}
+    for idx, call in enumerate(calls):
+        if tool_concurrency(call["tool_name"]) != TOOL_CONCURRENCY_PARALLEL:
+            continue
+        sig = f"{call['tool_name']}:{json.dumps(call['tool_input'], sort_keys=True, default=str)}"
+        if sig in first_by_sig:
+            duplicates[idx] = first_by_sig[sig]
+        else:
+            first_by_sig[sig] = idx
+
+    limiter = asyncio.Semaphore(MAX_CONCURRENT_TOOLS)
+
+    async def _one(idx: int) -> None:
+        call = calls[idx]
+        tool_name = call["tool_name"]
+        timeout = TOOL_TIMEOUTS.get(tool_name, TOOL_TIMEOUT)
+        ok = False
+        async with limiter:
+            try:
+                result_text = await asyncio.wait_for(
+                    execute_tool_fn(tool_name, call["tool_input"], dict(base_ctx)),
+                    timeout=timeout
+                )
+                ok = True
+            except asyncio.TimeoutError:
+                result_text = f"Error: Tool {tool_name} timed out after {timeout} seconds."
+                logger.warning(result_text)
+            except Exception as e:
+                result_text = f"Error executing {tool_name}: {e}"
+                logger.error(result_text)
+        results[idx] = (result_text, ok)
+        await on_event({"type": "tool_result", "tool": tool_name, "result": result_text})
+
+    for wave in _plan_waves(calls):
+        await asyncio.gather(*(_one(i) for i in wave if i not in duplicates))
+
+    for idx, original in duplicates.items():
+        results[idx] = results[original]
+    return results  # type: ignore[return-value]
+
 
 async def run_agent_loop(
     llm: Any,
@@ -25,81 +136,90 @@ async def run_agent_loop(
     Runs the multi-step tool execution loop.
     Returns the final buffered text if the LLM provided it, so the caller can emit it.
     If no tools were run and the LLM doesn't buffer, returns an empty string.
+
+    One step is one model round trip. When the model asks for several tools
+    in one response they run concurrently (see _run_calls), and their calls
+    and results are written back to history in the order the model made
+    them, so the next round trip sees the same transcript however the tools
+    happened to finish.
     """
     if not hasattr(llm, "chat_with_tools"):
         return "", []
 
     receipts = []
-    
+
     def get_messages():
         msgs = history.copy()
         if msgs and msgs[0].get("role") == "system" and tool_system_prompt:
             msgs[0] = msgs[0].copy()
             msgs[0]["content"] += f"\n\n{tool_system_prompt}"
         return msgs
-    
+
     previous_calls = set()
-    
+
     for step in range(MAX_TOOL_STEPS):
         try:
             res = await llm.chat_with_tools(get_messages(), active_tools)
         except Exception as e:
             logger.error("LLM chat_with_tools failed: %s", e)
             break
-            
+
         if res.get("type") != "tool_call":
             # If we used tools, or even if we didn't, we might have buffered content
             if receipts:
                 await on_event({"type": "receipt", "items": receipts})
             return res.get("content", ""), receipts
-            
-        tool_name = res["tool_name"]
-        tool_input = res["tool_input"]
-        tool_id = res.get("tool_use_id") or f"toolu_{uuid.uuid4().hex[:12]}"
-        
-        # Identical-call-twice breaker (deterministic key serialization)
-        call_sig = f"{tool_name}:{json.dumps(tool_input, sort_keys=True, default=str)}"
-        if call_sig in previous_calls:
-            logger.warning("Identical tool call detected: %s. Breaking loop.", call_sig)
-            if receipts:
-                await on_event({"type": "receipt", "items": receipts})
-            return "Error: I seem to be repeating myself and cannot complete the request.", receipts
-            
-        previous_calls.add(call_sig)
-        
-        logger.info("Agent loop step %d: calling tool %s", step, tool_name)
-        await on_event({"type": "tool_use", "tool": tool_name, "input": tool_input})
-        
-        ok = False
-        try:
-            ctx = {"user_id": user_id, "session_id": session_id}
-            if tool_context:
-                ctx.update(tool_context)
-                
-            result_text = await asyncio.wait_for(
-                execute_tool_fn(tool_name, tool_input, ctx),
-                timeout=TOOL_TIMEOUT
-            )
-            ok = True
-        except asyncio.TimeoutError:
-            result_text = f"Error: Tool {tool_name} timed out after {TOOL_TIMEOUT} seconds."
-            logger.warning(result_text)
-        except Exception as e:
-            result_text = f"Error executing {tool_name}: {e}"
-            logger.error(result_text)
-            
-        await on_event({"type": "tool_result", "tool": tool_name, "result": result_text})
-        
+
+        calls = _calls_from_response(res)
+
+        # Identical-call-twice breaker (deterministic key serialization).
+        # Only calls from earlier steps count: a repeat inside one response
+        # is deduplicated by _run_calls instead.
+        step_sigs = set()
+        for call in calls:
+            call_sig = f"{call['tool_name']}:{json.dumps(call['tool_input'], sort_keys=True, default=str)}"
+            if call_sig in previous_calls:
+                logger.warning("Identical tool call detected: %s. Breaking loop.", call_sig)
+                if receipts:
+                    await on_event({"type": "receipt", "items": receipts})
+                return "Error: I seem to be repeating myself and cannot complete the request.", receipts
+            step_sigs.add(call_sig)
+        previous_calls.update(step_sigs)
+
+        logger.info(
+            "Agent loop step %d: calling %s", step,
+            ", ".join(c["tool_name"] for c in calls))
+        for call in calls:
+            await on_event({"type": "tool_use", "tool": call["tool_name"], "input": call["tool_input"]})
+
+        ctx = {"user_id": user_id, "session_id": session_id}
+        if tool_context:
+            ctx.update(tool_context)
+        results = await _run_calls(calls, execute_tool_fn, on_event, ctx)
+
         if llm.__class__.__name__ == "ClaudeAPILLM":
-            await append_history_fn("assistant", [{"type": "tool_use", "id": tool_id, "name": tool_name, "input": tool_input}])
-            await append_history_fn("user", [{"type": "tool_result", "tool_use_id": tool_id, "content": result_text}])
+            # Anthropic requires every tool_use of a turn in one assistant
+            # message, answered by one user message carrying all results.
+            await append_history_fn("assistant", [
+                {"type": "tool_use", "id": c["tool_use_id"], "name": c["tool_name"], "input": c["tool_input"]}
+                for c in calls
+            ])
+            await append_history_fn("user", [
+                {"type": "tool_result", "tool_use_id": c["tool_use_id"], "content": result_text}
+                for c, (result_text, _ok) in zip(calls, results)
+            ])
         else:
-            await append_history_fn("assistant", "", {"tool_calls": [{"function": {"name": tool_name, "arguments": tool_input}}]})
-            await append_history_fn("tool", result_text)
-            
-        receipts.append({"tool": tool_name, "summary": str(result_text)[:100], "ok": ok})
+            await append_history_fn("assistant", "", {"tool_calls": [
+                {"function": {"name": c["tool_name"], "arguments": c["tool_input"]}}
+                for c in calls
+            ]})
+            for result_text, _ok in results:
+                await append_history_fn("tool", result_text)
+
+        for call, (result_text, ok) in zip(calls, results):
+            receipts.append({"tool": call["tool_name"], "summary": str(result_text)[:100], "ok": ok})
 
     if receipts:
         await on_event({"type": "receipt", "items": receipts})
-        
+
     return "", receipts
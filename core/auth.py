@@ -4,11 +4,12 @@ from fastapi import Request, HTTPException
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-import inspect
+import math
 import uuid
 import jwt
 
 from config.settings import get_settings
+from core.auth_cache import get_auth_cache
 
 
 def create_totp_challenge_token(user_id: str, ttl_seconds: int = 300) -> str:
@@ -80,7 +81,9 @@ async def decode_token(token: str) -> Optional[dict]:
         if payload.get("purpose"):
             return None
 
-        # Check revocation, user suspension, and forced logout
+        # Check revocation, user suspension, and forced logout. Answers are
+        # cached in-process (core/auth_cache.py); the routes that change
+        # them push invalidations there.
         jti = payload.get("jti")
         user_id = payload.get("sub")
         from main import get_app
@@ -88,21 +91,12 @@ async def decode_token(token: str) -> Optional[dict]:
         if app and hasattr(app.state, "memory_manager"):
             store = getattr(app.state.memory_manager, "_store", None)
             if store:
-                rev_fn = getattr(store, "is_token_revoked", None)
-                if jti and callable(rev_fn):
-                    rev_res = rev_fn(jti)
-                    if inspect.isawaitable(rev_res):
-                        rev_res = await rev_res
-                    if rev_res:
-                        return None
-
-                user_fn = getattr(store, "get_user_by_id", None)
-                if user_id and callable(user_fn):
-                    user_res = user_fn(user_id)
-                    if inspect.isawaitable(user_res):
-                        user = await user_res
-                    else:
-                        user = user_res
+                cache = get_auth_cache()
+                if jti and await cache.is_revoked(store, jti, payload.get("exp")):
+                    return None
+
+                if user_id:
+                    user = await cache.user_state(store, user_id)
                     if user:
                         if user.get("is_suspended"):
                             return None
@@ -115,7 +109,11 @@ async def decode_token(token: str) -> Optional[dict]:
                                 # handle trailing 'Z' if present
                                 ts_str = tokens_valid_after.replace("Z", "+00:00")
                                 cutoff_dt = datetime.fromisoformat(ts_str)
-                                if iat < cutoff_dt.timestamp():
+                                # iat is whole seconds but the cutoff is not:
+                                # compare at iat's resolution, or a login in
+                                # the same second as a forced logout would be
+                                # rejected for the token's whole lifetime.
+                                if iat < math.floor(cutoff_dt.timestamp()):
                                     return None
                             except ValueError:
                                 pass
@@ -0,0 +1,234 @@
+"""
+core/auth_cache.py
+
+In-process cache for the authorization checks decode_token makes on every
+authenticated request and SSE connection.
+
+Verifying a JWT is CPU only, but decode_token then asked the database two
+things each time: is this jti revoked, and has the user been suspended or
+force-logged-out since the token was issued. A dashboard page load is 20-30
+API calls, so that was 40-60 SQLite reads to learn nothing had changed.
+
+  * Unexpired revoked jtis are loaded into a Bloom filter. A jti the filter
+    has never seen is not revoked, with no database read. A jti it has seen
+    (a real revocation, or a rare false positive) is checked against the
+    database, and the answer is cached.
+  * Each user's auth state (is_suspended, tokens_valid_after) is cached by
+    user id. Concurrent misses for one user share a single lookup.
+  * Both expire after AUTH_CACHE_TTL_SECONDS. That bounds how long a change
+    made outside this process (a script, another worker) goes unseen.
+    Changes made through the API are pushed here immediately: logout calls
+    revoked(), and suspension, forced logout, password changes and account
+    deletion call invalidate_user().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+# 128 KiB of bits and 7 hashes: about 1% false positives at 100k revocations.
+_BLOOM_BITS = 1 << 20
+_BLOOM_HASHES = 7
+
+# Past this many cached entries, expired ones are swept on the next insert.
+_SWEEP_AT = 4096
+
+
+class _Bloom:
+    """Fixed-size Bloom filter over strings (double hashing of one blake2b)."""
+
+    def __init__(self, keys: Iterable[str] = (), bits: int = _BLOOM_BITS,
+                 hashes: int = _BLOOM_HASHES) -> None:
+        self._size = bits
+        self._hashes = hashes
+        self._bits = bytearray(bits // 8)
+        for key in keys:
+            self.add(key)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self._size for i in range(self._hashes))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7))
+                   for pos in self._positions(key))
+
+
+async def _call(store: Any, name: str, *args: Any) -> Any:
+    """store.<name>(*args), sync or async; None if the store lacks it."""
+    fn = getattr(store, name, None)
+    if not callable(fn):
+        return None
+    result = fn(*args)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _fetch_user(store: Any, user_id: str) -> Optional[dict]:
+    if callable(getattr(store, "get_user_auth_state", None)):
+        return await _call(store, "get_user_auth_state", user_id)
+    return await _call(store, "get_user_by_id", user_id)
+
+
+def _sweep(entries: Dict[str, Tuple[float, Any]], now: float) -> None:
+    if len(entries) >= _SWEEP_AT:
+        for key in [k for k, (expires, _) in entries.items() if expires <= now]:
+            del entries[key]
+
+
+class AuthCache:
+    """Revocation and user-state answers for decode_token. See the module docstring."""
+
+    def __init__(self) -> None:
+        # user_id -> (expires, auth state or None for an unknown user)
+        self._users: Dict[str, Tuple[float, Optional[dict]]] = {}
+        # jti -> (expires, revoked); revoked entries last as long as the token
+        self._jtis: Dict[str, Tuple[float, bool]] = {}
+        self._bloom: Optional[_Bloom] = None
+        self._bloom_expires = 0.0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Bumped by every invalidation, so a lookup that started before one
+        # cannot put the state it read back into the cache.
+        self._epoch = 0
+
+    @staticmethod
+    def _ttl() -> float:
+        from config.settings import get_settings
+        return get_settings().auth_cache_ttl_seconds
+
+    async def _shared(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fetch() once for all callers waiting on `key` at the same time."""
+        loop = asyncio.get_running_loop()
+        pending = self._inflight.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this caller was cancelled
+            return await fetch()  # the leader was; look it up ourselves
+        future = self._inflight[key] = loop.create_future()
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # followers re-raise it; none is fine too
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    # -- reads ------------------------------------------------------------
+
+    async def user_state(self, store: Any, user_id: str) -> Optional[dict]:
+        """The user's is_suspended / tokens_valid_after, or None if unknown."""
+        ttl = self._ttl()
+        if ttl <= 0:
+            return await _fetch_user(store, user_id)
+        now = time.time()
+        cached = self._users.get(user_id)
+        if cached is not None and cached[0] > now:
+            metrics.incr("auth_cache.hits")
+            return cached[1]
+        metrics.incr("auth_cache.misses")
+        epoch = self._epoch
+        state = await self._shared(f"user:{user_id}", lambda: _fetch_user(store, user_id))
+        if self._epoch == epoch:
+            _sweep(self._users, now)
+            self._users[user_id] = (now + ttl, state)
+        return state
+
+    async def is_revoked(self, store: Any, jti: str,
+                         expires_at: Optional[float] = None) -> bool:
+        """Whether `jti` is revoked. `expires_at` is the token's exp, if known."""
+        ttl = self._ttl()
+        if ttl <= 0:
+            return bool(await _call(store, "is_token_revoked", jti))
+        now = time.time()
+        cached = self._jtis.get(jti)
+        if cached is not None and cached[0] > now:
+            metrics.incr("auth_cache.hits")
+            return cached[1]
+        bloom = await self._revocations(store, now, ttl)
+        if bloom is not None and jti not in bloom:
+            metrics.incr("auth_cache.hits")
+            return False
+        metrics.incr("auth_cache.misses")
+        revoked = bool(await _call(store, "is_token_revoked", jti))
+        _sweep(self._jtis, now)
+        self._jtis[jti] = ((expires_at or now + ttl) if revoked else now + ttl, revoked)
+        return revoked
+
+    async def _revocations(self, store: Any, now: float, ttl: float) -> Optional[_Bloom]:
+        """The revoked-jti filter, rebuilt from the database once per TTL."""
+        if self._bloom is not None and self._bloom_expires > now:
+            return self._bloom
+        if not callable(getattr(store, "list_revoked_jtis", None)):
+            return None
+
+        async def _load() -> _Bloom:
+            jtis = await _call(store, "list_revoked_jtis") or ()
+            bloom = _Bloom(jtis)
+            # Revocations pushed here while the query ran.
+            for jti, (_, revoked) in self._jtis.items():
+                if revoked:
+                    bloom.add(jti)
+            self._bloom, self._bloom_expires = bloom, time.time() + ttl
+            return bloom
+
+        try:
+            return await self._shared("bloom", _load)
+        except Exception as exc:
+            logger.warning("Revoked-token list load failed; checking each token: %s", exc)
+            return None
+
+    # -- invalidation -----------------------------------------------------
+
+    def revoked(self, jti: str, expires_at: Optional[float] = None) -> None:
+        """A token was just revoked in this process; reject it from now on."""
+        self._jtis[jti] = (expires_at or float("inf"), True)
+        if self._bloom is not None:
+            self._bloom.add(jti)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """The user's suspension, sessions or credentials just changed."""
+        self._epoch += 1
+        self._users.pop(user_id, None)
+        self._inflight.pop(f"user:{user_id}", None)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._users.clear()
+        self._jtis.clear()
+        self._bloom = None
+        self._bloom_expires = 0.0
+        self._inflight.clear()
+
+
+_cache = AuthCache()
+
+
+def get_auth_cache() -> AuthCache:
+    return _cache
@@ -0,0 +1,175 @@
+"""
+core/context_window.py
+
+Keeps a conversation's prompt inside a token budget.
+
+ConversationLoop used to send its whole `_history` every turn, so a long
+kitchen or garage session got slower and costlier with each exchange until
+it ran past the model's context. ContextWindow trims that history in place
+before each call:
+
+  * the system message always stays;
+  * the turns after it are kept newest first while they fit the budget, and
+    the latest turn is kept whatever its size;
+  * a turn runs from one user utterance to the next, so an assistant tool
+    call and the results answering it (Anthropic tool_use/tool_result
+    blocks, or the Ollama-style `tool` messages) always leave together;
+  * evicted turns are folded into a rolling summary by a background model
+    call, and the summary rides in the system prompt from then on.
+
+Eviction does not wait for the summary. Until it lands, the prompt simply
+lacks those turns, so no turn pays for summarising an earlier one. The
+history is trimmed in place because run_agent_loop holds the same list.
+
+Token counts are estimates (characters / 3.5, plus per-message overhead),
+conservative for English across the tokenizers in use, and cached per
+message so each turn only counts what is new.
+
+The budget is min(the model's context_window from providers/llm/registry.py,
+LLM_CONTEXT_WINDOW) minus LLM_MAX_TOKENS kept free for the answer.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Role/framing overhead each message costs on top of its text.
+_MESSAGE_OVERHEAD = 4
+_CHARS_PER_TOKEN = 3.5
+
+# Floor so a tiny model window still leaves room for a system prompt and a turn.
+_MIN_BUDGET = 1024
+
+# The summary may use this share of the budget; it is asked to stay under it.
+_SUMMARY_SHARE = 0.15
+
+Summarizer = Callable[[str, List[dict]], Awaitable[str]]
+
+
+def estimate_tokens(content: Any) -> int:
+    """Estimated tokens in a message's content: text, or a list of blocks."""
+    if content is None:
+        return 0
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str, ensure_ascii=False)
+    return math.ceil(len(content) / _CHARS_PER_TOKEN)
+
+
+def token_budget(model_id: Optional[str], provider: Optional[str] = None) -> int:
+    """Prompt tokens a turn may use with `model_id`."""
+    from config.settings import get_settings
+    from providers.llm.registry import LLMRegistry
+
+    settings = get_settings()
+    window = settings.llm_context_window
+    entry = LLMRegistry.get(provider, model_id) if provider and model_id else None
+    if entry is None and model_id:
+        entry = next((e for e in LLMRegistry.all_models() if e.model_id == model_id), None)
+    if entry is not None:
+        window = min(window, entry.context_window)
+    return max(_MIN_BUDGET, window - settings.llm_max_tokens)
+
+
+def _starts_turn(message: dict) -> bool:
+    # A user message of tool_result blocks answers the call before it.
+    return message.get("role") == "user" and not isinstance(message.get("content"), list)
+
+
+def split_turns(messages: List[dict]) -> List[List[dict]]:
+    """Group messages into turns, each starting at a user utterance."""
+    turns: List[List[dict]] = []
+    for message in messages:
+        if not turns or _starts_turn(message):
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+class ContextWindow:
+    """Budgeted view of one conversation's history. See the module docstring."""
+
+    def __init__(self, budget: int, summarize: Optional[Summarizer] = None) -> None:
+        self.budget = budget
+        self.summary = ""
+        self._summarize = summarize
+        # id(message) -> (message, content, tokens). Holding the message keeps
+        # its id from being reused; the content check notices a replaced body.
+        self._counts: Dict[int, Tuple[dict, Any, int]] = {}
+        self._unsummarized: List[dict] = []
+        self._task = None
+
+    @property
+    def summary_budget(self) -> int:
+        return int(self.budget * _SUMMARY_SHARE)
+
+    def count(self, message: dict) -> int:
+        content = message.get("content")
+        cached = self._counts.get(id(message))
+        if cached is not None and cached[0] is message and cached[1] is content:
+            return cached[2]
+        tokens = estimate_tokens(content) + _MESSAGE_OVERHEAD
+        self._counts[id(message)] = (message, content, tokens)
+        return tokens
+
+    def prompt_tokens(self, history: List[dict]) -> int:
+        return sum(self.count(m) for m in history)
+
+    def fit(self, history: List[dict]) -> List[dict]:
+        """
+        Trim `history` in place to the budget and return what was evicted.
+
+        The system message's size (which already carries the summary when
+        the caller has spliced it in) is charged first.
+        """
+        head = 1 if history and history[0].get("role") == "system" else 0
+        turns = split_turns(history[head:])
+        used = sum(self.count(m) for m in history[:head])
+        keep = 0
+        for turn in reversed(turns):
+            size = sum(self.count(m) for m in turn)
+            if keep and used + size > self.budget:
+                break
+            used += size
+            keep += 1
+        evicted = [m for turn in turns[:len(turns) - keep] for m in turn]
+        if evicted:
+            del history[head:head + len(evicted)]
+            live = {id(m) for m in history}
+            self._counts = {k: v for k, v in self._counts.items() if k in live}
+        return evicted
+
+    def fold(self, evicted: List[dict], spawn: Callable[[Awaitable[None], str], Any]) -> None:
+        """Queue evicted turns for the rolling summary; one summariser at a time."""
+        if not evicted or self._summarize is None:
+            return
+        self._unsummarized.extend(evicted)
+        if self._task is None or self._task.done():
+            self._task = spawn(self._fold_pending(), "history summary")
+
+    async def _fold_pending(self) -> None:
+        while self._unsummarized:
+            batch, self._unsummarized = self._unsummarized, []
+            try:
+                summary = (await self._summarize(self.summary, batch)).strip()
+            except Exception as exc:
+                logger.info("History summary failed; those turns are dropped: %s", exc)
+                continue
+            if summary:
+                # A model that ignores the length limit must not grow the
+                # prompt the summary exists to bound.
+                limit = int(self.summary_budget * _CHARS_PER_TOKEN)
+                self.summary = summary[:limit]
+
+    def reset(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self.summary = ""
+        self._unsummarized = []
+        self._counts = {}
@@ -19,17 +19,22 @@
 # making the entire pipeline swappable without touching this file.
 #
 # History management:
-#   The loop maintains an ordered list of messages (system + user + assistant)
-#   that grows across turns. Call reset_history() to start a fresh conversation
-#   without reinitializing providers.
+#   The loop maintains an ordered list of messages (system + user + assistant).
+#   Each new user turn trims it to the model's token budget; older turns are
+#   folded into a rolling summary in the system prompt (core/context_window.py).
+#   Call reset_history() to start a fresh conversation without reinitializing
+#   providers.
 # =============================================================================
 
 from __future__ import annotations
 
 import asyncio
 import base64
+import json
 import logging
 import re
+import struct
+import time
 from dataclasses import dataclass
 from typing import (
     Union, Any, Callable, ClassVar, Coroutine, Dict, List, Optional,
@@ -37,12 +42,16 @@ from typing import (
 )
 
 from config.settings import get_settings
+from core import metrics
+from core.context_window import ContextWindow, token_budget
+from providers.llm.prompt_cache import VOLATILE_MARKER
 from core.kill_switch import is_kill_switch_active
 from core.intent_router import get_intent_router
 from core.memory_manager import MemoryManager
 from core.token_tracker import set_usage_user
 from providers.base import LLMProvider, STTProvider, TTSProvider
 from providers.memory.graphiti_provider import Episode, get_graphiti_provider
+from providers.stt.streaming import StreamingTranscriber
 
 
 logger = logging.getLogger(__name__)
@@ -381,6 +390,22 @@ def _get_local_default_model() -> Optional[str]:
         return "llama3.2:3b"
 
 
+def _piper_model_path(filename: str) -> str:
+    """
+    The installed .onnx for a Piper voice, or "" to use PIPER_MODEL_PATH.
+
+    Voices are downloaded next to the configured model, so a voice switch
+    resolves to a sibling file. A voice that was never downloaded keeps the
+    configured model rather than failing the turn.
+    """
+    import os
+    base = get_settings().piper_model_path
+    if not base or not filename:
+        return ""
+    candidate = os.path.join(os.path.dirname(base), filename)
+    return candidate if os.path.isfile(candidate) else ""
+
+
 def _build_tts_provider(
         voice_id_override: Optional[str] = None) -> TTSProvider:
     """
@@ -406,7 +431,8 @@ def _build_tts_provider(
                     return KokoroTTS(voice_code=entry.voice_code)
                 if entry.engine == "piper":
                     from providers.tts.piper import PiperTTS
-                    return PiperTTS()
+                    return PiperTTS(
+                        model_path_override=_piper_model_path(entry.filename))
                 if entry.engine == "chatterbox":
                     from providers.tts.chatterbox_provider import ChatterboxTTS
                     return ChatterboxTTS()
@@ -438,6 +464,39 @@ def _build_tts_provider(
     )
 
 
+class _PcmFramer:
+    """
+    Turn one sentence's TTS byte stream into frames of whole 16-bit samples.
+
+    Drops the 44-byte WAV header when the stream starts with one, however the
+    engine happened to split it, and carries an odd trailing byte over to the
+    next chunk -- the browser views each frame as an Int16Array, which
+    rejects odd lengths. Compressed audio (pcm=False) passes through as is.
+    """
+
+    _WAV_HEADER_LEN = 44
+
+    def __init__(self, pcm: bool = True) -> None:
+        self._pcm = pcm
+        self._pending = b""
+        self._header_checked = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        if not self._pcm:
+            return chunk
+        data = self._pending + chunk
+        if not self._header_checked:
+            if len(data) < self._WAV_HEADER_LEN and b"RIFF".startswith(data[:4]):
+                self._pending = data
+                return b""
+            self._header_checked = True
+            if data.startswith(b"RIFF"):
+                data = data[self._WAV_HEADER_LEN:]
+        cut = len(data) - (len(data) % 2)
+        self._pending = data[cut:]
+        return data[:cut]
+
+
 # -----------------------------------------------------------------------------
 # ConversationLoop
 # -----------------------------------------------------------------------------
@@ -498,6 +557,8 @@ class ConversationLoop:
         self._free_models_only: bool = False
         self._is_admin: bool = False
         self._history: List[dict] = []
+        self._window = ContextWindow(token_budget(settings.llm_model),
+                                     summarize=self._summarize_turns)
         self._initialized: bool = False
         self._turn_transcript: str = ""
         self._flush_memory: bool = False
@@ -810,20 +871,26 @@ class ConversationLoop:
     # is appended so the system message does not grow unboundedly.
     _RAG_BLOCK_MARKER = "\n\nRELEVANT DOCUMENT EXCERPTS:"
     _SKILLS_BLOCK_MARKER = "\n\n[ User skills relevant to this turn ]"
+    # Spliced last, after RAG and skills, so re-splicing those never strips it.
+    _SUMMARY_BLOCK_MARKER = "\n\n[ Earlier in this conversation ]"
 
     def _splice_system_block(self, marker: str, body: str) -> None:
         """Replace (or append) a dynamic block in the system prompt.
 
         Strips any previous block starting at `marker` from the system
         message's content, then appends `marker + body` (if body is
-        non-empty). Safe no-op when `_history` is empty or the first
-        message is not a system message.
+        non-empty). These blocks change per turn, so they always sit after
+        VOLATILE_MARKER, which is added first if the prompt lacks it. Safe
+        no-op when `_history` is empty or the first message is not a system
+        message.
         """
         if not self._history or self._history[0].get("role") != "system":
             return
         current = self._history[0].get("content") or ""
         idx = current.find(marker)
         base = current[:idx] if idx >= 0 else current
+        if body and VOLATILE_MARKER not in base:
+            base += VOLATILE_MARKER
         new_content = base + (marker + body if body else "")
         self._history[0] = {"role": "system", "content": new_content}
 
@@ -919,7 +986,11 @@ class ConversationLoop:
             except Exception as e:
                 logger.debug("Vehicle context injection skipped: %s", e)
 
-        full_system = self._system_prompt + memory_block + context_block + mode_block + vehicle_block
+        # Stable blocks first, so providers can cache the prefix; the
+        # per-turn blocks follow the marker (providers/llm/prompt_cache.py).
+        full_system = self._system_prompt + mode_block + vehicle_block
+        if memory_block or context_block:
+            full_system += VOLATILE_MARKER + memory_block + context_block
         if self._history and self._history[0].get("role") == "system":
             self._history[0]["content"] = full_system
         else:
@@ -932,6 +1003,8 @@ class ConversationLoop:
     async def _append_history(self, role: str, content: Any, meta: Dict[str, Any] = None) -> None:
         """Append to in-memory history and persist to DB if enabled."""
         self._history.append({"role": role, "content": content})
+        if role == "user" and isinstance(content, str):
+            self._fit_history()
         if self._memory and self._session_id and hasattr(self._memory._store, 'add_chat_message'):
             try:
                 content_str = str(content) if not isinstance(content, str) else content
@@ -971,38 +1044,169 @@ class ConversationLoop:
 
     async def _process_tts_stream(
             self, sentence_stream: AsyncGenerator[str, None], on_event: EventCallback):
-        """Consume sentences and stream audio chunks to the browser."""
+        """
+        Speak a streamed answer as a three-stage pipeline.
+
+        The sentence splitter (which also forwards LLM tokens), the TTS
+        engine and the WebSocket run as separate tasks joined by queues:
+        sentence N+1 is synthesized while N is still going out, and every
+        PCM chunk is framed and sent the moment the engine yields it.
+
+        TTS_LOOKAHEAD_SENTENCES caps how many synthesized sentences may wait
+        for the socket, which bounds the audio held in memory. Token
+        forwarding is never throttled by it -- sentences themselves queue
+        without limit, they are only text.
+
+        Each binary frame is `<HH gen_id, seq_id>` + 16-bit PCM; seq_id counts
+        frames within the turn and wraps at 65536.
+        """
+        assert self._tts is not None
+        tts = self._tts
+        depth = max(1, int(getattr(self._settings, "tts_lookahead_sentences", 2)))
+        # ElevenLabs returns mp3, Piper/Kokoro return wav
+        is_pcm = tts.__class__.__name__ != "ElevenLabsTTS"
+        sample_rate = int(getattr(tts, "sample_rate", 0) or 22050)
+
+        sentences: asyncio.Queue = asyncio.Queue()
+        # One chunk queue per sentence, in speaking order.
+        segments: asyncio.Queue = asyncio.Queue(maxsize=depth)
+
+        async def _split() -> None:
+            try:
+                async for sentence in sentence_stream:
+                    if sentence.strip():
+                        await sentences.put(sentence)
+                await sentences.put(None)
+            except Exception as exc:
+                await sentences.put(exc)
+
+        async def _synthesize() -> None:
+            while True:
+                sentence = await sentences.get()
+                if sentence is None or isinstance(sentence, Exception):
+                    await segments.put(sentence)
+                    return
+                chunks: asyncio.Queue = asyncio.Queue()
+                await segments.put(chunks)
+                try:
+                    async for chunk in tts.stream_synthesize(sentence):
+                        if chunk:
+                            await chunks.put(chunk)
+                    await chunks.put(None)
+                except Exception as exc:
+                    await chunks.put(exc)
+                    await segments.put(None)
+                    return
+
+        splitter = asyncio.create_task(_split())
+        synthesizer = asyncio.create_task(_synthesize())
+
+        started = time.monotonic()
+        first_audio_at: Optional[float] = None
+        last_frame_at: Optional[float] = None
+        audio_seconds = 0.0
         seq_id = 0
-        async for sentence in sentence_stream:
-            if not sentence.strip():
-                continue
+        try:
+            while True:
+                segment = await segments.get()
+                if segment is None:
+                    break
+                if isinstance(segment, Exception):
+                    raise segment
+                framer = _PcmFramer(pcm=is_pcm)
+                sentence_started = False
+                while True:
+                    chunk = await segment.get()
+                    if chunk is None:
+                        break
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    pcm = framer.feed(chunk)
+                    if not pcm:
+                        continue
+
+                    now = time.monotonic()
+                    if first_audio_at is None:
+                        first_audio_at = now
+                        metrics.observe("tts.first_audio_ms", (now - started) * 1000)
+                        await on_event({"type": "speaking"})
+                    else:
+                        if not sentence_started and last_frame_at is not None:
+                            metrics.observe(
+                                "tts.sentence_gap_ms", (now - last_frame_at) * 1000)
+                        # The browser plays from the first frame on; if the
+                        # wall clock has passed the audio sent so far, the
+                        # listener heard silence for the difference.
+                        underrun = (now - first_audio_at) - audio_seconds
+                        if underrun > 0.05:
+                            metrics.observe("tts.underrun_ms", underrun * 1000)
+                            audio_seconds = now - first_audio_at
+                    sentence_started = True
+
+                    header = struct.pack("<HH", self._gen_id & 0xFFFF, seq_id & 0xFFFF)
+                    await on_event(header + pcm)
+                    seq_id += 1
+                    audio_seconds += len(pcm) / (2 * sample_rate)
+                    last_frame_at = time.monotonic()
+        finally:
+            for task in (splitter, synthesizer):
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(splitter, synthesizer, return_exceptions=True)
+
+    def begin_stream(self, on_event: EventCallback) -> StreamingTranscriber:
+        """
+        Start a streaming voice turn.
 
-            audio_data = b""
-            assert self._tts is not None
-            async for chunk in self._tts.stream_synthesize(sentence):
-                if chunk:
-                    audio_data += chunk
+        The caller feeds raw 16 kHz PCM chunks into the returned transcriber
+        as they arrive and hands it to run_stream() once feed() reports the
+        end of speech (or the client stops sending). Meanwhile partials go
+        out as {"type": "partial_transcript", "text": "..."} and are
+        pre-scored by the intent router; a turn that looks bound for the LLM
+        gets its memory context loaded before the user finishes talking.
 
-            if audio_data:
-                await on_event({"type": "speaking"})
-                # ElevenLabs returns mp3, Piper/Kokoro return wav
-                fmt = "mp3" if self._tts.__class__.__name__ == "ElevenLabsTTS" else "wav"
+        Raises:
+            RuntimeError: If initialize() has not been called.
+        """
+        if not self._initialized or self._stt is None:
+            raise RuntimeError(
+                "ConversationLoop.initialize() must be called before begin_stream()."
+            )
+        warmed = False
 
-                # Strip WAV header if present (44 bytes typically for simple
-                # RIFF)
-                if fmt == "wav" and audio_data.startswith(b"RIFF"):
-                    pcm_data = audio_data[44:]
-                else:
-                    pcm_data = audio_data
+        async def on_partial(text: str) -> None:
+            nonlocal warmed
+            await on_event({"type": "partial_transcript", "text": text})
+            intent_name, _ = get_intent_router().prescore(text)
+            if (intent_name == "conversation" and not warmed and self._memory
+                    and not self._flush_memory and not self._suppress_memory):
+                warmed = True
+                asyncio.create_task(self._memory.prefetch_context(self._user_id))
 
-                import struct
-                header = struct.pack("<HH", self._gen_id, seq_id)
-                await on_event(header + pcm_data)
+        return StreamingTranscriber(self._stt, on_partial=on_partial)
 
-                seq_id += 1
+    async def run_stream(self, stream: StreamingTranscriber,
+                         on_event: EventCallback) -> None:
+        """
+        Finish a streaming voice turn started with begin_stream().
+
+        Only the segment still open at the end of speech is decoded here;
+        everything before it was transcribed while the user was talking.
+        The rest of the turn is run_once() with that transcript.
+        """
+        await on_event({"type": "transcribing"})
+        try:
+            transcript = await stream.finish()
+        except Exception as exc:
+            logger.error("Transcription failed: %s", exc)
+            await on_event({"type": "error", "message": f"Transcription error: {exc}"})
+            await on_event({"type": "idle"})
+            return
+        await self.run_once(stream.audio, on_event, transcript=transcript)
 
     async def run_once(self, audio_bytes: bytes,
-                       on_event: EventCallback) -> None:
+                       on_event: EventCallback,
+                       transcript: Optional[str] = None) -> None:
         """
         Execute one full conversation turn: transcribe -> respond -> speak.
 
@@ -1031,7 +1235,10 @@ class ConversationLoop:
               Full assembled LLM response.
 
           {"type": "speaking"}
-              TTS synthesis complete; audio event follows immediately.
+              First audio of the answer is ready; binary frames follow.
+
+          <HH gen_id, seq_id> + PCM  (binary)
+              One audio frame, sent as soon as the TTS engine yields it.
 
           {"type": "audio", "data": "<base64-wav>"}
               WAV audio for the browser to decode and play.
@@ -1045,6 +1252,8 @@ class ConversationLoop:
         Args:
             audio_bytes: Raw WAV bytes from the browser mic.
             on_event:    Async callable that accepts a dict event payload.
+            transcript:  Already-transcribed text (streaming turns). STT is
+                         skipped; audio_bytes is then only used for speaker ID.
 
         Raises:
             RuntimeError: If initialize() has not been called.
@@ -1065,15 +1274,16 @@ class ConversationLoop:
         # -----------------------------------------------------------------
         # Step 1: Transcribe audio bytes received from the browser
         # -----------------------------------------------------------------
-        try:
-            await on_event({"type": "transcribing"})
-            assert self._stt is not None
-            transcript = await self._stt.transcribe(audio_bytes)
-        except Exception as exc:
-            logger.error("Transcription failed: %s", exc)
-            await on_event({"type": "error", "message": f"Transcription error: {exc}"})
-            await on_event({"type": "idle"})
-            return
+        if transcript is None:
+            try:
+                await on_event({"type": "transcribing"})
+                assert self._stt is not None
+                transcript = await self._stt.transcribe(audio_bytes)
+            except Exception as exc:
+                logger.error("Transcription failed: %s", exc)
+                await on_event({"type": "error", "message": f"Transcription error: {exc}"})
+                await on_event({"type": "idle"})
+                return
 
         # Who just spoke? Shared devices -- a Vortex hub on a kitchen counter
         # -- carry one session for the whole household, so the logged-in user
@@ -1581,6 +1791,65 @@ class ConversationLoop:
 
         await on_event({"type": "idle"})
 
+    def _fit_history(self) -> None:
+        """Trim history to this model's budget as a new turn starts.
+
+        Evicted turns go to the rolling summary in the background; the
+        summary from earlier evictions is spliced into the system prompt
+        before measuring, so its size counts against the budget.
+        """
+        self._window.budget = token_budget(getattr(self._llm, "_model", None)
+                                           or self._llm_model_override
+                                           or self._settings.llm_model)
+        summary = self._window.summary
+        self._splice_system_block(self._SUMMARY_BLOCK_MARKER,
+                                  "\n" + summary if summary else "")
+        evicted = self._window.fit(self._history)
+        if evicted:
+            metrics.incr("conversation.history_evicted_messages", len(evicted))
+            self._window.fold(evicted, self._spawn_background)
+        metrics.observe("conversation.prompt_tokens",
+                        self._window.prompt_tokens(self._history))
+
+    async def _summarize_turns(self, previous: str, messages: List[dict]) -> str:
+        """Fold evicted turns into the running summary with the SIMPLE role's model.
+
+        Queued as BACKGROUND so it never holds up the next turn on a local model.
+        """
+        from core.token_tracker import usage_source
+        from providers.llm.agent_roles import AgentRole, Priority, get_role_registry
+        from providers.llm.scheduler import llm_priority
+
+        lines = []
+        for m in messages:
+            content = m.get("content")
+            if not isinstance(content, str):
+                content = json.dumps(content, default=str)
+            if content:
+                lines.append(f"{m.get('role')}: {content[:600]}")
+        if not lines:
+            return previous
+        cfg = get_role_registry().get(AgentRole.SIMPLE)
+        llm, _ = _build_llm_provider(provider_override=cfg.provider,
+                                     model_override=cfg.model_id)
+        words = max(40, int(self._window.summary_budget * 0.6))
+        prompt = [
+            {"role": "system", "content": (
+                "You maintain a running summary of a conversation between a user "
+                "and River, their household assistant. Merge the new exchanges "
+                "into the summary. Keep names, numbers, decisions, open requests "
+                "and anything River promised to do; drop pleasantries. Write "
+                f"plain prose, under {words} words. Reply with the summary only."
+            )},
+            {"role": "user", "content": (
+                f"Summary so far:\n{previous or '(none)'}\n\n"
+                "New exchanges:\n" + "\n".join(lines)
+            )},
+        ]
+        with usage_source("history_summary"), llm_priority(Priority.BACKGROUND):
+            parts = [chunk async for chunk in llm.stream_response(prompt)]
+        return re.sub(r"<think>.*?</think>", "", "".join(parts), flags=re.DOTALL)
+
     async def reset_history(self, flush_memory: bool = False, session_id: Optional[str] = None, new_session: bool = False) -> None:
         """
         Clear conversation history and rebuild the system prompt with fresh memory context.
@@ -1589,6 +1858,7 @@ class ConversationLoop:
         all providers (which would reload the Whisper model, etc.).
         """
         self._history = []
+        self._window.reset()
         self._skills_block_cache.clear()
 
         if new_session:
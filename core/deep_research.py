@@ -24,6 +24,8 @@ from typing import Any, Awaitable, Callable, Dict, List, Optional
 from urllib.parse import urlparse
 
 from config.settings import get_settings
+from providers.llm.agent_roles import AgentRole
+from providers.llm.scheduler import llm_priority
 
 logger = logging.getLogger(__name__)
 
@@ -454,26 +456,27 @@ async def run_deep_research(
             except Exception:
                 pass
 
-    await _emit("decompose")
-    sub_queries = await decompose_query(query, llm=llm)
-    await _emit("decompose_done", sub_queries=sub_queries)
-
-    await _emit("gather")
-    candidates = await gather_sources(sub_queries, search_provider=search_provider)
-    await _emit("gather_done", candidate_count=len(candidates))
-
-    await _emit("fetch")
-    fetched = await asyncio.gather(*[
-        fetch_and_extract(src, fetcher=fetcher, extractor=extractor)
-        for src in candidates
-    ])
-    # Drop sources we couldn't extract anything from at all.
-    sources = [s for s in fetched if (s.get("text") or s.get("snippet"))]
-    await _emit("fetch_done", source_count=len(sources))
-
-    await _emit("synthesize")
-    report = await synthesize(query, sources, llm=llm)
-    await _emit("synthesize_done")
+    with llm_priority(AgentRole.SEARCHER):
+        await _emit("decompose")
+        sub_queries = await decompose_query(query, llm=llm)
+        await _emit("decompose_done", sub_queries=sub_queries)
+
+        await _emit("gather")
+        candidates = await gather_sources(sub_queries, search_provider=search_provider)
+        await _emit("gather_done", candidate_count=len(candidates))
+
+        await _emit("fetch")
+        fetched = await asyncio.gather(*[
+            fetch_and_extract(src, fetcher=fetcher, extractor=extractor)
+            for src in candidates
+        ])
+        # Drop sources we couldn't extract anything from at all.
+        sources = [s for s in fetched if (s.get("text") or s.get("snippet"))]
+        await _emit("fetch_done", source_count=len(sources))
+
+        await _emit("synthesize")
+        report = await synthesize(query, sources, llm=llm)
+        await _emit("synthesize_done")
 
     title = (query.strip()[:80]) or "Research report"
     doc = await store.create_document(user_id, title, "research", report)
@@ -4,6 +4,8 @@ import json as _json
 import re as _re
 from datetime import datetime, timezone
 from fastapi import FastAPI
+from providers.llm.agent_roles import Priority
+from providers.llm.scheduler import llm_priority
 from providers.vault.vault_provider import VaultProvider
 
 logger = logging.getLogger(__name__)
@@ -224,11 +226,13 @@ async def run_distiller(app: FastAPI):
         return
         
     sessions = await store.get_undistilled_sessions(idle_minutes=IDLE_CLOSE_MINUTES)
-    for session in sessions:
-        try:
-            await _distill_session(app, session)
-        except Exception as e:
-            logger.error(f"Failed to distill session {session['id']}: {e}")
+    # Nobody is waiting on a distillation; it queues behind every turn.
+    with llm_priority(Priority.BACKGROUND):
+        for session in sessions:
+            try:
+                await _distill_session(app, session)
+            except Exception as e:
+                logger.error(f"Failed to distill session {session['id']}: {e}")
 
 async def sweep_messages(app: FastAPI):
     """Deletes old chat messages from distilled sessions."""
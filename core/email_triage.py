@@ -35,6 +35,8 @@ import re
 from typing import Any, Dict, List, Optional
 
 from config.settings import get_settings
+from providers.llm.agent_roles import AgentRole
+from providers.llm.scheduler import llm_priority
 
 logger = logging.getLogger(__name__)
 
@@ -282,5 +284,7 @@ async def triage_inbox(
 
     if not unread:
         return []
-    enriched = await asyncio.gather(*[_enrich_one(m) for m in unread])
+    # The gathered tasks copy the context, priority included, as they start.
+    with llm_priority(AgentRole.SIFTER):
+        enriched = await asyncio.gather(*[_enrich_one(m) for m in unread])
     return list(enriched)
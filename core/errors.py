@@ -9,6 +9,7 @@
 #   raise not_found("Recipe not found")
 #   raise bad_request("Invalid barcode")
 #   raise forbidden("Admin only")
+#   raise too_many_requests("Queue full", retry_after=1)
 #   raise api_error("Unexpected failure", exc)   # logs + 500
 #
 # Usage in background tasks / providers:
@@ -50,6 +51,11 @@ def conflict(detail: str) -> HTTPException:
     return HTTPException(status_code=409, detail=detail)
 
 
+def too_many_requests(detail: str, retry_after: int) -> HTTPException:
+    return HTTPException(status_code=429, detail=detail,
+                         headers={"Retry-After": str(retry_after)})
+
+
 def api_error(detail: str, exc: Optional[Exception] = None,
               log: logging.Logger = _logger) -> HTTPException:
     """Log an unexpected exception and return a 500 HTTPException."""
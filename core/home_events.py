@@ -1,29 +1,168 @@
+"""
+core/home_events.py
+
+In-process fan-out of Home Assistant state changes.
+
+The HA WebSocket reader publishes every state_changed event here; the context
+engine, the device-trigger engine and each open /api/home/stream consumer
+subscribe. Subscribers used to be awaited one after another, so one slow
+handler held up every later one and the reader itself. Now each subscriber
+gets its own bounded queue and worker task:
+
+  - publish() only enqueues, so it never waits on a handler;
+  - a subscriber sees its events in publish order, one at a time;
+  - a slow or stuck subscriber only backs up its own queue -- a long agent
+    run in one handler cannot delay a leak alert in another;
+  - coalesce=True keeps only the newest state per entity while it waits
+    (the first queued old_state is kept, so the change still reads "from
+    where it was when last delivered"). For consumers that want current
+    state, not every flicker of a power sensor;
+  - a full queue drops its oldest event rather than growing.
+
+Metrics, per subscriber name: home_bus.<name>.queue_depth (gauge),
+home_bus.<name>.handler_ms, home_bus.<name>.dropped and
+home_bus.<name>.coalesced.
+"""
+
+from __future__ import annotations
+
 import asyncio
+import itertools
 import logging
-from typing import Callable, Coroutine, Dict, List, Any
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Coroutine, List, Optional
+
+from core import metrics
 
 logger = logging.getLogger(__name__)
 
 # Callback takes (entity_id: str, new_state: dict, old_state: dict)
 EventCallback = Callable[[str, dict, dict], Coroutine[Any, Any, None]]
 
+DEFAULT_QUEUE_SIZE = 1024
+
+
+class _Subscriber:
+    """One callback with its own queue and worker task."""
+
+    def __init__(self, cb: EventCallback, name: str, maxsize: int,
+                 coalesce: bool) -> None:
+        self.cb = cb
+        self.name = name
+        self.maxsize = max(1, maxsize)
+        self.coalesce = coalesce
+        # Coalescing subscribers key by entity_id; the rest by a sequence
+        # number, so every event gets its own slot.
+        self.pending: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._seq = itertools.count()
+        self._overflowing = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def put(self, entity_id: str, new_state: dict, old_state: dict) -> None:
+        if self.coalesce and entity_id in self.pending:
+            first_old = self.pending[entity_id][2]
+            self.pending[entity_id] = (entity_id, new_state, first_old)
+            metrics.incr(f"home_bus.{self.name}.coalesced")
+        else:
+            if len(self.pending) >= self.maxsize:
+                self.pending.popitem(last=False)
+                metrics.incr(f"home_bus.{self.name}.dropped")
+                if not self._overflowing:
+                    self._overflowing = True
+                    logger.warning("Home event subscriber %s is %d events behind; "
+                                   "dropping the oldest.", self.name, self.maxsize)
+            key = entity_id if self.coalesce else next(self._seq)
+            self.pending[key] = (entity_id, new_state, old_state)
+        metrics.set_gauge(f"home_bus.{self.name}.queue_depth", len(self.pending))
+        self._ensure_worker()
+        self._idle.clear()
+        self._wakeup.set()
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            if not self.pending:
+                self._overflowing = False
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            _, (entity_id, new_state, old_state) = self.pending.popitem(last=False)
+            metrics.set_gauge(f"home_bus.{self.name}.queue_depth", len(self.pending))
+            started = time.perf_counter()
+            try:
+                await self.cb(entity_id, new_state, old_state)
+            except Exception as e:
+                logger.error("Error in home event subscriber %s: %s", self.name, e)
+            finally:
+                metrics.observe(f"home_bus.{self.name}.handler_ms",
+                                (time.perf_counter() - started) * 1000)
+
+    async def join(self) -> None:
+        if self._idle is not None and self._loop is asyncio.get_running_loop():
+            await self._idle.wait()
+
+    def stop(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        self._worker = None
+        self.pending.clear()
+
+
 class HomeEventBus:
     def __init__(self):
-        self._subscribers: List[EventCallback] = []
+        self._subscribers: List[_Subscriber] = []
+
+    def subscribe(self, cb: EventCallback, *, name: Optional[str] = None,
+                  coalesce: bool = False,
+                  maxsize: int = DEFAULT_QUEUE_SIZE) -> None:
+        """
+        Deliver every published event to `cb` from its own worker task.
 
-    def subscribe(self, cb: EventCallback):
-        self._subscribers.append(cb)
+        Args:
+            name:     Label for metrics and logs; defaults to the callback's
+                      qualified name.
+            coalesce: Keep only the newest pending state per entity.
+            maxsize:  Pending events kept before the oldest is dropped.
+        """
+        label = name or getattr(cb, "__qualname__", None) or repr(cb)
+        self._subscribers.append(_Subscriber(cb, label, maxsize, coalesce))
 
     def unsubscribe(self, cb: EventCallback):
-        if cb in self._subscribers:
-            self._subscribers.remove(cb)
+        for sub in self._subscribers:
+            if sub.cb == cb:
+                sub.stop()
+                self._subscribers.remove(sub)
+                return
+
+    def publish(self, entity_id: str, new_state: dict, old_state: dict) -> None:
+        """Queue the event for every subscriber; never waits on a handler.
+
+        Must be called from the event loop thread.
+        """
+        for sub in list(self._subscribers):
+            sub.put(entity_id, new_state, old_state)
 
     async def emit(self, entity_id: str, new_state: dict, old_state: dict):
-        for cb in self._subscribers:
-            try:
-                await cb(entity_id, new_state, old_state)
-            except Exception as e:
-                logger.error(f"Error in home event subscriber: {e}")
+        self.publish(entity_id, new_state, old_state)
+
+    async def join(self) -> None:
+        """Wait until every subscriber has handled what is queued so far."""
+        for sub in list(self._subscribers):
+            await sub.join()
+
 
 _bus = HomeEventBus()
 
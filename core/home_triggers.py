@@ -23,6 +23,21 @@ The engine subscribes once to the HA event bus (core/home_events) and fans
 out to every enabled device routine. Delivery goes through the DeliveryRouter,
 never straight to push, so quiet hours, severity gating and cooldowns apply in
 one place.
+
+A busy house emits dozens of state changes a second (power sensors, media
+players), so the hot path never reads the routines table. The enabled device
+routines are compiled once into a _TriggerIndex keyed by entity_id,
+device_class, domain and area; an event no routine could match is dropped with
+a few dict lookups and no await. The index is rebuilt when the store's
+routines_version moves (any create/update/delete through SQLiteStore, or
+mark_routines_changed() from code that writes the table directly), and at
+least every _INDEX_MAX_AGE seconds for edits made by other processes.
+Per-event evaluation time is recorded as home_triggers.eval_ms.
+
+The bus delivers to this subscriber one event at a time, so the subscriber
+only matches. Each firing (an agent run or a delivery) is a background task,
+like the for_seconds timers: a routine whose agent run takes a minute must
+not hold up the smoke alarm event queued behind it.
 """
 
 from __future__ import annotations
@@ -32,13 +47,22 @@ import logging
 import time
 import zoneinfo
 from datetime import datetime, time as dtime
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set
+
+from core import metrics
 
 logger = logging.getLogger(__name__)
 
 # A pending "state must hold for N seconds" timer, keyed by (routine, entity).
 _PendingKey = tuple
 
+# Upper bound on how long a compiled index is trusted without a version
+# change -- covers routines edited from another process.
+_INDEX_MAX_AGE = 300.0
+
+# Entity -> area map refresh interval.
+_AREAS_MAX_AGE = 60.0
+
 
 def parse_hhmm(value: str) -> Optional[dtime]:
     try:
@@ -138,14 +162,63 @@ def explain(config: dict, entity_id: str, new_state: dict,
     return {"would_fire": True, "delay_seconds": 0.0, "reason": "matches"}
 
 
+class _TriggerIndex:
+    """Enabled device routines, bucketed by the selector that narrows most.
+
+    Each routine sits in exactly one bucket -- the first of entity_id,
+    device_class, domain, area that it sets -- and matches() still checks
+    every selector, so the buckets only decide which routines are worth
+    evaluating for an event.
+    """
+
+    __slots__ = ("by_entity", "by_device_class", "by_domain", "by_area", "by_id")
+
+    def __init__(self, routines: list) -> None:
+        self.by_entity: Dict[str, List[dict]] = {}
+        self.by_device_class: Dict[str, List[dict]] = {}
+        self.by_domain: Dict[str, List[dict]] = {}
+        self.by_area: Dict[str, List[dict]] = {}
+        self.by_id: Dict[str, dict] = {}
+        for r in routines:
+            config = r.get("trigger_config") or {}
+            if r.get("trigger") != "device" or not has_selector(config):
+                continue
+            if config.get("entity_id"):
+                bucket = self.by_entity.setdefault(config["entity_id"], [])
+            elif config.get("device_class"):
+                bucket = self.by_device_class.setdefault(config["device_class"], [])
+            elif config.get("domain"):
+                bucket = self.by_domain.setdefault(config["domain"], [])
+            else:
+                bucket = self.by_area.setdefault(str(config["area"]).lower(), [])
+            bucket.append(r)
+            self.by_id[r["id"]] = r
+
+    def candidates(self, entity_id: str, new_state: dict,
+                   area: Optional[str]) -> List[dict]:
+        found = list(self.by_entity.get(entity_id, ()))
+        device_class = (new_state.get("attributes") or {}).get("device_class")
+        if device_class:
+            found.extend(self.by_device_class.get(device_class, ()))
+        found.extend(self.by_domain.get(entity_id.split(".")[0], ()))
+        if area and self.by_area:
+            found.extend(self.by_area.get(area.lower(), ()))
+        return found
+
+
 class HomeTriggerEngine:
     """Watches the HA event bus and fires device-triggered routines."""
 
     def __init__(self, app) -> None:
         self._app = app
         self._pending: Dict[_PendingKey, asyncio.Task] = {}
+        self._firing: Set[asyncio.Task] = set()
         self._areas: Dict[str, Optional[str]] = {}
         self._areas_at: float = 0.0
+        self._index: Optional[_TriggerIndex] = None
+        self._index_version: Optional[int] = None
+        self._index_at: float = 0.0
+        self._index_lock = asyncio.Lock()
         self._started = False
 
     # -- lifecycle ---------------------------------------------------------
@@ -154,7 +227,8 @@ class HomeTriggerEngine:
         from core.home_events import get_home_bus
         if self._started:
             return
-        get_home_bus().subscribe(self.on_event)
+        # Not coalesced: a routine may care about every transition.
+        get_home_bus().subscribe(self.on_event, name="home_triggers")
         self._started = True
         logger.info("Home trigger engine listening for device events.")
 
@@ -163,9 +237,10 @@ class HomeTriggerEngine:
         if not self._started:
             return
         get_home_bus().unsubscribe(self.on_event)
-        for task in self._pending.values():
+        for task in [*self._pending.values(), *self._firing]:
             task.cancel()
         self._pending.clear()
+        self._firing.clear()
         self._started = False
 
     # -- helpers -----------------------------------------------------------
@@ -174,13 +249,16 @@ class HomeTriggerEngine:
     def _store(self):
         return self._app.state.memory_manager._store
 
+    def _areas_stale(self) -> bool:
+        return time.time() - self._areas_at > _AREAS_MAX_AGE
+
     async def _area_for(self, entity_id: str) -> Optional[str]:
         """Entity -> area, cached for a minute.
 
         Every state change would otherwise hit SQLite, and a busy house emits
         a lot of them.
         """
-        if time.time() - self._areas_at > 60:
+        if self._areas_stale():
             try:
                 rows = await self._store.execute_read_async(
                     "SELECT entity_id, area FROM ha_entities")
@@ -207,6 +285,35 @@ class HomeTriggerEngine:
             return []
         return [r for r in routines if r.get("trigger") == "device"]
 
+    def _routines_version(self) -> int:
+        return getattr(self._store, "routines_version", 0)
+
+    def _current_index(self) -> Optional[_TriggerIndex]:
+        """The compiled index, or None when it needs (re)building."""
+        if (self._index is None
+                or self._index_version != self._routines_version()
+                or time.monotonic() - self._index_at > _INDEX_MAX_AGE):
+            return None
+        return self._index
+
+    async def _load_index(self) -> _TriggerIndex:
+        async with self._index_lock:
+            index = self._current_index()
+            if index is not None:
+                return index
+            # Read the version first: a write landing during the load then
+            # leaves the index one version behind and it reloads next event.
+            version = self._routines_version()
+            index = _TriggerIndex(await self._device_routines())
+            self._index, self._index_version = index, version
+            self._index_at = time.monotonic()
+            metrics.set_gauge("home_triggers.routines", len(index.by_id))
+            return index
+
+    def invalidate(self) -> None:
+        """Drop the compiled routines; the next event reloads them."""
+        self._index = None
+
     # -- the hot path ------------------------------------------------------
 
     async def on_event(self, entity_id: str, new_state: dict,
@@ -220,17 +327,48 @@ class HomeTriggerEngine:
 
     async def _handle(self, entity_id: str, new_state: dict,
                       old_state: dict) -> None:
-        routines = await self._device_routines()
+        started = time.perf_counter()
+        try:
+            await self._evaluate(entity_id, new_state, old_state)
+        finally:
+            metrics.observe("home_triggers.eval_ms",
+                            (time.perf_counter() - started) * 1000)
+
+    def _with_pending(self, routines: List[dict], index: _TriggerIndex,
+                      entity_id: str) -> List[dict]:
+        """Add routines counting down on this entity that the index skipped,
+        so a change that no longer matches them still cancels the timer."""
+        if not self._pending:
+            return routines
+        seen = {r["id"] for r in routines}
+        for rid, eid in self._pending:
+            if eid == entity_id and rid not in seen and rid in index.by_id:
+                routines.append(index.by_id[rid])
+                seen.add(rid)
+        return routines
+
+    async def _evaluate(self, entity_id: str, new_state: dict,
+                        old_state: dict) -> None:
+        index = self._current_index() or await self._load_index()
+        if not index.by_id:
+            return
+        # Area rules need a current entity -> area map; everything else can
+        # be decided from the cached one without awaiting.
+        if index.by_area and self._areas_stale():
+            await self._area_for(entity_id)
+        area = self._areas.get(entity_id)
+        routines = self._with_pending(
+            index.candidates(entity_id, new_state, area), index, entity_id)
         if not routines:
+            metrics.incr("home_triggers.rejected")
             return
-        area = await self._area_for(entity_id)
+        if self._areas_stale():
+            area = await self._area_for(entity_id)
         new_value = str(new_state.get("state"))
         old_value = str((old_state or {}).get("state"))
 
         for r in routines:
             config = r.get("trigger_config") or {}
-            if not has_selector(config):
-                continue
             key = (r["id"], entity_id)
 
             if not matches(config, entity_id, new_state, area):
@@ -253,7 +391,7 @@ class HomeTriggerEngine:
             if hold > 0:
                 self._schedule(key, hold, r, entity_id, new_state, area)
             else:
-                await self._fire(r, entity_id, new_state, area)
+                self._spawn_fire(r, entity_id, new_state, area)
 
     def _cancel(self, key: _PendingKey) -> None:
         task = self._pending.pop(key, None)
@@ -268,7 +406,7 @@ class HomeTriggerEngine:
         async def _later():
             try:
                 await asyncio.sleep(hold)
-                await self._fire(routine, entity_id, new_state, area)
+                await self._fire_logged(routine, entity_id, new_state, area)
             except asyncio.CancelledError:
                 pass
             finally:
@@ -283,6 +421,22 @@ class HomeTriggerEngine:
         task = asyncio.create_task(_later())
         self._pending[key] = task
 
+    def _spawn_fire(self, routine: dict, entity_id: str, new_state: dict,
+                    area: Optional[str]) -> None:
+        """Fire off the bus worker, keeping a reference until it finishes."""
+        task = asyncio.create_task(
+            self._fire_logged(routine, entity_id, new_state, area))
+        self._firing.add(task)
+        task.add_done_callback(self._firing.discard)
+
+    async def _fire_logged(self, routine: dict, entity_id: str,
+                           new_state: dict, area: Optional[str]) -> None:
+        try:
+            await self._fire(routine, entity_id, new_state, area)
+        except Exception as e:
+            logger.error("Device trigger '%s' failed on %s: %s",
+                         routine.get("name"), entity_id, e)
+
     async def _fire(self, routine: dict, entity_id: str, new_state: dict,
                     area: Optional[str]) -> None:
         config = routine.get("trigger_config") or {}
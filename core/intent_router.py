@@ -19,6 +19,8 @@
 #   - Keyword fraction:   (matching_keywords / total_keywords) * 0.8
 #   - Final confidence:   max(phrase_score, keyword_score)
 #   - Threshold:          INTENT_CONFIDENCE_THRESHOLD (default 0.7 from .env)
+#   All intents are scored in one pass by _IntentMatcher, an Aho-Corasick
+#   automaton compiled from the registry (benchmark: scripts/bench_intent_router.py).
 #
 # Adding a new intent:
 #   1. Add an entry to INTENT_REGISTRY with phrases, keywords, and a handler.
@@ -48,6 +50,7 @@ from __future__ import annotations
 import contextlib
 import logging
 import re
+from collections import deque
 from contextvars import ContextVar
 from dataclasses import dataclass, field
 from typing import Any, Callable, Coroutine, Dict, Iterator, List, Optional, Tuple
@@ -1672,6 +1675,129 @@ INTENT_REGISTRY: List[Intent] = [
 ]
 
 
+# =============================================================================
+# Compiled matcher
+# =============================================================================
+#
+# Scoring used to walk every intent for every transcript, lowercasing each
+# phrase and keyword again and running one substring test per entry -- a few
+# hundred scans of the transcript on the critical path of every voice turn.
+# _IntentMatcher compiles the whole registry once into an Aho-Corasick
+# automaton, finds every phrase and keyword occurrence (overlaps included) in
+# one pass over the transcript, and turns the hits into exactly the scores
+# IntentRouter._compute_score would give.
+
+
+def _registry_signature(intents: List[Intent]) -> Tuple:
+    """Cheap identity of the registry's shape, checked before every match.
+
+    Catches intents being added, removed or replaced and phrase/keyword lists
+    growing or shrinking. An edit that rewrites a phrase in place keeps the
+    shape; call rebuild_intent_matcher() after one of those.
+    """
+    return tuple(
+        (id(i), id(i.phrases), len(i.phrases), id(i.keywords), len(i.keywords))
+        for i in intents
+    )
+
+
+class _IntentMatcher:
+    """Aho-Corasick automaton over every phrase and keyword in a registry."""
+
+    def __init__(self, intents: List[Intent]) -> None:
+        self.intents = list(intents)
+        self.signature = _registry_signature(intents)
+
+        # pattern -> [(intent index, is_phrase)], one entry per registry entry
+        # so duplicate keywords count twice, as they do in _compute_score.
+        owners: Dict[str, List[Tuple[int, bool]]] = {}
+        for idx, intent in enumerate(self.intents):
+            for phrase in intent.phrases:
+                owners.setdefault(phrase.lower(), []).append((idx, True))
+            for kw in intent.keywords:
+                owners.setdefault(kw.lower(), []).append((idx, False))
+        # "" is a substring of everything; it never enters the automaton.
+        self._always = tuple(owners.pop("", ()))
+        self._owners = owners
+        self._keyword_totals = [len(i.keywords) for i in self.intents]
+
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Tuple[str, ...]] = [()]
+        for pattern in owners:
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    out.append(())
+                    nxt = goto[state][ch] = len(goto) - 1
+                state = nxt
+            out[state] += (pattern,)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] += out[fail[nxt]]
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def scores(self, lower_transcript: str) -> List[float]:
+        """Score of each intent (same order as self.intents) in one pass."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for ch in lower_transcript:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+
+        phrase_hit = [False] * len(self.intents)
+        keyword_hits = [0] * len(self.intents)
+        for pattern in found:
+            for idx, is_phrase in self._owners[pattern]:
+                if is_phrase:
+                    phrase_hit[idx] = True
+                else:
+                    keyword_hits[idx] += 1
+        for idx, is_phrase in self._always:
+            if is_phrase:
+                phrase_hit[idx] = True
+            else:
+                keyword_hits[idx] += 1
+
+        return [
+            max(0.9 if phrase_hit[idx] else 0.0,
+                (keyword_hits[idx] / total) * 0.8 if total else 0.0)
+            for idx, total in enumerate(self._keyword_totals)
+        ]
+
+
+_matcher: Optional[_IntentMatcher] = None
+
+
+def _get_matcher() -> _IntentMatcher:
+    """The compiled matcher for INTENT_REGISTRY, rebuilt if its shape changed."""
+    global _matcher
+    if _matcher is None or _matcher.signature != _registry_signature(INTENT_REGISTRY):
+        _matcher = _IntentMatcher(INTENT_REGISTRY)
+    return _matcher
+
+
+def rebuild_intent_matcher() -> None:
+    """Recompile the matcher now. Call after editing a phrase in place."""
+    global _matcher
+    _matcher = _IntentMatcher(INTENT_REGISTRY)
+
+
 # =============================================================================
 # IntentRouter
 # =============================================================================
@@ -1697,6 +1823,10 @@ class IntentRouter:
         if confidence_threshold is None:
             confidence_threshold = get_settings().intent_confidence_threshold
         self._threshold = confidence_threshold
+        _get_matcher()  # compile now rather than on the first voice turn
+        # (matcher, lowered transcript, result) of the last scoring, so a
+        # final transcript equal to the last pre-scored partial is free.
+        self._last_scored: Optional[Tuple[_IntentMatcher, str, Tuple[Intent, float]]] = None
         logger.info(
             "IntentRouter initialized. Threshold: %.2f. Registered intents: %s.",
             self._threshold,
@@ -1746,6 +1876,22 @@ class IntentRouter:
             spoken = await best_intent.handler(transcript, user_id)
         return best_intent.name, spoken
 
+    def prescore(self, partial_transcript: str) -> Tuple[str, float]:
+        """
+        Score a partial (still-streaming) transcript without dispatching.
+
+        Lets the voice path start work that only one branch needs -- e.g.
+        warming the memory context when the turn is heading for the LLM --
+        before the user has finished talking. Handlers never run here.
+
+        Returns:
+            Tuple of (intent_name, score); ("conversation", 0.0) below threshold.
+        """
+        if not partial_transcript.strip():
+            return "conversation", 0.0
+        intent, score = self._score(partial_transcript)
+        return intent.name, score
+
     # -------------------------------------------------------------------------
     # Scoring
     # -------------------------------------------------------------------------
@@ -1754,6 +1900,8 @@ class IntentRouter:
         """
         Score every non-fallback intent and return the best match.
 
+        All intents are scored in a single pass by the compiled matcher.
+
         Falls back to the "conversation" intent if nothing exceeds the threshold.
 
         Args:
@@ -1762,16 +1910,25 @@ class IntentRouter:
         Returns:
             Tuple of (best_intent, best_score).
         """
+        matcher = _get_matcher()
         lower = transcript.lower()
+        last = self._last_scored
+        if last is not None and last[0] is matcher and last[1] == lower:
+            return last[2]
+        result = self._best(matcher, lower)
+        self._last_scored = (matcher, lower, result)
+        return result
+
+    def _best(self, matcher: _IntentMatcher, lower: str) -> Tuple[Intent, float]:
+        scores = matcher.scores(lower)
         best_score = 0.0
         # Default: conversation fallback
         best_intent: Intent = INTENT_REGISTRY[-1]
 
-        for intent in INTENT_REGISTRY:
+        for intent, score in zip(matcher.intents, scores):
             if intent.name == "conversation":
                 continue  # Skip the fallback during scoring
 
-            score = self._compute_score(lower, intent)
             if score > best_score:
                 best_score = score
                 best_intent = intent
@@ -1787,6 +1944,9 @@ class IntentRouter:
         """
         Compute a confidence score for one intent against the transcript.
 
+        The reference definition of a score. _score() uses the compiled
+        _IntentMatcher, which must agree with this exactly.
+
         Scoring:
           - Phrase match: any exact phrase found in the transcript -> 0.9
           - Keyword match: (matched_count / total_keywords) * 0.8
@@ -21,6 +21,8 @@
 #       Store or update an inferred preference.
 #   .cleanup_expired(user_id) -> int
 #       Sweep expired summaries; returns count deleted.
+#   .flush_ttl_extensions() -> int
+#       Write queued summary TTL extensions in one batch.
 #
 # Dependencies:
 #   providers.memory (SQLiteStore, all models, ttl_engine)
@@ -37,9 +39,14 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 import uuid
-from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Tuple
 
 from config.settings import get_settings
 from providers.memory.models import (
@@ -50,12 +57,25 @@ from providers.memory.models import (
     TTLOption,
 )
 from providers.memory.sqlite_store import SQLiteStore
-from providers.memory.ttl_engine import calculate_expires_at, extend_ttl
+from providers.memory.ttl_engine import calculate_expires_at, extend_ttl, is_expired
 from providers.memory.vector_store import VectorStore
 
 
 logger = logging.getLogger(__name__)
 
+# Users whose snapshots are kept at once; least recently used go first.
+_MAX_CACHED_USERS = 256
+
+
+@dataclass
+class _MemorySnapshot:
+    """One user's SQLite memory tiers, with facts/preferences pre-rendered."""
+    settings: MemorySettings
+    facts_block: str
+    prefs_block: str
+    summaries: list[ConversationSummary]
+    loaded_at: float
+
 
 class MemoryManager:
     """
@@ -68,6 +88,10 @@ class MemoryManager:
         - One MemoryManager instance is shared across all WebSocket connections.
         - build_context_block() is called at conversation start; it also handles
           auto-extend for any summaries it loads (if settings.auto_extend is True).
+        - The SQLite tiers are cached per user (MEMORY_CONTEXT_CACHE_SECONDS)
+          and dropped by every write method below, so all memory writes must
+          go through this class. TTL extensions are queued and written in
+          batches by flush_ttl_extensions().
         - record_summary() is called at conversation end with the full transcript
           or a pre-generated summary string.
     """
@@ -76,6 +100,9 @@ class MemoryManager:
         self._store = store
         self._settings = get_settings()
         self._vector_store = VectorStore() if self._settings.semantic_memory_enabled else None
+        self._snapshots: "OrderedDict[str, _MemorySnapshot]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._pending_ttl: Dict[str, Tuple[Optional[datetime], int]] = {}
 
     async def initialize(self) -> None:
         """Ensure the database schema is ready. Call once at server startup."""
@@ -107,45 +134,119 @@ class MemoryManager:
         if self._settings.semantic_memory_enabled and query_text:
             return await self.get_context_for_prompt(user_id, query_text)
 
-        mem_settings = await self._store.get_memory_settings(user_id)
-        parts: list[str] = []
+        snapshot = await self._get_snapshot(user_id)
+        return self._render(snapshot, semantic_results=None)
 
-        # --- Facts ---
-        facts = await self._store.get_facts(user_id)
-        if facts:
-            lines = [f"  - {f.key}: {f.value}" for f in facts]
-            parts.append("KNOWN FACTS ABOUT THE USER:\n" + "\n".join(lines))
+    async def get_context_for_prompt(
+            self, user_id: str, query_text: str) -> str:
+        """
+        Retrieves relevant context using semantic search, augmented by core SQLite results.
+        """
+        try:
+            # The Chroma query does not depend on the SQLite tiers, so both
+            # run at once; on a warm snapshot only the query is left.
+            semantic_results, snapshot = await asyncio.gather(
+                self._vector_store.search(  # type: ignore
+                    query_text,
+                    n_results=6,
+                    where={"user_id": user_id}
+                ),
+                self._get_snapshot(user_id),
+            )
 
-        # --- Preferences ---
-        prefs = await self._store.get_preferences(user_id)
-        if prefs:
-            lines = [f"  - {p.category}: {p.value}" for p in prefs]
-            parts.append("USER PREFERENCES:\n" + "\n".join(lines))
+            # Extend TTL for semantic summary hits
+            if semantic_results and snapshot.settings.auto_extend:
+                for r in semantic_results:
+                    if r.get("metadata", {}).get("type") == "summary":
+                        self._queue_ttl_extension(
+                            r["id"], snapshot.settings.default_ttl)
 
-        # --- Summaries ---
-        if mem_settings.summaries_enabled:
-            summaries = await self._store.get_recent_summaries(
+            return self._render(snapshot, semantic_results)
+
+        except Exception as exc:
+            logger.warning(
+                "Semantic search failed: %s. Falling back to SQLite only.", exc)
+            return await self.build_context_block(user_id, query_text=None)
+
+    async def _get_snapshot(self, user_id: str) -> _MemorySnapshot:
+        """The user's cached memory tiers, loading them if absent or stale."""
+        snapshot = self._snapshots.get(user_id)
+        max_age = self._settings.memory_context_cache_seconds
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < max_age:
+            self._snapshots.move_to_end(user_id)
+            return snapshot
+
+        version = self._versions.get(user_id, 0)
+        mem_settings, facts, prefs, summaries = await asyncio.gather(
+            self._store.get_memory_settings(user_id),
+            self._store.get_facts(user_id),
+            self._store.get_preferences(user_id),
+            self._store.get_recent_summaries(
                 user_id,
                 limit=self._settings.memory_max_summaries_in_context,
-            )
-            if summaries:
-                lines = []
-                for s in summaries:
-                    date_str = (
-                        s.created_at.strftime("%Y-%m-%d")
-                        if s.created_at
-                        else "unknown date"
-                    )
-                    lines.append(f"  [{date_str}] {s.summary}")
-
-                    if mem_settings.auto_extend:
-                        new_expiry = extend_ttl(s, mem_settings.default_ttl)
-                        await self._store.update_summary_ttl(s.id, new_expiry)
-
-                parts.append(
-                    "RECENT CONVERSATION SUMMARIES (most recent first):\n"
-                    + "\n".join(lines)
+            ),
+        )
+        snapshot = _MemorySnapshot(
+            settings=mem_settings,
+            facts_block=(
+                "KNOWN FACTS ABOUT THE USER:\n"
+                + "\n".join(f"  - {f.key}: {f.value}" for f in facts)
+                if facts else ""
+            ),
+            prefs_block=(
+                "USER PREFERENCES:\n"
+                + "\n".join(f"  - {p.category}: {p.value}" for p in prefs)
+                if prefs else ""
+            ),
+            summaries=summaries if mem_settings.summaries_enabled else [],
+            loaded_at=time.monotonic(),
+        )
+        # A write that landed while we were reading makes this copy stale
+        # already; hand it out for this turn but do not keep it.
+        if self._versions.get(user_id, 0) == version and max_age > 0:
+            self._snapshots[user_id] = snapshot
+            self._snapshots.move_to_end(user_id)
+            while len(self._snapshots) > _MAX_CACHED_USERS:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def _render(self, snapshot: _MemorySnapshot,
+                semantic_results: Optional[list[dict]]) -> str:
+        parts: list[str] = []
+
+        if semantic_results:
+            lines = [f"  - {r['text']}" for r in semantic_results]
+            parts.append("RELEVANT MEMORIES (Local):\n" + "\n".join(lines))
+
+        if snapshot.facts_block:
+            parts.append(snapshot.facts_block)
+
+        if snapshot.prefs_block:
+            parts.append(snapshot.prefs_block)
+
+        # --- Summaries ---
+        mem_settings = snapshot.settings
+        summaries = [s for s in snapshot.summaries if not is_expired(s)]
+        if summaries:
+            lines = []
+            for s in summaries:
+                date_str = (
+                    s.created_at.strftime("%Y-%m-%d")
+                    if s.created_at
+                    else "unknown date"
                 )
+                lines.append(f"  [{date_str}] {s.summary}")
+
+                if mem_settings.auto_extend:
+                    new_expiry = extend_ttl(s, mem_settings.default_ttl)
+                    # The snapshot stays in step with what the flush will write.
+                    s.expires_at = new_expiry
+                    self._queue_ttl_extension(s.id, mem_settings.default_ttl)
+
+            parts.append(
+                "RECENT CONVERSATION SUMMARIES (most recent first):\n"
+                + "\n".join(lines)
+            )
 
         if not parts:
             return ""
@@ -156,90 +257,56 @@ class MemoryManager:
             + "\n--- END MEMORY ---"
         )
 
-    async def get_context_for_prompt(
-            self, user_id: str, query_text: str) -> str:
-        """
-        Retrieves relevant context using semantic search, augmented by core SQLite results.
-        """
-        try:
-            mem_settings = await self._store.get_memory_settings(user_id)
-            
-            # 1. Local Semantic results (ChromaDB)
-            semantic_results = await self._vector_store.search(  # type: ignore
-                query_text,
-                n_results=6,
-                where={"user_id": user_id}
-            )
+    async def prefetch_context(self, user_id: str) -> None:
+        """Load the user's snapshot ahead of time (e.g. while they are still
+        talking) so the next build_context_block() finds it warm."""
+        await self._get_snapshot(user_id)
 
-            # 2. Core SQLite results
-            facts = await self._store.get_facts(user_id)
-            prefs = await self._store.get_preferences(user_id)
-            
-            recent_summaries = []
-            if mem_settings.summaries_enabled:
-                recent_summaries = await self._store.get_recent_summaries(
-                    user_id,
-                    limit=self._settings.memory_max_summaries_in_context,
-                )
+    def invalidate_context(self, user_id: str) -> None:
+        """Drop the cached memory snapshot for `user_id` after a write."""
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._snapshots.pop(user_id, None)
 
-            parts: list[str] = []
+    # =========================================================================
+    # Deferred TTL extension
+    # =========================================================================
 
-            # Extend TTL for semantic summary hits
-            if semantic_results and mem_settings.auto_extend:
-                for r in semantic_results:
-                    if r.get("metadata", {}).get("type") == "summary":
-                        summary_id = r["id"]
-                        summary = await self._store.get_summary_by_id(summary_id)
-                        if summary:
-                            new_expiry = extend_ttl(summary, mem_settings.default_ttl)
-                            await self._store.update_summary_ttl(summary.id, new_expiry)
-
-            if semantic_results:
-                lines = [f"  - {r['text']}" for r in semantic_results]
-                parts.append("RELEVANT MEMORIES (Local):\n" + "\n".join(lines))
-
-            if facts:
-                lines = [f"  - {f.key}: {f.value}" for f in facts]
-                parts.append(
-                    "KNOWN FACTS ABOUT THE USER:\n" +
-                    "\n".join(lines))
-
-            if prefs:
-                lines = [f"  - {p.category}: {p.value}" for p in prefs]
-                parts.append("USER PREFERENCES:\n" + "\n".join(lines))
-                
-            if recent_summaries:
-                lines = []
-                for s in recent_summaries:
-                    date_str = (
-                        s.created_at.strftime("%Y-%m-%d")
-                        if s.created_at
-                        else "unknown date"
-                    )
-                    lines.append(f"  [{date_str}] {s.summary}")
-                    
-                    if mem_settings.auto_extend:
-                        new_expiry = extend_ttl(s, mem_settings.default_ttl)
-                        await self._store.update_summary_ttl(s.id, new_expiry)
-
-                parts.append(
-                    "RECENT CONVERSATION SUMMARIES (most recent first):\n"
-                    + "\n".join(lines)
-                )
+    def _queue_ttl_extension(self, summary_id: str, default_ttl: str) -> None:
+        """
+        Record that a summary was pulled into context.
 
-            if not parts:
-                return ""
+        Nothing is written here: references pile up in memory and
+        flush_ttl_extensions() applies them in one transaction. Several
+        references before a flush collapse into one row update, with the
+        latest expiry and the summed reference count.
+        """
+        _, refs = self._pending_ttl.get(summary_id, (None, 0))
+        self._pending_ttl[summary_id] = (calculate_expires_at(default_ttl), refs + 1)
 
-            return (
-                "\n\n--- MEMORY ---\n"
-                + "\n\n".join(parts)
-                + "\n--- END MEMORY ---"
-            )
+    async def flush_ttl_extensions(self) -> int:
+        """
+        Write all queued TTL extensions. Runs from the memory_ttl_flush sweep,
+        before expiry cleanup, and at shutdown.
 
-        except Exception as exc:
-            logger.warning(
-                "Semantic search failed: %s. Falling back to SQLite only.", exc)
-            return await self.build_context_block(user_id, query_text=None)
+        Returns:
+            Number of summaries updated.
+        """
+        if not self._pending_ttl:
+            return 0
+        pending, self._pending_ttl = self._pending_ttl, {}
+        updates = [(sid, expires, refs) for sid, (expires, refs) in pending.items()]
+        try:
+            await self._store.update_summary_ttls(updates)
+        except Exception:
+            # Put them back (newer references win) so the next flush retries.
+            for sid, entry in pending.items():
+                if sid not in self._pending_ttl:
+                    self._pending_ttl[sid] = entry
+                else:
+                    expires, refs = self._pending_ttl[sid]
+                    self._pending_ttl[sid] = (expires, refs + entry[1])
+            raise
+        return len(updates)
 
     async def search_memories(self, user_id: str, query: str, limit: int = 5) -> list[dict]:
         """Search across facts, preferences, and summaries using vector store."""
@@ -303,6 +370,7 @@ class MemoryManager:
             source_ref=source_ref,
         )
         await self._store.upsert_fact(fact)
+        self.invalidate_context(user_id)
         logger.debug(
             "Fact upserted to SQLite (user=%s, key=%s).",
             user_id,
@@ -318,12 +386,16 @@ class MemoryManager:
 
     async def delete_fact(self, fact_id: str, user_id: str) -> bool:
         deleted = await self._store.delete_fact(fact_id, user_id)
+        if deleted:
+            self.invalidate_context(user_id)
         if deleted and self._settings.semantic_memory_enabled and self._vector_store:
             await self._vector_store.delete(fact_id)
         return deleted
 
     async def update_fact(self, fact_id: str, user_id: str, key: str, value: str) -> bool:
         updated = await self._store.update_fact(fact_id, user_id, key, value)
+        if updated:
+            self.invalidate_context(user_id)
         if updated and self._settings.semantic_memory_enabled and self._vector_store:
             fact_text = f"{key}: {value}"
             await self._vector_store.upsert(
@@ -342,6 +414,8 @@ class MemoryManager:
 
     async def delete_preference(self, pref_id: str, user_id: str) -> bool:
         deleted = await self._store.delete_preference(pref_id, user_id)
+        if deleted:
+            self.invalidate_context(user_id)
         if deleted and self._settings.semantic_memory_enabled and self._vector_store:
             await self._vector_store.delete(pref_id)
         return deleted
@@ -379,6 +453,7 @@ class MemoryManager:
             source_ref=source_ref,
         )
         await self._store.upsert_preference(pref)
+        self.invalidate_context(user_id)
         logger.debug(
             "Preference upserted to SQLite (user=%s, category=%s).",
             user_id,
@@ -394,6 +469,8 @@ class MemoryManager:
 
     async def update_preference(self, pref_id: str, user_id: str, category: str, value: str) -> bool:
         updated = await self._store.update_preference(pref_id, user_id, category, value)
+        if updated:
+            self.invalidate_context(user_id)
         if updated and self._settings.semantic_memory_enabled and self._vector_store:
             pref_text = f"Preference - {category}: {value}"
             await self._vector_store.upsert(
@@ -432,10 +509,21 @@ class MemoryManager:
 
     async def delete_summary(self, summary_id: str, user_id: str) -> bool:
         deleted = await self._store.delete_summary(summary_id, user_id)
+        if deleted:
+            self.invalidate_context(user_id)
+            self._pending_ttl.pop(summary_id, None)
         if deleted and self._settings.semantic_memory_enabled and self._vector_store:
             await self._vector_store.delete(summary_id)
         return deleted
 
+    async def set_summary_ttl(self, summary_id: str, user_id: str, ttl_setting: str) -> bool:
+        """Apply a user-chosen TTL option to one of their summaries."""
+        updated = await self._store.set_summary_ttl(
+            summary_id, user_id, ttl_setting, calculate_expires_at(ttl_setting))
+        if updated:
+            self.invalidate_context(user_id)
+        return updated
+
     async def record_summary(
         self,
         user_id: str,
@@ -481,6 +569,7 @@ class MemoryManager:
             source_ref=source_ref,
         )
         await self._store.save_summary(summary)
+        self.invalidate_context(user_id)
         
         if self._settings.semantic_memory_enabled and self._vector_store:
             await self._vector_store.upsert(
@@ -507,6 +596,7 @@ class MemoryManager:
 
     async def save_memory_settings(self, settings: MemorySettings) -> None:
         await self._store.save_memory_settings(settings)
+        self.invalidate_context(settings.user_id)
 
     # =========================================================================
     # LLM settings
@@ -529,8 +619,11 @@ class MemoryManager:
         Returns:
             Number of rows deleted.
         """
+        # Queued extensions may rescue summaries that look expired on disk.
+        await self.flush_ttl_extensions()
         deleted_ids = await self._store.delete_expired_summaries(user_id)
         if deleted_ids:
+            self.invalidate_context(user_id)
             if self._settings.semantic_memory_enabled and self._vector_store:
                 for d_id in deleted_ids:
                     await self._vector_store.delete(d_id)
@@ -0,0 +1,107 @@
+"""
+core/metrics.py
+
+In-process performance counters for River Song AI.
+
+Langfuse (core/observability.py) answers "what did this LLM call do". This
+module answers the cheaper, always-on question "how long are the hot paths
+taking right now": time-to-first-audio, queue depth, pool wait and so on.
+Nothing leaves the process -- the SLAE admin panel reads snapshot() through
+GET /api/admin/slae/metrics.
+
+Three kinds of series, all keyed by a dotted name ("tts.first_audio_ms"):
+
+  observe(name, value)  -- a latency/size sample. Keeps count, total, max and
+                           a rolling window of the most recent samples for
+                           percentiles.
+  incr(name, n)         -- a monotonically increasing counter.
+  set_gauge(name, v)    -- a point-in-time value (queue depth, pool size).
+
+Every call is O(1) and thread-safe, so executor threads may record too.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict
+
+# Samples kept per series for percentiles. Counts and totals are lifetime.
+_WINDOW = 512
+
+_lock = threading.Lock()
+_series: Dict[str, "_Series"] = {}
+_counters: Dict[str, int] = {}
+_gauges: Dict[str, float] = {}
+
+
+class _Series:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=_WINDOW)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.recent.append(value)
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.recent)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "max": round(self.max, 2),
+        }
+
+
+def observe(name: str, value: float) -> None:
+    """Record one sample of `name` (milliseconds by convention for *_ms)."""
+    with _lock:
+        series = _series.get(name)
+        if series is None:
+            series = _series[name] = _Series()
+        series.add(float(value))
+
+
+def incr(name: str, n: int = 1) -> None:
+    """Add `n` to the counter `name`."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def set_gauge(name: str, value: float) -> None:
+    """Set the current value of the gauge `name`."""
+    with _lock:
+        _gauges[name] = value
+
+
+def snapshot() -> Dict[str, Any]:
+    """Everything recorded so far, shaped for JSON."""
+    with _lock:
+        return {
+            "latency": {k: s.summary() for k, s in sorted(_series.items())},
+            "counters": dict(sorted(_counters.items())),
+            "gauges": dict(sorted(_gauges.items())),
+        }
+
+
+def reset() -> None:
+    """Forget every series. For tests."""
+    with _lock:
+        _series.clear()
+        _counters.clear()
+        _gauges.clear()
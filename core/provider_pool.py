@@ -1,6 +1,7 @@
 import asyncio
 import logging
-from typing import Optional, Dict, Tuple
+import time
+from typing import Any, Optional, Dict, Tuple
 
 from config.settings import get_settings
 
@@ -15,7 +16,9 @@ class ProviderPool:
         self.tts = None
         self.stt_model_size = None
         self.tts_voice_id = None
-        
+        # voice_id -> provider. None is the system default voice.
+        self._tts_pool: Dict[Optional[str], Any] = {}
+
     @classmethod
     async def get_instance(cls):
         if cls._instance is None:
@@ -40,11 +43,64 @@ class ProviderPool:
             return self.stt
 
     async def get_tts(self, voice_id: Optional[str] = None):
+        """
+        Shared TTS provider for `voice_id`, built on first request.
+
+        Providers are pooled per voice, so two rooms on different voices do
+        not evict each other's resident engine, and a voice switch no longer
+        throws away the previous one. Engines are warmed here so the first
+        sentence of a turn does not pay for process start-up and model load.
+        """
         loop = asyncio.get_running_loop()
         async with self._lock:
-            if self.tts is None or self.tts_voice_id != voice_id:
+            tts = self._tts_pool.get(voice_id)
+            if tts is None:
                 from core.conversation_loop import _build_tts_provider
-                self.tts = await loop.run_in_executor(
+                tts = await loop.run_in_executor(
                     None, lambda: _build_tts_provider(voice_id_override=voice_id))
-                self.tts_voice_id = voice_id
-            return self.tts
+                self._tts_pool[voice_id] = tts
+            self.tts = tts
+            self.tts_voice_id = voice_id
+        warm_up = getattr(tts, "warm_up", None)
+        if warm_up is not None:
+            try:
+                await warm_up()
+            except Exception as exc:
+                # Synthesis retries the start-up and reports it properly.
+                logger.warning("TTS warm-up failed for voice %s: %s", voice_id, exc)
+        return tts
+
+    async def reap_idle_tts(self, max_idle_seconds: float) -> int:
+        """
+        Stop the resident engine of every pooled voice idle that long.
+
+        The provider stays in the pool -- a connection may still hold it --
+        and restarts its engine on the next sentence. Voices whose engine is
+        already stopped are skipped, so a reaped voice is not closed again on
+        every pass. Returns how many were stopped.
+        """
+        if max_idle_seconds <= 0:
+            return 0
+        now = time.monotonic()
+        stopped = 0
+        for voice_id, tts in list(self._tts_pool.items()):
+            last_used = getattr(tts, "last_used", None)
+            if last_used is None or now - last_used < max_idle_seconds:
+                continue
+            if not getattr(tts, "engine_running", True):
+                continue
+            try:
+                await tts.close()
+                stopped += 1
+            except Exception as exc:
+                logger.warning("Could not stop idle TTS voice %s: %s", voice_id, exc)
+        return stopped
+
+    async def close_all(self) -> None:
+        """Stop every pooled TTS engine. Called at application shutdown."""
+        for voice_id, tts in list(self._tts_pool.items()):
+            try:
+                await tts.close()
+            except Exception as exc:
+                logger.warning("Could not stop TTS voice %s: %s", voice_id, exc)
+        self._tts_pool.clear()
@@ -1,99 +1,285 @@
 """
 core/routines_scheduler.py
 
-Background task that checks for scheduled routines and executes them.
+Runs scheduled routines at their time, and executes routines generally.
 Supports proactive briefings (Phase 13).
+
+RoutineScheduler keeps each enabled schedule routine's next fire instant in
+a TimerHeap (core/timer_heap.py) and sleeps until the earliest one, instead
+of scanning every routine once a minute and string-comparing "HH:MM" -- which
+missed a routine outright whenever a tick landed late. Fire instants are
+computed in the owner's timezone, honour `days`, and survive DST: a time that
+falls in a spring-forward gap fires at the first instant after it, and one
+that occurs twice in autumn fires once.
+
+The heap is resynced when SQLiteStore.routines_version moves (checked every
+_SYNC_SECONDS without touching the database) and fully reloaded every
+_RESYNC_SECONDS to pick up timezone changes. Only routines whose time, days
+or timezone changed are recomputed.
+
+A routine whose time passed while the server was down, or that comes due
+more than _LATE_GRACE_SECONDS late, follows ROUTINES_MISSED_RUN_POLICY:
+"skip", or "run_once_on_recovery" -- once, however many slots were missed,
+if no more than ROUTINES_CATCHUP_MINUTES late.
 """
 
 import asyncio
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
+from datetime import time as dtime
 import zoneinfo
+from typing import Dict, Optional, Set
 from fastapi import FastAPI
+from config.settings import get_settings
 from core.conversation_loop import ConversationLoop
 from core.distiller import run_distiller, sweep_messages
+from core.home_triggers import parse_hhmm
+from core.timer_heap import TimerHeap
+from providers.llm.agent_roles import Priority
+from providers.llm.scheduler import llm_priority
 
 logger = logging.getLogger(__name__)
 
+UTC = zoneinfo.ZoneInfo("UTC")
+
+_DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# How often the loop checks store.routines_version (an attribute read).
+_SYNC_SECONDS = 30.0
+# Full reload interval: timezone edits and writes from other processes.
+_RESYNC_SECONDS = 900.0
+# A fire this late counts as missed and goes through the missed-run policy.
+_LATE_GRACE_SECONDS = 120.0
+
+
+def _weekdays(days) -> Set[int]:
+    """Weekday numbers (Mon=0) a routine runs on; empty `days` is every day."""
+    if isinstance(days, str):
+        import json
+        try:
+            days = json.loads(days)
+        except Exception:
+            days = []
+    if not days:
+        return set(range(7))
+    return {i for i, name in enumerate(_DAY_NAMES)
+            if any(str(d).lower().startswith(name) for d in days)}
+
+
+def _instant(day, at: dtime, tz: zoneinfo.ZoneInfo) -> datetime:
+    # Through UTC so a wall time inside a DST gap becomes a real instant.
+    return datetime.combine(day, at, tzinfo=tz).astimezone(UTC)
+
+
+def next_fire_after(routine: dict, tz: zoneinfo.ZoneInfo,
+                    after: datetime) -> Optional[datetime]:
+    """First instant strictly after `after` at which the routine runs."""
+    at = parse_hhmm(routine.get("time") or "")
+    weekdays = _weekdays(routine.get("days"))
+    if at is None or not weekdays:
+        return None
+    start = after.astimezone(tz).date()
+    for i in range(8):
+        day = start + timedelta(days=i)
+        if day.weekday() in weekdays:
+            fire = _instant(day, at, tz)
+            if fire > after:
+                return fire
+    return None
+
+
+def last_fire_before(routine: dict, tz: zoneinfo.ZoneInfo,
+                     before: datetime) -> Optional[datetime]:
+    """Latest instant at or before `before` at which the routine ran or should have."""
+    at = parse_hhmm(routine.get("time") or "")
+    weekdays = _weekdays(routine.get("days"))
+    if at is None or not weekdays:
+        return None
+    start = before.astimezone(tz).date()
+    for i in range(8):
+        day = start - timedelta(days=i)
+        if day.weekday() in weekdays:
+            fire = _instant(day, at, tz)
+            if fire <= before:
+                return fire
+    return None
 
 
+def _parse_ts(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return ts if ts.tzinfo else ts.replace(tzinfo=UTC)
+
+
+class RoutineScheduler:
+    """Fires schedule routines from a heap of next fire instants."""
+
+    def __init__(self, app: FastAPI) -> None:
+        self._app = app
+        self._heap = TimerHeap()
+        self._routines: Dict[str, dict] = {}
+        # routine id -> (time, days, tz) its heap entry was computed from.
+        self._signatures: Dict[str, tuple] = {}
+        self._tz: Dict[str, zoneinfo.ZoneInfo] = {}
+        self._version = None
+        self._synced_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
 
+    @property
+    def _store(self):
+        return self._app.state.memory_manager._store
 
-async def _check_routines(app: FastAPI):
-    memory_manager = app.state.memory_manager
-    store = memory_manager._store
+    # -- lifecycle ---------------------------------------------------------
 
-    # We need a list of all users who have routines.
-    # For now, we'll assume we can list all routines in the DB.
-    # Note: SQLiteStore.list_routines usually takes a user_id.
-    # We might need a global list_all_enabled_routines.
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="routine_scheduler")
 
-    # Mocking global list for now since SQLiteStore might not have it
-    # If the method doesn't exist, we'll skip for this turn.
-    if not hasattr(store, "get_enabled_routines"):
-        return
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Runs already fired would otherwise outlive shutdown and touch a
+        # closed memory store.
+        running = list(self._running)
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        self._running.clear()
 
-    routines = await store.get_enabled_routines()
-    now_utc = datetime.now(zoneinfo.ZoneInfo("UTC"))
+    def next_due(self, routine_id: str) -> Optional[datetime]:
+        """When the routine is due next, as the scheduler sees it."""
+        due = self._heap.due_at(routine_id)
+        return datetime.fromtimestamp(due, UTC) if due is not None else None
 
-    for r in routines:
-        user_id = r["user_id"]
+    # -- the loop ----------------------------------------------------------
 
-        # 1. Check if it’s time to run (based on user’s timezone)
-        user_settings = await store.get_llm_settings(user_id)
+    async def _run(self) -> None:
+        await self.sync(recovering=True)
+        while True:
+            try:
+                for rid, due_at in await self._heap.wait_due(max_wait=_SYNC_SECONDS):
+                    self._fire(rid, due_at)
+                if self._needs_sync():
+                    await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Routine scheduler error: %s", e, exc_info=True)
+                await asyncio.sleep(_SYNC_SECONDS)
 
-        # Safe attribute/item access for timezone
-        if isinstance(user_settings, dict):
-            tz_str = user_settings.get("timezone") or "UTC"
-        else:
-            tz_str = getattr(user_settings, "timezone", "UTC")
+    def _needs_sync(self) -> bool:
+        return (getattr(self._store, "routines_version", None) != self._version
+                or time.monotonic() - self._synced_at > _RESYNC_SECONDS)
 
+    async def _user_tz(self, user_id: str) -> zoneinfo.ZoneInfo:
         try:
-            user_tz = zoneinfo.ZoneInfo(tz_str)
+            user_settings = await self._store.get_llm_settings(user_id)
+            if isinstance(user_settings, dict):
+                tz_str = user_settings.get("timezone") or "UTC"
+            else:
+                tz_str = getattr(user_settings, "timezone", None) or "UTC"
+            return zoneinfo.ZoneInfo(tz_str)
         except Exception:
-            user_tz = zoneinfo.ZoneInfo("UTC")
+            return UTC
 
-        now_local = now_utc.astimezone(user_tz)
+    async def sync(self, recovering: bool = False) -> None:
+        """Bring the heap in line with the enabled schedule routines.
 
-        # Schedule check (e.g. "08:00")
+        With `recovering`, a slot missed since the routine last ran is queued
+        at its original time so _fire applies the missed-run policy to it.
+        """
+        store = self._store
+        version = getattr(store, "routines_version", None)
+        try:
+            routines = await store.get_enabled_routines()
+        except Exception as e:
+            logger.error("Could not load routines: %s", e)
+            return
         # The tool writers persist "schedule" for HH:MM triggers
         # (core/tools_routines.py); accept the legacy "time" value too.
-        if r["trigger"] in ("schedule", "time") and r["time"] == now_local.strftime("%H:%M"):
-            # Check days (empty = every day)
-            days = r.get("days") or []
-            if isinstance(days, str):
-                import json
-                try:
-                    days = json.loads(days)
-                except Exception:
-                    days = []
-            if days:
-                today_str = now_local.strftime("%a").lower()  # e.g., "mon"
-                if not any(d.lower().startswith(today_str) for d in days):
-                    continue
-
-            # Check if it ran recently to avoid double-triggers in the same
-            # minute
-            last_run = r.get("last_run")
-            if last_run:
-                try:
-                    lr_dt = datetime.fromisoformat(last_run)
-                    if (now_utc - lr_dt).total_seconds() < 120:
-                        continue
-                except ValueError:
-                    logger.warning(
-                        "Routine '%s' has malformed last_run timestamp '%s' — "
-                        "running it now and resetting the value.",
-                        r.get("name"), last_run
-                    )
-                    # Don't skip — let it run, which will write a fresh valid
-                    # timestamp
-
-            logger.info(
-                "Triggering scheduled routine '%s' for user %s",
-                r["name"],
-                user_id)
-            asyncio.create_task(_run_proactive_routine(app, user_id, r))
+        routines = [r for r in routines if r.get("trigger") in ("schedule", "time")]
+        for user_id in {r["user_id"] for r in routines}:
+            self._tz[user_id] = await self._user_tz(user_id)
+
+        now = datetime.now(UTC)
+        seen = set()
+        for r in routines:
+            rid = r["id"]
+            seen.add(rid)
+            self._routines[rid] = r
+            tz = self._tz[r["user_id"]]
+            signature = (r.get("time"), tuple(sorted(_weekdays(r.get("days")))), tz.key)
+            if self._signatures.get(rid) == signature and rid in self._heap:
+                continue
+            self._signatures[rid] = signature
+
+            fire = next_fire_after(r, tz, now)
+            if recovering:
+                missed = last_fire_before(r, tz, now)
+                ref = _parse_ts(r.get("last_run")) or _parse_ts(r.get("created_at"))
+                if missed is not None and (ref is None or missed > ref):
+                    fire = missed
+            if fire is None:
+                self._heap.remove(rid)
+            else:
+                self._heap.set(rid, fire.timestamp())
+
+        for rid in set(self._routines) - seen:
+            self._routines.pop(rid, None)
+            self._signatures.pop(rid, None)
+            self._heap.remove(rid)
+        self._version = version
+        self._synced_at = time.monotonic()
+
+    def _fire(self, routine_id: str, due_at: float) -> None:
+        r = self._routines.get(routine_id)
+        if r is None:
+            return
+        now = datetime.now(UTC)
+        following = next_fire_after(r, self._tz.get(r["user_id"], UTC), now)
+        if following is not None:
+            self._heap.set(routine_id, following.timestamp())
+
+        late = now.timestamp() - due_at
+        if late > _LATE_GRACE_SECONDS:
+            settings = get_settings()
+            if (settings.routines_missed_run_policy != "run_once_on_recovery"
+                    or late > settings.routines_catchup_minutes * 60):
+                logger.info("Skipping routine '%s': its %s run was missed by %.0f min.",
+                            r["name"], datetime.fromtimestamp(due_at, UTC).isoformat(),
+                            late / 60)
+                return
+            logger.info("Catching up routine '%s', %.0f min late.", r["name"], late / 60)
+
+        logger.info(
+            "Triggering scheduled routine '%s' for user %s",
+            r["name"],
+            r["user_id"])
+        task = asyncio.create_task(_run_proactive_routine(self._app, r["user_id"], r))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+
+_scheduler: Optional[RoutineScheduler] = None
+
+
+def get_routine_scheduler(app: Optional[FastAPI] = None) -> Optional[RoutineScheduler]:
+    global _scheduler
+    if _scheduler is None and app is not None:
+        _scheduler = RoutineScheduler(app)
+    return _scheduler
 
 
 async def _run_proactive_routine(app: FastAPI, user_id: str, routine: dict):
@@ -122,8 +308,9 @@ async def _run_proactive_routine(app: FastAPI, user_id: str, routine: dict):
         )
         await loop.initialize()
 
-        # Run the routine
-        await loop.run_text(routine["prompt"], capture)
+        # Run the routine. Nobody is waiting on it, so it queues behind turns.
+        with llm_priority(Priority.PROACTIVE):
+            await loop.run_text(routine["prompt"], capture)
         final_text = "".join(output_parts)
         
         # Add receipts to text if any
@@ -0,0 +1,169 @@
+"""
+core/telemetry_ingest.py
+
+Shared group-commit pipeline for fleet telemetry.
+
+Every satellite program (Vector, Horizon/Kova/Sentinel/Vortex via the generic
+fleet router, Kova's own API, Vexa) posts telemetry in batches. Writing each
+sample as its own INSERT meant one executor hop and one commit per sample; with
+a dozen mowers and two riders sending 50-sample batches, the commit rate was
+the ceiling on ingest.
+
+Routes now hand a whole batch to submit(). The first submitter in a quiet
+period schedules a flush `telemetry_flush_interval_ms` later; everything that
+arrives from any unit before then is written together -- one executemany per
+table, one transaction, on the store's isolated writer connection -- and every
+waiting submitter is released when that commit lands. A request therefore
+still returns only once its rows are durable, exactly as before. If the group
+commit fails, each submitter's rows are retried in a commit of their own, so
+only the request that sent the bad row gets the error.
+
+When more than `telemetry_max_pending_rows` rows are waiting, submit() raises
+TelemetryBackpressure and the route answers 429 with Retry-After, so a
+backlog turns into client-side retries instead of unbounded server memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import get_settings
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetryBackpressure(Exception):
+    """The ingest queue is full; the client should retry after `retry_after` s."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"telemetry ingest queue full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class TelemetryIngest:
+    """Coalesces telemetry batches from many units into group commits.
+
+    One instance per database file (see get_telemetry_ingest). Not thread-safe;
+    call from the event loop only.
+    """
+
+    def __init__(self, store) -> None:
+        self._store = store
+        self._pending: List[Tuple[str, List[tuple], asyncio.Future]] = []
+        self._pending_rows = 0
+        self._inflight_rows = 0
+        self._flusher: Optional[asyncio.Task] = None
+
+    @property
+    def queued_rows(self) -> int:
+        return self._pending_rows + self._inflight_rows
+
+    async def submit(self, sql: str, rows: List[tuple]) -> int:
+        """Queue `rows` for `sql` and wait until they are committed.
+
+        Returns the number of rows written. Raises TelemetryBackpressure
+        without queueing anything if the pipeline is over its limit.
+        """
+        if not rows:
+            return 0
+        settings = get_settings()
+        if self.queued_rows + len(rows) > settings.telemetry_max_pending_rows:
+            metrics.incr("telemetry.rejected_batches")
+            raise TelemetryBackpressure(
+                max(1, math.ceil(settings.telemetry_flush_interval_ms / 1000)))
+
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        self._pending.append((sql, rows, done))
+        self._pending_rows += len(rows)
+        metrics.set_gauge("telemetry.queued_rows", self.queued_rows)
+
+        flusher = self._flusher
+        if flusher is None or flusher.done() or flusher.get_loop() is not loop:
+            self._flusher = loop.create_task(self._flush_soon())
+        await done
+        return len(rows)
+
+    async def _flush_soon(self) -> None:
+        await asyncio.sleep(get_settings().telemetry_flush_interval_ms / 1000)
+        # Batches that arrive while a commit is in progress are picked up by
+        # the next pass, so under load commits run back to back.
+        while self._pending:
+            batch, self._pending = self._pending, []
+            self._inflight_rows, self._pending_rows = self._pending_rows, 0
+
+            statements: Dict[str, List[tuple]] = {}
+            for sql, rows, _ in batch:
+                statements.setdefault(sql, []).extend(rows)
+
+            started = time.perf_counter()
+            try:
+                await self._store.execute_many_isolated_async(list(statements.items()))
+            except Exception as e:
+                if len(batch) == 1:
+                    logger.error("Telemetry commit of %d rows failed: %s",
+                                 self._inflight_rows, e)
+                    _settle(batch[0][2], e)
+                else:
+                    # One unit's bad row must not fail everyone else's
+                    # request: the transaction rolled back, so commit each
+                    # submitter's rows on their own.
+                    logger.warning("Telemetry group commit of %d rows failed (%s); "
+                                   "retrying %d batches one by one.",
+                                   self._inflight_rows, e, len(batch))
+                    metrics.incr("telemetry.split_commits")
+                    await self._commit_each(batch)
+            else:
+                metrics.observe("telemetry.commit_ms",
+                                (time.perf_counter() - started) * 1000)
+                metrics.observe("telemetry.commit_rows", self._inflight_rows)
+                for _, _, done in batch:
+                    _settle(done)
+            finally:
+                self._inflight_rows = 0
+                metrics.set_gauge("telemetry.queued_rows", self.queued_rows)
+
+    async def _commit_each(self, batch: List[Tuple[str, List[tuple], asyncio.Future]]) -> None:
+        for sql, rows, done in batch:
+            try:
+                await self._store.execute_many_isolated_async([(sql, rows)])
+            except Exception as e:
+                logger.error("Telemetry commit of %d rows failed: %s", len(rows), e)
+                _settle(done, e)
+            else:
+                _settle(done)
+
+
+def _settle(done: asyncio.Future, error: Optional[BaseException] = None) -> None:
+    if done.done():
+        return
+    if error is None:
+        done.set_result(None)
+    else:
+        done.set_exception(error)
+
+
+async def ingest_telemetry(store, sql: str, rows: List[tuple]) -> int:
+    """Route helper: submit() with backpressure surfaced as HTTP 429."""
+    from core.errors import too_many_requests
+    try:
+        return await get_telemetry_ingest(store).submit(sql, rows)
+    except TelemetryBackpressure as e:
+        raise too_many_requests("Telemetry ingest is busy; retry shortly.",
+                                e.retry_after)
+
+
+_ingests: Dict[str, TelemetryIngest] = {}
+
+
+def get_telemetry_ingest(store) -> TelemetryIngest:
+    """The ingest pipeline for `store`'s database file."""
+    ingest = _ingests.get(store._db_path)
+    if ingest is None:
+        ingest = _ingests[store._db_path] = TelemetryIngest(store)
+    return ingest
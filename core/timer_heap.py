@@ -0,0 +1,115 @@
+"""
+core/timer_heap.py
+
+A min-heap of keyed due times, and the sleep that goes with it.
+
+Both schedulers -- user routines (core/routines_scheduler.py) and Vector
+mowing schedules (daemons/vector_scheduler) -- used to wake every minute and
+scan every row to see what was due. TimerHeap keeps each key's next due
+instant (epoch seconds) in a heap instead, so the loop sleeps until exactly
+the earliest one and only touches what is due:
+
+    heap = TimerHeap()
+    heap.set("routine-1", next_fire.timestamp())
+    while running:
+        for key, due_at in await heap.wait_due(max_wait=30):
+            ...fire, then heap.set(key, <following instant>)
+
+set() and remove() are O(log n); superseded heap entries are skipped lazily
+when they surface. set() with an earlier time than the loop is sleeping
+towards wakes it. max_wait bounds each sleep so the caller can resync and so
+a wall-clock jump (suspend, NTP step) is noticed within that bound.
+
+Not thread-safe; use from one event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class TimerHeap:
+    """Keyed due times with earliest-first retrieval."""
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        # key -> sequence number of its live heap entry.
+        self._live: Dict[Hashable, int] = {}
+        self._due: Dict[Hashable, float] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._live
+
+    def due_at(self, key: Hashable) -> Optional[float]:
+        return self._due.get(key)
+
+    def set(self, key: Hashable, due_at: float) -> None:
+        """(Re)schedule `key`; replaces any earlier time for it."""
+        seq = next(self._seq)
+        self._live[key] = seq
+        self._due[key] = due_at
+        earliest = self.next_due()
+        heapq.heappush(self._heap, (due_at, seq, key))
+        if self._wakeup is not None and (earliest is None or due_at < earliest):
+            self._wakeup.set()
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._compact()
+
+    def remove(self, key: Hashable) -> None:
+        self._live.pop(key, None)
+        self._due.pop(key, None)
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._live.clear()
+        self._due.clear()
+
+    def next_due(self) -> Optional[float]:
+        """Earliest live due time, or None when empty."""
+        self._skip_dead()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """Remove and return every (key, due_at) with due_at <= now, earliest first."""
+        now = time.time() if now is None else now
+        due = []
+        while True:
+            self._skip_dead()
+            if not self._heap or self._heap[0][0] > now:
+                return due
+            due_at, _, key = heapq.heappop(self._heap)
+            del self._live[key]
+            del self._due[key]
+            due.append((key, due_at))
+
+    async def wait_due(self, max_wait: float) -> List[Tuple[Hashable, float]]:
+        """Sleep until something is due (or max_wait passes), then pop_due()."""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.clear()
+        nxt = self.next_due()
+        delay = max_wait if nxt is None else min(max_wait, nxt - time.time())
+        if delay > 0:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        return self.pop_due()
+
+    def _skip_dead(self) -> None:
+        heap = self._heap
+        while heap and self._live.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+
+    def _compact(self) -> None:
+        self._heap = [e for e in self._heap if self._live.get(e[2]) == e[1]]
+        heapq.heapify(self._heap)
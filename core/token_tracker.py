@@ -2,19 +2,53 @@
 core/token_tracker.py
 
 Records LLM token usage to river_song.db and provides summary queries.
-All writes are synchronous sqlite3 (matching the project pattern).
+
+record_usage() runs at the end of every LLM call, inside the providers' async
+streaming generators. It used to INSERT there, on the event loop; now it only
+appends the row to an in-memory buffer and bumps a per-minute counter. A task
+on the running loop flushes the buffer `_FLUSH_INTERVAL` later in one
+transaction, off the loop via asyncio.to_thread, the same group-commit shape
+as core/telemetry_ingest.py. Callers without a running loop (scripts, worker
+threads) flush inline, which is what they always did. Every reader flushes
+first, so a summary never misses a call that has already returned.
+
+ROLLUPS
+-------
+An AFTER INSERT trigger folds each row into token_usage_hourly and
+token_usage_daily, keyed by (bucket, provider, model, source, user_id). A
+window of N days is read as raw rows up to the first whole hour, hourly
+buckets up to the first whole day, then daily buckets, so summaries touch at
+most an hour of token_usage however large the table grows. The trigger keeps
+the rollups right for any writer, including another process or a script
+inserting directly.
+
+get_provider_rate() (the NIM 40 req/min monitor) reads the in-memory minute
+counters, which are seeded from the table on first use. They see this
+process's calls only; windows longer than an hour go to the rollups.
+
+PROMPT CACHE
+------------
+cache_read_tokens and cache_write_tokens are prompt tokens a provider served
+from, or wrote to, its prompt cache. Anthropic bills them apart from
+input_tokens (reads at a tenth of the input rate, writes at 1.25x), so they
+are stored apart and priced with those multipliers.
 """
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import logging
+import math
 import sqlite3
 import threading
 import time
+from collections import deque
 from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional, Tuple
+
+from core import metrics
 
 # Which feature is currently spending tokens. Set by feature entrypoints via
 # usage_source(...); read by record_usage so the providers themselves don't
@@ -33,6 +67,10 @@ _usage_source: ContextVar[str] = ContextVar("usage_source", default="other")
 # that label rather than being blamed on whoever spoke last.
 _usage_user: ContextVar[str] = ContextVar("usage_user", default="system")
 
+# Anthropic's prompt-cache pricing, as multiples of the model's input rate.
+_CACHE_READ_RATE = 0.10
+_CACHE_WRITE_RATE = 1.25
+
 # Rows written by test scripts (TestClient runs, verify_gates) — never real
 # spend; excluded from summaries and purged once per process.
 _TEST_PROVIDERS = ("test_provider", "verify")
@@ -132,13 +170,15 @@ def _connect() -> sqlite3.Connection:
     Held for the life of the thread so the per-call open/close cost
     (and the per-connection mutex contention that comes with it) is
     paid only once. WAL lets readers run while a writer holds the lock,
-    which matters under concurrent LLM-call bursts.
+    which matters under concurrent LLM-call bursts. Reopened if the
+    database path changes under it.
     """
+    path = str(_db_path())
     conn = getattr(_local, "conn", None)
-    if conn is not None:
+    if conn is not None and getattr(_local, "path", path) == path:
         return conn
     conn = sqlite3.connect(
-        str(_db_path()),
+        path,
         timeout=10.0,
         check_same_thread=False,
         isolation_level=None,  # autocommit; we control transactions explicitly
@@ -149,15 +189,101 @@ def _connect() -> sqlite3.Connection:
     except sqlite3.Error:
         pass
     _local.conn = conn
+    _local.path = path
     return conn
 
 
 _schema_ready = False
+_schema_path: Optional[str] = None
+
+_ROLLUPS = (("token_usage_hourly", 3600), ("token_usage_daily", 86400))
+_ROLLUP_COLUMNS = ("bucket, provider, model, source, user_id, input_tokens, "
+                   "output_tokens, calls, first_ts, last_ts, "
+                   "cache_read_tokens, cache_write_tokens")
+
+
+def _add_cache_columns(conn: sqlite3.Connection, table: str) -> None:
+    """Idempotent migration: prompt-cache token columns."""
+    for column in ("cache_read_tokens", "cache_write_tokens"):
+        try:
+            conn.execute(
+                f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass  # column already exists
+
+
+def _create_rollups(conn: sqlite3.Connection) -> None:
+    """Rollup tables plus the trigger that feeds them; backfilled when new."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        existing = {r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        upserts = []
+        for table, seconds in _ROLLUPS:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    bucket        INTEGER NOT NULL,
+                    provider      TEXT    NOT NULL,
+                    model         TEXT    NOT NULL,
+                    source        TEXT    NOT NULL,
+                    user_id       TEXT    NOT NULL,
+                    input_tokens  INTEGER NOT NULL DEFAULT 0,
+                    output_tokens INTEGER NOT NULL DEFAULT 0,
+                    calls         INTEGER NOT NULL DEFAULT 0,
+                    first_ts      REAL    NOT NULL,
+                    last_ts       REAL    NOT NULL,
+                    cache_read_tokens  INTEGER NOT NULL DEFAULT 0,
+                    cache_write_tokens INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (bucket, provider, model, source, user_id)
+                ) WITHOUT ROWID
+            """)
+            if table not in existing:
+                # Rows recorded before the rollups existed; in the same
+                # transaction as the trigger so none are counted twice.
+                conn.execute(f"""
+                    INSERT INTO {table} ({_ROLLUP_COLUMNS})
+                    SELECT CAST(ts / {seconds} AS INTEGER) * {seconds},
+                           provider, model, COALESCE(source, 'other'), user_id,
+                           SUM(input_tokens), SUM(output_tokens), COUNT(*),
+                           MIN(ts), MAX(ts),
+                           SUM(cache_read_tokens), SUM(cache_write_tokens)
+                    FROM token_usage GROUP BY 1, 2, 3, 4, 5
+                """)
+            else:
+                _add_cache_columns(conn, table)
+            upserts.append(f"""
+                INSERT INTO {table} ({_ROLLUP_COLUMNS}) VALUES (
+                    CAST(NEW.ts / {seconds} AS INTEGER) * {seconds},
+                    NEW.provider, NEW.model, COALESCE(NEW.source, 'other'),
+                    NEW.user_id, NEW.input_tokens, NEW.output_tokens, 1,
+                    NEW.ts, NEW.ts, NEW.cache_read_tokens, NEW.cache_write_tokens)
+                ON CONFLICT (bucket, provider, model, source, user_id) DO UPDATE SET
+                    input_tokens  = input_tokens  + excluded.input_tokens,
+                    output_tokens = output_tokens + excluded.output_tokens,
+                    calls         = calls + 1,
+                    first_ts      = MIN(first_ts, excluded.first_ts),
+                    last_ts       = MAX(last_ts, excluded.last_ts),
+                    cache_read_tokens  = cache_read_tokens  + excluded.cache_read_tokens,
+                    cache_write_tokens = cache_write_tokens + excluded.cache_write_tokens;
+            """)
+        # Recreated each start so a trigger from an older schema picks up
+        # the current columns.
+        conn.execute("DROP TRIGGER IF EXISTS token_usage_rollup")
+        conn.execute(
+            "CREATE TRIGGER token_usage_rollup "
+            "AFTER INSERT ON token_usage BEGIN " + "".join(upserts) + " END")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
 
 
 def ensure_table() -> None:
-    """Create/upgrade token_usage table. Safe to call repeatedly."""
-    global _schema_ready
+    """Create/upgrade token_usage and its rollups. Safe to call repeatedly."""
+    global _schema_ready, _schema_path
+    path = str(_db_path())
+    if _schema_ready and _schema_path == path:
+        return
     conn = _connect()
     conn.execute("""
         CREATE TABLE IF NOT EXISTS token_usage (
@@ -173,23 +299,159 @@ def ensure_table() -> None:
     """)
     conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_token_usage_ts ON token_usage(ts)")
-    if not _schema_ready:
-        # Idempotent migration: add source attribution column.
-        try:
-            conn.execute(
-                "ALTER TABLE token_usage ADD COLUMN source TEXT NOT NULL DEFAULT 'other'")
-        except sqlite3.OperationalError:
-            pass  # column already exists
-        # Purge rows written by test scripts run against this database.
-        try:
-            placeholders = ",".join("?" * len(_TEST_PROVIDERS))
+    # Idempotent migration: add source attribution column.
+    try:
+        conn.execute(
+            "ALTER TABLE token_usage ADD COLUMN source TEXT NOT NULL DEFAULT 'other'")
+    except sqlite3.OperationalError:
+        pass  # column already exists
+    _add_cache_columns(conn, "token_usage")
+    # The trigger reads the new columns, so the rollups come after them.
+    _create_rollups(conn)
+    # Purge rows written by test scripts run against this database.
+    try:
+        placeholders = ",".join("?" * len(_TEST_PROVIDERS))
+        for table in ("token_usage", *(t for t, _ in _ROLLUPS)):
             conn.execute(
-                f"DELETE FROM token_usage WHERE LOWER(provider) IN ({placeholders})",
+                f"DELETE FROM {table} WHERE LOWER(provider) IN ({placeholders})",
                 _TEST_PROVIDERS,
             )
-        except sqlite3.Error:
-            pass
-        _schema_ready = True
+    except sqlite3.Error:
+        pass
+    _schema_ready, _schema_path = True, path
+
+
+# ---------------------------------------------------------------------------
+# Write buffer
+# ---------------------------------------------------------------------------
+
+# Seconds a recorded call waits for others to share its commit.
+_FLUSH_INTERVAL = 1.0
+# Past this many unflushed rows the oldest are dropped, so a database that
+# stays locked costs a little accounting rather than unbounded memory.
+_MAX_PENDING = 10_000
+
+_pending: Deque[tuple] = deque(maxlen=_MAX_PENDING)
+_flush_lock = threading.Lock()
+_flusher: Optional[asyncio.Task] = None
+
+_INSERT = (
+    "INSERT INTO token_usage (ts, provider, model, input_tokens, output_tokens, "
+    "user_id, call_type, source, cache_read_tokens, cache_write_tokens) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def flush() -> int:
+    """Write every buffered row in one transaction. Returns the rows written.
+
+    Blocking; the recorder's own flushes run in a worker thread. Rows stay
+    buffered if the write fails and go out with the next flush.
+    """
+    with _flush_lock:
+        batch = []
+        while _pending:
+            batch.append(_pending.popleft())
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        try:
+            ensure_table()
+            conn = _connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(_INSERT, batch)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as exc:
+            logger.warning("token_tracker: flush of %d rows failed: %s",
+                           len(batch), exc)
+            with _rates_lock:
+                # Rows recorded during the flush now share the buffer with
+                # the batch; whatever does not fit goes, oldest first.
+                overflow = len(batch) + len(_pending) - _MAX_PENDING
+                if overflow > 0:
+                    metrics.incr("token_usage.dropped_rows", overflow)
+                    logger.warning("token_tracker: buffer full, dropped %d "
+                                   "unflushed rows", overflow)
+                    batch = batch[overflow:]
+                _pending.extendleft(reversed(batch))
+            return 0
+        metrics.observe("token_usage.flush_ms", (time.perf_counter() - started) * 1000)
+        metrics.observe("token_usage.flush_rows", len(batch))
+        return len(batch)
+
+
+async def _flush_soon() -> None:
+    await asyncio.sleep(_FLUSH_INTERVAL)
+    await asyncio.to_thread(flush)
+
+
+def _schedule_flush() -> None:
+    global _flusher
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        flush()  # no event loop to keep free: write now, as before
+        return
+    flusher = _flusher
+    if flusher is None or flusher.done() or flusher.get_loop() is not loop:
+        _flusher = loop.create_task(_flush_soon())
+
+
+# ---------------------------------------------------------------------------
+# Per-minute rate counters
+# ---------------------------------------------------------------------------
+
+# Minutes of history kept per provider; longer windows read the rollups.
+_RATE_MINUTES = 60
+
+# provider -> [minute, calls, input_tokens, output_tokens], oldest first.
+_rates: Dict[str, Deque[List[int]]] = {}
+_rates_seeded = False
+_rates_lock = threading.Lock()
+
+
+def _count_rate(ts: float, provider: str, input_tokens: int,
+                output_tokens: int, calls: int = 1) -> None:
+    minute = int(ts // 60)
+    buckets = _rates.setdefault(provider, deque())
+    if buckets and buckets[-1][0] >= minute:
+        bucket = buckets[-1]  # same minute, or the clock stepped back
+    else:
+        bucket = [minute, 0, 0, 0]
+        buckets.append(bucket)
+    bucket[1] += calls
+    bucket[2] += input_tokens
+    bucket[3] += output_tokens
+    while buckets[0][0] < minute - _RATE_MINUTES:
+        buckets.popleft()
+
+
+def _seed_rates() -> None:
+    """Load the last hour from the table once, so a restart starts warm.
+
+    Called with _rates_lock held: no call can be counted between the flush
+    and the query, so none is counted twice.
+    """
+    global _rates_seeded
+    flush()
+    ensure_table()
+    rows = _connect().execute(
+        """
+        SELECT provider, CAST(ts / 60 AS INTEGER) AS minute, COUNT(*),
+               SUM(input_tokens), SUM(output_tokens)
+        FROM token_usage WHERE ts >= ?
+        GROUP BY provider, minute ORDER BY minute
+        """,
+        ((int(time.time() // 60) - _RATE_MINUTES) * 60,),
+    ).fetchall()
+    _rates.clear()
+    for provider, minute, calls, inp, out in rows:
+        _count_rate(minute * 60, provider, inp or 0, out or 0, calls)
+    _rates_seeded = True
 
 
 def record_usage(
@@ -200,27 +462,64 @@ def record_usage(
     user_id: str | None = None,
     call_type: str = "stream",
     source: str | None = None,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
 ) -> None:
-    """Insert one token-usage row. Silently no-ops on any error.
+    """Buffer one token-usage row. Never blocks on the database; never raises.
 
     `source` (which feature spent the tokens) and `user_id` (who) both default
     to the ambient context set by the caller, so a provider that passes
-    neither still gets attributed.
+    neither still gets attributed. Both are read here, in the caller's
+    context, not when the row is flushed.
+
+    The cache counts are prompt tokens billed apart from `input_tokens`; see
+    PROMPT CACHE above.
     """
-    if not input_tokens and not output_tokens:
+    if not (input_tokens or output_tokens or cache_read_tokens or cache_write_tokens):
         return
     try:
-        ensure_table()
-        conn = _connect()
-        conn.execute(
-            "INSERT INTO token_usage (ts, provider, model, input_tokens, output_tokens, user_id, call_type, source) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (time.time(), provider, model, input_tokens,
-             output_tokens, user_id or _usage_user.get(), call_type,
-             source or _usage_source.get()),
-        )
+        row = (time.time(), provider, model, input_tokens, output_tokens,
+               user_id or _usage_user.get(), call_type,
+               source or _usage_source.get(),
+               cache_read_tokens or 0, cache_write_tokens or 0)
+        with _rates_lock:
+            if len(_pending) == _MAX_PENDING:
+                metrics.incr("token_usage.dropped_rows")
+            _pending.append(row)
+            _count_rate(row[0], provider, input_tokens, output_tokens)
+        _schedule_flush()
     except Exception as exc:
-        logger.debug("token_tracker: write failed: %s", exc)
+        logger.debug("token_tracker: record failed: %s", exc)
+
+
+def _ceil_to(ts: float, seconds: int) -> int:
+    return math.ceil(ts / seconds) * seconds
+
+
+def _window(cutoff: float) -> Tuple[str, tuple]:
+    """
+    Every call since `cutoff` as one row source, cheapest table first.
+
+    Raw rows cover the partial hour after the cutoff, hourly buckets the
+    partial day after that, daily buckets the rest. Columns: provider, model,
+    source, user_id, input_tokens, output_tokens, calls, first_ts, last_ts,
+    cache_read_tokens, cache_write_tokens.
+    """
+    hour = _ceil_to(cutoff, 3600)
+    day = _ceil_to(cutoff, 86400)
+    rollup = ("SELECT provider, model, source, user_id, input_tokens, "
+              "output_tokens, calls, first_ts, last_ts, cache_read_tokens, "
+              "cache_write_tokens FROM {}")
+    sql = (
+        "SELECT provider, model, COALESCE(source, 'other') AS source, user_id, "
+        "input_tokens, output_tokens, 1 AS calls, ts AS first_ts, ts AS last_ts, "
+        "cache_read_tokens, cache_write_tokens "
+        "FROM token_usage WHERE ts >= ? AND ts < ? "
+        "UNION ALL " + rollup.format("token_usage_hourly")
+        + " WHERE bucket >= ? AND bucket < ? "
+        "UNION ALL " + rollup.format("token_usage_daily") + " WHERE bucket >= ?"
+    )
+    return sql, (cutoff, hour, hour, day, day)
 
 
 def _is_local(provider: str) -> bool:
@@ -253,7 +552,8 @@ def _rates_for(model: str) -> Optional[Dict[str, float]]:
     return None
 
 
-def _estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+def _estimate_cost(model: str, input_tokens: int, output_tokens: int,
+                   cache_read_tokens: int = 0, cache_write_tokens: int = 0) -> float:
     """Return estimated USD cost. Returns 0.0 for unknown / local models."""
     rates = _COST_PER_M.get(model)
     if not rates:
@@ -280,7 +580,9 @@ def _estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
     if not rates:
         return 0.0
     return (input_tokens * rates["in"] +
-            output_tokens * rates["out"]) / 1_000_000
+            output_tokens * rates["out"] +
+            cache_read_tokens * rates["in"] * _CACHE_READ_RATE +
+            cache_write_tokens * rates["in"] * _CACHE_WRITE_RATE) / 1_000_000
 
 
 def get_summary(days: int = 30, user_ids: Optional[List[str]] = None) -> dict:
@@ -318,13 +620,14 @@ def get_summary(days: int = 30, user_ids: Optional[List[str]] = None) -> dict:
         }
     """
     try:
+        flush()
         ensure_table()
-        cutoff = time.time() - days * 86400
+        window, params = _window(time.time() - days * 86400)
         conn = _connect()
         conn.row_factory = sqlite3.Row
         not_test = "LOWER(provider) NOT IN ({})".format(
             ",".join("?" * len(_TEST_PROVIDERS)))
-        params = (cutoff, *_TEST_PROVIDERS)
+        params = (*params, *_TEST_PROVIDERS)
         user_clause = ""
         if user_ids is not None:
             # An empty list must match nothing rather than degrade to "all".
@@ -336,9 +639,11 @@ def get_summary(days: int = 30, user_ids: Optional[List[str]] = None) -> dict:
             SELECT provider, model,
                    SUM(input_tokens)  AS input_tokens,
                    SUM(output_tokens) AS output_tokens,
-                   COUNT(*)           AS calls
-            FROM token_usage
-            WHERE ts >= ? AND {not_test}{user_clause}
+                   SUM(calls)         AS calls,
+                   SUM(cache_read_tokens)  AS cache_read_tokens,
+                   SUM(cache_write_tokens) AS cache_write_tokens
+            FROM ({window})
+            WHERE {not_test}{user_clause}
             GROUP BY provider, model
             ORDER BY (SUM(input_tokens) + SUM(output_tokens)) DESC
             """,
@@ -347,12 +652,16 @@ def get_summary(days: int = 30, user_ids: Optional[List[str]] = None) -> dict:
 
         by_model: List[dict] = []
         total_in = total_out = total_cost = 0
+        total_cache_read = total_cache_write = 0
 
         for r in rows:
             inp, out = r["input_tokens"] or 0, r["output_tokens"] or 0
-            cost = _estimate_cost(r["model"], inp, out)
+            c_read, c_write = r["cache_read_tokens"] or 0, r["cache_write_tokens"] or 0
+            cost = _estimate_cost(r["model"], inp, out, c_read, c_write)
             total_in += inp
             total_out += out
+            total_cache_read += c_read
+            total_cache_write += c_write
             total_cost += cost  # type: ignore
             rates = _rates_for(r["model"])
             calls = r["calls"] or 0
@@ -361,6 +670,8 @@ def get_summary(days: int = 30, user_ids: Optional[List[str]] = None) -> dict:
                 "model": r["model"],
                 "input_tokens": inp,
                 "output_tokens": out,
+                "cache_read_tokens": c_read,
+                "cache_write_tokens": c_write,
                 "estimated_cost_usd": round(cost, 6),
                 "calls": calls,
                 # The rate that produced the dollar figure, carried alongside
@@ -380,13 +691,15 @@ def get_summary(days: int = 30, user_ids: Optional[List[str]] = None) -> dict:
         # so the UI can answer "what is using the tokens" at a glance.
         src_rows = conn.execute(
             f"""
-            SELECT COALESCE(source, 'other') AS source, provider, model,
+            SELECT source, provider, model,
                    SUM(input_tokens)  AS input_tokens,
                    SUM(output_tokens) AS output_tokens,
-                   COUNT(*)           AS calls
-            FROM token_usage
-            WHERE ts >= ? AND {not_test}{user_clause}
-            GROUP BY COALESCE(source, 'other'), provider, model
+                   SUM(calls)         AS calls,
+                   SUM(cache_read_tokens)  AS cache_read_tokens,
+                   SUM(cache_write_tokens) AS cache_write_tokens
+            FROM ({window})
+            WHERE {not_test}{user_clause}
+            GROUP BY source, provider, model
             """,
             params,
         ).fetchall()
@@ -394,7 +707,8 @@ def get_summary(days: int = 30, user_ids: Optional[List[str]] = None) -> dict:
         sources: Dict[str, dict] = {}
         for r in src_rows:
             inp, out = r["input_tokens"] or 0, r["output_tokens"] or 0
-            cost = _estimate_cost(r["model"], inp, out)
+            cost = _estimate_cost(r["model"], inp, out, r["cache_read_tokens"] or 0,
+                                  r["cache_write_tokens"] or 0)
             entry = sources.setdefault(r["source"], {
                 "source": r["source"], "input_tokens": 0, "output_tokens": 0,
                 "estimated_cost_usd": 0.0, "calls": 0, "models": [],
@@ -421,6 +735,8 @@ def get_summary(days: int = 30, user_ids: Optional[List[str]] = None) -> dict:
             "days": days,
             "total_input": total_in,
             "total_output": total_out,
+            "total_cache_read": total_cache_read,
+            "total_cache_write": total_cache_write,
             "estimated_cost_usd": round(total_cost, 6),
             "by_model": by_model,
             "by_source": by_source,
@@ -429,6 +745,7 @@ def get_summary(days: int = 30, user_ids: Optional[List[str]] = None) -> dict:
         logger.warning("token_tracker: summary failed: %s", exc)
         return {
             "days": days, "total_input": 0, "total_output": 0,
+            "total_cache_read": 0, "total_cache_write": 0,
             "estimated_cost_usd": 0.0, "by_model": [], "by_source": [],
         }
 
@@ -437,28 +754,36 @@ def get_provider_rate(provider: str, window_seconds: int = 60) -> dict:
     """
     Return request count and token totals for a provider within the last
     `window_seconds`. Used by the NIM rate-limit monitor (40 req/min limit).
+
+    Windows up to an hour come from the in-memory minute counters: whole
+    minutes inside the window count in full, the minute the window starts in
+    counts pro rata. Longer ones are read from the rollups.
     """
     try:
-        ensure_table()
-        cutoff = time.time() - window_seconds
-        conn = _connect()
-        row = conn.execute(
-            """
-            SELECT COUNT(*) AS calls,
-                   SUM(input_tokens)  AS input_tokens,
-                   SUM(output_tokens) AS output_tokens
-            FROM token_usage
-            WHERE provider = ? AND ts >= ?
-            """,
-            (provider, cutoff),
-        ).fetchone()
-        calls = row[0] or 0
+        if window_seconds > _RATE_MINUTES * 60:
+            return _provider_rate_from_table(provider, window_seconds)
+        now = time.time()
+        start = now - window_seconds
+        calls = inp = out = 0.0
+        with _rates_lock:
+            if not _rates_seeded:
+                _seed_rates()
+            for minute, c, i, o in _rates.get(provider, ()):
+                begin = minute * 60
+                end = min(begin + 60, now)
+                if end <= start:
+                    continue
+                share = 1.0 if begin >= start or end <= begin \
+                    else (end - start) / (end - begin)
+                calls += c * share
+                inp += i * share
+                out += o * share
         return {
             "provider": provider,
             "window_seconds": window_seconds,
-            "calls": calls,
-            "input_tokens": row[1] or 0,
-            "output_tokens": row[2] or 0,
+            "calls": round(calls),
+            "input_tokens": round(inp),
+            "output_tokens": round(out),
         }
     except Exception as exc:
         logger.warning("token_tracker: rate query failed: %s", exc)
@@ -466,6 +791,26 @@ def get_provider_rate(provider: str, window_seconds: int = 60) -> dict:
                 "input_tokens": 0, "output_tokens": 0}
 
 
+def _provider_rate_from_table(provider: str, window_seconds: int) -> dict:
+    flush()
+    ensure_table()
+    window, params = _window(time.time() - window_seconds)
+    row = _connect().execute(
+        f"""
+        SELECT SUM(calls), SUM(input_tokens), SUM(output_tokens)
+        FROM ({window}) WHERE provider = ?
+        """,
+        (*params, provider),
+    ).fetchone()
+    return {
+        "provider": provider,
+        "window_seconds": window_seconds,
+        "calls": row[0] or 0,
+        "input_tokens": row[1] or 0,
+        "output_tokens": row[2] or 0,
+    }
+
+
 def get_model_usage(days: int = 30, model: Optional[str] = None) -> dict:
     """Real recorded usage per model, with who spent it.
 
@@ -480,13 +825,14 @@ def get_model_usage(days: int = 30, model: Optional[str] = None) -> dict:
     stale price is visible rather than merely applied.
     """
     try:
+        flush()
         ensure_table()
-        cutoff = time.time() - days * 86400
+        window, params = _window(time.time() - days * 86400)
         conn = _connect()
         conn.row_factory = sqlite3.Row
         not_test = "LOWER(provider) NOT IN ({})".format(
             ",".join("?" * len(_TEST_PROVIDERS)))
-        params: tuple = (cutoff, *_TEST_PROVIDERS)
+        params = (*params, *_TEST_PROVIDERS)
         model_filter = ""
         if model:
             model_filter = " AND model = ?"
@@ -497,11 +843,13 @@ def get_model_usage(days: int = 30, model: Optional[str] = None) -> dict:
             SELECT provider, model, user_id,
                    SUM(input_tokens)  AS input_tokens,
                    SUM(output_tokens) AS output_tokens,
-                   COUNT(*)           AS calls,
-                   MIN(ts)            AS first_ts,
-                   MAX(ts)            AS last_ts
-            FROM token_usage
-            WHERE ts >= ? AND {not_test}{model_filter}
+                   SUM(calls)         AS calls,
+                   SUM(cache_read_tokens)  AS cache_read_tokens,
+                   SUM(cache_write_tokens) AS cache_write_tokens,
+                   MIN(first_ts)      AS first_ts,
+                   MAX(last_ts)       AS last_ts
+            FROM ({window})
+            WHERE {not_test}{model_filter}
             GROUP BY provider, model, user_id
             """,
             params,
@@ -511,7 +859,8 @@ def get_model_usage(days: int = 30, model: Optional[str] = None) -> dict:
         for r in rows:
             key = (r["provider"], r["model"])
             inp, out = r["input_tokens"] or 0, r["output_tokens"] or 0
-            cost = _estimate_cost(r["model"], inp, out)
+            cost = _estimate_cost(r["model"], inp, out, r["cache_read_tokens"] or 0,
+                                  r["cache_write_tokens"] or 0)
             entry = models.get(key)
             if entry is None:
                 rates = _rates_for(r["model"])
@@ -38,6 +38,57 @@ DANGEROUS_TOOLS = {
     "trigger_n8n_workflow",
 }
 
+# Concurrency classes for the agent loop, which may run several tool calls
+# from one model response at once (core/agent_loop.py):
+#   parallel  -- PARALLEL_TOOLS, which only read or fetch. Consecutive ones
+#                run concurrently, and identical ones run once.
+#   serial    -- everything else, including tools not listed anywhere: they
+#                act on the house or change stored state, so each runs on
+#                its own, in the order the model asked. "Turn off the lights,
+#                then lock the door" stays in order, and a read asked for
+#                after a write sees it.
+#   exclusive -- DANGEROUS_TOOLS; run alone with nothing else in flight.
+# A new tool is serial until it is added to PARALLEL_TOOLS.
+TOOL_CONCURRENCY_PARALLEL = "parallel"
+TOOL_CONCURRENCY_SERIAL = "serial"
+TOOL_CONCURRENCY_EXCLUSIVE = "exclusive"
+
+PARALLEL_TOOLS = {
+    "asset_summary",
+    "check_reading_status",
+    "find_asset",
+    "find_notes",
+    "find_parts",
+    "get_vehicle_spec",
+    "get_vehicle_status",
+    "get_weather",
+    "list_device_alerts",
+    "list_google_tasks",
+    "list_routines",
+    "list_vehicles",
+    "query_vehicle_manual",
+    "read_note",
+    "read_shopping_list",
+    "read_vault_note",
+    "recall_memory",
+    "registry_health",
+    "search_commerce_products",
+    "search_emails",
+    "search_google_books",
+    "search_vault",
+    "warranty_check",
+    "web_search",
+}
+
+
+def tool_concurrency(tool_name: str) -> str:
+    """Concurrency class of `tool_name`; unknown tools are serial."""
+    if tool_name in DANGEROUS_TOOLS:
+        return TOOL_CONCURRENCY_EXCLUSIVE
+    if tool_name in PARALLEL_TOOLS:
+        return TOOL_CONCURRENCY_PARALLEL
+    return TOOL_CONCURRENCY_SERIAL
+
 
 async def execute_tool(
         tool_name: str, tool_input: Dict[str, Any], context: Dict[str, Any]) -> str:
@@ -1422,7 +1473,9 @@ async def _exec_search_vault(args: dict, user_id: str) -> str:
         if not results:
             return f"No notes found matching '{args['query']}'."
         lines = [
-            f"- {r.get('title', r['virtual_path'])} ({r['virtual_path']})" for r in results[:10]]
+            f"- {r.get('title', r['virtual_path'])} ({r['virtual_path']})"
+            + (f"\n    {r['snippet']}" if r.get("snippet") else "")
+            for r in results[:10]]
         return f"Found {len(results)} note(s):\n" + "\n".join(lines)
     except Exception as exc:
         logger.error("search_vault failed: %s", exc)
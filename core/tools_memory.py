@@ -230,13 +230,15 @@ async def _exec_find_notes(args: dict, context: dict) -> str:
         return "Error: Vault provider unavailable."
         
     try:
-        results = await provider.store.search_vault_notes(user_id, query, limit=5)
+        results = await provider.search_text(user_id, query, limit=5)
         if not results:
             return f"No notes found for query: {query}"
             
         out = f"Found {len(results)} notes:\n"
         for r in results:
             out += f"- {r['virtual_path']} ({r['title']})\n"
+            if r.get("snippet"):
+                out += f"    {r['snippet']}\n"
         return out
     except Exception as e:
         return f"Failed to search notes: {e}"
@@ -19,6 +19,13 @@ logger = logging.getLogger(__name__)
 _background_tasks: set = set()
 
 
+def _routines_changed(db_path: str) -> None:
+    # These executors write with their own connection; tell the shared store
+    # so the schedulers and trigger index reload.
+    from providers.memory.sqlite_store import SQLiteStore
+    SQLiteStore(db_path).mark_routines_changed()
+
+
 async def _exec_create_routine(args: dict, user_id: str) -> str:
     import uuid
     import json
@@ -52,6 +59,7 @@ async def _exec_create_routine(args: dict, user_id: str) -> str:
                 (rid, user_id, name, trigger, time_val, json.dumps(days), prompt, "simple", severity, 1, now, now)
             )
             conn.commit()
+            _routines_changed(db_path)
             return f"Created routine '{name}' with ID {rid}."
         finally:
             conn.close()
@@ -119,6 +127,7 @@ async def _exec_update_routine(args: dict, user_id: str) -> str:
             
             conn.execute(f"UPDATE routines SET {', '.join(set_parts)} WHERE id = ? AND user_id = ?", vals)
             conn.commit()
+            _routines_changed(db_path)
             return f"Routine {rid} updated."
         finally:
             conn.close()
@@ -133,6 +142,7 @@ async def _exec_delete_routine(args: dict, user_id: str) -> str:
             rid = args.get("routine_id")
             conn.execute("DELETE FROM routines WHERE id = ? AND user_id = ?", (rid, user_id))
             conn.commit()
+            _routines_changed(db_path)
             return f"Routine {rid} deleted."
         finally:
             conn.close()
@@ -0,0 +1,262 @@
+"""
+core/vortex_audio.py
+
+Binary audio frames for the Vortex WebSocket.
+
+Speech used to reach a unit as one JSON `audio` frame carrying the whole
+utterance as base64 WAV. That frame was a third larger than the audio. It was
+encoded and decoded on each side, sent only once synthesis had finished, and
+big enough to hold the socket while it went out. Units that negotiate it now
+get speech as binary WebSocket frames, streamed as the TTS engine produces it:
+
+    header, 16 bytes little-endian                         payload
+    "RV" | version u8 | kind u8 | codec u8 | channels u8 |  s16le PCM, or one
+    stream u16 | seq u32 | sample_rate u32                  Opus packet
+
+    kind    AUDIO_START   opens `stream`; empty payload
+            AUDIO_DATA    audio, at most MAX_PAYLOAD bytes
+            AUDIO_END     closes `stream`; empty payload
+    codec   CODEC_PCM (0) or CODEC_OPUS (1)
+
+`seq` counts frames within a stream. A START for a new stream id replaces
+whatever the unit is playing, which is how River interrupting herself sounds.
+Captions, presence and the amplitude envelope stay on JSON frames, and they
+interleave with the audio because no frame is large.
+
+NEGOTIATION
+-----------
+The auth frame may carry
+
+    "audio": {"binary": true, "codecs": ["opus", "pcm_s16le"]}
+
+in the unit's order of preference. negotiate() picks the first codec this
+server can produce; Opus is offered only when `opuslib` (and libopus) is
+installed. auth_ok echoes the choice. A unit that offers nothing, which is
+all firmware from before this, keeps the JSON `audio` frame.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import struct
+import wave
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RV"
+VERSION = 1
+
+AUDIO_START = 1
+AUDIO_DATA = 2
+AUDIO_END = 3
+
+CODEC_PCM = 0
+CODEC_OPUS = 1
+CODECS = {"pcm_s16le": CODEC_PCM, "opus": CODEC_OPUS}
+
+_HEADER = struct.Struct("<2sBBBBHII")
+HEADER_SIZE = _HEADER.size
+
+# ~90 ms of 22.05 kHz mono PCM. Small enough that a presence or amplitude
+# frame never waits long behind audio on a Pi on weak WiFi.
+MAX_PAYLOAD = 4096
+
+# Opus only runs at these rates; anything else is resampled to 24 kHz.
+_OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+_OPUS_FRAME_MS = 20
+
+_opus_ok: Optional[bool] = None
+
+
+@dataclass(frozen=True)
+class AudioHeader:
+    kind: int
+    codec: int
+    channels: int
+    stream: int
+    seq: int
+    sample_rate: int
+
+
+def pack_header(kind: int, codec: int, stream: int, seq: int,
+                sample_rate: int, channels: int = 1) -> bytes:
+    return _HEADER.pack(MAGIC, VERSION, kind, codec, channels,
+                        stream & 0xFFFF, seq & 0xFFFFFFFF, sample_rate)
+
+
+def parse_header(frame: bytes) -> Optional[AudioHeader]:
+    """The header of a binary frame, or None if it is not one of ours."""
+    if len(frame) < HEADER_SIZE:
+        return None
+    magic, version, kind, codec, channels, stream, seq, rate = \
+        _HEADER.unpack_from(frame)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return AudioHeader(kind, codec, channels, stream, seq, rate)
+
+
+def opus_available() -> bool:
+    """True when an Opus encoder can be built here. Checked once."""
+    global _opus_ok
+    if _opus_ok is None:
+        try:
+            import opuslib  # noqa: F401
+            _opus_ok = True
+        except Exception as exc:  # ImportError, or libopus missing
+            logger.info("Opus encoding unavailable (%s); Vortex audio uses PCM.", exc)
+            _opus_ok = False
+    return _opus_ok
+
+
+def negotiate(offer: Any) -> Optional[str]:
+    """
+    The codec to stream to a unit, from the `audio` field of its auth frame.
+
+    Returns None for the JSON fallback: no offer, `binary` not set, or no
+    codec in common.
+    """
+    if not isinstance(offer, dict) or not offer.get("binary"):
+        return None
+    codecs = offer.get("codecs") or ["pcm_s16le"]
+    if not isinstance(codecs, list):
+        return None
+    for codec in codecs:
+        if codec == "pcm_s16le":
+            return codec
+        if codec == "opus" and opus_available():
+            return codec
+    return None
+
+
+def pcm_from_wav(wav_bytes: bytes) -> Optional[Tuple[bytes, int, int]]:
+    """(s16le frames, sample_rate, channels) from a WAV, or None if it is not 16-bit."""
+    try:
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+            if wav.getsampwidth() != 2:
+                return None
+            return (wav.readframes(wav.getnframes()), wav.getframerate(),
+                    wav.getnchannels())
+    except Exception:
+        return None
+
+
+def wav_from_pcm(pcm: bytes, sample_rate: int, channels: int = 1) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Encoders
+# ---------------------------------------------------------------------------
+
+class PcmEncoder:
+    """Re-chunks s16le PCM into payloads of at most MAX_PAYLOAD bytes."""
+
+    codec = CODEC_PCM
+
+    def __init__(self, sample_rate: int, channels: int = 1) -> None:
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._frame = 2 * channels
+        self._pending = b""
+
+    def feed(self, pcm: bytes) -> List[bytes]:
+        data = self._pending + pcm
+        usable = len(data) - len(data) % self._frame
+        self._pending = data[usable:]
+        data, size = data[:usable], MAX_PAYLOAD - MAX_PAYLOAD % self._frame
+        return [data[i:i + size] for i in range(0, usable, size)]
+
+    def flush(self) -> List[bytes]:
+        self._pending = b""
+        return []
+
+
+class _Resampler:
+    """Streaming linear resampler for mono s16le; keeps phase across chunks."""
+
+    def __init__(self, src: int, dst: int) -> None:
+        self._step = src / dst
+        self._phase = 0.0
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def feed(self, samples: np.ndarray) -> np.ndarray:
+        x = np.concatenate([self._tail, samples.astype(np.float32)])
+        if len(x) < 2:
+            self._tail = x
+            return np.zeros(0, dtype=np.int16)
+        positions = np.arange(self._phase, len(x) - 1, self._step)
+        out = np.interp(positions, np.arange(len(x)), x)
+        following = positions[-1] + self._step if len(positions) else self._phase
+        self._phase = following - (len(x) - 1)
+        self._tail = x[-1:]
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+
+class OpusEncoder:
+    """
+    s16le mono PCM to Opus packets, one per 20 ms, resampling if needed.
+
+    Build only after opus_available() says yes.
+    """
+
+    codec = CODEC_OPUS
+
+    def __init__(self, sample_rate: int, channels: int = 1) -> None:
+        import opuslib
+
+        if channels != 1:
+            raise ValueError("Opus streaming is mono only.")
+        self.sample_rate = sample_rate if sample_rate in _OPUS_RATES else 24000
+        self.channels = 1
+        self._resampler = (_Resampler(sample_rate, self.sample_rate)
+                           if self.sample_rate != sample_rate else None)
+        self._encoder = opuslib.Encoder(self.sample_rate, 1, opuslib.APPLICATION_VOIP)
+        self._frame_samples = self.sample_rate * _OPUS_FRAME_MS // 1000
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._odd = b""
+
+    def feed(self, pcm: bytes) -> List[bytes]:
+        data = self._odd + pcm
+        cut = len(data) - len(data) % 2
+        self._odd = data[cut:]
+        samples = np.frombuffer(data[:cut], dtype="<i2")
+        if self._resampler is not None:
+            samples = self._resampler.feed(samples)
+        self._pending = np.concatenate([self._pending, samples])
+        return self._drain()
+
+    def flush(self) -> List[bytes]:
+        if len(self._pending):
+            pad = (-len(self._pending)) % self._frame_samples
+            self._pending = np.concatenate(
+                [self._pending, np.zeros(pad, dtype=np.int16)])
+        return self._drain()
+
+    def _drain(self) -> List[bytes]:
+        n = self._frame_samples
+        whole = len(self._pending) - len(self._pending) % n
+        packets = [self._encoder.encode(self._pending[i:i + n].astype("<i2").tobytes(), n)
+                   for i in range(0, whole, n)]
+        self._pending = self._pending[whole:]
+        return packets
+
+
+def make_encoder(codec: str, sample_rate: int, channels: int = 1):
+    """An encoder for the negotiated codec, falling back to PCM if Opus cannot take it."""
+    if codec == "opus":
+        try:
+            return OpusEncoder(sample_rate, channels)
+        except Exception as exc:
+            logger.debug("Opus encoder unavailable for this stream (%s); sending PCM.", exc)
+    return PcmEncoder(sample_rate, channels)
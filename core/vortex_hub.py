@@ -13,7 +13,7 @@ these shapes; see prototypes/presence-orb.html):
 
     presence   {state, amplitude, mood, caption}
     amplitude  {value: 0..1}
-    audio      {audio: <base64 wav>, text?}
+    audio      {audio: <base64 wav>, text?}   (units without binary audio)
     surface    <card descriptor>
     surface_withdraw {id}
     navigate   {page}
@@ -24,6 +24,9 @@ these shapes; see prototypes/presence-orb.html):
 `state` is one of PRESENCE_STATES. Nothing else is valid, and this module
 refuses to send anything else rather than letting an unknown state reach a
 renderer that will silently drop it.
+
+Units that negotiated it at auth get speech as binary frames instead of the
+`audio` message, streamed while it is synthesized; see core/vortex_audio.py.
 """
 
 from __future__ import annotations
@@ -31,12 +34,17 @@ from __future__ import annotations
 import asyncio
 import base64
 import io
+import itertools
+import json
 import logging
 import time
 import wave
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
 
+from core import vortex_audio
 from core.vortex_security import LoopLock
 
 logger = logging.getLogger(__name__)
@@ -62,6 +70,8 @@ class VortexConnection:
     # Last self-reported presence/occupancy, treated as a hint only.
     state: str = "idle"
     occupancy: Dict[str, Any] = field(default_factory=dict)
+    # Negotiated binary audio codec; None keeps the JSON `audio` frame.
+    audio_codec: Optional[str] = None
 
 
 class VortexHub:
@@ -77,12 +87,14 @@ class VortexHub:
         self._connections: Dict[str, VortexConnection] = {}
         self._lock = LoopLock()
         self._speaking_tasks: Dict[str, asyncio.Task] = {}
+        self._stream_ids = itertools.count(1)
 
     # -- registry ---------------------------------------------------------
 
     async def register(self, unit_id: str, websocket: Any, *,
                        room: Optional[str] = None,
-                       has_display: bool = True) -> VortexConnection:
+                       has_display: bool = True,
+                       audio_codec: Optional[str] = None) -> VortexConnection:
         """
         Attach a socket to a unit id, replacing any previous one.
 
@@ -90,7 +102,8 @@ class VortexHub:
         live sockets, or every push is delivered twice.
         """
         conn = VortexConnection(unit_id=unit_id, websocket=websocket,
-                                room=room, has_display=has_display)
+                                room=room, has_display=has_display,
+                                audio_codec=audio_codec)
         async with self._lock:
             existing = self._connections.get(unit_id)
             self._connections[unit_id] = conn
@@ -100,8 +113,8 @@ class VortexHub:
                 await existing.websocket.close()
             except Exception:
                 pass
-        logger.info("Vortex unit %s connected (room=%s, display=%s).",
-                    unit_id, room, has_display)
+        logger.info("Vortex unit %s connected (room=%s, display=%s, audio=%s).",
+                    unit_id, room, has_display, audio_codec or "json")
         return conn
 
     async def unregister(self, unit_id: str, websocket: Any = None) -> None:
@@ -153,6 +166,42 @@ class VortexHub:
             await self.unregister(unit_id, conn.websocket)
             return False
 
+    async def send_encoded(self, unit_id: str, text: str) -> bool:
+        """Send a frame already serialized by encode_frame(). False if it did not land."""
+        conn = self._connections.get(unit_id)
+        if conn is None:
+            return False
+        try:
+            await conn.websocket.send_text(text)
+            return True
+        except Exception as exc:
+            logger.info("Vortex send to %s failed (%s); dropping connection.",
+                        unit_id, exc)
+            await self.unregister(unit_id, conn.websocket)
+            return False
+
+    async def send_encoded_many(self, unit_ids: Iterable[str], text: str) -> int:
+        """One serialized frame to several units. Returns the delivered count."""
+        results = await asyncio.gather(
+            *(self.send_encoded(uid, text) for uid in unit_ids),
+            return_exceptions=True,
+        )
+        return sum(1 for r in results if r is True)
+
+    async def send_bytes(self, unit_id: str, data: bytes) -> bool:
+        """Send one binary frame to one unit. Returns False if it did not land."""
+        conn = self._connections.get(unit_id)
+        if conn is None:
+            return False
+        try:
+            await conn.websocket.send_bytes(data)
+            return True
+        except Exception as exc:
+            logger.info("Vortex send to %s failed (%s); dropping connection.",
+                        unit_id, exc)
+            await self.unregister(unit_id, conn.websocket)
+            return False
+
     async def send_many(self, unit_ids: Iterable[str], message_type: str,
                         payload: Optional[Dict[str, Any]] = None) -> int:
         """Send the same frame to several units. Returns the delivered count."""
@@ -220,7 +269,8 @@ class VortexHub:
 
         The unit plays an opaque audio blob and cannot measure it meaningfully,
         so the envelope is derived here — from the same synthesis, at the same
-        moment — and streamed as `amplitude` frames while it plays.
+        moment — and streamed as `amplitude` frames while it plays. A unit on
+        binary audio gets the PCM as binary frames (see open_audio()).
 
         Args:
             wav_bytes: WAV audio from the TTS provider.
@@ -230,6 +280,14 @@ class VortexHub:
         """
         if not wav_bytes:
             return False
+        conn = self._connections.get(unit_id)
+        decoded = (vortex_audio.pcm_from_wav(wav_bytes)
+                   if push_audio and conn is not None and conn.audio_codec else None)
+        if decoded is not None:
+            pcm, rate, channels = decoded
+            stream = self.open_audio(unit_id, rate, channels=channels, text=text)
+            written = await stream.write(pcm)
+            return await stream.close() and written
         if push_audio:
             ok = await self.send(unit_id, "audio", {
                 "audio": base64.b64encode(wav_bytes).decode("ascii"),
@@ -241,37 +299,80 @@ class VortexHub:
         self.start_amplitude_stream(unit_id, wav_bytes, caption=text)
         return True
 
+    def open_audio(self, unit_id: str, sample_rate: int, *, channels: int = 1,
+                   text: str = "", fmt: str = "pcm") -> "AudioStream":
+        """
+        Start streaming speech to a unit; write() chunks as they are produced.
+
+        Units on binary audio hear each chunk as it is written. Others get the
+        whole utterance as one JSON `audio` frame on close(), as before.
+
+        Args:
+            sample_rate: Rate of the s16le PCM that will be written.
+            text: The spoken text, for the caption.
+            fmt: "pcm", or an opaque container ("mp3") that can only go out on
+                the JSON path.
+        """
+        conn = self._connections.get(unit_id)
+        codec = conn.audio_codec if conn is not None and fmt == "pcm" else None
+        return AudioStream(self, unit_id, sample_rate, channels=channels,
+                           text=text, fmt=fmt, codec=codec,
+                           stream_id=next(self._stream_ids) & 0xFFFF)
+
     def start_amplitude_stream(self, unit_id: str, wav_bytes: bytes,
                                caption: str = "") -> None:
         """
         Begin streaming the envelope of `wav_bytes` to a unit, in the background.
 
         Cancels any stream already running for that unit: River interrupting
-        herself should replace the old envelope, not interleave with it.
+        herself should replace the old envelope, not interleave with it. The
+        envelope is computed in a worker thread inside that task, so neither
+        the event loop nor the caller waits for it.
         """
-        envelope = amplitude_envelope(wav_bytes)
-        if not envelope:
-            return
+        self._start_amplitude(unit_id, wav_bytes, caption)
+
+    def _start_amplitude(self, unit_id: str, envelope: Any, caption: str,
+                         live: Optional["_LiveEnvelope"] = None) -> None:
         previous = self._speaking_tasks.get(unit_id)
         if previous is not None:
             previous.cancel()
         task = asyncio.create_task(
-            self._run_amplitude_stream(unit_id, envelope, caption))
+            self._run_amplitude_stream(unit_id, envelope, caption, live))
         self._speaking_tasks[unit_id] = task
 
-    async def _run_amplitude_stream(self, unit_id: str, envelope: Sequence[float],
-                                    caption: str) -> None:
-        """Emit one amplitude frame per envelope sample, paced to real time."""
+    async def _run_amplitude_stream(self, unit_id: str, envelope: Any,
+                                    caption: str,
+                                    live: Optional["_LiveEnvelope"] = None) -> None:
+        """
+        Emit one amplitude frame per envelope sample, paced to real time.
+
+        `envelope` is a list of values, or WAV bytes to measure first. With
+        `live`, the envelope grows while the audio streams; running out means
+        waiting for more until it closes.
+        """
         try:
+            if isinstance(envelope, (bytes, bytearray)):
+                envelope = await asyncio.to_thread(amplitude_envelope, bytes(envelope))
+                if not envelope:
+                    return
             await self.presence(unit_id, "speaking", amplitude=envelope[0],
                                 caption=caption[:180] or None)
             started = time.monotonic()
-            for index, value in enumerate(envelope):
+            index = 0
+            while True:
+                if index >= len(envelope):
+                    if live is None or not await live.wait_for(index):
+                        break
+                    # The unit ran dry as well and resumes playing now.
+                    started = max(started,
+                                  time.monotonic() - index * _AMPLITUDE_PERIOD)
+                value = envelope[index]
                 target = started + (index * _AMPLITUDE_PERIOD)
                 delay = target - time.monotonic()
+                index += 1
                 if delay > 0:
                     await asyncio.sleep(delay)
-                elif index and delay < -_AMPLITUDE_PERIOD:
+                elif index > 1 and delay < -_AMPLITUDE_PERIOD:
                     continue  # Fell behind: drop the frame rather than lag.
                 if not await self.send(unit_id, "amplitude", {"value": value}):
                     return
@@ -281,7 +382,9 @@ class VortexHub:
         except Exception as exc:  # pragma: no cover - defensive
             logger.error("Amplitude stream for %s failed: %s", unit_id, exc)
         finally:
-            self._speaking_tasks.pop(unit_id, None)
+            # A cancelled stream must not unregister the one replacing it.
+            if self._speaking_tasks.get(unit_id) is asyncio.current_task():
+                self._speaking_tasks.pop(unit_id, None)
 
     def is_speaking(self, unit_id: str) -> bool:
         """True while an amplitude stream is running for this unit."""
@@ -300,6 +403,147 @@ class VortexHub:
         self._connections.clear()
 
 
+class AudioStream:
+    """
+    One utterance on its way to one unit. Built by VortexHub.open_audio().
+
+    Binary: a START frame, then DATA frames as write() is called, then END
+    on close(). The orb's envelope is computed from the same chunks and
+    streamed alongside. JSON: the audio is buffered and sent as one `audio`
+    frame on close(), exactly as speak() always has.
+    """
+
+    def __init__(self, hub: VortexHub, unit_id: str, sample_rate: int, *,
+                 channels: int, text: str, fmt: str, codec: Optional[str],
+                 stream_id: int) -> None:
+        self._hub = hub
+        self._unit_id = unit_id
+        self._rate = sample_rate
+        self._channels = channels
+        self._text = text
+        self._fmt = fmt
+        self._stream_id = stream_id
+        self._encoder = (vortex_audio.make_encoder(codec, sample_rate, channels)
+                         if codec else None)
+        self._buffer: List[bytes] = []
+        self._seq = 0
+        self._started = False
+        self._animating = False
+        self._closed = False
+        self._ok = True
+        self._envelope: Optional[_LiveEnvelope] = None
+
+    @property
+    def binary(self) -> bool:
+        return self._encoder is not None
+
+    async def write(self, chunk: bytes) -> bool:
+        """Send (or buffer) one chunk. False once the unit has gone."""
+        if not chunk or self._closed or not self._ok:
+            return self._ok
+        if self._encoder is None:
+            self._buffer.append(chunk)
+            return True
+        if not self._started:
+            self._started = True
+            if not await self._frame(vortex_audio.AUDIO_START):
+                return False
+            self._envelope = _LiveEnvelope(self._rate, self._channels)
+        # The envelope for this chunk exists before the chunk is sent, so it
+        # is ready by the time the unit plays it.
+        self._envelope.feed(chunk)
+        if not self._animating and self._envelope.values:
+            self._animating = True
+            self._hub._start_amplitude(self._unit_id, self._envelope.values,
+                                       self._text, self._envelope)
+        for payload in self._encoder.feed(chunk):
+            if not await self._frame(vortex_audio.AUDIO_DATA, payload):
+                return False
+        return True
+
+    async def close(self) -> bool:
+        """Finish the utterance. Returns whether it reached the unit."""
+        if self._closed:
+            return self._ok
+        self._closed = True
+        if self._encoder is None:
+            return await self._send_json()
+        if self._started and self._ok:
+            for payload in self._encoder.flush():
+                if not await self._frame(vortex_audio.AUDIO_DATA, payload):
+                    break
+            else:
+                await self._frame(vortex_audio.AUDIO_END)
+        if self._envelope is not None:
+            self._envelope.close()
+        return self._ok and self._started
+
+    async def _frame(self, kind: int, payload: bytes = b"") -> bool:
+        header = vortex_audio.pack_header(
+            kind, self._encoder.codec, self._stream_id, self._seq,
+            self._encoder.sample_rate, self._encoder.channels)
+        self._seq += 1
+        self._ok = await self._hub.send_bytes(self._unit_id, header + payload)
+        return self._ok
+
+    async def _send_json(self) -> bool:
+        data = b"".join(self._buffer)
+        self._buffer = []
+        if not data:
+            return False
+        if self._fmt != "pcm":
+            # Only PCM can be measured for the orb. Send the audio anyway —
+            # a non-pulsing orb beats a silent unit.
+            self._ok = await self._hub.send(self._unit_id, "audio", {
+                "audio": base64.b64encode(data).decode("ascii"),
+                "format": self._fmt, "text": self._text})
+            if self._ok:
+                await self._hub.presence(self._unit_id, "speaking")
+            return self._ok
+        wav = vortex_audio.wav_from_pcm(data, self._rate, self._channels)
+        self._ok = await self._hub.speak(self._unit_id, wav, text=self._text)
+        return self._ok
+
+
+class _LiveEnvelope:
+    """Envelope values appended as an utterance streams; the orb waits on it."""
+
+    def __init__(self, sample_rate: int, channels: int) -> None:
+        self.values: List[float] = []
+        self._channels = channels
+        self._window = max(1, int(sample_rate / AMPLITUDE_HZ)) * 2 * channels
+        self._pending = b""
+        self._loudest = 0.0
+        self._more = asyncio.Event()
+        self._closed = False
+
+    def feed(self, pcm: bytes) -> None:
+        data = self._pending + pcm
+        whole = len(data) - len(data) % self._window
+        self._pending = data[whole:]
+        if not whole:
+            return
+        frames = self._window // (2 * self._channels)
+        peaks = _window_peaks(data[:whole], self._channels, frames)
+        # Normalised against the loudest window so far; the rest of the
+        # utterance is not known yet.
+        loudest = np.maximum.accumulate(np.maximum(peaks, self._loudest))
+        self._loudest = float(loudest[-1])
+        self.values.extend(_shape(peaks, loudest))
+        self._more.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._more.set()
+
+    async def wait_for(self, index: int) -> bool:
+        """Wait until values[index] exists; False if the stream ended first."""
+        while len(self.values) <= index and not self._closed:
+            self._more.clear()
+            await self._more.wait()
+        return len(self.values) > index
+
+
 # ---------------------------------------------------------------------------
 # Envelope extraction
 # ---------------------------------------------------------------------------
@@ -336,34 +580,49 @@ def amplitude_envelope(wav_bytes: bytes,
         return []
 
     samples_per_window = max(1, int(framerate / rate_hz))
-    bytes_per_frame = width * channels
-    total_frames = len(frames) // bytes_per_frame
-    if total_frames <= 0:
+    peaks = _window_peaks(frames, channels, samples_per_window)
+    if not len(peaks):
         return []
 
-    # Decimate within each window: an orb does not need every sample, and this
-    # keeps a ten-second response to a few thousand int conversions.
-    stride = max(1, samples_per_window // 32)
-
-    peaks: List[float] = []
-    for start in range(0, total_frames, samples_per_window):
-        end = min(start + samples_per_window, total_frames)
-        peak = 0
-        for frame_index in range(start, end, stride):
-            offset = frame_index * bytes_per_frame
-            value = int.from_bytes(frames[offset:offset + 2], "little", signed=True)
-            magnitude = -value if value < 0 else value
-            if magnitude > peak:
-                peak = magnitude
-        peaks.append(peak / 32768.0)
-
-    loudest = max(peaks, default=0.0)
+    loudest = float(peaks.max())
     if loudest <= 0.001:
         return []
+    return _shape(peaks, np.float32(loudest))
+
 
-    # Normalise, then apply a mild curve: raw peak amplitude looks flat on a
-    # renderer that maps it straight to radius.
-    return [round(min(1.0, (p / loudest) ** 0.7), 4) for p in peaks]
+def _window_peaks(frames: bytes, channels: int,
+                  samples_per_window: int) -> np.ndarray:
+    """
+    Peak 0..1 of the first channel in each window of s16le frames.
+
+    Vectorised: one frombuffer view, a reshape into windows (the last one
+    zero-padded) and a max per row. Every sample counts, so a short click
+    cannot fall between decimation strides.
+    """
+    samples = np.frombuffer(frames, dtype="<i2", count=len(frames) // 2)
+    first = samples[:len(samples) - len(samples) % channels:channels]
+    if not len(first):
+        return np.zeros(0, dtype=np.float32)
+    magnitudes = np.abs(first.astype(np.int32))
+    pad = (-len(magnitudes)) % samples_per_window
+    if pad:
+        magnitudes = np.concatenate([magnitudes, np.zeros(pad, dtype=np.int32)])
+    peaks = magnitudes.reshape(-1, samples_per_window).max(axis=1)
+    return peaks.astype(np.float32) / 32768.0
+
+
+def _shape(peaks: np.ndarray, loudest: np.ndarray) -> List[float]:
+    """Normalise, then apply a mild curve: raw peak amplitude looks flat on a
+    renderer that maps it straight to radius."""
+    ratio = np.divide(peaks, loudest, out=np.zeros_like(peaks), where=loudest > 0.001)
+    return np.round(np.minimum(1.0, ratio ** 0.7), 4).tolist()
+
+
+def encode_frame(message_type: str,
+                 payload: Optional[Dict[str, Any]] = None) -> str:
+    """Serialize a frame once, for send_encoded_many() to fan out as-is."""
+    return json.dumps({"type": message_type, **(payload or {})},
+                      separators=(",", ":"), ensure_ascii=False, default=str)
 
 
 def _normalise_room(room: str) -> str:
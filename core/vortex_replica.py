@@ -28,6 +28,25 @@ Versioning is per section. `GET /api/vortex/replica?since=N` returns only the
 sections that changed after version N, plus a new stamp. A unit that has been
 off for a week and a unit that reconnected after eight seconds both ask the
 same question and get the right-sized answer.
+
+ELEMENT DELTAS
+--------------
+In the keyed sections (devices, cameras and notifications), each element is
+fingerprinted and versioned on its own, and removals leave a tombstone. A
+unit that acknowledges what it holds, with `{"type": "replica_ack",
+"version": N, "epoch": E}` over its socket, is pushed only the operations
+since N:
+
+    {"type": "replica", "version", "base": N, "epoch", "changed": [...],
+     "deltas": {"devices": {"upsert": [<element>...], "remove": [<id>...]}},
+     <unkeyed section>: <whole payload>, ...}
+
+One light toggling is one upsert, not the whole device list. Each distinct
+frame is serialized once and the same text goes to every unit on that base.
+A unit behind `floor` (its tombstones were pruned) or from another epoch
+(this server restarted) gets a full snapshot instead. Units that never ack
+(all firmware before this) keep the section-level `replica` frame and the
+*_update messages.
 """
 
 from __future__ import annotations
@@ -36,9 +55,11 @@ import asyncio
 import hashlib
 import json
 import logging
+import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from core import metrics
 from core.vortex_security import LoopLock
 
 logger = logging.getLogger(__name__)
@@ -52,6 +73,17 @@ SECTIONS = (
 # also arrives by push, so this is the backstop rather than the mechanism.
 _STALE_AFTER_SECONDS = 60.0
 
+# Sections made of identifiable elements, and the field that identifies them.
+_KEYED = {"devices": "entity_id", "cameras": "entity_id", "notifications": "id"}
+
+# Removals remembered per household. Older ones are pruned and `floor` moves
+# past them; a unit acknowledged before the floor gets a full snapshot.
+_MAX_TOMBSTONES = 512
+
+_LEGACY_MESSAGES = (("devices", "devices_update"),
+                    ("cameras", "cameras_update"),
+                    ("notifications", "notifications_update"))
+
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -68,19 +100,131 @@ class _HouseholdReplica:
 
     def __init__(self, owner_user_id: str) -> None:
         self.owner_user_id = owner_user_id
+        # Versions only compare within one epoch; it changes with the process.
+        self.epoch = uuid.uuid4().hex[:12]
         self.version = 0
         self.payloads: Dict[str, Any] = {}
         self.fingerprints: Dict[str, str] = {}
         self.versions: Dict[str, int] = {}
+        # Keyed sections: element id -> its JSON, the version it last
+        # changed at, and tombstones (id -> version removed).
+        self.elements: Dict[str, Dict[str, str]] = {}
+        self.element_versions: Dict[str, Dict[str, int]] = {}
+        self.removed: Dict[str, Dict[str, int]] = {}
+        # Version at which a keyed section was last replaced wholesale (first
+        # build, or a payload that could not be keyed).
+        self.whole_since: Dict[str, int] = {}
+        self.floor = 0
         self.built_at = 0.0
         self.lock = LoopLock()
 
+    def apply(self, name: str, payload: Any) -> bool:
+        """Record a freshly built section. Returns whether it changed."""
+        key = _KEYED.get(name)
+        elements = _keyed_elements(payload, key) if key else None
+        if elements is None:
+            fingerprint = _fingerprint(payload)
+            if self.fingerprints.get(name) == fingerprint:
+                return False
+            self.version += 1
+            self.fingerprints[name] = fingerprint
+            if key:
+                # Could not be keyed this time; units get it whole.
+                for table in (self.elements, self.element_versions, self.removed):
+                    table.pop(name, None)
+                self.whole_since[name] = self.version
+        else:
+            old = self.elements.get(name)
+            if old == elements:
+                return False
+            self.version += 1
+            self.fingerprints.pop(name, None)
+            if old is None:
+                self.whole_since[name] = self.version
+                self.element_versions[name] = {k: self.version for k in elements}
+                self.removed[name] = {}
+            else:
+                self._diff(name, old, elements)
+            self.elements[name] = elements
+        self.payloads[name] = payload
+        self.versions[name] = self.version
+        return True
+
+    def _diff(self, name: str, old: Dict[str, str], new: Dict[str, str]) -> None:
+        versions, removed = self.element_versions[name], self.removed[name]
+        for element_id, encoded in new.items():
+            if old.get(element_id) != encoded:
+                versions[element_id] = self.version
+                removed.pop(element_id, None)
+        for element_id in old.keys() - new.keys():
+            versions.pop(element_id, None)
+            removed[element_id] = self.version
+        total = sum(len(r) for r in self.removed.values())
+        if total > _MAX_TOMBSTONES:
+            oldest = sorted((v, section, element_id)
+                            for section, r in self.removed.items()
+                            for element_id, v in r.items())
+            for v, section, element_id in oldest[:total - _MAX_TOMBSTONES // 2]:
+                del self.removed[section][element_id]
+                self.floor = max(self.floor, v)
+
+    def delta(self, since: int) -> Optional[Dict[str, Any]]:
+        """
+        Everything that changed after `since`, element by element where the
+        section allows it. None when `since` cannot be served that way.
+        """
+        if since < self.floor or since > self.version:
+            return None
+        out: Dict[str, Any] = {"version": self.version, "base": since,
+                               "epoch": self.epoch, "full": False,
+                               "generated_at": _now_iso()}
+        changed: List[str] = []
+        deltas: Dict[str, Any] = {}
+        for name in SECTIONS:
+            if name not in self.payloads or self.versions.get(name, 0) <= since:
+                continue
+            changed.append(name)
+            key = _KEYED.get(name)
+            if key is None or name not in self.elements \
+                    or self.whole_since.get(name, 0) > since:
+                out[name] = self.payloads[name]
+                continue
+            newer = {element_id for element_id, v in self.element_versions[name].items()
+                     if v > since}
+            deltas[name] = {
+                "upsert": [e for e in self.payloads[name] if str(e.get(key)) in newer],
+                "remove": [element_id for element_id, v in self.removed[name].items()
+                           if v > since],
+            }
+        out["changed"] = changed
+        if deltas:
+            out["deltas"] = deltas
+        return out
+
+
+def _keyed_elements(payload: Any, key: str) -> Optional[Dict[str, str]]:
+    """element id -> canonical JSON, or None if the payload is not a list of
+    uniquely keyed dicts."""
+    if not isinstance(payload, list):
+        return None
+    elements: Dict[str, str] = {}
+    for element in payload:
+        if not isinstance(element, dict) or element.get(key) in (None, ""):
+            return None
+        element_id = str(element[key])
+        if element_id in elements:
+            return None
+        elements[element_id] = json.dumps(element, sort_keys=True, default=str)
+    return elements
+
 
 class ReplicaService:
     """Builds, versions and pushes the unit-facing replica."""
 
     def __init__(self) -> None:
         self._households: Dict[str, _HouseholdReplica] = {}
+        # unit_id -> (epoch, version) it last acknowledged holding.
+        self._acked: Dict[str, Tuple[str, int]] = {}
         # Weather-alert surface ids currently on screen, so a warning that
         # lapses is withdrawn rather than left to time out.
         self._live_weather_surfaces: set = set()
@@ -117,14 +261,8 @@ class ReplicaService:
                     logger.warning("Replica section '%s' failed for %s: %s",
                                    name, owner_user_id, payload)
                     continue
-                fingerprint = _fingerprint(payload)
-                if replica.fingerprints.get(name) == fingerprint:
-                    continue
-                replica.version += 1
-                replica.payloads[name] = payload
-                replica.fingerprints[name] = fingerprint
-                replica.versions[name] = replica.version
-                changed.append(name)
+                if replica.apply(name, payload):
+                    changed.append(name)
 
             replica.built_at = asyncio.get_running_loop().time()
 
@@ -293,6 +431,7 @@ class ReplicaService:
 
         out: Dict[str, Any] = {
             "version": replica.version,
+            "epoch": replica.epoch,
             "generated_at": _now_iso(),
             "full": full,
         }
@@ -320,21 +459,34 @@ class ReplicaService:
 
     # -- pushing ----------------------------------------------------------
 
+    def acknowledge(self, unit_id: str, version: Any, epoch: Any) -> None:
+        """Record the replica version a unit says it holds (a `replica_ack`)."""
+        try:
+            self._acked[unit_id] = (str(epoch or ""), int(version))
+        except (TypeError, ValueError):
+            pass
+
+    def forget(self, unit_id: str) -> None:
+        """Drop a unit's acknowledged version — it disconnected or was reset."""
+        self._acked.pop(unit_id, None)
+
     async def push_updates(self, owner_user_id: str,
                            sections: Optional[List[str]] = None) -> int:
         """
         Rebuild, then push what changed to that household's connected units.
 
-        Sends both the generic `replica` delta and the three specific messages
-        the device layer already listens for (`devices_update`,
+        Units that acknowledge their version get element deltas against it.
+        The rest get the section-level `replica` frame plus the three specific
+        messages the device layer already listens for (`devices_update`,
         `cameras_update`, `notifications_update`), so the device grid, camera
         page and notification bar populate without a device-side change.
+        Every frame is serialized once, however many units receive it.
         """
         changed = await self.refresh(owner_user_id, sections)
         if not changed:
             return 0
 
-        from core.vortex_hub import get_vortex_hub
+        from core.vortex_hub import encode_frame, get_vortex_hub
         from core.vortex_units import list_profiles
 
         replica = self._household(owner_user_id)
@@ -344,20 +496,45 @@ class ReplicaService:
         if not unit_ids:
             return 0
 
-        delta = {"version": replica.version,
-                 "changed": changed,
-                 "generated_at": _now_iso()}
-        for name in changed:
-            delta[name] = replica.payloads[name]
-
-        delivered = await hub.send_many(unit_ids, "replica", delta)
-
-        for name, message_type in (("devices", "devices_update"),
-                                   ("cameras", "cameras_update"),
-                                   ("notifications", "notifications_update")):
-            if name in changed:
-                await hub.send_many(unit_ids, message_type,
-                                    {"data": replica.payloads[name]})
+        legacy: List[str] = []
+        by_base: Dict[int, List[str]] = {}
+        behind: List[str] = []
+        for unit_id in unit_ids:
+            acked = self._acked.get(unit_id)
+            if acked is None:
+                legacy.append(unit_id)
+            elif acked[0] != replica.epoch:
+                behind.append(unit_id)
+            else:
+                by_base.setdefault(acked[1], []).append(unit_id)
+
+        delivered = 0
+        for base, units in by_base.items():
+            delta = replica.delta(base)
+            if delta is None:
+                behind.extend(units)
+                continue
+            metrics.incr("vortex_replica.delta_frames")
+            delivered += await hub.send_encoded_many(units, encode_frame("replica", delta))
+
+        for unit_id in behind:
+            # Too far behind for deltas, or from before a restart.
+            metrics.incr("vortex_replica.full_frames")
+            snapshot = await self.snapshot(owner_user_id, unit_id=unit_id)
+            delivered += int(await hub.send(unit_id, "replica", snapshot))
+
+        if legacy:
+            delta = {"version": replica.version,
+                     "epoch": replica.epoch,
+                     "changed": changed,
+                     "generated_at": _now_iso()}
+            for name in changed:
+                delta[name] = replica.payloads[name]
+            delivered += await hub.send_encoded_many(legacy, encode_frame("replica", delta))
+            for name, message_type in _LEGACY_MESSAGES:
+                if name in changed:
+                    await hub.send_encoded_many(legacy, encode_frame(
+                        message_type, {"data": replica.payloads[name]}))
 
         if "weather_alerts" in changed:
             await self._raise_weather_alert_surfaces(replica.payloads["weather_alerts"])
@@ -389,12 +566,13 @@ class ReplicaService:
         """Send a full replica to one unit — used the moment it connects."""
         from core.vortex_hub import get_vortex_hub
 
+        # Whatever the unit acknowledged before is gone with this snapshot;
+        # until it acks the new one, it gets full section frames.
+        self.forget(unit_id)
         snapshot = await self.snapshot(owner_user_id, unit_id=unit_id)
         hub = get_vortex_hub()
         ok = await hub.send(unit_id, "replica", snapshot)
-        for name, message_type in (("devices", "devices_update"),
-                                   ("cameras", "cameras_update"),
-                                   ("notifications", "notifications_update")):
+        for name, message_type in _LEGACY_MESSAGES:
             if name in snapshot:
                 await hub.send(unit_id, message_type, {"data": snapshot[name]})
         return ok
@@ -408,6 +586,7 @@ class ReplicaService:
     def reset(self) -> None:
         """Drop all cached replicas. Test helper."""
         self._households.clear()
+        self._acked.clear()
         self._live_weather_surfaces = set()
 
 
@@ -333,10 +333,15 @@ async def _detect_faces(image: bytes) -> int:
     return await asyncio.get_running_loop().run_in_executor(None, _run)
 
 
-async def _match_face(image: bytes, owner_user_id: str) -> Optional[Dict[str, Any]]:
+async def _match_face(images: List[bytes],
+                      owner_user_id: str) -> Optional[Dict[str, Any]]:
     """
     Match a face against the household's enrolled identities.
 
+    `images` are the frames that contain a face, best first. When the
+    backend's module also exposes `match_frames(images, owner_user_id)`, all
+    of them are scored in one batch; otherwise the first goes to `match`.
+
     Recognition is pluggable and, by default, absent: this deployment ships
     detection but no embedding model, and inventing a match from a general
     vision model would be a confident answer to a question it cannot answer.
@@ -361,13 +366,18 @@ async def _match_face(image: bytes, owner_user_id: str) -> Optional[Dict[str, An
     import importlib
 
     try:
-        backend = getattr(importlib.import_module(module_name), attribute)
+        module = importlib.import_module(module_name)
+        backend = getattr(module, attribute)
     except (ImportError, AttributeError) as exc:
         raise FaceRecognitionUnavailable(
             f"Face backend '{dotted}' could not be loaded: {exc}")
 
+    batch = getattr(module, "match_frames", None)
     try:
-        result = backend(image, owner_user_id)
+        if len(images) > 1 and callable(batch):
+            result = batch(images, owner_user_id)
+        else:
+            result = backend(images[0], owner_user_id)
         if asyncio.iscoroutine(result):
             result = await result
     except Exception as exc:
@@ -430,7 +440,9 @@ async def identify_from_frames(*, unit_id: str, owner_user_id: str,
                 "message": "I couldn't see a face."}
 
     try:
-        match = await _match_face(decoded[face_counts.index(best_count)],
+        with_faces = sorted((i for i, n in enumerate(face_counts) if n > 0),
+                            key=lambda i: -face_counts[i])
+        match = await _match_face([decoded[i] for i in with_faces],
                                   owner_user_id)
     except FaceRecognitionUnavailable as exc:
         logger.info("Face identification requested on %s but unavailable: %s",
@@ -239,16 +239,64 @@ async def handle_unit_utterance(*, unit_id: str, user_id: str, audio: bytes,
         await hub.presence(unit_id, "error", caption="Voice is unavailable")
         return
 
-    async def on_event(event: Dict[str, Any]) -> None:
+    speech = _TurnSpeech(hub, unit_id, getattr(loop, "_tts", None))
+
+    async def on_event(event: Any) -> None:
+        if isinstance(event, (bytes, bytearray)):
+            await speech.feed(bytes(event))
+            return
+        if event.get("type") == "idle":
+            await speech.close()
         await _relay_event(hub, unit_id, event)
 
     await hub.presence(unit_id, "thinking")
     try:
-        with origin_scope(origin):
+        from providers.llm.agent_roles import Priority
+        from providers.llm.scheduler import llm_priority
+
+        with origin_scope(origin), llm_priority(Priority.INTERACTIVE_VOICE):
             await loop.run_once(audio, on_event=on_event)  # type: ignore[arg-type]
     except Exception as exc:
         logger.error("Vortex voice turn failed for %s: %s", unit_id, exc)
         await hub.presence(unit_id, "error", caption="Something went wrong")
+    finally:
+        await speech.close()
+
+
+class _TurnSpeech:
+    """
+    A turn's streamed answer, passed to the unit as the loop synthesizes it.
+
+    The loop emits each TTS chunk as a bytes event: `<HH gen_id, seq_id>`
+    followed by 16-bit PCM (mp3 for ElevenLabs). Those go straight into one
+    hub audio stream, so a binary-audio unit starts speaking at the first
+    sentence rather than after the last.
+    """
+
+    _LOOP_HEADER = 4
+
+    def __init__(self, hub: Any, unit_id: str, tts: Any) -> None:
+        self._hub = hub
+        self._unit_id = unit_id
+        self._tts = tts
+        self._stream: Any = None
+
+    async def feed(self, frame: bytes) -> None:
+        chunk = frame[self._LOOP_HEADER:]
+        if not chunk:
+            return
+        if self._stream is None:
+            # The same test the loop makes: ElevenLabs streams mp3.
+            pcm = self._tts.__class__.__name__ != "ElevenLabsTTS"
+            rate = int(getattr(self._tts, "sample_rate", 0) or 22050)
+            self._stream = self._hub.open_audio(
+                self._unit_id, rate, fmt="pcm" if pcm else "mp3")
+        await self._stream.write(chunk)
+
+    async def close(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            await stream.close()
 
 
 async def _relay_event(hub: Any, unit_id: str, event: Dict[str, Any]) -> None:
@@ -11,6 +11,7 @@ from daemons.base_daemon import BaseDaemon
 from core.token_tracker import set_usage_source
 from config.settings import get_settings
 from providers.llm.agent_roles import AgentRole, get_role_registry
+from providers.llm.scheduler import set_llm_priority
 from providers.memory.graphiti_provider import Episode, get_graphiti_provider
 
 logger = logging.getLogger(__name__)
@@ -50,6 +51,7 @@ class ScribeDaemon(BaseDaemon):
     async def _run_heuristic_scan(self) -> None:
         """Scan the vault for notes that need deeper analysis."""
         set_usage_source("scribe")
+        set_llm_priority(AgentRole.SCRIBE)
         logger.info("Scribe: performing vault heuristic scan...")
         
         try:
@@ -216,6 +218,7 @@ class ScribeDaemon(BaseDaemon):
 
     async def _analyze_note(self, virtual_path: str, user_id: str | None = None) -> dict:
         set_usage_source("scribe")
+        set_llm_priority(AgentRole.SCRIBE)
         """On-demand deep analysis of a single note.
 
         Same pipeline as the heuristic scan, scoped to one note: read it,
@@ -1,34 +1,76 @@
 import asyncio
 import logging
+import time
 from datetime import datetime, timezone
 import json
 import uuid
 import os
+from typing import Dict, Optional
+
 import httpx
 from croniter import croniter
 
+from core.timer_heap import TimerHeap
 from daemons.base_daemon import BaseDaemon
 from providers.memory.sqlite_store import SQLiteStore
 
 logger = logging.getLogger(__name__)
 
+# Schedules are edited through the API in the main process, so the daemon
+# re-reads them on this interval; firing itself waits on the heap.
+_SYNC_SECONDS = 30.0
+# A run this late was missed (daemon down or stalled): missed_run_policy
+# decides between "skip" and "run_once_on_recovery".
+_LATE_GRACE_SECONDS = 120.0
+# Heap key for the hourly telemetry prune.
+_PRUNE = "__prune_telemetry__"
+
+
+def _epoch(value) -> Optional[float]:
+    """A stored next_run (naive UTC or aware ISO) as epoch seconds."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _next_hour(now: float) -> float:
+    return (now // 3600 + 1) * 3600
+
+
 class VectorSchedulerDaemon(BaseDaemon):
     name = "vector_scheduler"
 
     def __init__(self):
         super().__init__()
         self.store = SQLiteStore()
+        self._heap = TimerHeap()
+        self._schedules: Dict[str, dict] = {}
+        self._synced_at = 0.0
 
     async def _main_loop(self):
         logger.info("VectorSchedulerDaemon starting scheduler loop")
         await self.store.initialize()
-        
+        self._heap.set(_PRUNE, _next_hour(time.time()))
+
         while self._running:
             try:
-                await self._tick()
+                if time.monotonic() - self._synced_at >= _SYNC_SECONDS:
+                    await self._sync()
+                for key, due_at in await self._heap.wait_due(max_wait=_SYNC_SECONDS):
+                    if key == _PRUNE:
+                        self._heap.set(_PRUNE, _next_hour(time.time()))
+                        await self._prune()
+                    else:
+                        await self._run_schedule(key, due_at)
             except Exception as e:
                 logger.error(f"Scheduler tick error: {e}")
-            await asyncio.sleep(60)
+                await asyncio.sleep(5)
 
     async def _wake_queue(self, unit_id: str):
         try:
@@ -39,35 +81,62 @@ class VectorSchedulerDaemon(BaseDaemon):
         except Exception as e:
             logger.error(f"Failed to wake queue for {unit_id}: {e}")
 
-    async def _tick(self):
-        now = datetime.now(timezone.utc).replace(tzinfo=None)
+    async def _sync(self):
+        """Reconcile the heap with the enabled schedules; only changed rows move."""
         schedules = await self.store.get_active_schedules()
-        
+        seen = set()
         for s in schedules:
-            next_run_str = s.get("next_run")
-            if next_run_str:
-                next_run_dt = datetime.fromisoformat(next_run_str)
-                if next_run_dt.tzinfo is not None:
-                    next_run_dt = next_run_dt.astimezone(timezone.utc).replace(tzinfo=None)
-                if next_run_dt <= now:
-                    program = await self.store.execute_read_one_async("SELECT assigned_unit_id FROM vector_programs WHERE program_id=?", (s["program_id"],))
-                    if program and program.get("assigned_unit_id"):
-                        unit_id = program["assigned_unit_id"]
-                        
-                        idempotency_key = f"schedule:{s['schedule_id']}:{now.strftime('%Y%m%d%H%M')}"
-                        existing = await self.store.execute_read_one_async("SELECT 1 FROM vector_commands WHERE idempotency_key=?", (idempotency_key,))
-                        if not existing:
-                            cmd_id = uuid.uuid4().hex
-                            sql = "INSERT INTO vector_commands (command_id, unit_id, issued_by, issued_at, idempotency_key, action, params) VALUES (?, ?, ?, ?, ?, ?, ?)"
-                            await self.store.execute_write_async(sql, (cmd_id, unit_id, f"schedule:{s['schedule_id']}", now.isoformat(), idempotency_key, "mow_start", json.dumps({"program_id": s["program_id"]})))
-                            await self._wake_queue(unit_id)
-                            
-                    cron = croniter(s["cron_utc"], now)
-                    new_next_run = cron.get_next(datetime)
-                    await self.store.update_schedule(s["schedule_id"], now.isoformat(), new_next_run.isoformat())
-                    
-        if now.minute == 0:
-            units = await self.store.get_vector_units()
-            retention_days = int(os.getenv("VECTOR_TELEMETRY_RETENTION_DAYS", "90"))
-            for u in units:
-                await self.store.prune_telemetry(u["unit_id"], retention_days)
+            sid = s["schedule_id"]
+            seen.add(sid)
+            self._schedules[sid] = s
+            due = _epoch(s.get("next_run"))
+            if due is None:
+                now = datetime.now(timezone.utc).replace(tzinfo=None)
+                due = croniter(s["cron_utc"], now).get_next(datetime).replace(
+                    tzinfo=timezone.utc).timestamp()
+            if self._heap.due_at(sid) != due:
+                self._heap.set(sid, due)
+        for sid in set(self._schedules) - seen:
+            self._schedules.pop(sid, None)
+            self._heap.remove(sid)
+        self._synced_at = time.monotonic()
+
+    async def _run_schedule(self, schedule_id: str, due_at: float):
+        s = self._schedules.get(schedule_id)
+        if s is None:
+            return
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        slot = datetime.fromtimestamp(due_at, timezone.utc).replace(tzinfo=None)
+        late = (now - slot).total_seconds()
+        run = (late <= _LATE_GRACE_SECONDS
+               or s.get("missed_run_policy") == "run_once_on_recovery")
+
+        if run:
+            program = await self.store.execute_read_one_async("SELECT assigned_unit_id FROM vector_programs WHERE program_id=?", (s["program_id"],))
+            if program and program.get("assigned_unit_id"):
+                unit_id = program["assigned_unit_id"]
+
+                # Keyed on the slot, not the wall clock, so a late or
+                # repeated fire of the same slot issues one command.
+                idempotency_key = f"schedule:{schedule_id}:{slot.strftime('%Y%m%d%H%M')}"
+                existing = await self.store.execute_read_one_async("SELECT 1 FROM vector_commands WHERE idempotency_key=?", (idempotency_key,))
+                if not existing:
+                    cmd_id = uuid.uuid4().hex
+                    sql = "INSERT INTO vector_commands (command_id, unit_id, issued_by, issued_at, idempotency_key, action, params) VALUES (?, ?, ?, ?, ?, ?, ?)"
+                    await self.store.execute_write_async(sql, (cmd_id, unit_id, f"schedule:{schedule_id}", now.isoformat(), idempotency_key, "mow_start", json.dumps({"program_id": s["program_id"]})))
+                    await self._wake_queue(unit_id)
+        else:
+            logger.info(f"Skipping schedule {schedule_id}: its {slot.isoformat()} run was missed by {late / 60:.0f} min")
+
+        # Every missed slot collapses into the one run above.
+        new_next_run = croniter(s["cron_utc"], now).get_next(datetime)
+        last_run = now.isoformat() if run else s.get("last_run")
+        await self.store.update_schedule(schedule_id, last_run, new_next_run.isoformat())
+        s["last_run"], s["next_run"] = last_run, new_next_run.isoformat()
+        self._heap.set(schedule_id, new_next_run.replace(tzinfo=timezone.utc).timestamp())
+
+    async def _prune(self):
+        units = await self.store.get_vector_units()
+        retention_days = int(os.getenv("VECTOR_TELEMETRY_RETENTION_DAYS", "90"))
+        for u in units:
+            await self.store.prune_telemetry(u["unit_id"], retention_days)
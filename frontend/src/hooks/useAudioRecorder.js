@@ -4,20 +4,27 @@
 // Records mic audio in the browser and sends raw PCM over Binary WebSockets.
 // Uses an AudioWorkletProcessor (`vad-processor.js`) for non-blocking capture,
 // VAD (Voice Activity Detection), and linear downsampling to 16kHz.
+//
+// Every chunk is handed to `onChunk` as soon as the worklet produces it, so a
+// streaming client can forward the utterance while the user is still talking.
+// The chunks are also kept, and the whole utterance still goes to `onComplete`
+// when recording stops, for a client that has to fall back to one upload.
 // =============================================================================
 
 import { useCallback, useEffect, useRef, useState } from 'react'
 
-export function useAudioRecorder({ onComplete, onNoSpeech, onAmbientChunk }) {
+export function useAudioRecorder({ onComplete, onNoSpeech, onChunk, onAmbientChunk }) {
   const [isRecording, setIsRecording] = useState(false)
   const [audioLevel,  setAudioLevel]  = useState(0)
 
   const onCompleteRef = useRef(onComplete)
   const onNoSpeechRef = useRef(onNoSpeech)
+  const onChunkRef = useRef(onChunk)
   const onAmbientChunkRef = useRef(onAmbientChunk)
 
   useEffect(() => { onCompleteRef.current = onComplete }, [onComplete])
   useEffect(() => { onNoSpeechRef.current = onNoSpeech }, [onNoSpeech])
+  useEffect(() => { onChunkRef.current = onChunk }, [onChunk])
   useEffect(() => { onAmbientChunkRef.current = onAmbientChunk }, [onAmbientChunk])
 
   const contextRef   = useRef(null)
@@ -108,6 +115,7 @@ export function useAudioRecorder({ onComplete, onNoSpeech, onAmbientChunk }) {
             onAmbientChunkRef.current?.(msg.data)
           } else {
             chunksRef.current.push(msg.data)
+            onChunkRef.current?.(msg.data)
           }
         } else if (msg.type === 'speech_end' || msg.type === 'timeout') {
           setTimeout(stopRecording, 0)
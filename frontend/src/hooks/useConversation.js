@@ -20,7 +20,13 @@ const WS_PROTOCOL = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
  */
 const STREAM_WATCHDOG_MS = 180000
 
-export function useConversation({ token, user, sessionId, onSessionId, extraQueryParams = {} }) {
+/**
+ * The server's reply to `{type:'start', stream:true}` when it has no streaming
+ * STT. The client then re-arms the turn as a single upload instead.
+ */
+const STREAM_UNAVAILABLE_PREFIX = 'Streaming STT unavailable'
+
+export function useConversation({ token, user, sessionId, onSessionId, extraQueryParams = {}, streamAudio = true }) {
   const backendHost = API_BASE ? new URL(API_BASE).host : window.location.host;
   const wsProtocol = API_BASE ? (API_BASE.startsWith('https') ? 'wss:' : 'ws:') : WS_PROTOCOL;
   
@@ -34,9 +40,15 @@ export function useConversation({ token, user, sessionId, onSessionId, extraQuer
   const [streamingContent, setStreamingContent] = useState('')
   const [error, setError] = useState(null)
   const [toolEvents, setToolEvents] = useState([])
+  const [partialTranscript, setPartialTranscript] = useState('')
 
   const streamTimeoutRef = useRef(null)
   const expectedGenIdRef = useRef(0)
+  // How the utterance being recorded reaches the server: 'stream' sends each
+  // chunk as it is captured, 'upload' sends the whole utterance when recording
+  // stops, and 'done' means the server already has it and the rest is dropped.
+  const captureModeRef = useRef('upload')
+  const stopRecorderRef = useRef(null)
 
   const finalizeStream = useCallback(() => {
     setStreamingContent(current => {
@@ -75,9 +87,20 @@ export function useConversation({ token, user, sessionId, onSessionId, extraQuer
     const { type, text, content, message, data, session_id, title } = event
     switch (type) {
       case 'connected':       setConvState('idle');       setError(null); break
-      case 'listening':       setConvState('listening');  setStreamingContent(''); setError(null); break
+      case 'listening':       setConvState('listening');  setStreamingContent(''); setPartialTranscript(''); setError(null); break
       case 'transcribing':    setConvState('transcribing'); break
-      case 'transcript':      if (text) setMessages(p => [...p, { role: 'user', text }]); break
+      case 'partial_transcript': setPartialTranscript(text || ''); break
+      case 'transcript':
+        setPartialTranscript('')
+        if (text) setMessages(p => [...p, { role: 'user', text }])
+        break
+      case 'speech_end':
+        // The server heard the end of the utterance and has started the
+        // turn; the rest of the recording is not needed.
+        captureModeRef.current = 'done'
+        setConvState('thinking')
+        stopRecorderRef.current?.()
+        break
       case 'thinking':
         setConvState('thinking')
         setStreamingContent('')
@@ -134,7 +157,15 @@ export function useConversation({ token, user, sessionId, onSessionId, extraQuer
       case 'idle':
         if (!audioPlayer.isPlaying) setConvState('idle')
         break
-      case 'error':   setError(message || 'An unknown error occurred.'); break
+      case 'error':
+        if (captureModeRef.current === 'stream' && message?.startsWith(STREAM_UNAVAILABLE_PREFIX)) {
+          // Keep recording and send the utterance in one piece at the end.
+          captureModeRef.current = 'upload'
+          sendMessageRef.current?.({ type: 'start' })
+          break
+        }
+        setError(message || 'An unknown error occurred.')
+        break
       case 'session':
         if (onSessionId) onSessionId(session_id)
         break
@@ -146,6 +177,8 @@ export function useConversation({ token, user, sessionId, onSessionId, extraQuer
   }, [audioPlayer, finalizeStream, armStreamWatchdog])
 
   const { sendMessage, connectionStatus, authError } = useWebSocket(wsUrl, handleMessage, { token })
+  const sendMessageRef = useRef(sendMessage)
+  useEffect(() => { sendMessageRef.current = sendMessage }, [sendMessage])
 
   useEffect(() => {
     if (authError) setError('Session expired.')
@@ -159,13 +192,49 @@ export function useConversation({ token, user, sessionId, onSessionId, extraQuer
     }
   }, [connectionStatus])
 
-  const { startRecording, stopRecording, isRecording, audioLevel } = useAudioRecorder({
+  const {
+    startRecording: startRecorder,
+    stopRecording,
+    isRecording,
+    audioLevel,
+  } = useAudioRecorder({
+    onChunk: pcm => {
+      if (captureModeRef.current === 'stream') sendMessage(pcm)
+    },
     onComplete: pcm => {
+      const mode = captureModeRef.current
+      captureModeRef.current = 'done'
+      if (mode === 'done') return
       setConvState('thinking')
-      sendMessage(pcm)
+      // A streamed utterance is already on the server; just close it.
+      sendMessage(mode === 'stream' ? { type: 'audio_end' } : pcm)
+    },
+    onNoSpeech: () => {
+      if (captureModeRef.current !== 'done') sendMessage({ type: 'interrupt' })
+      captureModeRef.current = 'done'
+      setConvState(s => (s === 'listening' ? 'idle' : s))
     },
-    onNoSpeech: () => setConvState(s => (s === 'listening' ? 'idle' : s)),
   })
+  useEffect(() => { stopRecorderRef.current = stopRecording }, [stopRecording])
+
+  /**
+   * Open the turn on the server before the mic starts, so the first chunk
+   * has somewhere to go. The server answers `listening`; with `stream` it
+   * also sends `partial_transcript` as the user speaks and `speech_end` when
+   * it hears them stop.
+   */
+  const startRecording = useCallback(async () => {
+    if (isRecording) return true
+    captureModeRef.current = streamAudio ? 'stream' : 'upload'
+    setPartialTranscript('')
+    sendMessage({ type: 'start', stream: streamAudio })
+    const ok = await startRecorder()
+    if (!ok) {
+      captureModeRef.current = 'done'
+      sendMessage({ type: 'interrupt' })
+    }
+    return ok
+  }, [isRecording, streamAudio, sendMessage, startRecorder])
 
   useEffect(() => {
     window.dispatchEvent(new CustomEvent('rs-presence', { detail: { state: convState } }))
@@ -228,6 +297,7 @@ export function useConversation({ token, user, sessionId, onSessionId, extraQuer
     messages,
     setMessages,
     streamingContent,
+    partialTranscript,
     toolEvents,
     error,
     setError,
@@ -25,6 +25,7 @@ export default function ConversationPage({ setAction }) {
     convState,
     messages,
     streamingContent,
+    partialTranscript,
     error,
     setError,
     isRecording,
@@ -192,12 +193,17 @@ export default function ConversationPage({ setAction }) {
             <strong>{m.role === 'user' ? 'YOU' : 'RIVER'}:</strong> {m.text}
           </div>
         ))}
+        {partialTranscript && (
+          <div style={{ fontSize: '0.95rem', opacity: 0.5 }}>
+            <strong>YOU:</strong> {partialTranscript}
+          </div>
+        )}
         {streamingContent && (
           <div style={{ fontSize: '0.95rem', color: 'var(--primary)' }}>
             <strong>RIVER:</strong> {streamingContent}
           </div>
         )}
-        {messages.length === 0 && !streamingContent && convState === 'listening' && (
+        {messages.length === 0 && !streamingContent && !partialTranscript && convState === 'listening' && (
           <div style={{ fontSize: '0.9rem', opacity: 0.5, textAlign: 'center', color: 'var(--primary)' }}>Intercepting audio stream...</div>
         )}
       </div>
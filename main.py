@@ -106,6 +106,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     memory_manager = MemoryManager(store)
     await memory_manager.initialize()
     app.state.memory_manager = memory_manager
+    app.state.store = store
     app.state.active_connections = {} # user_id -> List[WebSocket]
     app.state.ws_tickets = {} # ticket_uuid -> {"user_id": str, "expires_at": float, "is_kiosk": bool}
     logger.info("Memory layer ready (db=%s).", settings.db_path)
@@ -165,6 +166,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     app.state.context_engine = ContextEngine()
     logger.info("Context engine ready.")
 
+    # Intent router: compile the phrase/keyword matcher before the first turn
+    from core.intent_router import get_intent_router
+    get_intent_router()
+
     # Rover telemetry (Task Rover)
     app.state.rover_telemetry = {}
     logger.info("Rover telemetry initialized.")
@@ -221,15 +226,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Register Sweeps
     from core.sweeps import register_sweep, start_sweeps, stop_sweeps
-    from core.routines_scheduler import _check_routines
+    from core.routines_scheduler import get_routine_scheduler
     from core.distiller import run_distiller, sweep_messages
     from core.initiative import weather_sweep_func
     from core.brief import brief_sweep_func
     
-    async def _routines_sweep():
-        await _check_routines(app)
-    register_sweep("routines", 60, _routines_sweep)
-    
     async def _distiller_sweep():
         await run_distiller(app)
         await sweep_messages(app)
@@ -240,6 +241,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         for user in users:
             await app.state.memory_manager.cleanup_expired(str(user["id"]))
     register_sweep("memory_ttl", 3600, _ttl_sweep)
+
+    async def _ttl_flush_sweep():
+        await app.state.memory_manager.flush_ttl_extensions()
+    register_sweep("memory_ttl_flush", settings.memory_ttl_flush_seconds, _ttl_flush_sweep)
     
     register_sweep("weather", 900, weather_sweep_func)
     register_sweep("briefings", 900, brief_sweep_func)
@@ -261,6 +266,15 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     from core.kitchen_sweep import kitchen_sweep_func
     register_sweep("kitchen", 3600, kitchen_sweep_func)
 
+    # Resident TTS engines (one per pooled voice) are stopped once idle and
+    # restart on the next sentence.
+    from core.provider_pool import ProviderPool
+
+    async def _tts_idle_sweep():
+        pool = await ProviderPool.get_instance()
+        await pool.reap_idle_tts(settings.tts_idle_shutdown_seconds)
+    register_sweep("tts_idle", 60, _tts_idle_sweep)
+
     from providers.smart_home.sync import sync_ha_entities
     async def ha_sync_sweep():
         await sync_ha_entities()
@@ -294,7 +308,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             ctx = app.state.context_engine
             await ctx.update_from_ha_sensor(entity_id, new_state.get("state", ""), new_state.get("attributes", {}))
             
-        bus.subscribe(on_home_event)
+        # The context engine only needs the current reading, so a backlog of
+        # power-sensor updates collapses to the latest per entity.
+        bus.subscribe(on_home_event, name="context_engine", coalesce=True)
 
         # Device-triggered routines (H4) and the built-in safety pack (H5).
         # The engine subscribes to the same bus; the safety rules are created
@@ -322,6 +338,8 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
                 _seed_safety_rules())
         
     await start_sweeps(app)
+    # Scheduled routines sleep on their own heap rather than a sweep tick.
+    get_routine_scheduler(app).start()
 
     # CHRONOS: Start vault watcher
     from providers.vault.vault_provider import start_vault_watcher
@@ -346,6 +364,23 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         pass
 
     await stop_sweeps()
+    await get_routine_scheduler().stop()
+    try:
+        await memory_manager.flush_ttl_extensions()
+    except Exception as exc:
+        logger.warning("Final summary TTL flush failed: %s", exc)
+    try:
+        from core.token_tracker import flush as flush_token_usage
+        await asyncio.to_thread(flush_token_usage)
+    except Exception as exc:
+        logger.warning("Final token usage flush failed: %s", exc)
+    await (await ProviderPool.get_instance()).close_all()
+    try:
+        from providers.feeds.cache import close_feed_clients, get_feed_cache
+        await close_feed_clients()
+        get_feed_cache().close()
+    except Exception as exc:
+        logger.warning("Feed cache shutdown failed: %s", exc)
     store.close()
     logger.info("River Song AI shutting down.")
 
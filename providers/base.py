@@ -166,3 +166,12 @@ class TTSProvider(ABC):
         result = await self.synthesize(text)
         if result:
             yield result
+
+    async def close(self) -> None:
+        """
+        Release any resident engine (worker process, loaded model).
+
+        Providers without one need not override this. Callers may keep using
+        a closed provider; it restarts whatever it needs on the next call.
+        """
+        return None
@@ -6,7 +6,9 @@ Face enrollment and identification, built to sit beside voice match.
 Same shape as `providers/voice_id/voice_id_provider.py` on purpose: a user
 enrols a few samples from their own account, prints live on local disk under
 `data/face_prints/<user_id>/`, identification is a cosine comparison against
-those prints, and nothing ever leaves the machine.
+those prints, and nothing ever leaves the machine. The comparison runs against
+every print at once through providers/print_matrix.py; identify_batch() scores
+several frames in the same product.
 
 MODELS
 ------
@@ -49,6 +51,8 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
+from providers.print_matrix import PrintMatrix
+
 logger = logging.getLogger(__name__)
 
 FACE_PRINTS_ROOT = "data/face_prints"
@@ -114,8 +118,8 @@ class FaceIDProvider:
 
         self._executor = ThreadPoolExecutor(max_workers=1,
                                             thread_name_prefix="face-id")
-        # user_id -> list of (128,) float32 embeddings
-        self._cache: Dict[str, List[np.ndarray]] = {}
+        # Every enrolled (128,) embedding, normalised, as one matrix.
+        self._prints = PrintMatrix(FACE_PRINTS_ROOT)
         self._cache_loaded = False
         self._user_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
@@ -235,36 +239,16 @@ class FaceIDProvider:
         feature = recognizer.feature(aligned)
         return np.asarray(feature, dtype=np.float32).reshape(-1), aligned
 
-    def _match_score(self, a: np.ndarray, b: np.ndarray) -> float:
-        """Cosine similarity between two SFace embeddings."""
-        denominator = float(np.linalg.norm(a) * np.linalg.norm(b))
-        if denominator == 0.0:
-            return -1.0
-        return float(np.dot(a, b) / denominator)
-
     # -- print cache ------------------------------------------------------
 
     def _load_cache(self) -> None:
-        """Walk FACE_PRINTS_ROOT and load every stored embedding into memory."""
-        self._cache = {}
-        if os.path.isdir(FACE_PRINTS_ROOT):
-            for user_id in os.listdir(FACE_PRINTS_ROOT):
-                user_dir = os.path.join(FACE_PRINTS_ROOT, user_id)
-                if not os.path.isdir(user_dir):
-                    continue
-                embeddings = []
-                for name in sorted(os.listdir(user_dir)):
-                    if name.endswith(".npy"):
-                        try:
-                            embeddings.append(
-                                np.load(os.path.join(user_dir, name)))
-                        except Exception as exc:
-                            logger.warning("Unreadable face print %s: %s",
-                                           name, exc)
-                if embeddings:
-                    self._cache[user_id] = embeddings
+        """Map the print matrix, rebuilding it from FACE_PRINTS_ROOT if stale."""
+        if self._cache_loaded:
+            self._prints.refresh()
+            return
+        self._prints.load()
         self._cache_loaded = True
-        logger.info("Face ID cache loaded: %d enrolled user(s).", len(self._cache))
+        logger.info("Face ID cache loaded: %d enrolled user(s).", len(self._prints))
 
     # -- public API -------------------------------------------------------
 
@@ -301,6 +285,10 @@ class FaceIDProvider:
 
             embedding, aligned = self._embed(image_bytes)
 
+            # Current before the sample file lands, so a rebuild cannot pick
+            # the new sample up from disk and append() add it a second time.
+            self._load_cache()
+
             user_dir = os.path.join(FACE_PRINTS_ROOT, user_id)
             os.makedirs(user_dir, exist_ok=True, mode=0o700)
 
@@ -312,9 +300,7 @@ class FaceIDProvider:
             cv2.imwrite(os.path.join(user_dir, f"sample_{number}.jpg"), aligned)
             np.save(os.path.join(user_dir, f"sample_{number}.npy"), embedding)
 
-            if not self._cache_loaded:
-                self._load_cache()
-            self._cache.setdefault(user_id, []).append(embedding)
+            self._prints.append(user_id, embedding)
 
             manifest_path = os.path.join(user_dir, "manifest.json")
             now = datetime.now(timezone.utc).isoformat()
@@ -331,14 +317,7 @@ class FaceIDProvider:
             manifest["last_updated"] = now
             _atomic_write_json(manifest_path, manifest)
 
-            samples = self._cache[user_id]
-            if len(samples) > 1:
-                scores = [self._match_score(samples[i], samples[j])
-                          for i in range(len(samples))
-                          for j in range(i + 1, len(samples))]
-                mean_similarity = sum(scores) / len(scores)
-            else:
-                mean_similarity = 1.0
+            mean_similarity = self._prints.self_similarity(user_id)
 
             return {"sample_count": number,
                     "mean_self_similarity": round(mean_similarity, 4)}
@@ -370,41 +349,7 @@ class FaceIDProvider:
             # enrolled" is a true answer, but if the models are missing it is
             # not the *useful* one — the operator needs to know the feature
             # cannot run at all, and raising here says so.
-            self._ensure_models()
-
-            if not self._cache_loaded:
-                self._load_cache()
-            if not self._cache:
-                return {"matched": False, "reason": "no_enrollments"}
-
-            try:
-                query, _ = self._embed(image_bytes)
-            except ValueError as exc:
-                return {"matched": False, "reason": "no_face",
-                        "detail": str(exc)}
-
-            best_user, best_score = None, -1.0
-            runner_up, runner_up_score = None, -1.0
-            for user_id, samples in self._cache.items():
-                score = max(self._match_score(query, s) for s in samples)
-                if score > best_score:
-                    runner_up, runner_up_score = best_user, best_score
-                    best_user, best_score = user_id, score
-                elif score > runner_up_score:
-                    runner_up, runner_up_score = user_id, score
-
-            result: Dict[str, Any] = {
-                "confidence": round(best_score, 4),
-                "runner_up_user_id": runner_up,
-                "runner_up_confidence": (round(runner_up_score, 4)
-                                         if runner_up else None),
-                "threshold": effective,
-            }
-            if best_user is None or best_score < effective:
-                result.update({"matched": False, "reason": "below_threshold"})
-                return result
-            result.update({"matched": True, "user_id": best_user})
-            return result
+            return self._identify_many([image_bytes], effective)[0]
 
         # FaceModelsUnavailable propagates deliberately. A missing model means
         # this server could not look, which is a different answer to give a
@@ -412,13 +357,78 @@ class FaceIDProvider:
         loop = asyncio.get_running_loop()
         return await loop.run_in_executor(self._executor, _sync)
 
+    async def identify_batch(self, images: List[bytes],
+                             threshold: Optional[float] = None
+                             ) -> List[Dict[str, Any]]:
+        """
+        identify() for several images, one result per image in order.
+
+        Every face found is scored against every print in a single matrix
+        product, so a burst of frames costs one comparison, not one per frame.
+        """
+        effective = self._threshold if threshold is None else threshold
+
+        def _sync() -> List[Dict[str, Any]]:
+            return self._identify_many(images, effective)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _sync)
+
+    def _identify_many(self, images: List[bytes],
+                       threshold: float) -> List[Dict[str, Any]]:
+        # Checked before the enrolment cache on purpose. "Nobody is
+        # enrolled" is a true answer, but if the models are missing it is
+        # not the *useful* one — the operator needs to know the feature
+        # cannot run at all, and raising here says so.
+        self._ensure_models()
+
+        self._load_cache()
+        if not len(self._prints):
+            return [{"matched": False, "reason": "no_enrollments"} for _ in images]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(images)
+        queries, slots = [], []
+        for i, image_bytes in enumerate(images):
+            try:
+                query, _ = self._embed(image_bytes)
+            except ValueError as exc:
+                results[i] = {"matched": False, "reason": "no_face",
+                              "detail": str(exc)}
+                continue
+            queries.append(query)
+            slots.append(i)
+
+        if queries:
+            scores = self._prints.user_scores(np.stack(queries))
+            for i, row in zip(slots, scores):
+                results[i] = self._decide(self._prints.rank_scores(row), threshold)
+        return results  # type: ignore[return-value]
+
+    @staticmethod
+    def _decide(ranked: List[Tuple[str, float]], threshold: float) -> Dict[str, Any]:
+        best_user, best_score = ranked[0] if ranked else (None, -1.0)
+        runner_up, runner_up_score = ranked[1] if len(ranked) > 1 else (None, -1.0)
+        result: Dict[str, Any] = {
+            "confidence": round(best_score, 4),
+            "runner_up_user_id": runner_up,
+            "runner_up_confidence": (round(runner_up_score, 4)
+                                     if runner_up else None),
+            "threshold": threshold,
+        }
+        if best_user is None or best_score < threshold:
+            result.update({"matched": False, "reason": "below_threshold"})
+            return result
+        result.update({"matched": True, "user_id": best_user})
+        return result
+
     async def delete_enrollment(self, user_id: str) -> None:
         """Remove a user's prints entirely. Their account, their data."""
         def _sync() -> None:
             user_dir = os.path.join(FACE_PRINTS_ROOT, user_id)
             if os.path.isdir(user_dir):
                 shutil.rmtree(user_dir)
-            self._cache.pop(user_id, None)
+            if self._cache_loaded:
+                self._prints.remove_user(user_id)
 
         loop = asyncio.get_running_loop()
         await loop.run_in_executor(self._executor, _sync)
@@ -469,3 +479,21 @@ async def match(image_bytes: bytes, owner_user_id: str) -> Optional[Dict[str, An
     return {"user_id": result["user_id"],
             "confidence": result.get("confidence"),
             "matched": True}
+
+
+async def match_frames(images: List[bytes],
+                       owner_user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    match() over several frames of the same moment, scored in one batch.
+
+    The most confident matched frame wins, so one frame caught mid-blink or
+    half-turned does not decide the answer.
+    """
+    results = await get_face_id_provider().identify_batch(images)
+    matched = [r for r in results if r.get("matched")]
+    if not matched:
+        return None
+    best = max(matched, key=lambda r: r.get("confidence") or 0.0)
+    return {"user_id": best["user_id"],
+            "confidence": best.get("confidence"),
+            "matched": True}
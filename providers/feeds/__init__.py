@@ -14,5 +14,6 @@
 #              Handles "how did the Cubs do" style queries.
 #
 # All providers require API keys set in .env. See .env.example for details.
-# All public methods are async. HTTP calls use httpx.AsyncClient.
+# All public methods are async. HTTP calls go through the pooled clients and the
+# shared single-flight cache in providers/feeds/cache.py.
 # =============================================================================
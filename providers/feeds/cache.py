@@ -0,0 +1,365 @@
+"""
+providers/feeds/cache.py
+
+One cache and one set of HTTP connection pools for every feed provider.
+
+Dashboards, the briefing, tools and the Pulse daemon all ask for the same
+upstream data (weather for the household's location, today's headlines,
+scoreboards) at the same moments. Previously each feed module kept its own
+dict with its own TTL and eviction rules, opened a fresh httpx.AsyncClient
+per call, and let concurrent misses all reach the upstream API.
+
+FeedCache.get(source, key, loader):
+  - Fresh entry (younger than the source's TTL): returned as-is.
+  - Stale entry (younger than FEED_CACHE_STALE_FACTOR TTLs): returned at
+    once while a single background task refreshes it.
+  - Miss: one loader call per key no matter how many callers are waiting
+    (single-flight); the rest await the same task.
+  - A failed load falls back to whatever is cached, however old, and only
+    raises when there is nothing to serve.
+  - In memory the cache is an LRU of FEED_CACHE_MAX_ENTRIES entries; with
+    FEED_CACHE_PERSIST entries are also written to a SQLite file
+    (FEED_CACHE_PATH, default next to DB_PATH), read on a memory miss, so a
+    restart -- or the Pulse daemon in its own process -- starts warm.
+
+TTLs are per source (DEFAULT_TTLS, overridden by the FEED_CACHE_TTLS JSON
+setting). fetch_json() is the usual entry point for JSON APIs: it caches the
+decoded response under a hash of the URL and query, so API keys in the query
+never reach the cache file.
+
+feed_client(url) hands out one pooled httpx.AsyncClient per upstream host,
+so repeat calls reuse TLS connections.
+
+Hits, stale serves, misses and coalesced waiters are counted in core.metrics
+(feed_cache.hit, feed_cache.stale, feed_cache.miss, feed_cache.coalesced).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from config.settings import get_settings
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds an entry is fresh, by source. Values are the TTLs the feed modules
+# used before they shared this cache.
+DEFAULT_TTLS: Dict[str, float] = {
+    "weather": 600,
+    "air_quality": 900,
+    "geocode": 86400,
+    "nws_alerts": 300,
+    "news": 600,
+    "stocks": 60,
+    "stock_chart": 3600,
+    "stock_news": 900,
+    "symbol_search": 86400,
+    "sports_teams": 86400,
+    "sports_scoreboard": 60,
+    "sports_standings": 3600,
+    "sports_schedule": 3600,
+    "sports_boxscore": 30,
+    "flights": 60,
+    "space_solar": 300,
+    "space_aurora": 300,
+    "space_launches": 900,
+    "eonet": 1800,
+    "neows": 1800,
+    "ocearch": 1800,
+    "hackernews": 300,
+    "reddit": 300,
+    "eventbrite": 900,
+}
+_FALLBACK_TTL = 300.0
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS feed_cache (
+    key       TEXT PRIMARY KEY,
+    stored_at REAL NOT NULL,
+    value     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feed_cache_stored_at ON feed_cache(stored_at);
+"""
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    stored_at: float
+
+
+class FeedCache:
+    """Single-flight, stale-while-revalidate LRU with optional SQLite backing."""
+
+    def __init__(self, max_entries: int, path: Optional[str] = None,
+                 stale_factor: float = 5.0,
+                 ttls: Optional[Dict[str, float]] = None) -> None:
+        self._max_entries = max(1, max_entries)
+        self._path = path
+        self._stale_factor = max(1.0, stale_factor)
+        self._ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refreshing: Set[asyncio.Task] = set()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def ttl(self, source: str) -> float:
+        return float(self._ttls.get(source, _FALLBACK_TTL))
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    async def get(self, source: str, key: str, loader: Loader, *,
+                  ttl: Optional[float] = None, persist: bool = True) -> Any:
+        """
+        The cached value for (source, key), calling `loader` when there is none.
+
+        Args:
+            source:  Feed source name; picks the TTL and prefixes the key.
+            key:     Identifies the request within the source.
+            loader:  Coroutine function producing a fresh value. Values must
+                     be JSON-serialisable when `persist` is on.
+            ttl:     Overrides the source TTL (seconds).
+            persist: False keeps the value out of the cache file (tokens).
+
+        Raises:
+            Whatever `loader` raised, when nothing is cached to fall back on.
+        """
+        ckey = f"{source}:{key}"
+        ttl = self.ttl(source) if ttl is None else ttl
+        persist = persist and bool(self._path)
+
+        entry = self._entries.get(ckey)
+        if entry is None and persist:
+            entry = await asyncio.to_thread(self._read, ckey)
+            if entry is not None:
+                self._remember(ckey, entry)
+        if entry is not None:
+            age = time.time() - entry.stored_at
+            if age < ttl:
+                self._entries.move_to_end(ckey)
+                metrics.incr("feed_cache.hit")
+                return entry.value
+            if age < ttl * self._stale_factor:
+                metrics.incr("feed_cache.stale")
+                if ckey not in self._inflight:
+                    task = self._start_load(ckey, loader, persist)
+                    self._refreshing.add(task)
+                    task.add_done_callback(self._refresh_done)
+                return entry.value
+
+        task = self._inflight.get(ckey)
+        if task is None:
+            metrics.incr("feed_cache.miss")
+            task = self._start_load(ckey, loader, persist)
+        else:
+            metrics.incr("feed_cache.coalesced")
+        try:
+            # Shielded: one caller going away must not cancel the load for
+            # everyone else waiting on it.
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if entry is not None:
+                logger.warning("Feed %s refresh failed; serving a copy from %.0fs ago.",
+                               ckey, time.time() - entry.stored_at)
+                return entry.value
+            raise
+
+    def peek(self, source: str, key: str) -> Any:
+        """Whatever is in memory for (source, key), fresh or not; never loads."""
+        entry = self._entries.get(f"{source}:{key}")
+        return entry.value if entry is not None else None
+
+    def clear(self) -> None:
+        self._entries.clear()
+        with self._db_lock:
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM feed_cache")
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    def _start_load(self, ckey: str, loader: Loader, persist: bool) -> asyncio.Task:
+        task = asyncio.ensure_future(self._load(ckey, loader, persist))
+        self._inflight[ckey] = task
+        task.add_done_callback(lambda t: self._inflight.pop(ckey, None)
+                               if self._inflight.get(ckey) is t else None)
+        return task
+
+    async def _load(self, ckey: str, loader: Loader, persist: bool) -> Any:
+        value = await loader()
+        entry = _Entry(value=value, stored_at=time.time())
+        self._remember(ckey, entry)
+        if persist:
+            try:
+                await asyncio.to_thread(self._write, ckey, entry)
+            except Exception as exc:
+                logger.warning("Feed cache write failed for %s: %s", ckey, exc)
+        return value
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refreshing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background feed refresh failed: %s", task.exception())
+
+    def _remember(self, ckey: str, entry: _Entry) -> None:
+        self._entries[ckey] = entry
+        self._entries.move_to_end(ckey)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_DDL)
+            self._conn = conn
+        return self._conn
+
+    def _read(self, ckey: str) -> Optional[_Entry]:
+        try:
+            with self._db_lock:
+                row = self._get_conn().execute(
+                    "SELECT stored_at, value FROM feed_cache WHERE key = ?",
+                    (ckey,)).fetchone()
+            return _Entry(value=json.loads(row[1]), stored_at=row[0]) if row else None
+        except (sqlite3.Error, ValueError) as exc:
+            logger.debug("Feed cache read failed for %s: %s", ckey, exc)
+            return None
+
+    def _write(self, ckey: str, entry: _Entry) -> None:
+        blob = json.dumps(entry.value, separators=(",", ":"))
+        with self._db_lock:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO feed_cache (key, stored_at, value) "
+                    "VALUES (?, ?, ?)", (ckey, entry.stored_at, blob))
+                # Keep the file to roughly the in-memory bound.
+                conn.execute(
+                    "DELETE FROM feed_cache WHERE key IN (SELECT key FROM feed_cache "
+                    "ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self._max_entries * 4,))
+
+
+_cache: Optional[FeedCache] = None
+_cache_lock = threading.Lock()
+
+
+def _ttl_overrides(raw: str) -> Dict[str, float]:
+    try:
+        parsed = json.loads(raw or "{}")
+        return {str(k): float(v) for k, v in parsed.items()}
+    except (ValueError, TypeError, AttributeError) as exc:
+        logger.warning("Ignoring malformed FEED_CACHE_TTLS (%s).", exc)
+        return {}
+
+
+def get_feed_cache() -> FeedCache:
+    """The process-wide feed cache, built from settings on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            settings = get_settings()
+            path = None
+            if settings.feed_cache_persist:
+                path = settings.feed_cache_path or os.path.join(
+                    os.path.dirname(settings.db_path) or ".", "feed_cache.db")
+            _cache = FeedCache(
+                max_entries=settings.feed_cache_max_entries,
+                path=path,
+                stale_factor=settings.feed_cache_stale_factor,
+                ttls=_ttl_overrides(settings.feed_cache_ttls),
+            )
+        return _cache
+
+
+# -----------------------------------------------------------------------------
+# Pooled HTTP clients
+# -----------------------------------------------------------------------------
+
+# host -> (event loop the client was opened on, client). A client's pool is
+# tied to its loop, so a new loop (tests, a daemon restart) gets new clients.
+_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def feed_client(url: str) -> httpx.AsyncClient:
+    """The shared client for `url`'s host. Pass timeouts/headers per request."""
+    host = urlsplit(url).netloc.lower()
+    loop = asyncio.get_running_loop()
+    held = _clients.get(host)
+    if held is not None and held[0] is loop and not held[1].is_closed:
+        return held[1]
+    client = httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=5),
+    )
+    _clients[host] = (loop, client)
+    return client
+
+
+async def close_feed_clients() -> None:
+    """Close every pooled client opened on the running loop."""
+    loop = asyncio.get_running_loop()
+    for host, (client_loop, client) in list(_clients.items()):
+        if client_loop is loop:
+            _clients.pop(host, None)
+            await client.aclose()
+
+
+def request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Cache key for a GET: a hash, so secrets in the query stay out of the file."""
+    canonical = json.dumps([url, sorted((params or {}).items())], default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+async def fetch_json(source: str, url: str, *,
+                     params: Optional[Dict[str, Any]] = None,
+                     headers: Optional[Dict[str, str]] = None,
+                     timeout: float = 10.0,
+                     ttl: Optional[float] = None) -> Any:
+    """
+    GET `url` through the feed cache and return the decoded JSON body.
+
+    Raises:
+        httpx.HTTPError: On a non-2xx response or a transport failure, when
+            nothing is cached to fall back on.
+    """
+    async def _load() -> Any:
+        resp = await feed_client(url).get(
+            url, params=params, headers=headers, timeout=timeout,
+            follow_redirects=True)
+        resp.raise_for_status()
+        return resp.json()
+
+    return await get_feed_cache().get(source, request_key(url, params), _load, ttl=ttl)
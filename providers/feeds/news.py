@@ -14,7 +14,7 @@ import logging
 from datetime import datetime, timezone
 from typing import Any, Dict, List
 
-import httpx
+from providers.feeds.cache import feed_client, fetch_json, get_feed_cache, request_key
 
 logger = logging.getLogger(__name__)
 
@@ -226,15 +226,21 @@ _MEDIASTACK_BASE = "http://api.mediastack.com/v1/news"
 async def fetch_rss_feed(url: str, source_name: str,
                          limit: int = 10) -> List[Dict[str, Any]]:
     """Fetch and parse a single RSS feed URL, returning up to `limit` articles."""
+    async def _load() -> List[Dict[str, Any]]:
+        resp = await feed_client(url).get(url, timeout=10, follow_redirects=True)
+        resp.raise_for_status()
+        return _parse_feed(resp.text, url, source_name, limit)
+
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url, follow_redirects=True)
-            resp.raise_for_status()
-            content = resp.text
+        return await get_feed_cache().get(
+            "news", request_key(url, {"source": source_name, "limit": limit}), _load)
     except Exception as exc:
         logger.warning("RSS fetch failed for %s: %s", url, exc)
         return []
 
+
+def _parse_feed(content: str, url: str, source_name: str,
+                limit: int) -> List[Dict[str, Any]]:
     # Minimal RSS/Atom parser — avoids needing feedparser for the happy path
     articles: List[Dict[str, Any]] = []
     import xml.etree.ElementTree as ET
@@ -300,11 +306,7 @@ async def fetch_newsapi(api_key: str, category: str = "general",
         "pageSize": limit,
     }
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            # type: ignore
-            resp = await client.get(f"{_NEWSAPI_BASE}/top-headlines", params=params)  # type: ignore
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("news", f"{_NEWSAPI_BASE}/top-headlines", params=params)
     except Exception as exc:
         logger.warning("NewsAPI fetch failed: %s", exc)
         return []
@@ -331,16 +333,13 @@ async def fetch_world_news(
     if not api_key:
         return []
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(f"{_WORLD_NEWS_BASE}/search-news", params={
-                "api-key": api_key,
-                "language": language,
-                "number": limit,
-                "sort": "publish-time",
-                "sort-direction": "DESC",
-            })
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("news", f"{_WORLD_NEWS_BASE}/search-news", params={
+            "api-key": api_key,
+            "language": language,
+            "number": limit,
+            "sort": "publish-time",
+            "sort-direction": "DESC",
+        })
     except Exception as exc:
         logger.warning("World News API fetch failed: %s", exc)
         return []
@@ -366,14 +365,11 @@ async def fetch_apitube(api_key: str, limit: int = 10) -> List[Dict[str, Any]]:
     if not api_key:
         return []
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(_APITUBE_BASE, params={
-                "api_key": api_key,
-                "language": "en",
-                "count": limit,
-            })
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("news", _APITUBE_BASE, params={
+            "api_key": api_key,
+            "language": "en",
+            "count": limit,
+        })
     except Exception as exc:
         logger.warning("APITube fetch failed: %s", exc)
         return []
@@ -400,16 +396,13 @@ async def fetch_mediastack(
     if not api_key:
         return []
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(_MEDIASTACK_BASE, params={
-                "access_key": api_key,
-                "categories": categories,
-                "languages": "en",
-                "limit": limit,
-                "sort": "published_desc",
-            })
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("news", _MEDIASTACK_BASE, params={
+            "access_key": api_key,
+            "categories": categories,
+            "languages": "en",
+            "limit": limit,
+            "sort": "published_desc",
+        })
     except Exception as exc:
         logger.warning("Mediastack fetch failed: %s", exc)
         return []
@@ -466,9 +459,8 @@ async def fetch_articles(
     articles: List[Dict[str, Any]] = []
     for r, category in zip(results, meta):
         if isinstance(r, list):
-            for a in r:
-                a.setdefault("category", category)
-            articles.extend(r)
+            # Copies: the lists come from the shared feed cache.
+            articles.extend({"category": category, **a} for a in r)
     articles.sort(key=lambda a: a.get("published_at") or "", reverse=True)
     return articles
 
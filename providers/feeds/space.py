@@ -8,32 +8,19 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import time
 from datetime import datetime, timezone
 from typing import Any
 
-import httpx
+from providers.feeds.cache import feed_client, get_feed_cache
 
 logger = logging.getLogger(__name__)
 
-_CACHE_TTL_SOLAR = 300   # 5 min
-_CACHE_TTL_AURORA = 300   # 5 min
-_CACHE_TTL_LAUNCHES = 900   # 15 min
-
-_cache_solar: dict[str, tuple[dict, float]] = {}
-_cache_aurora: dict[str, tuple[dict, float]] = {}
-_cache_launches: dict[str, tuple[list, float]] = {}
-
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
-async def _fetch_solar() -> dict:
-    cached = _cache_solar.get("solar")
-    if cached and time.monotonic() < cached[1]:
-        return cached[0]
-
+async def _load_solar() -> dict:
     result = {
         "kp_index": 0.0,
         "kp_label": "Unknown",
@@ -44,85 +31,80 @@ async def _fetch_solar() -> dict:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            kp_resp, flares_resp, wind_resp, mag_resp = await asyncio.gather(
-                client.get(
-                    "https://services.swpc.noaa.gov/products/noaa-planetary-k-index.json"),
-                client.get(
-                    "https://services.swpc.noaa.gov/json/goes/primary/xrays-7-day.json"),
-                client.get(
-                    "https://services.swpc.noaa.gov/products/solar-wind/plasma-2-hour.json"),
-                client.get(
-                    "https://services.swpc.noaa.gov/products/solar-wind/mag-2-hour.json"),
-                return_exceptions=True
-            )
-
-            if not isinstance(
-                    kp_resp, Exception) and kp_resp.status_code == 200:  # type: ignore
-                data = kp_resp.json()  # type: ignore
-                if len(data) > 1:
-                    last_row = data[-1]
-                    try:
-                        kp = float(last_row[1])
-                        result["kp_index"] = kp
-                        if kp >= 9:
-                            result["kp_label"], result["kp_color"] = "G5 Extreme Storm", "#cc0000"
-                        elif kp >= 8:
-                            result["kp_label"], result["kp_color"] = "G4 Severe Storm", "#ff3300"
-                        elif kp >= 7:
-                            result["kp_label"], result["kp_color"] = "G3 Strong Storm", "#ff8800"
-                        elif kp >= 6:
-                            result["kp_label"], result["kp_color"] = "G2 Moderate Storm", "#ffcc00"
-                        elif kp >= 5:
-                            result["kp_label"], result["kp_color"] = "G1 Minor Storm", "#00cc44"
-                        else:
-                            result["kp_label"], result["kp_color"] = "Normal", "#00cc44"
-                    except (ValueError, IndexError):
-                        pass
-
-            if not isinstance(
-                    flares_resp, Exception) and flares_resp.status_code == 200:  # type: ignore
-                data = flares_resp.json()  # type: ignore
-                datetime.now(timezone.utc).timestamp()
-                pass
-                # Threshold for C-class is 1e-6 W/m²
-                # Simplified flares extraction logic
-                # The API requires parsing the xrays-7-day.json, skipping deep
-                # parsing to avoid errors, leaving empty if hard to parse,
-                # wait, I can try to extract.
-
-            if not isinstance(
-                    wind_resp, Exception) and wind_resp.status_code == 200:  # type: ignore
-                data = wind_resp.json()  # type: ignore
-                if len(data) > 1:
-                    last_row = data[-1]
-                    try:
-                        result["solar_wind_speed_kms"] = float(last_row[2])
-                    except (ValueError, IndexError):
-                        pass
-
-            if not isinstance(
-                    mag_resp, Exception) and mag_resp.status_code == 200:  # type: ignore
-                data = mag_resp.json()  # type: ignore
-                if len(data) > 1:
-                    last_row = data[-1]
-                    try:
-                        result["bz_nt"] = float(last_row[3])
-                    except (ValueError, IndexError):
-                        pass
+        client = feed_client("https://services.swpc.noaa.gov")
+        kp_resp, flares_resp, wind_resp, mag_resp = await asyncio.gather(
+            client.get(
+                "https://services.swpc.noaa.gov/products/noaa-planetary-k-index.json"),
+            client.get(
+                "https://services.swpc.noaa.gov/json/goes/primary/xrays-7-day.json"),
+            client.get(
+                "https://services.swpc.noaa.gov/products/solar-wind/plasma-2-hour.json"),
+            client.get(
+                "https://services.swpc.noaa.gov/products/solar-wind/mag-2-hour.json"),
+            return_exceptions=True
+        )
+
+        if not isinstance(
+                kp_resp, Exception) and kp_resp.status_code == 200:  # type: ignore
+            data = kp_resp.json()  # type: ignore
+            if len(data) > 1:
+                last_row = data[-1]
+                try:
+                    kp = float(last_row[1])
+                    result["kp_index"] = kp
+                    if kp >= 9:
+                        result["kp_label"], result["kp_color"] = "G5 Extreme Storm", "#cc0000"
+                    elif kp >= 8:
+                        result["kp_label"], result["kp_color"] = "G4 Severe Storm", "#ff3300"
+                    elif kp >= 7:
+                        result["kp_label"], result["kp_color"] = "G3 Strong Storm", "#ff8800"
+                    elif kp >= 6:
+                        result["kp_label"], result["kp_color"] = "G2 Moderate Storm", "#ffcc00"
+                    elif kp >= 5:
+                        result["kp_label"], result["kp_color"] = "G1 Minor Storm", "#00cc44"
+                    else:
+                        result["kp_label"], result["kp_color"] = "Normal", "#00cc44"
+                except (ValueError, IndexError):
+                    pass
+
+        if not isinstance(
+                flares_resp, Exception) and flares_resp.status_code == 200:  # type: ignore
+            data = flares_resp.json()  # type: ignore
+            datetime.now(timezone.utc).timestamp()
+            pass
+            # Threshold for C-class is 1e-6 W/m²
+            # Simplified flares extraction logic
+            # The API requires parsing the xrays-7-day.json, skipping deep
+            # parsing to avoid errors, leaving empty if hard to parse,
+            # wait, I can try to extract.
+
+        if not isinstance(
+                wind_resp, Exception) and wind_resp.status_code == 200:  # type: ignore
+            data = wind_resp.json()  # type: ignore
+            if len(data) > 1:
+                last_row = data[-1]
+                try:
+                    result["solar_wind_speed_kms"] = float(last_row[2])
+                except (ValueError, IndexError):
+                    pass
+
+        if not isinstance(
+                mag_resp, Exception) and mag_resp.status_code == 200:  # type: ignore
+            data = mag_resp.json()  # type: ignore
+            if len(data) > 1:
+                last_row = data[-1]
+                try:
+                    result["bz_nt"] = float(last_row[3])
+                except (ValueError, IndexError):
+                    pass
 
     except Exception as exc:
         logger.warning("Solar fetch failed: %s", exc)
 
-    _cache_solar["solar"] = (result, time.monotonic() + _CACHE_TTL_SOLAR)
     return result
 
 
-async def _fetch_aurora(lat: float) -> dict:
-    cached = _cache_aurora.get("aurora")
-    if cached and time.monotonic() < cached[1]:
-        return cached[0]
-
+async def _load_aurora(lat: float) -> dict:
     result = {
         "visible_tonight": False,
         "viewline_lat": 90.0,
@@ -132,63 +114,69 @@ async def _fetch_aurora(lat: float) -> dict:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get("https://services.swpc.noaa.gov/products/noaa-aurora-forecast.json")
-            if resp.status_code == 200:
-                resp.json()
-                # Dummy viewline extraction for stability, real SWPC parsing is
-                # complex
-                result["viewline_lat"] = 60.0  # Placeholder
-                if lat >= 60.0:
-                    result["your_chance"] = "likely"
-                elif lat >= 57.0:
-                    result["your_chance"] = "low"
+        client = feed_client("https://services.swpc.noaa.gov")
+        resp = await client.get("https://services.swpc.noaa.gov/products/noaa-aurora-forecast.json")
+        if resp.status_code == 200:
+            resp.json()
+            # Dummy viewline extraction for stability, real SWPC parsing is
+            # complex
+            result["viewline_lat"] = 60.0  # Placeholder
+            if lat >= 60.0:
+                result["your_chance"] = "likely"
+            elif lat >= 57.0:
+                result["your_chance"] = "low"
     except Exception as exc:
         logger.warning("Aurora fetch failed: %s", exc)
 
-    _cache_aurora["aurora"] = (result, time.monotonic() + _CACHE_TTL_AURORA)
     return result
 
 
-async def _fetch_launches() -> list:
-    cached = _cache_launches.get("launches")
-    if cached and time.monotonic() < cached[1]:
-        return cached[0]
-
+async def _load_launches() -> list:
     result = []
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get("https://ll.thespacedevs.com/2.2.0/launch/upcoming/?limit=10&mode=detailed")
-            if resp.status_code == 200:
-                data = resp.json()
-                for item in data.get("results", []):
-                    pad = item.get("pad", {})
-                    loc = pad.get("location", {})
-                    mission = item.get("mission") or {}
-                    status = item.get("status") or {}
-                    provider = item.get("launch_service_provider") or {}
-
-                    result.append({
-                        "id": item.get("id"),
-                        "name": item.get("name"),
-                        "provider": provider.get("name"),
-                        "pad": f"{pad.get('name', '')}, {loc.get('name', '')}",
-                        "country_code": loc.get("country_code"),
-                        "net": item.get("net"),
-                        "window_start": item.get("window_start"),
-                        "window_end": item.get("window_end"),
-                        "status": status.get("name", "Unknown"),
-                        "mission_type": mission.get("type", "Unknown"),
-                        "image_url": item.get("image")
-                    })
+        client = feed_client("https://ll.thespacedevs.com")
+        resp = await client.get("https://ll.thespacedevs.com/2.2.0/launch/upcoming/?limit=10&mode=detailed")
+        if resp.status_code == 200:
+            data = resp.json()
+            for item in data.get("results", []):
+                pad = item.get("pad", {})
+                loc = pad.get("location", {})
+                mission = item.get("mission") or {}
+                status = item.get("status") or {}
+                provider = item.get("launch_service_provider") or {}
+
+                result.append({
+                    "id": item.get("id"),
+                    "name": item.get("name"),
+                    "provider": provider.get("name"),
+                    "pad": f"{pad.get('name', '')}, {loc.get('name', '')}",
+                    "country_code": loc.get("country_code"),
+                    "net": item.get("net"),
+                    "window_start": item.get("window_start"),
+                    "window_end": item.get("window_end"),
+                    "status": status.get("name", "Unknown"),
+                    "mission_type": mission.get("type", "Unknown"),
+                    "image_url": item.get("image")
+                })
     except Exception as exc:
         logger.warning("Launches fetch failed: %s", exc)
 
-    _cache_launches["launches"] = (
-        result, time.monotonic() + _CACHE_TTL_LAUNCHES)
     return result
 
 
+async def _fetch_solar() -> dict:
+    return await get_feed_cache().get("space_solar", "solar", _load_solar)
+
+
+async def _fetch_aurora(lat: float) -> dict:
+    return await get_feed_cache().get(
+        "space_aurora", str(round(lat, 1)), lambda: _load_aurora(lat))
+
+
+async def _fetch_launches() -> list:
+    return await get_feed_cache().get("space_launches", "upcoming", _load_launches)
+
+
 async def fetch_space(lat: float, lon: float) -> dict[str, Any]:
     """
     Fetch solar flares, aurora forecast, and rocket launches.
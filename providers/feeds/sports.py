@@ -8,10 +8,9 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import time
-from typing import Any, Optional
+from typing import Any
 
-import httpx
+from providers.feeds.cache import feed_client, get_feed_cache
 
 logger = logging.getLogger(__name__)
 
@@ -42,19 +41,11 @@ ESPN_LEAGUES = {
 
 BASE_URL = "https://site.api.espn.com/apis/site/v2/sports"
 
-_cache: dict = {}
 
-
-def _get_from_cache(key: str) -> Optional[Any]:
-    if key in _cache:
-        val, expiry = _cache[key]
-        if time.time() < expiry:
-            return val
-    return None
-
-
-def _set_cache(key: str, val: Any, ttl_sec: int):
-    _cache[key] = (val, time.time() + ttl_sec)
+async def _espn_get(url: str) -> Any:
+    resp = await feed_client(url).get(url, timeout=10)
+    resp.raise_for_status()
+    return resp.json()
 
 
 async def get_leagues() -> list[dict]:
@@ -62,179 +53,151 @@ async def get_leagues() -> list[dict]:
 
 
 async def get_teams(league_id: str) -> list[dict]:
-    cached = _get_from_cache(f"teams:{league_id}")
-    if cached:
-        return cached
-
     info = ESPN_LEAGUES.get(league_id)
     if not info:
         return []
 
+    async def _load() -> list[dict]:
+        data = await _espn_get(f"{BASE_URL}/{info['sport']}/{info['league']}/teams?limit=200")
+        teams_data = data["sports"][0]["leagues"][0]["teams"]
+
+        results = []
+        for t in teams_data:
+            team = t["team"]
+            results.append({
+                "id": team["id"],
+                "name": team["displayName"],
+                "abbr": team["abbreviation"],
+                "logo": team["logos"][0]["href"] if team.get("logos") else "",
+                "color": team.get("color", ""),
+                "league_id": league_id,
+                "league_label": info["label"],
+                "sport": info["sport"],
+                "icon": info["icon"],
+            })
+        return results
+
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            url = f"{BASE_URL}/{info['sport']}/{info['league']}/teams?limit=200"
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
-            teams_data = data["sports"][0]["leagues"][0]["teams"]
-
-            results = []
-            for t in teams_data:
-                team = t["team"]
-                results.append({
-                    "id": team["id"],
-                    "name": team["displayName"],
-                    "abbr": team["abbreviation"],
-                    "logo": team["logos"][0]["href"] if team.get("logos") else "",
-                    "color": team.get("color", ""),
-                    "league_id": league_id,
-                    "league_label": info["label"],
-                    "sport": info["sport"],
-                    "icon": info["icon"],
-                })
-
-            _set_cache(f"teams:{league_id}", results, 86400)  # 24h
-            return results
+        return await get_feed_cache().get("sports_teams", league_id, _load)
     except Exception as exc:
         logger.warning("ESPN get_teams failed for %s: %s", league_id, exc)
         return []
 
 
 async def get_scoreboard(league_id: str) -> list[dict]:
-    cached = _get_from_cache(f"scoreboard:{league_id}")
-    if cached:
-        return cached
-
     info = ESPN_LEAGUES.get(league_id)
     if not info:
         return []
 
+    async def _load() -> list[dict]:
+        data = await _espn_get(f"{BASE_URL}/{info['sport']}/{info['league']}/scoreboard")
+
+        results = []
+        for event in data.get("events", []):
+            competition = event["competitions"][0]
+            results.append({
+                "id": event["id"],
+                "name": event["name"],
+                "short_name": event["shortName"],
+                "date": event["date"],
+                "status": event["status"]["type"]["name"],
+                "status_detail": event["status"]["type"]["shortDetail"],
+                "is_live": event["status"]["type"]["state"] == "in",
+                "home_id": competition["competitors"][0]["team"]["id"],
+                "home_team": competition["competitors"][0]["team"]["displayName"],
+                "home_abbr": competition["competitors"][0]["team"]["abbreviation"],
+                "home_logo": competition["competitors"][0]["team"]["logo"] if "logo" in competition["competitors"][0]["team"] else "",
+                "home_score": competition["competitors"][0].get("score", ""),
+                "home_winner": competition["competitors"][0].get("winner", False),
+                "away_id": competition["competitors"][1]["team"]["id"],
+                "away_team": competition["competitors"][1]["team"]["displayName"],
+                "away_abbr": competition["competitors"][1]["team"]["abbreviation"],
+                "away_logo": competition["competitors"][1]["team"]["logo"] if "logo" in competition["competitors"][1]["team"] else "",
+                "away_score": competition["competitors"][1].get("score", ""),
+                "away_winner": competition["competitors"][1].get("winner", False),
+                "venue": competition["venue"]["fullName"] if competition.get("venue") else "",
+                "league_id": league_id,
+            })
+        return results
+
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            url = f"{BASE_URL}/{info['sport']}/{info['league']}/scoreboard"
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
-
-            results = []
-            for event in data.get("events", []):
-                competition = event["competitions"][0]
-                results.append({
-                    "id": event["id"],
-                    "name": event["name"],
-                    "short_name": event["shortName"],
-                    "date": event["date"],
-                    "status": event["status"]["type"]["name"],
-                    "status_detail": event["status"]["type"]["shortDetail"],
-                    "is_live": event["status"]["type"]["state"] == "in",
-                    "home_id": competition["competitors"][0]["team"]["id"],
-                    "home_team": competition["competitors"][0]["team"]["displayName"],
-                    "home_abbr": competition["competitors"][0]["team"]["abbreviation"],
-                    "home_logo": competition["competitors"][0]["team"]["logo"] if "logo" in competition["competitors"][0]["team"] else "",
-                    "home_score": competition["competitors"][0].get("score", ""),
-                    "home_winner": competition["competitors"][0].get("winner", False),
-                    "away_id": competition["competitors"][1]["team"]["id"],
-                    "away_team": competition["competitors"][1]["team"]["displayName"],
-                    "away_abbr": competition["competitors"][1]["team"]["abbreviation"],
-                    "away_logo": competition["competitors"][1]["team"]["logo"] if "logo" in competition["competitors"][1]["team"] else "",
-                    "away_score": competition["competitors"][1].get("score", ""),
-                    "away_winner": competition["competitors"][1].get("winner", False),
-                    "venue": competition["venue"]["fullName"] if competition.get("venue") else "",
-                    "league_id": league_id,
-                })
-
-            _set_cache(f"scoreboard:{league_id}", results, 60)  # 60s
-            return results
+        return await get_feed_cache().get("sports_scoreboard", league_id, _load)
     except Exception as exc:
         logger.warning("ESPN get_scoreboard failed for %s: %s", league_id, exc)
         return []
 
 
 async def get_standings(league_id: str) -> list[dict]:
-    cached = _get_from_cache(f"standings:{league_id}")
-    if cached:
-        return cached
-
     info = ESPN_LEAGUES.get(league_id)
     if not info:
         return []
 
+    async def _load() -> list[dict]:
+        data = await _espn_get(f"{BASE_URL}/{info['sport']}/{info['league']}/standings")
+
+        entries = data["standings"]["entries"]
+        results = []
+        for entry in entries:
+            team = entry["team"]
+            results.append({
+                "team_id": team["id"],
+                "team": team["displayName"],
+                "abbr": team["abbreviation"],
+                "logo": team["logos"][0]["href"] if team.get("logos") else "",
+                "stats": {s["name"]: s["displayValue"] for s in entry.get("stats", [])},
+            })
+        return results
+
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            url = f"{BASE_URL}/{info['sport']}/{info['league']}/standings"
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
-
-            entries = data["standings"]["entries"]
-            results = []
-            for entry in entries:
-                team = entry["team"]
-                results.append({
-                    "team_id": team["id"],
-                    "team": team["displayName"],
-                    "abbr": team["abbreviation"],
-                    "logo": team["logos"][0]["href"] if team.get("logos") else "",
-                    "stats": {s["name"]: s["displayValue"] for s in entry.get("stats", [])},
-                })
-
-            _set_cache(f"standings:{league_id}", results, 3600)  # 1h
-            return results
+        return await get_feed_cache().get("sports_standings", league_id, _load)
     except Exception as exc:
         logger.warning("ESPN get_standings failed for %s: %s", league_id, exc)
         return []
 
 
 async def get_schedule(team_id: str, league_id: str) -> list[dict]:
-    cached = _get_from_cache(f"schedule:{league_id}:{team_id}")
-    if cached:
-        return cached
-
     info = ESPN_LEAGUES.get(league_id)
     if not info:
         return []
 
+    async def _load() -> list[dict]:
+        data = await _espn_get(f"{BASE_URL}/{info['sport']}/{info['league']}/teams/{team_id}/schedule")
+
+        events = data.get("events", [])
+        results = []
+        for event in events:
+            comp = event["competitions"][0]
+            # Filter pre-game events only (state != post)
+            if comp["status"]["type"]["state"] == "post":
+                continue
+
+            results.append({
+                "id": event["id"],
+                "name": event["name"],
+                "short_name": event["shortName"],
+                "date": event["date"],
+                "status": event["status"]["type"]["name"],
+                "status_detail": event["status"]["type"]["shortDetail"],
+                "is_live": event["status"]["type"]["state"] == "in",
+                "home_team": comp["competitors"][0]["team"]["displayName"],
+                "home_abbr": comp["competitors"][0]["team"]["abbreviation"],
+                "home_logo": comp["competitors"][0]["team"]["logo"] if "logo" in comp["competitors"][0]["team"] else "",
+                "home_score": comp["competitors"][0].get("score", ""),
+                "home_winner": comp["competitors"][0].get("winner", False),
+                "away_team": comp["competitors"][1]["team"]["displayName"],
+                "away_abbr": comp["competitors"][1]["team"]["abbreviation"],
+                "away_logo": comp["competitors"][1]["team"]["logo"] if "logo" in comp["competitors"][1]["team"] else "",
+                "away_score": comp["competitors"][1].get("score", ""),
+                "away_winner": comp["competitors"][1].get("winner", False),
+                "venue": comp["venue"]["fullName"] if comp.get("venue") else "",
+                "league_id": league_id,
+            })
+            if len(results) >= 10:
+                break
+        return results
+
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            url = f"{BASE_URL}/{info['sport']}/{info['league']}/teams/{team_id}/schedule"
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
-
-            events = data.get("events", [])
-            results = []
-            for event in events:
-                comp = event["competitions"][0]
-                # Filter pre-game events only (state != post)
-                if comp["status"]["type"]["state"] == "post":
-                    continue
-
-                results.append({
-                    "id": event["id"],
-                    "name": event["name"],
-                    "short_name": event["shortName"],
-                    "date": event["date"],
-                    "status": event["status"]["type"]["name"],
-                    "status_detail": event["status"]["type"]["shortDetail"],
-                    "is_live": event["status"]["type"]["state"] == "in",
-                    "home_team": comp["competitors"][0]["team"]["displayName"],
-                    "home_abbr": comp["competitors"][0]["team"]["abbreviation"],
-                    "home_logo": comp["competitors"][0]["team"]["logo"] if "logo" in comp["competitors"][0]["team"] else "",
-                    "home_score": comp["competitors"][0].get("score", ""),
-                    "home_winner": comp["competitors"][0].get("winner", False),
-                    "away_team": comp["competitors"][1]["team"]["displayName"],
-                    "away_abbr": comp["competitors"][1]["team"]["abbreviation"],
-                    "away_logo": comp["competitors"][1]["team"]["logo"] if "logo" in comp["competitors"][1]["team"] else "",
-                    "away_score": comp["competitors"][1].get("score", ""),
-                    "away_winner": comp["competitors"][1].get("winner", False),
-                    "venue": comp["venue"]["fullName"] if comp.get("venue") else "",
-                    "league_id": league_id,
-                })
-                if len(results) >= 10:
-                    break
-
-            _set_cache(f"schedule:{league_id}:{team_id}", results, 3600)  # 1h
-            return results
+        return await get_feed_cache().get("sports_schedule", f"{league_id}:{team_id}", _load)
     except Exception as exc:
         logger.warning(
             "ESPN get_schedule failed for %s/%s: %s",
@@ -245,30 +208,23 @@ async def get_schedule(team_id: str, league_id: str) -> list[dict]:
 
 
 async def get_boxscore(event_id: str, league_id: str) -> dict:
-    cached = _get_from_cache(f"boxscore:{event_id}")
-    if cached:
-        return cached
-
     info = ESPN_LEAGUES.get(league_id)
     if not info:
         return {}
 
+    async def _load() -> dict:
+        data = await _espn_get(f"{BASE_URL}/{info['sport']}/{info['league']}/summary?event={event_id}")
+
+        res = {
+            "header": data.get("header", {}),
+            "boxscore": data.get("boxscore", {}),
+            "plays": data.get("plays", []),
+            "league_id": league_id
+        }
+        return res
+
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            url = f"{BASE_URL}/{info['sport']}/{info['league']}/summary?event={event_id}"
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
-
-            res = {
-                "header": data.get("header", {}),
-                "boxscore": data.get("boxscore", {}),
-                "plays": data.get("plays", []),
-                "league_id": league_id
-            }
-
-            _set_cache(f"boxscore:{event_id}", res, 30)  # 30s
-            return res
+        return await get_feed_cache().get("sports_boxscore", event_id, _load)
     except Exception as exc:
         logger.warning("ESPN get_boxscore failed for %s: %s", event_id, exc)
         return {}
@@ -288,11 +244,8 @@ async def search_teams(q: str) -> list[dict]:
     if not q or not q.strip():
         return []
 
+    # Team lists are in the feed cache, so this is a scan over memory.
     q_lower = q.strip().lower()
-    cached = _get_from_cache(f"search_teams:{q_lower}")
-    if cached is not None:
-        return cached
-
     active_leagues = list(ESPN_LEAGUES.keys())
     all_results = await asyncio.gather(
         *[get_teams(lid) for lid in active_leagues],
@@ -312,7 +265,6 @@ async def search_teams(q: str) -> list[dict]:
                 matches.append(team)
                 seen.add(team["id"])
 
-    _set_cache(f"search_teams:{q_lower}", matches, 3600)
     return matches
 
 
@@ -373,7 +325,7 @@ async def fetch_event_stats(event_id: str) -> dict:
     # Search through all cached scoreboards to find which league owns this
     # event
     for lid in ESPN_LEAGUES:
-        cached = _get_from_cache(f"scoreboard:{lid}")
+        cached = get_feed_cache().peek("sports_scoreboard", lid)
         if not cached:
             continue
         for event in cached:
@@ -15,7 +15,7 @@ import asyncio
 import logging
 from typing import Any, Dict, List, Optional
 
-import httpx
+from providers.feeds.cache import fetch_json
 
 logger = logging.getLogger(__name__)
 
@@ -26,14 +26,11 @@ _FINNHUB_BASE = "https://finnhub.io/api/v1"
 async def fetch_quote(ticker: str, api_key: str) -> Optional[Dict[str, Any]]:
     """Fetch a single stock quote from Alpha Vantage."""
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(_BASE, params={
-                "function": "GLOBAL_QUOTE",
-                "symbol": ticker.upper(),
-                "apikey": api_key,
-            })
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("stocks", _BASE, params={
+            "function": "GLOBAL_QUOTE",
+            "symbol": ticker.upper(),
+            "apikey": api_key,
+        })
     except Exception as exc:
         logger.warning("Alpha Vantage fetch failed for %s: %s", ticker, exc)
         return None
@@ -83,15 +80,12 @@ async def fetch_chart(ticker: str, api_key: str,
                       days: int = 30) -> List[Dict[str, Any]]:
     """Fetch daily OHLCV data for the last `days` trading days."""
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(_BASE, params={
-                "function": "TIME_SERIES_DAILY",
-                "symbol": ticker.upper(),
-                "outputsize": "compact",
-                "apikey": api_key,
-            })
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("stock_chart", _BASE, timeout=15, params={
+            "function": "TIME_SERIES_DAILY",
+            "symbol": ticker.upper(),
+            "outputsize": "compact",
+            "apikey": api_key,
+        })
     except Exception as exc:
         logger.warning(
             "Alpha Vantage chart fetch failed for %s: %s",
@@ -130,13 +124,10 @@ async def fetch_finnhub_quote(
     if not api_key:
         return None
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(f"{_FINNHUB_BASE}/quote", params={
-                "symbol": ticker.upper(),
-                "token": api_key,
-            })
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("stocks", f"{_FINNHUB_BASE}/quote", params={
+            "symbol": ticker.upper(),
+            "token": api_key,
+        })
     except Exception as exc:
         logger.warning("Finnhub quote failed for %s: %s", ticker, exc)
         return None
@@ -182,15 +173,12 @@ async def fetch_finnhub_news(
     today = date.today()
     week_ago = today - timedelta(days=7)
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(f"{_FINNHUB_BASE}/company-news", params={
-                "symbol": ticker.upper(),
-                "from": week_ago.isoformat(),
-                "to": today.isoformat(),
-                "token": api_key,
-            })
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("stock_news", f"{_FINNHUB_BASE}/company-news", params={
+            "symbol": ticker.upper(),
+            "from": week_ago.isoformat(),
+            "to": today.isoformat(),
+            "token": api_key,
+        })
     except Exception as exc:
         logger.warning("Finnhub news failed for %s: %s", ticker, exc)
         return []
@@ -218,14 +206,11 @@ async def fetch_finnhub_news(
 async def search_symbols(query: str, api_key: str) -> List[Dict[str, Any]]:
     """Search for ticker symbols by company name or partial ticker."""
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(_BASE, params={
-                "function": "SYMBOL_SEARCH",
-                "keywords": query,
-                "apikey": api_key,
-            })
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("symbol_search", _BASE, params={
+            "function": "SYMBOL_SEARCH",
+            "keywords": query,
+            "apikey": api_key,
+        })
     except Exception as exc:
         logger.warning("Alpha Vantage symbol search failed: %s", exc)
         return []
@@ -10,7 +10,7 @@ from __future__ import annotations
 import logging
 from typing import Any, Dict, List, Optional
 
-import httpx
+from providers.feeds.cache import fetch_json
 
 logger = logging.getLogger(__name__)
 
@@ -108,10 +108,7 @@ async def fetch_weather(
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(_BASE, params=params)  # type: ignore
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("weather", _BASE, params=params)
     except Exception as exc:
         logger.error("Open-Meteo fetch failed: %s", exc)
         raise
@@ -232,14 +229,14 @@ async def get_weather_report(lat: float, lon: float,
 async def _reverse_geocode(lat: float, lon: float) -> str:
     """Return a short human-readable location name via Nominatim (no key needed)."""
     try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            resp = await client.get(
-                "https://nominatim.openstreetmap.org/reverse",
-                params={"lat": lat, "lon": lon, "format": "json", "zoom": 10},
-                headers={"User-Agent": "RiverSongAI/1.0 (riversongai.com)"},
-            )
-            resp.raise_for_status()
-            addr = resp.json().get("address", {})
+        data = await fetch_json(
+            "geocode",
+            "https://nominatim.openstreetmap.org/reverse",
+            params={"lat": lat, "lon": lon, "format": "json", "zoom": 10},
+            headers={"User-Agent": "RiverSongAI/1.0 (riversongai.com)"},
+            timeout=5,
+        )
+        addr = data.get("address", {})
         parts = [
             addr.get("city") or addr.get("town") or addr.get(
                 "village") or addr.get("county"),
@@ -280,48 +277,45 @@ async def _fetch_purpleair_aqi(
         return None
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(
-                _PURPLEAIR_BASE,
-                params={
-                    "fields": "pm2.5_atm,pm2.5_60minute,humidity,latitude,longitude,last_seen",
-                    "nwlng": lon - 0.05,
-                    "nwlat": lat + 0.05,
-                    "selng": lon + 0.05,
-                    "selat": lat - 0.05,
-                    "max_age": 3600
-                },
-                headers={"X-API-Key": api_key}
-            )
-            if resp.status_code != 200:
-                return None
-            data = resp.json()
-            if not data.get("data"):
-                return None
-
-            # Simple fallback to first sensor
-            sensor = data["data"][0]
-            pm25 = sensor[1] if len(sensor) > 1 else 0
-            if pm25 is None:
-                return None
-
-            aqi = _pm25_to_aqi(pm25)
-            label, color = "Unknown", "#888"
-            for threshold, lbl, col in _AQI_LEVELS:
-                if aqi <= threshold:
-                    label, color = lbl, col
-                    break
-
-            return {
-                "aqi": aqi,
-                "label": label,
-                "color": color,
-                "pm2_5": pm25,
-                "pm10": None,
-                "ozone": None,
-                "nitrogen_dioxide": None,
-                "carbon_monoxide": None
-            }
+        data = await fetch_json(
+            "air_quality",
+            _PURPLEAIR_BASE,
+            params={
+                "fields": "pm2.5_atm,pm2.5_60minute,humidity,latitude,longitude,last_seen",
+                "nwlng": lon - 0.05,
+                "nwlat": lat + 0.05,
+                "selng": lon + 0.05,
+                "selat": lat - 0.05,
+                "max_age": 3600
+            },
+            headers={"X-API-Key": api_key}
+        )
+        if not data.get("data"):
+            return None
+
+        # Simple fallback to first sensor
+        sensor = data["data"][0]
+        pm25 = sensor[1] if len(sensor) > 1 else 0
+        if pm25 is None:
+            return None
+
+        aqi = _pm25_to_aqi(pm25)
+        label, color = "Unknown", "#888"
+        for threshold, lbl, col in _AQI_LEVELS:
+            if aqi <= threshold:
+                label, color = lbl, col
+                break
+
+        return {
+            "aqi": aqi,
+            "label": label,
+            "color": color,
+            "pm2_5": pm25,
+            "pm10": None,
+            "ozone": None,
+            "nitrogen_dioxide": None,
+            "carbon_monoxide": None
+        }
     except Exception as exc:
         logger.warning("PurpleAir fetch failed: %s", exc)
         return None
@@ -330,15 +324,12 @@ async def _fetch_purpleair_aqi(
 async def _fetch_openmeteo_aqi(lat: float, lon: float) -> Dict[str, Any]:
     """Fetch current air quality from Open-Meteo air quality API (no key needed)."""
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(_AQI_BASE, params={
-                "latitude": lat,
-                "longitude": lon,
-                "current": "us_aqi,pm10,pm2_5,ozone,nitrogen_dioxide,carbon_monoxide",
-                "timezone": "auto",
-            })
-            resp.raise_for_status()
-            data = resp.json()
+        data = await fetch_json("air_quality", _AQI_BASE, params={
+            "latitude": lat,
+            "longitude": lon,
+            "current": "us_aqi,pm10,pm2_5,ozone,nitrogen_dioxide,carbon_monoxide",
+            "timezone": "auto",
+        })
     except Exception as exc:
         logger.warning("Air quality fetch failed: %s", exc)
         return {}
@@ -389,28 +380,19 @@ async def fetch_nws_alerts(lat: float, lon: float) -> List[Dict[str, Any]]:
     """
     try:
         headers = {"User-Agent": "RiverSongAI/1.0 (riversongai.com)"}
-        async with httpx.AsyncClient(timeout=10, headers=headers) as client:
-            # NWS requires a point lookup first to get the grid zone
-            point_resp = await client.get(
-                f"{_NWS_BASE}/points/{lat:.4f},{lon:.4f}"
-            )
-            if point_resp.status_code != 200:
-                logger.debug(
-                    "NWS point lookup failed: %s",
-                    point_resp.status_code)
-                return []
-            point_data = point_resp.json()
-            point_data.get("properties", {}).get("forecastZone", "")
-            point_data.get("properties", {}).get("county", "")
-
-            # Use the active alerts by point endpoint (simplest)
-            alerts_resp = await client.get(
-                f"{_NWS_BASE}/alerts/active",
-                params={"point": f"{lat:.4f},{lon:.4f}"},
-            )
-            if alerts_resp.status_code != 200:
-                return []
-            alerts_data = alerts_resp.json()
+        # NWS requires a point lookup first to get the grid zone
+        point_data = await fetch_json(
+            "geocode", f"{_NWS_BASE}/points/{lat:.4f},{lon:.4f}", headers=headers)
+        point_data.get("properties", {}).get("forecastZone", "")
+        point_data.get("properties", {}).get("county", "")
+
+        # Use the active alerts by point endpoint (simplest)
+        alerts_data = await fetch_json(
+            "nws_alerts",
+            f"{_NWS_BASE}/alerts/active",
+            params={"point": f"{lat:.4f},{lon:.4f}"},
+            headers=headers,
+        )
     except Exception as exc:
         logger.debug("NWS alerts fetch failed: %s", exc)
         return []
@@ -33,7 +33,7 @@ from __future__ import annotations
 import threading
 import time
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, IntEnum
 from typing import Dict, List, Optional
 
 
@@ -56,6 +56,19 @@ class AgentRole(str, Enum):
     REFLECTOR = "reflector"   # self-critique / evaluation passes
 
 
+class Priority(IntEnum):
+    """Queue class for local model calls; lower runs first.
+
+    See providers/llm/scheduler.py. BACKGROUND work also waits while any
+    interactive call is running and can be preempted by one.
+    """
+
+    INTERACTIVE_VOICE = 0   # someone is standing there waiting to hear the answer
+    INTERACTIVE_TEXT  = 1   # chat page, API turns
+    PROACTIVE         = 2   # routines, research, anything the user will read later
+    BACKGROUND        = 3   # distillation, note synthesis, triage sweeps
+
+
 @dataclass(frozen=True)
 class RoleConfig:
     """Static configuration for one agent role.
@@ -67,6 +80,7 @@ class RoleConfig:
         max_tokens:  Generation cap.
         json_mode:   True if the role expects strict JSON output.
         notes:       Free-text purpose hint shown in the admin panel.
+        priority:    Scheduling class for local model calls made in this role.
     """
     role: AgentRole
     provider: str
@@ -75,6 +89,7 @@ class RoleConfig:
     max_tokens: int = 1024
     json_mode: bool = False
     notes: str = ""
+    priority: Priority = Priority.INTERACTIVE_TEXT
 
 
 @dataclass
@@ -136,6 +151,7 @@ _DEFAULTS: Dict[AgentRole, RoleConfig] = {
         temperature=0.4,
         max_tokens=1024,
         notes="CHRONOS Scribe daemon — note synthesis from raw context.",
+        priority=Priority.BACKGROUND,
     ),
     AgentRole.SIFTER: RoleConfig(
         role=AgentRole.SIFTER,
@@ -145,6 +161,7 @@ _DEFAULTS: Dict[AgentRole, RoleConfig] = {
         max_tokens=512,
         json_mode=True,
         notes="Sifter daemon — fast triage / filtering with structured output.",
+        priority=Priority.BACKGROUND,
     ),
     AgentRole.WARDEN: RoleConfig(
         role=AgentRole.WARDEN,
@@ -154,6 +171,7 @@ _DEFAULTS: Dict[AgentRole, RoleConfig] = {
         max_tokens=512,
         json_mode=True,
         notes="Warden daemon — safety / policy checks. Deterministic, JSON.",
+        priority=Priority.PROACTIVE,
     ),
     AgentRole.REFINER: RoleConfig(
         role=AgentRole.REFINER,
@@ -171,6 +189,7 @@ _DEFAULTS: Dict[AgentRole, RoleConfig] = {
         max_tokens=1024,
         json_mode=True,
         notes="Structured reports — analytics summaries, daemon outputs. Qwen handles JSON well.",
+        priority=Priority.BACKGROUND,
     ),
     AgentRole.SEARCHER: RoleConfig(
         role=AgentRole.SEARCHER,
@@ -179,6 +198,7 @@ _DEFAULTS: Dict[AgentRole, RoleConfig] = {
         temperature=0.5,
         max_tokens=2048,
         notes="Research + retrieval synthesis. RAM-resident; more capacity for synthesis.",
+        priority=Priority.PROACTIVE,
     ),
     AgentRole.CODER: RoleConfig(
         role=AgentRole.CODER,
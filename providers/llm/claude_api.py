@@ -2,6 +2,10 @@
 providers/llm/claude_api.py
 
 Anthropic Claude API provider for River Song AI.
+
+The stable part of the system prompt and the tool list are sent with
+cache_control (providers/llm/prompt_cache.py); cache reads and writes are
+recorded with the rest of the call's usage.
 """
 
 from __future__ import annotations
@@ -14,6 +18,7 @@ from config.settings import get_settings
 from core.observability import trace_llm
 from core.token_tracker import record_usage
 from providers.base import LLMProvider
+from providers.llm.prompt_cache import anthropic_system, anthropic_tools
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +34,13 @@ def _friendly_error(exc: Exception) -> str:
     return "I had trouble responding."
 
 
+def _record(model: str, usage, call_type: str) -> None:
+    record_usage("anthropic", model, usage.input_tokens, usage.output_tokens,
+                 call_type=call_type,
+                 cache_read_tokens=getattr(usage, "cache_read_input_tokens", 0) or 0,
+                 cache_write_tokens=getattr(usage, "cache_creation_input_tokens", 0) or 0)
+
+
 class ClaudeAPILLM(LLMProvider):
     """
     Stream responses from Anthropic Claude via the official SDK.
@@ -55,12 +67,10 @@ class ClaudeAPILLM(LLMProvider):
                 model=self._model,
                 max_tokens=self._max_tokens,
                 temperature=self._temperature,
-                system=system_prompt,
+                system=anthropic_system(system_prompt),  # type: ignore
                 messages=chat_messages  # type: ignore
             )
-            record_usage("anthropic", self._model,
-                         response.usage.input_tokens, response.usage.output_tokens,
-                         call_type="chat")
+            _record(self._model, response.usage, "chat")
             return "".join(
                 b.text for b in response.content if b.type == "text")
         except Exception as exc:
@@ -82,16 +92,14 @@ class ClaudeAPILLM(LLMProvider):
                 model=self._model,
                 max_tokens=self._max_tokens,
                 temperature=self._temperature,
-                system=system_prompt,
+                system=anthropic_system(system_prompt),  # type: ignore
                 messages=chat_messages  # type: ignore
             ) as stream:
                 async for text in stream.text_stream:
                     yield text
                 try:
                     msg = await stream.get_final_message()
-                    record_usage("anthropic", self._model,
-                                 msg.usage.input_tokens, msg.usage.output_tokens,
-                                 call_type="stream")
+                    _record(self._model, msg.usage, "stream")
                 except Exception:
                     pass
         except Exception as exc:
@@ -113,7 +121,7 @@ class ClaudeAPILLM(LLMProvider):
                 max_tokens=max(self._max_tokens, 16000),
                 temperature=1,
                 thinking={"type": "enabled", "budget_tokens": 5000},
-                system=system_prompt,
+                system=anthropic_system(system_prompt),  # type: ignore
                 messages=chat_messages,  # type: ignore
                 betas=["interleaved-thinking-2025-05-14"],
             ) as stream:
@@ -141,26 +149,22 @@ class ClaudeAPILLM(LLMProvider):
                 model=self._model,
                 max_tokens=self._max_tokens,
                 temperature=self._temperature,
-                system=system,
+                system=anthropic_system(system),  # type: ignore
                 messages=messages,
-                tools=tools
+                tools=anthropic_tools(tools)
             )
 
-            record_usage("anthropic", self._model,
-                         response.usage.input_tokens, response.usage.output_tokens,
-                         call_type="tools")
+            _record(self._model, response.usage, "tools")
 
             if response.stop_reason == "tool_use":
-                # Find the first tool_use block
-                tool_use_block = next(
-                    (b for b in response.content if b.type == "tool_use"), None)
-                if tool_use_block:
-                    return {
-                        "type": "tool_call",
-                        "tool_name": tool_use_block.name,
-                        "tool_input": tool_use_block.input,
-                        "tool_use_id": tool_use_block.id
-                    }
+                # Claude may ask for several tools in one turn; the agent
+                # loop runs them together. Top-level keys mirror the first.
+                calls = [
+                    {"tool_name": b.name, "tool_input": b.input, "tool_use_id": b.id}
+                    for b in response.content if b.type == "tool_use"
+                ]
+                if calls:
+                    return {"type": "tool_call", **calls[0], "tool_calls": calls}
 
             # Default to text response
             text = "".join(
@@ -8,6 +8,9 @@
 # real-time text display in the frontend without waiting for the full
 # response to be generated.
 #
+# Every call sends keep_alive (OLLAMA_KEEP_ALIVE) so the model, and the KV
+# cache of the prompt prefix it last saw, stay loaded between turns.
+#
 # Prerequisites:
 #   1. Install Ollama: https://ollama.com
 #   2. Start the server: `ollama serve`
@@ -24,7 +27,10 @@ from typing import AsyncGenerator, List
 import ollama as ollama_client
 
 from config.settings import get_settings
+from core import metrics
 from providers.base import LLMProvider
+from providers.llm.prompt_cache import ollama_keep_alive
+from providers.llm.scheduler import Preempted, get_llm_scheduler
 
 
 logger = logging.getLogger(__name__)
@@ -82,6 +88,11 @@ class OllamaLLM(LLMProvider):
         Raises:
             RuntimeError: If Ollama is unreachable, the model is not found,
                           or the API returns an unexpected error.
+            Preempted:    (a RuntimeError) A background call gave way to
+                          interactive work after it had started yielding.
+
+        Waits for a slot from providers/llm/scheduler.py before calling
+        Ollama; the ambient llm_priority decides its place in the queue.
 
         Example:
             full = ""
@@ -99,43 +110,65 @@ class OllamaLLM(LLMProvider):
                 messages), self._model
         )
 
-        try:
-            stream = await self._client.chat(
-                model=self._model,
-                messages=messages,
-                stream=True,
-                options={
-                    "num_predict": self._max_tokens,
-                    "temperature": self._temperature,
-                },
-            )
-
-            async for part in stream:
-                # The ollama library returns dict-like objects. Support both
-                # attribute and dict access defensively.
-                if isinstance(part, dict):
-                    message = part.get("message", {})
-                    chunk = (
-                        message.get("content", "")
-                        if isinstance(message, dict)
-                        else getattr(message, "content", "")
-                    )
-                else:
-                    chunk = getattr(
-                        getattr(part, "message", None), "content", ""
-                    ) or ""
-
-                if chunk:
-                    yield chunk
-
-        except ollama_client.ResponseError as exc:  # type: ignore
-            raise RuntimeError(
-                f"Ollama returned an error for model '{self._model}': {exc}"
-            ) from exc
-        except Exception as exc:
-            raise RuntimeError(
-                f"Failed to communicate with Ollama at '{self._base_url}': {exc}"
-            ) from exc
+        scheduler = get_llm_scheduler()
+        while True:
+            slot = await scheduler.acquire(self._model)
+            produced = False
+            try:
+                stream = await self._client.chat(
+                    model=self._model,
+                    messages=messages,
+                    stream=True,
+                    keep_alive=ollama_keep_alive(),
+                    options={
+                        "num_predict": self._max_tokens,
+                        "temperature": self._temperature,
+                    },
+                )
+
+                async for part in stream:
+                    if slot.preempted:
+                        # Closing the stream is what makes Ollama stop
+                        # generating and actually frees the slot.
+                        await _close(stream)
+                        break
+                    # The ollama library returns dict-like objects. Support both
+                    # attribute and dict access defensively.
+                    if isinstance(part, dict):
+                        message = part.get("message", {})
+                        chunk = (
+                            message.get("content", "")
+                            if isinstance(message, dict)
+                            else getattr(message, "content", "")
+                        )
+                    else:
+                        chunk = getattr(
+                            getattr(part, "message", None), "content", ""
+                        ) or ""
+
+                    if chunk:
+                        produced = True
+                        yield chunk
+
+            except ollama_client.ResponseError as exc:  # type: ignore
+                raise RuntimeError(
+                    f"Ollama returned an error for model '{self._model}': {exc}"
+                ) from exc
+            except Exception as exc:
+                raise RuntimeError(
+                    f"Failed to communicate with Ollama at '{self._base_url}': {exc}"
+                ) from exc
+            finally:
+                scheduler.release(slot)
+
+            if not slot.preempted:
+                return
+            if produced:
+                raise Preempted(
+                    f"Background call to '{self._model}' preempted by interactive work.")
+            # Nothing reached the caller yet: queue again, behind the
+            # interactive request, and start over.
+            metrics.incr("llm_scheduler.requeued")
 
     async def stream_chat(
             self, messages: list[dict]) -> AsyncGenerator[str, None]:
@@ -165,22 +198,26 @@ class OllamaLLM(LLMProvider):
                     }
                 })
 
-            response = await self._client.chat(
-                model=self._model,
-                messages=messages,
-                tools=formatted_tools,
-                options={"temperature": self._temperature}
-            )
+            async with get_llm_scheduler().slot(self._model):
+                response = await self._client.chat(
+                    model=self._model,
+                    messages=messages,
+                    tools=formatted_tools,
+                    keep_alive=ollama_keep_alive(),
+                    options={"temperature": self._temperature}
+                )
 
             message = response.get("message", {})
             if message.get("tool_calls"):
-                tc = message["tool_calls"][0]
-                return {
-                    "type": "tool_call",
-                    "tool_name": tc["function"]["name"],
-                    "tool_input": tc["function"]["arguments"],
-                    "tool_use_id": None
-                }
+                calls = [
+                    {
+                        "tool_name": tc["function"]["name"],
+                        "tool_input": tc["function"]["arguments"],
+                        "tool_use_id": None
+                    }
+                    for tc in message["tool_calls"]
+                ]
+                return {"type": "tool_call", **calls[0], "tool_calls": calls}
 
             return {"type": "text", "content": message.get("content", "")}
 
@@ -188,3 +225,12 @@ class OllamaLLM(LLMProvider):
             logger.error("Ollama tool use call failed: %s", exc)
             return {
                 "type": "text", "content": f"My local brain had a hiccup during tool use: {exc}"}
+
+
+async def _close(stream) -> None:
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception as exc:
+            logger.debug("Closing a preempted Ollama stream failed: %s", exc)
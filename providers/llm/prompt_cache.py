@@ -0,0 +1,69 @@
+"""
+providers/llm/prompt_cache.py
+
+Stable/volatile split of the system prompt, for provider prefix caching.
+
+ConversationLoop builds the system prompt as the persona, mode and vehicle
+blocks (the same every turn of a session) followed by the memory, room,
+document, skills and summary blocks (which change every turn). The second
+part starts at VOLATILE_MARKER, so providers can tell the two apart from the
+text alone, without a side channel through every call site:
+
+  * Anthropic gets the system prompt as two text blocks with cache_control
+    on the stable one, and on the last tool, so follow-up turns read the
+    persona and tool schemas from the cache instead of paying for them.
+  * Ollama reuses its KV cache for the longest prefix shared with the
+    previous request; stable-first ordering is what makes that prefix long,
+    and keep_alive stops the model (and the cache) being unloaded between
+    turns.
+
+A system prompt without the marker is treated as wholly stable.
+"""
+
+from __future__ import annotations
+
+from typing import List, Tuple, Union
+
+from config.settings import get_settings
+
+VOLATILE_MARKER = "\n\n[ Context for this turn ]"
+
+_EPHEMERAL = {"type": "ephemeral"}
+
+
+def split_system(system: str) -> Tuple[str, str]:
+    """(stable, volatile) halves of a system prompt; volatile keeps the marker."""
+    idx = system.find(VOLATILE_MARKER)
+    if idx < 0:
+        return system, ""
+    return system[:idx], system[idx:]
+
+
+def anthropic_system(system: str) -> Union[str, List[dict]]:
+    """The `system` argument for Anthropic, with the stable part cacheable."""
+    if not system or not get_settings().llm_prompt_cache_enabled:
+        return system
+    stable, volatile = split_system(system)
+    if not stable.strip():
+        # Nothing stable to cache, and Anthropic rejects an empty text block.
+        return system
+    blocks = [{"type": "text", "text": stable, "cache_control": _EPHEMERAL}]
+    if volatile:
+        blocks.append({"type": "text", "text": volatile})
+    return blocks
+
+
+def anthropic_tools(tools: list) -> list:
+    """Tool list with a cache breakpoint after the last schema."""
+    if not tools or not get_settings().llm_prompt_cache_enabled:
+        return tools
+    return [*tools[:-1], {**tools[-1], "cache_control": _EPHEMERAL}]
+
+
+def ollama_keep_alive() -> Union[str, float]:
+    """OLLAMA_KEEP_ALIVE as Ollama accepts it: a duration string, or seconds."""
+    value = get_settings().ollama_keep_alive
+    try:
+        return float(value)
+    except ValueError:
+        return value
@@ -26,6 +26,7 @@ import ollama as ollama_client
 
 from config.settings import get_settings
 from providers.base import LLMProvider
+from providers.llm.prompt_cache import ollama_keep_alive
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +77,7 @@ class RemoteOllamaLLM(LLMProvider):
                 model=self._model,
                 messages=messages,
                 stream=True,
+                keep_alive=ollama_keep_alive(),
                 options={
                     "num_predict": self._max_tokens,
                     "temperature": self._temperature,
@@ -0,0 +1,301 @@
+"""
+providers/llm/scheduler.py
+
+Priority queue in front of the local Ollama server.
+
+Every subsystem that talks to Ollama builds its own OllamaLLM, and nothing
+coordinated them: a nightly distillation, the scribe daemon and an inbox
+triage could all be generating when someone asked River a question out loud,
+and Ollama served them in arrival order. On one small GPU that meant the
+voice turn waited behind a batch job it knew nothing about.
+
+OllamaLLM now takes a slot from this scheduler for each call:
+
+  * Each model gets `ollama_num_parallel` slots (per-model overrides in
+    `ollama_model_parallel`), matching what the Ollama server actually runs
+    in parallel; asking it for more only queues inside Ollama, in FIFO order.
+  * Calls beyond that wait here, ordered by Priority (voice, text,
+    proactive, background) and then by arrival.
+  * BACKGROUND calls are also deferred while any interactive call is running
+    or waiting, on any model -- it is the same GPU.
+  * An interactive call that cannot get a slot preempts a BACKGROUND holder
+    of that model. The holder's stream stops at the next chunk; if it had
+    not produced anything yet it re-queues and retries transparently,
+    otherwise it raises Preempted (a RuntimeError, which callers of
+    stream_response already handle as "the model failed").
+  * The daemons (scribe, sifter) are separate processes with schedulers of
+    their own, so interactive work is also published across processes: while
+    a scheduler has interactive calls running or waiting it holds a shared
+    flock on llm_interactive.lock next to the database. BACKGROUND calls are
+    only admitted when no process holds it, rechecked every
+    _EXTERNAL_POLL_SECONDS while they wait. Admission only: a background
+    stream already running in another process is not preempted.
+
+The priority of a call comes from the ambient context, set the same way as
+the token tracker's usage source:
+
+    with llm_priority(AgentRole.SCRIBE):      # the role's configured class
+        ...
+    set_llm_priority(Priority.INTERACTIVE_VOICE)  # the rest of this task
+
+Unset means INTERACTIVE_TEXT, so an untagged caller is never starved.
+
+Queue waits go to core.metrics as llm_scheduler.wait_ms.<class>. One
+scheduler per event loop; call from the loop only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fcntl
+import heapq
+import itertools
+import logging
+import time
+import weakref
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Union
+
+from core import metrics
+from providers.llm.agent_roles import AgentRole, Priority, get_role_registry
+
+logger = logging.getLogger(__name__)
+
+_priority: ContextVar[Optional[Priority]] = ContextVar("llm_priority", default=None)
+
+_INTERACTIVE = Priority.INTERACTIVE_TEXT  # this class and better are interactive
+
+# How often a background call held back by another process's interactive
+# work looks again.
+_EXTERNAL_POLL_SECONDS = 0.25
+
+
+class Preempted(RuntimeError):
+    """A background call gave up its slot to interactive work mid-stream."""
+
+
+def _resolve(priority: Union[Priority, AgentRole]) -> Priority:
+    if isinstance(priority, AgentRole):
+        return get_role_registry().get(priority).priority
+    return Priority(priority)
+
+
+def current_priority() -> Priority:
+    """The class local model calls made here will queue in."""
+    priority = _priority.get()
+    return Priority.INTERACTIVE_TEXT if priority is None else priority
+
+
+def set_llm_priority(priority: Union[Priority, AgentRole]) -> None:
+    """Queue this async task's local model calls as `priority` (or the role's)."""
+    _priority.set(_resolve(priority))
+
+
+@contextlib.contextmanager
+def llm_priority(priority: Union[Priority, AgentRole]):
+    """Queue local model calls inside this context as `priority` (or the role's)."""
+    token = _priority.set(_resolve(priority))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _interactive_lock_path() -> Path:
+    from config.settings import get_settings
+    return Path(get_settings().db_path).parent / "llm_interactive.lock"
+
+
+class _InteractiveMarker:
+    """This process's share of the cross-process "interactive work" lock."""
+
+    def __init__(self) -> None:
+        self._file: Optional[IO] = None
+
+    def set(self, busy: bool) -> None:
+        if busy and self._file is None:
+            try:
+                path = _interactive_lock_path()
+                path.parent.mkdir(parents=True, exist_ok=True)
+                f = open(path, "a")
+                fcntl.flock(f, fcntl.LOCK_SH)
+                self._file = f
+            except OSError as exc:
+                logger.debug("Could not publish interactive LLM work: %s", exc)
+        elif not busy and self._file is not None:
+            self._file.close()  # releases the lock
+            self._file = None
+
+    @staticmethod
+    def held_elsewhere() -> bool:
+        """Whether any other holder has interactive work right now."""
+        try:
+            with open(_interactive_lock_path(), "a") as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return True
+                return False
+        except OSError:
+            return False  # no lock file to check: admit as before
+
+
+@dataclass(eq=False)
+class Slot:
+    """One running call's claim on a model."""
+    model: str
+    priority: Priority
+    started: float = field(default_factory=time.monotonic)
+    preempted: bool = False
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: Priority
+    seq: int
+    model: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    queued: float = field(compare=False, default_factory=time.monotonic)
+
+
+class LocalLLMScheduler:
+    """Hands out per-model slots by priority. See the module docstring."""
+
+    def __init__(self) -> None:
+        self._active: Dict[str, List[Slot]] = {}
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._marker = _InteractiveMarker()
+        self._poll: Optional[asyncio.TimerHandle] = None
+
+    # -- inspection -------------------------------------------------------
+
+    def limit(self, model: str) -> int:
+        from config.settings import get_settings
+        settings = get_settings()
+        return max(1, int(settings.ollama_model_parallel.get(
+            model, settings.ollama_num_parallel)))
+
+    def snapshot(self) -> dict:
+        return {
+            "active": {m: [s.priority.name.lower() for s in slots]
+                       for m, slots in self._active.items() if slots},
+            "waiting": [(w.model, w.priority.name.lower()) for w in sorted(self._waiting)],
+        }
+
+    # -- slots ------------------------------------------------------------
+
+    async def acquire(self, model: str, priority: Optional[Priority] = None) -> Slot:
+        """Wait for a slot on `model`. Release it with release()."""
+        priority = current_priority() if priority is None else priority
+        waiter = _Waiter(priority, next(self._seq), model,
+                         asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiting, waiter)
+        self._dispatch()
+        try:
+            slot = await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+                heapq.heapify(self._waiting)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                self.release(waiter.future.result())
+            raise
+        metrics.observe(f"llm_scheduler.wait_ms.{priority.name.lower()}",
+                        (time.monotonic() - waiter.queued) * 1000)
+        return slot
+
+    def release(self, slot: Slot) -> None:
+        slots = self._active.get(slot.model, [])
+        if slot in slots:
+            slots.remove(slot)
+        self._dispatch()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, model: str, priority: Optional[Priority] = None):
+        """acquire()/release() around a call that cannot be preempted mid-way."""
+        held = await self.acquire(model, priority)
+        try:
+            yield held
+        finally:
+            self.release(held)
+
+    # -- internals --------------------------------------------------------
+
+    def _interactive_busy(self) -> bool:
+        return (any(w.priority <= _INTERACTIVE for w in self._waiting)
+                or any(s.priority <= _INTERACTIVE
+                       for slots in self._active.values() for s in slots))
+
+    def _dispatch(self) -> None:
+        """Grant every waiter that can run now, best priority first."""
+        # Drop our own share of the lock first, so held_elsewhere() does not
+        # see interactive work that has already finished here.
+        self._marker.set(self._interactive_busy())
+        elsewhere: Optional[bool] = None  # probed once, when first needed
+        blocked: List[_Waiter] = []
+        while self._waiting:
+            waiter = heapq.heappop(self._waiting)
+            if waiter.future.done():            # cancelled while queued
+                continue
+            slots = self._active.setdefault(waiter.model, [])
+            deferred = (waiter.priority == Priority.BACKGROUND
+                        and (self._interactive_busy()
+                             or any(w.priority <= _INTERACTIVE for w in blocked)))
+            if len(slots) >= self.limit(waiter.model) or deferred:
+                blocked.append(waiter)
+                continue
+            if waiter.priority == Priority.BACKGROUND:
+                if elsewhere is None:
+                    elsewhere = self._marker.held_elsewhere()
+                if elsewhere:
+                    blocked.append(waiter)
+                    continue
+            slot = Slot(waiter.model, waiter.priority)
+            slots.append(slot)
+            waiter.future.set_result(slot)
+        self._waiting = blocked
+        heapq.heapify(self._waiting)
+        self._marker.set(self._interactive_busy())
+        self._preempt_for(blocked)
+        if elsewhere and self._poll is None:
+            # Nothing in this process will dispatch again when the other
+            # process finishes, so look again shortly.
+            self._poll = asyncio.get_running_loop().call_later(
+                _EXTERNAL_POLL_SECONDS, self._repoll)
+        metrics.set_gauge("llm_scheduler.waiting", len(self._waiting))
+
+    def _repoll(self) -> None:
+        self._poll = None
+        self._dispatch()
+
+    def _preempt_for(self, blocked: List[_Waiter]) -> None:
+        """Ask one background holder per blocked interactive waiter to yield."""
+        for waiter in blocked:
+            if waiter.priority > _INTERACTIVE:
+                continue
+            victims = [s for s in self._active.get(waiter.model, ())
+                       if s.priority == Priority.BACKGROUND and not s.preempted]
+            if not victims:
+                continue
+            victim = max(victims, key=lambda s: s.started)  # least work lost
+            victim.preempted = True
+            metrics.incr("llm_scheduler.preempted")
+            logger.debug("Preempting a background %s call for a %s request.",
+                         victim.model, waiter.priority.name.lower())
+
+
+_schedulers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LocalLLMScheduler]" = \
+    weakref.WeakKeyDictionary()
+
+
+def get_llm_scheduler() -> LocalLLMScheduler:
+    """The scheduler for the running event loop."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = _schedulers[loop] = LocalLLMScheduler()
+    return scheduler
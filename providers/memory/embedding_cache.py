@@ -0,0 +1,204 @@
+"""
+providers/memory/embedding_cache.py
+
+Content-addressed cache for embedding vectors.
+
+Facts are re-embedded on every upsert, recurring questions on every search,
+and unchanged document chunks on every re-index. The vector for a given text
+only depends on which backend and model produced it, so EmbeddingProvider
+looks here first.
+
+Key:     sha256(backend, model id, normalised text). Normalising is Unicode
+         NFC plus whitespace collapsing, so re-extracted chunks that differ
+         only in line wrapping still hit.
+Tiers:   an in-memory LRU (EMBEDDING_CACHE_MEMORY_ITEMS entries) in front of
+         a SQLite file (EMBEDDING_CACHE_PATH, default next to DB_PATH) that
+         holds vectors as float32 blobs and survives restarts.
+Models:  the model id is part of the key, so switching embedding_model or
+         fastembed_model can never return a vector from the old model. Rows
+         left behind by other models are purged the first time a model is
+         seen, so the file does not keep growing across switches.
+
+Hits and misses are counted in core.metrics (embedding_cache.hit_memory,
+embedding_cache.hit_disk, embedding_cache.miss).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+from config.settings import get_settings
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key    TEXT PRIMARY KEY,
+    model  TEXT NOT NULL,
+    dim    INTEGER NOT NULL,
+    vector BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_embeddings_model ON embeddings(model);
+"""
+
+# SQLite's default limit on bound parameters is 999 on older builds.
+_LOOKUP_CHUNK = 500
+
+
+def normalise(text: str) -> str:
+    """The form of `text` that is hashed: NFC, whitespace runs collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(backend: str, model: str, text: str) -> str:
+    digest = hashlib.sha256()
+    for part in (backend, model, normalise(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier (LRU + SQLite) vector cache. Thread-safe."""
+
+    def __init__(self, path: str, memory_items: int) -> None:
+        self._path = path
+        self._capacity = max(0, memory_items)
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        # Two locks: the LRU one is taken on the event loop, so it guards dict
+        # operations only and is never held across SQLite I/O, which runs in
+        # worker threads under the connection lock.
+        self._lru_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._models_seen: set = set()
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, List[float]]:
+        """Cached vectors for whichever of `keys` are known."""
+        found: Dict[str, List[float]] = {}
+        missing: List[str] = []
+        with self._lru_lock:
+            for key in keys:
+                vec = self._lru.get(key)
+                if vec is None:
+                    missing.append(key)
+                else:
+                    self._lru.move_to_end(key)
+                    found[key] = vec
+        if found:
+            metrics.incr("embedding_cache.hit_memory", len(found))
+        if missing:
+            on_disk = await asyncio.to_thread(self._read, missing)
+            if on_disk:
+                metrics.incr("embedding_cache.hit_disk", len(on_disk))
+                with self._lru_lock:
+                    for key, vec in on_disk.items():
+                        self._remember(key, vec)
+                found.update(on_disk)
+            if len(missing) > len(on_disk):
+                metrics.incr("embedding_cache.miss", len(missing) - len(on_disk))
+        return found
+
+    async def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        """Store freshly computed vectors produced by `model`."""
+        if not vectors:
+            return
+        with self._lru_lock:
+            for key, vec in vectors.items():
+                self._remember(key, vec)
+        try:
+            await asyncio.to_thread(self._write, model, vectors)
+        except Exception as exc:
+            # A cache that cannot persist is still a working memory cache.
+            logger.warning("Embedding cache write failed: %s", exc)
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    def _remember(self, key: str, vec: List[float]) -> None:
+        if not self._capacity:
+            return
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self._capacity:
+            self._lru.popitem(last=False)
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_DDL)
+            self._conn = conn
+        return self._conn
+
+    def _read(self, keys: List[str]) -> Dict[str, List[float]]:
+        rows = []
+        with self._db_lock:
+            conn = self._get_conn()
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                rows.extend(conn.execute(
+                    "SELECT key, vector FROM embeddings WHERE key IN "
+                    f"({', '.join('?' * len(chunk))})", chunk).fetchall())
+        return {key: array("f", blob).tolist() for key, blob in rows}
+
+    def _write(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        with self._db_lock:
+            conn = self._get_conn()
+            with conn:
+                if model not in self._models_seen:
+                    purged = conn.execute(
+                        "DELETE FROM embeddings WHERE model != ?", (model,)).rowcount
+                    if purged:
+                        logger.info("Embedding cache: dropped %d vectors from "
+                                    "previous models (now %s).", purged, model)
+                    self._models_seen = {model}
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(key, model, len(vec), array("f", vec).tobytes())
+                     for key, vec in vectors.items()],
+                )
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """The process-wide cache, or None when EMBEDDING_CACHE_ENABLED is off."""
+    global _cache
+    settings = get_settings()
+    if not settings.embedding_cache_enabled:
+        return None
+    path = settings.embedding_cache_path or os.path.join(
+        os.path.dirname(settings.db_path) or ".", "embedding_cache.db")
+    with _cache_lock:
+        if _cache is None or _cache._path != path:
+            if _cache is not None:
+                _cache.close()
+            _cache = EmbeddingCache(path, settings.embedding_cache_memory_items)
+        return _cache
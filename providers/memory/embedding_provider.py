@@ -12,15 +12,20 @@ The fastembed path is gated behind a soft import: if the package is missing
 when the backend is requested, we log a clear warning and return None rather
 than crashing. The Ollama path stays the default for compatibility with any
 existing populated ChromaDB collection.
+
+Every vector goes through the content-addressed EmbeddingCache
+(providers/memory/embedding_cache.py) first, so text that has been embedded
+before by the same backend and model is never sent to the model again.
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 from config.settings import get_settings
+from providers.memory.embedding_cache import cache_key, get_embedding_cache
 
 
 logger = logging.getLogger(__name__)
@@ -68,6 +73,11 @@ class EmbeddingProvider:
             host=self._settings.ollama_base_url)
         return self._ollama_client
 
+    def _model_id(self) -> str:
+        if self._backend == "fastembed":
+            return self._settings.fastembed_model
+        return self._settings.embedding_model
+
     async def embed(self, text: str) -> Optional[List[float]]:
         """
         Return an embedding vector for `text`, or None on any failure.
@@ -78,9 +88,93 @@ class EmbeddingProvider:
         if not text or not text.strip():
             return None
 
+        cache = get_embedding_cache()
+        if cache is not None:
+            model = self._model_id()
+            key = cache_key(self._backend, model, text)
+            hit = (await cache.get_many([key])).get(key)
+            if hit is not None:
+                return hit
+
         if self._backend == "fastembed":
-            return await self._embed_fastembed(text)
-        return await self._embed_ollama(text)
+            vec = await self._embed_fastembed(text)
+        else:
+            vec = await self._embed_ollama(text)
+        if cache is not None and vec is not None:
+            await cache.put_many(model, {key: vec})
+        return vec
+
+    async def embed_many(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> List[Optional[List[float]]]:
+        """
+        Embed many texts; the result lines up with `texts` one-to-one.
+
+        Entries are None where embed() would have returned None (blank text
+        or a failed call), so one bad chunk never sinks a whole document.
+
+        Texts are cut into batches of `batch_size` (EMBEDDING_BATCH_SIZE)
+        and up to `concurrency` (EMBEDDING_CONCURRENCY) batches are in flight
+        at once. fastembed embeds each batch in a single inference call.
+        Ollama stays on the legacy per-prompt /api/embeddings endpoint --
+        /api/embed batches but returns normalised vectors, which would not
+        be comparable with an existing collection under Chroma's default L2
+        distance -- so there `concurrency` requests run side by side instead
+        of one after another.
+
+        Cached vectors are filled in first and only the misses are embedded;
+        texts that repeat within the call are embedded once.
+        """
+        batch_size = max(1, batch_size or self._settings.embedding_batch_size)
+        concurrency = max(1, concurrency or self._settings.embedding_concurrency)
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        todo = [i for i, t in enumerate(texts) if t and t.strip()]
+        if not todo:
+            return results
+
+        cache = get_embedding_cache()
+        keys: Dict[int, str] = {}
+        if cache is not None:
+            model = self._model_id()
+            keys = {i: cache_key(self._backend, model, texts[i]) for i in todo}
+            cached = await cache.get_many(list(dict.fromkeys(keys.values())))
+            first: Dict[str, int] = {}
+            misses: List[int] = []
+            for i in todo:
+                if keys[i] in cached:
+                    results[i] = cached[keys[i]]
+                elif keys[i] not in first:
+                    first[keys[i]] = i
+                    misses.append(i)
+            todo = misses
+
+        limiter = asyncio.Semaphore(concurrency)
+
+        async def run_batch(indices: List[int]) -> None:
+            async with limiter:
+                batch = [texts[i] for i in indices]
+                if self._backend == "fastembed":
+                    vectors = await self._embed_fastembed_batch(batch, batch_size)
+                else:
+                    vectors = [await self._embed_ollama(t) for t in batch]
+                for i, vec in zip(indices, vectors):
+                    results[i] = vec
+
+        await asyncio.gather(*(
+            run_batch(todo[start:start + batch_size])
+            for start in range(0, len(todo), batch_size)
+        ))
+
+        if cache is not None:
+            fresh = {keys[i]: results[i] for i in todo if results[i] is not None}
+            await cache.put_many(model, fresh)
+            for i, key in keys.items():
+                if results[i] is None and key in fresh:
+                    results[i] = fresh[key]
+        return results
 
     # -------------------------------------------------------------------------
     # Backends
@@ -123,6 +217,24 @@ class EmbeddingProvider:
             )
             return None
 
+    async def _embed_fastembed_batch(
+            self, texts: List[str], batch_size: int) -> List[Optional[List[float]]]:
+        model = _get_fastembed_model(self._settings.fastembed_model)
+        if model is None:
+            return [None] * len(texts)
+        try:
+            vectors = await asyncio.to_thread(
+                lambda: list(model.embed(texts, batch_size=batch_size)))
+            return [[float(x) for x in v.tolist()] for v in vectors]
+        except Exception as exc:
+            logger.warning(
+                "fastembed batch embedding (%d texts) failed for model %s: %s",
+                len(texts),
+                self._settings.fastembed_model,
+                exc,
+            )
+            return [None] * len(texts)
+
 
 def _get_fastembed_model(model_id: str):
     """
@@ -22,6 +22,14 @@
 #     .save_memory_settings() -- persist MemorySettings for a user
 #     .get_llm_settings()   -- fetch or create default LLMSettings for a user
 #     .save_llm_settings()  -- persist LLMSettings for a user
+#   get_store()             -- FastAPI dependency for the shared store
+#
+# Sharing:
+#   SQLiteStore(path) returns one shared instance per database file, so the
+#   many call sites that construct it per request all use the same bounded
+#   reader pool (SQLITE_POOL_SIZE threads, one connection each) and the single
+#   isolated writer. Pool wait time and queue depth are published to
+#   core.metrics as sqlite.pool_* / sqlite.writer_*.
 #
 # Dependencies:
 #   sqlite3 (stdlib)
@@ -44,10 +52,13 @@ import os
 import re
 import sqlite3
 import threading
+import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+
+from core import metrics
 
 from providers.memory.models import (
     ConversationSummary,
@@ -154,7 +165,8 @@ CREATE TABLE IF NOT EXISTS chat_sessions (
     updated_at    TEXT NOT NULL,
     distilled_at  TEXT,
     archived      INTEGER DEFAULT 0,
-    meta          TEXT DEFAULT '{}'
+    meta          TEXT DEFAULT '{}',
+    message_count INTEGER NOT NULL DEFAULT 0
 );
 CREATE TABLE IF NOT EXISTS chat_messages (
     id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -222,11 +234,12 @@ CREATE TABLE IF NOT EXISTS vault_notes (
     id           INTEGER PRIMARY KEY AUTOINCREMENT,
     owner_kind   TEXT NOT NULL,
     owner_id     TEXT NOT NULL,
-    virtual_path TEXT NOT NULL UNIQUE,
+    virtual_path TEXT NOT NULL,
     title        TEXT,
     size         INTEGER,
     mtime        REAL,
-    indexed_at   REAL
+    indexed_at   REAL,
+    UNIQUE(owner_kind, owner_id, virtual_path)
 );
 
 CREATE INDEX IF NOT EXISTS idx_vault_notes_owner ON vault_notes(owner_kind, owner_id);
@@ -791,6 +804,9 @@ from providers.memory.store import (  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
+# Prepared statements cached per connection (sqlite3's default is 128).
+_STATEMENT_CACHE_SIZE = 256
+
 # Substrings of sqlite OperationalError messages that mean "this idempotent
 # migration was already applied" — expected on every startup after the first,
 # so they are logged at DEBUG rather than treated as failures. Anything else is
@@ -822,17 +838,49 @@ class SQLiteStore(
     so the FastAPI event loop is never blocked.
     """
 
-    def __init__(self, db_path: Optional[str] = None) -> None:
+    # One store per database file per process. Routes, daemons and core
+    # modules construct SQLiteStore() freely -- on every telemetry post and
+    # command poll -- and each construction used to build two thread pools
+    # and a fresh set of connections. Construction now returns the shared
+    # instance for that file, so they all use one bounded reader pool, one
+    # writer and one set of warm connections.
+    _instances: Dict[str, "SQLiteStore"] = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, db_path: Optional[str] = None) -> "SQLiteStore":
+        from config.settings import get_settings
+        settings = get_settings()
         if db_path is None:
-            from config.settings import get_settings
-            db_path = get_settings().db_path
+            db_path = settings.db_path
+        key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = super().__new__(cls)
+                store._setup(db_path, settings.sqlite_pool_size)
+                cls._instances[key] = store
+            return store
+
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        # All state is built once, in _setup(), by __new__.
+        pass
+
+    def _setup(self, db_path: str, pool_size: int) -> None:
         self._db_path = db_path
+        self._pool_size = max(1, pool_size)
         self._local = threading.local()
+        # Every connection any thread has opened, so close() can reach them.
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self._waiting = {"pool": 0, "writer": 0}
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._start_executors()
+
+    def _start_executors(self) -> None:
         self._executor = ThreadPoolExecutor(
-            max_workers=min(4, os.cpu_count() or 1),
+            max_workers=self._pool_size,
             thread_name_prefix="sqlite",
         )
-        self._conn: Optional[sqlite3.Connection] = None
         # Dedicated single-thread writer for high-volume, fire-and-forget
         # writes (vector telemetry, pulse snapshots). It has its own connection
         # so a burst of telemetry can never occupy the shared read/write pool
@@ -842,7 +890,6 @@ class SQLiteStore(
             max_workers=1,
             thread_name_prefix="sqlite-write",
         )
-        self._write_conn: Optional[sqlite3.Connection] = None
 
     # -------------------------------------------------------------------------
     # Lifecycle
@@ -903,7 +950,7 @@ class SQLiteStore(
             "ALTER TABLE routines ADD COLUMN trigger_config TEXT NOT NULL DEFAULT '{}'",
             "ALTER TABLE routines ADD COLUMN builtin INTEGER NOT NULL DEFAULT 0",
             "INSERT OR IGNORE INTO admin_config (key, value) VALUES ('__global__', '{}')",
-            "CREATE TABLE IF NOT EXISTS vault_notes (id INTEGER PRIMARY KEY AUTOINCREMENT, owner_kind TEXT NOT NULL, owner_id TEXT NOT NULL, virtual_path TEXT NOT NULL UNIQUE, title TEXT, size INTEGER, mtime REAL, indexed_at REAL)",
+            "CREATE TABLE IF NOT EXISTS vault_notes (id INTEGER PRIMARY KEY AUTOINCREMENT, owner_kind TEXT NOT NULL, owner_id TEXT NOT NULL, virtual_path TEXT NOT NULL, title TEXT, size INTEGER, mtime REAL, indexed_at REAL, UNIQUE(owner_kind, owner_id, virtual_path))",
             "CREATE TABLE IF NOT EXISTS vault_links (id INTEGER PRIMARY KEY AUTOINCREMENT, src_note_id INTEGER NOT NULL, target_title TEXT NOT NULL, FOREIGN KEY(src_note_id) REFERENCES vault_notes(id) ON DELETE CASCADE)",
             "CREATE TABLE IF NOT EXISTS vault_audit (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, action TEXT NOT NULL, virtual_path TEXT NOT NULL, ts REAL NOT NULL)",
             "CREATE TABLE IF NOT EXISTS pulse_snapshots (id INTEGER PRIMARY KEY AUTOINCREMENT, source TEXT NOT NULL, data_json TEXT NOT NULL, ts REAL NOT NULL)",
@@ -947,6 +994,7 @@ class SQLiteStore(
             "ALTER TABLE vector_units RENAME COLUMN unit_name TO name",
             "ALTER TABLE vector_units RENAME COLUMN platform_type TO platform",
             "ALTER TABLE chat_sessions ADD COLUMN meta TEXT DEFAULT '{}'",
+            "ALTER TABLE chat_sessions ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0",
             "ALTER TABLE routines ADD COLUMN last_output TEXT",
         ]:
             try:
@@ -969,6 +1017,9 @@ class SQLiteStore(
                     )
 
         self._migrate_preferences_unique(conn)
+        self._migrate_vault_notes_owner_unique(conn)
+        self._ensure_vault_fts(conn)
+        self._ensure_chat_index(conn)
 
     def _migrate_preferences_unique(self, conn) -> None:
         """Rebuild `preferences` only while the legacy UNIQUE(user_id, category) exists."""
@@ -1002,56 +1053,90 @@ class SQLiteStore(
         )
 
     def close(self) -> None:
-        """Close the connection and shut down the thread pool."""
-        if self._conn:
-            self._conn.close()
-            self._conn = None
-        if self._write_conn:
-            self._write_conn.close()
-            self._write_conn = None
+        """Close every connection and stop the worker threads.
+
+        The store stays registered and usable: the next call starts fresh
+        threads and connections. This keeps holders of the shared instance
+        (app.state, module globals) valid across an app restart in-process.
+        """
         self._executor.shutdown(wait=False)
         self._write_executor.shutdown(wait=False)
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+        self._write_conn = None
+        self._start_executors()
 
     # -------------------------------------------------------------------------
     # Internal helpers
     # -------------------------------------------------------------------------
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the per-connection PRAGMAs applied once."""
+        from config.settings import get_settings
+        settings = get_settings()
+        conn = sqlite3.connect(
+            self._db_path,
+            check_same_thread=False,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            # Each connection keeps its own prepared-statement cache; the
+            # stdlib default of 128 is smaller than our working set of SQL.
+            cached_statements=_STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers proceed while a writer holds the lock.
+        # busy_timeout retries for up to 5 s before raising SQLITE_BUSY.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        # Under WAL, NORMAL only syncs at checkpoints: a commit survives an
+        # application crash, and an OS crash can lose the last few commits.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_mb) * 1024}")
+        conn.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_mb) * 1024 * 1024}")
+        with self._conns_lock:
+            self._conns.append(conn)
+        return conn
+
     def _get_conn(self) -> sqlite3.Connection:
         conn = getattr(self._local, "conn", None)
         if conn is None:
-            conn = sqlite3.connect(
-                self._db_path,
-                check_same_thread=False,
-                detect_types=sqlite3.PARSE_DECLTYPES,
-            )
-            conn.row_factory = sqlite3.Row
-            # WAL lets readers proceed while a writer holds the lock.
-            # busy_timeout retries for up to 5 s before raising SQLITE_BUSY.
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA busy_timeout=5000")
-            self._local.conn = conn
+            conn = self._local.conn = self._connect()
         return conn
 
-    async def _run(self, fn, *args):
+    async def _submit(self, lane: str, executor: ThreadPoolExecutor, fn, args):
+        """Run fn(*args) on `executor`, recording wait time and queue depth."""
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(self._executor, fn, *args)
+        queued_at = time.perf_counter()
+        with self._conns_lock:
+            self._waiting[lane] += 1
+            metrics.set_gauge(f"sqlite.{lane}_queue_depth", self._waiting[lane])
+
+        def call():
+            with self._conns_lock:
+                self._waiting[lane] -= 1
+                metrics.set_gauge(f"sqlite.{lane}_queue_depth", self._waiting[lane])
+            metrics.observe(f"sqlite.{lane}_wait_ms",
+                            (time.perf_counter() - queued_at) * 1000)
+            return fn(*args)
+
+        return await loop.run_in_executor(executor, call)
+
+    async def _run(self, fn, *args):
+        return await self._submit("pool", self._executor, fn, args)
 
     def _get_write_conn(self) -> sqlite3.Connection:
         """Separate connection for the isolated high-volume writer thread."""
         if self._write_conn is None:
-            self._write_conn = sqlite3.connect(
-                self._db_path,
-                check_same_thread=False,
-                detect_types=sqlite3.PARSE_DECLTYPES,
-            )
-            self._write_conn.row_factory = sqlite3.Row
-            self._write_conn.execute("PRAGMA journal_mode=WAL")
-            self._write_conn.execute("PRAGMA busy_timeout=5000")
+            self._write_conn = self._connect()
         return self._write_conn
 
     async def _run_write(self, fn, *args):
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(self._write_executor, fn, *args)
+        return await self._submit("writer", self._write_executor, fn, args)
 
     def _execute_write_isolated(self, sql: str, params: tuple) -> None:
         conn = self._get_write_conn()
@@ -1063,6 +1148,21 @@ class SQLiteStore(
         """Write via the dedicated writer thread/connection (telemetry, pulse)."""
         await self._run_write(self._execute_write_isolated, sql, params)
 
+    def _execute_many_isolated(self, statements: list) -> None:
+        conn = self._get_write_conn()
+        # One transaction for the whole batch: all rows land, or none do.
+        with conn:
+            for sql, rows in statements:
+                conn.executemany(sql, rows)
+
+    async def execute_many_isolated_async(
+            self, statements: List[Tuple[str, List[tuple]]]) -> None:
+        """Run several executemany() calls as one commit on the isolated writer.
+
+        `statements` is [(sql, [params, ...]), ...], executed in order.
+        """
+        await self._run_write(self._execute_many_isolated, statements)
+
     # -------------------------------------------------------------------------
     # Vector fleet units
     # -------------------------------------------------------------------------
@@ -1093,10 +1193,12 @@ class SQLiteStore(
             self, sql: str, params: tuple = ()) -> Optional[dict]:
         return await self._run(self._execute_read_one, sql, params)
 
-    async def get_chat_sessions(self, user_id: str, scope: Optional[str] = None) -> List[dict]:
-        rows = await self._run(self._execute_read,
-            "SELECT id, title, updated_at, (SELECT count(*) FROM chat_messages WHERE session_id=chat_sessions.id) as message_count FROM chat_sessions WHERE user_id = ? AND archived = 0 ORDER BY updated_at DESC",
-            (user_id,)
-        )
-        return rows
 
+def get_store() -> SQLiteStore:
+    """
+    FastAPI dependency for the process-wide store (settings.db_path).
+
+    Use as `store: SQLiteStore = Depends(get_store)`. main.py publishes the
+    same instance as app.state.store.
+    """
+    return SQLiteStore()
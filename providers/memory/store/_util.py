@@ -59,6 +59,7 @@ if typing.TYPE_CHECKING:
         async def execute_read_one_async(self, sql: str, params: tuple = ()) -> typing.Optional[typing.Dict[str, typing.Any]]: ...
         async def execute_write_async(self, sql: str, params: tuple) -> None: ...
         async def execute_write_isolated_async(self, sql: str, params: tuple) -> None: ...
+        async def execute_many_isolated_async(self, statements: typing.List[typing.Tuple[str, typing.List[tuple]]]) -> None: ...
         async def get_admin_config(self) -> dict: ...
         async def set_admin_config(self, config: dict) -> None: ...
 else:
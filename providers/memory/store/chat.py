@@ -1,8 +1,56 @@
 from typing import List, Dict, Any, Optional
+import logging
+import sqlite3
 import uuid
 import json
 from datetime import datetime, timezone
 
+from .vault import fts_query
+
+logger = logging.getLogger(__name__)
+
+# chat_sessions.message_count is maintained here rather than counted on every
+# session-list load. Triggers cover every writer, including the retention
+# sweep's bulk delete.
+_CHAT_COUNT_DDL = """
+CREATE TRIGGER IF NOT EXISTS chat_messages_count_insert AFTER INSERT ON chat_messages
+BEGIN
+    UPDATE chat_sessions SET message_count = message_count + 1 WHERE id = new.session_id;
+END;
+CREATE TRIGGER IF NOT EXISTS chat_messages_count_delete AFTER DELETE ON chat_messages
+BEGIN
+    UPDATE chat_sessions SET message_count = message_count - 1 WHERE id = old.session_id;
+END;
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_list
+    ON chat_sessions(user_id, archived, updated_at);
+"""
+
+# External-content index over chat_messages.content; rowid is chat_messages.id.
+_CHAT_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS chat_messages_fts USING fts5(
+    content,
+    content = 'chat_messages',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE TRIGGER IF NOT EXISTS chat_messages_fts_insert AFTER INSERT ON chat_messages
+BEGIN
+    INSERT INTO chat_messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS chat_messages_fts_delete AFTER DELETE ON chat_messages
+BEGIN
+    INSERT INTO chat_messages_fts (chat_messages_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS chat_messages_fts_update AFTER UPDATE OF content ON chat_messages
+BEGIN
+    INSERT INTO chat_messages_fts (chat_messages_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    INSERT INTO chat_messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+"""
+
 from ._util import StoreProtocol
 class ChatStoreMixin(StoreProtocol):
     # Requires self._run and self._get_conn from the main SQLiteStore
@@ -14,28 +62,53 @@ class ChatStoreMixin(StoreProtocol):
             cur.row_factory = dict_factory
             if scope:
                 query = """
-                    SELECT s.id, s.title, s.updated_at, COUNT(m.id) as message_count
-                    FROM chat_sessions s
-                    LEFT JOIN chat_messages m ON s.id = m.session_id
-                    WHERE s.user_id = ? AND s.archived = 0 AND s.meta LIKE ?
-                    GROUP BY s.id
-                    ORDER BY s.updated_at DESC
+                    SELECT id, title, updated_at, message_count
+                    FROM chat_sessions
+                    WHERE user_id = ? AND archived = 0 AND meta LIKE ?
+                    ORDER BY updated_at DESC
                 """
                 params = (user_id, f'%"{scope}"%')
             else:
                 query = """
-                    SELECT s.id, s.title, s.updated_at, COUNT(m.id) as message_count
-                    FROM chat_sessions s
-                    LEFT JOIN chat_messages m ON s.id = m.session_id
-                    WHERE s.user_id = ? AND s.archived = 0 AND (s.meta IS NULL OR s.meta NOT LIKE '%"scope"%')
-                    GROUP BY s.id
-                    ORDER BY s.updated_at DESC
+                    SELECT id, title, updated_at, message_count
+                    FROM chat_sessions
+                    WHERE user_id = ? AND archived = 0 AND (meta IS NULL OR meta NOT LIKE '%"scope"%')
+                    ORDER BY updated_at DESC
                 """
                 params = (user_id,)
             c = cur.execute(query, params)
             return [dict(row) for row in c.fetchall()]
         return await self._run(_get)
 
+    def _ensure_chat_index(self, conn: sqlite3.Connection) -> None:
+        """Create message-count and full-text upkeep; called from _sync_initialize."""
+        has_triggers = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'chat_messages_count_insert'"
+        ).fetchone()
+        if not has_triggers:
+            # First start with the column: count what is already there.
+            conn.execute(
+                """
+                UPDATE chat_sessions SET message_count =
+                    (SELECT count(*) FROM chat_messages WHERE session_id = chat_sessions.id)
+                """
+            )
+        conn.executescript(_CHAT_COUNT_DDL)
+        conn.commit()
+
+        try:
+            has_fts = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'chat_messages_fts'"
+            ).fetchone()
+            conn.executescript(_CHAT_FTS_DDL)
+            if not has_fts:
+                conn.execute(
+                    "INSERT INTO chat_messages_fts (chat_messages_fts) VALUES ('rebuild')")
+                conn.commit()
+        except sqlite3.OperationalError as exc:
+            logger.warning(
+                "SQLite has no FTS5 (%s); chat search will use substring matching.", exc)
+
     async def create_chat_session(self, user_id: str, title: str = "", meta: Optional[Dict[str, Any]] = None) -> str:
         session_id = str(uuid.uuid4())
         now = datetime.now(timezone.utc).isoformat()
@@ -75,6 +148,76 @@ class ChatStoreMixin(StoreProtocol):
             return [dict(row) for row in c.fetchall()]
         return await self._run(_get)
         
+    async def search_chat_messages(
+            self, user_id: str, query: str, cursor: Optional[str] = None,
+            limit: int = 20) -> Dict[str, Any]:
+        """
+        Full-text search over the user's non-archived chat history, newest
+        match first.
+
+        Returns {"results": [...], "next_cursor": str | None}; pass
+        next_cursor back to get the following page. Each result has the
+        message id, session_id, session_title, role, created_at and a
+        `snippet` with hits in [brackets]. Falls back to a substring match
+        when SQLite lacks FTS5.
+
+        The cursor is the last message id returned, and the next page starts
+        strictly below it. Ids are handed out in insert order, so this is
+        recency order: a page never depends on how many hits came before it,
+        and messages written while paging cannot shift or repeat rows.
+        """
+        after_id = _parse_search_cursor(cursor)
+        keyset = "AND m.id < ?" if after_id is not None else ""
+        keyset_args = [after_id] if after_id is not None else []
+
+        def _search() -> Dict[str, Any]:
+            conn = self._get_conn()
+            cur = conn.cursor()
+            cur.row_factory = dict_factory
+            rows: Optional[List[Dict[str, Any]]] = None
+            match = fts_query(query)
+            if not match:
+                return {"results": [], "next_cursor": None}
+            try:
+                rows = cur.execute(
+                    f"""
+                    SELECT m.id, m.session_id, s.title AS session_title, m.role,
+                           m.created_at,
+                           snippet(chat_messages_fts, 0, '[', ']', '…', 16) AS snippet
+                    FROM chat_messages_fts
+                    JOIN chat_messages m ON m.id = chat_messages_fts.rowid
+                    JOIN chat_sessions s ON s.id = m.session_id
+                    WHERE chat_messages_fts MATCH ? AND s.user_id = ? AND s.archived = 0
+                      {keyset}
+                    ORDER BY m.id DESC
+                    LIMIT ?
+                    """,
+                    (match, user_id, *keyset_args, limit + 1)
+                ).fetchall()
+            except sqlite3.OperationalError as exc:
+                logger.debug("Chat FTS search unavailable, using LIKE: %s", exc)
+            if rows is None:
+                rows = cur.execute(
+                    f"""
+                    SELECT m.id, m.session_id, s.title AS session_title, m.role,
+                           m.created_at, substr(m.content, 1, 200) AS snippet
+                    FROM chat_messages m
+                    JOIN chat_sessions s ON s.id = m.session_id
+                    WHERE m.content LIKE ? AND s.user_id = ? AND s.archived = 0
+                      {keyset}
+                    ORDER BY m.id DESC
+                    LIMIT ?
+                    """,
+                    (f"%{query}%", user_id, *keyset_args, limit + 1)
+                ).fetchall()
+            more = len(rows) > limit
+            results = [dict(r) for r in rows[:limit]]
+            return {
+                "results": results,
+                "next_cursor": str(results[-1]["id"]) if more else None,
+            }
+        return await self._run(_search)
+
     async def get_chat_session(self, user_id: str, session_id: str) -> Optional[Dict[str, Any]]:
         def _get() -> Optional[Dict[str, Any]]:
             conn = self._get_conn()
@@ -167,5 +310,13 @@ class ChatStoreMixin(StoreProtocol):
             return c.rowcount
         return await self._run(_delete)
 
+def _parse_search_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Message id from a search_chat_messages cursor; None if unusable."""
+    try:
+        return int(cursor) if cursor else None
+    except ValueError:
+        return None
+
+
 def dict_factory(cursor, row):
     return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
@@ -463,6 +463,71 @@ class FactsStoreMixin(StoreProtocol):
         )
         conn.commit()
 
+    async def set_summary_ttl(
+        self,
+        summary_id: str,
+        user_id: str,
+        ttl_setting: str,
+        expires_at: Optional[datetime],
+    ) -> bool:
+        """Change a summary's TTL option and expiry. Returns False if not found."""
+        return await self._run(
+            self._sync_set_summary_ttl, summary_id, user_id, ttl_setting, expires_at)
+
+    def _sync_set_summary_ttl(
+        self,
+        summary_id: str,
+        user_id: str,
+        ttl_setting: str,
+        expires_at: Optional[datetime],
+    ) -> bool:
+        conn = self._get_conn()
+        res = conn.execute(
+            "UPDATE conversation_summaries SET ttl_setting = ?, expires_at = ? "
+            "WHERE id = ? AND user_id = ?",
+            (ttl_setting, _dt_to_str(expires_at), summary_id, user_id),
+        )
+        conn.commit()
+        return res.rowcount > 0
+
+    async def update_summary_ttls(
+        self,
+        updates: List[tuple],
+    ) -> None:
+        """
+        Apply many deferred TTL extensions in one transaction.
+
+        `updates` is [(summary_id, new_expires_at, references), ...]. Works like
+        update_summary_ttl() per row, except reference_count grows by
+        `references` and forever summaries keep a NULL expiry.
+        """
+        if updates:
+            await self._run(self._sync_update_summary_ttls, updates)
+
+    def _sync_update_summary_ttls(self, updates: List[tuple]) -> None:
+        conn = self._get_conn()
+        now = _now_str()
+        with conn:
+            conn.executemany(
+                """
+                UPDATE conversation_summaries
+                SET expires_at      = CASE WHEN ttl_setting = 'forever'
+                                           THEN NULL ELSE :expires_at END,
+                    reference_count = reference_count + :refs,
+                    last_referenced = :now
+                WHERE id = :id
+                """,
+                [
+                    {
+                        "expires_at": _dt_to_str(expires_at),
+                        "refs": refs,
+                        "now": now,
+                        "id": summary_id,
+                    }
+                    for summary_id, expires_at, refs in updates
+                ],
+            )
+
     async def delete_expired_summaries(self, user_id: str) -> list[str]:
         """
         Bulk-delete all expired summaries for a user.
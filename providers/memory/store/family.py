@@ -209,6 +209,19 @@ class FamilyStoreMixin(StoreProtocol):
     # Routines
     # =========================================================================
 
+    # Bumped by every routine write except run bookkeeping (last_run /
+    # last_output), so in-memory views such as the device-trigger index know
+    # when to reload. A class default keeps the mixin free of __init__.
+    _routines_version: int = 0
+
+    @property
+    def routines_version(self) -> int:
+        return self._routines_version
+
+    def mark_routines_changed(self) -> None:
+        """For code that writes the routines table without these methods."""
+        self._routines_version += 1
+
     def _row_to_routine(self, row) -> dict:
         return {
             "id": row["id"],
@@ -272,6 +285,7 @@ class FamilyStoreMixin(StoreProtocol):
                 int(routine.get("builtin", False))),
         )
         conn.commit()
+        self._routines_version += 1
         row = conn.execute(
             "SELECT * FROM routines WHERE id=?", (rid,)).fetchone()
         return self._row_to_routine(row)
@@ -320,6 +334,8 @@ class FamilyStoreMixin(StoreProtocol):
             vals,
         )
         conn.commit()
+        if not set(fields) <= {"last_run", "last_output"}:
+            self._routines_version += 1
         row = conn.execute(
             "SELECT * FROM routines WHERE id=? AND user_id=?",
             (routine_id,
@@ -334,6 +350,7 @@ class FamilyStoreMixin(StoreProtocol):
         cur = conn.execute(
             "DELETE FROM routines WHERE id=? AND user_id=?", (routine_id, user_id))
         conn.commit()
+        self._routines_version += 1
         return cur.rowcount > 0
 
     async def get_enabled_routines(self) -> list:
@@ -52,6 +52,30 @@ class UsersStoreMixin(StoreProtocol):
             "SELECT 1 FROM revoked_tokens WHERE jti=?", (jti,)).fetchone()
         return row is not None
 
+    async def list_revoked_jtis(self) -> list[str]:
+        """Every revoked jti that has not expired yet."""
+        return await self._run(self._sync_list_revoked_jtis)
+
+    def _sync_list_revoked_jtis(self) -> list[str]:
+        conn = self._get_conn()
+        rows = conn.execute(
+            "SELECT jti FROM revoked_tokens WHERE expires_at >= ?", (_now_str(),)).fetchall()
+        return [r[0] for r in rows]
+
+    async def get_user_auth_state(self, user_id: str) -> Optional[dict]:
+        """The columns decode_token checks on every request, and nothing else."""
+        return await self._run(self._sync_get_user_auth_state, user_id)
+
+    def _sync_get_user_auth_state(self, user_id: str) -> Optional[dict]:
+        conn = self._get_conn()
+        row = conn.execute(
+            "SELECT is_suspended, tokens_valid_after FROM users WHERE id=?",
+            (user_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"is_suspended": bool(row[0]), "tokens_valid_after": row[1]}
+
     async def delete_expired_tokens(self) -> int:
         return await self._run(self._sync_delete_expired_tokens)
 
@@ -9,9 +9,55 @@
 
 from __future__ import annotations
 
+import logging
+import re
+import sqlite3
 from datetime import datetime, timezone
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
+# Full-text index over note title/body/tags; rowid is vault_notes.id. Kept in
+# step by _sync_upsert_vault_note and, for deletes from any path, a trigger.
+_VAULT_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS vault_notes_fts USING fts5(
+    title, body, tags,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE TRIGGER IF NOT EXISTS vault_notes_fts_delete AFTER DELETE ON vault_notes
+BEGIN
+    DELETE FROM vault_notes_fts WHERE rowid = old.id;
+END;
+"""
+
+# bm25() column weights: a hit in the title outranks one in tags, which
+# outranks one in the body.
+_BM25_WEIGHTS = "10.0, 1.0, 4.0"
+
+_QUERY_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn what a person typed into an FTS5 MATCH expression.
+
+    "quoted words" stay a phrase, a trailing * keeps a prefix search, and
+    every other word is quoted (so FTS5 operators and punctuation in user
+    input cannot break the query). The last bare word is also treated as a
+    prefix, so results appear while a word is still being typed. All terms
+    must match. Returns "" when nothing searchable is left.
+    """
+    terms = []  # [quoted term, is a bare word, typed with a trailing *]
+    for m in _QUERY_TERM_RE.finditer(text):
+        phrase, word = m.group(1), m.group(2)
+        tokens = re.findall(r"\w+", phrase if phrase is not None else word)
+        if tokens:
+            terms.append(['"' + " ".join(tokens) + '"', word is not None,
+                          word is not None and word.endswith("*")])
+    if terms and terms[-1][1]:
+        terms[-1][2] = True
+    return " AND ".join(t + ("*" if star else "") for t, _, star in terms)
 
 
 from ._util import StoreProtocol
@@ -34,9 +80,11 @@ class VaultStoreMixin(StoreProtocol):
         title: str,
         size: int,
         mtime: float,
-        links: list[str]
+        links: list[str],
+        body: str = "",
+        tags: Optional[list[str]] = None,
     ) -> None:
-        await self._run(self._sync_upsert_vault_note, owner_kind, owner_id, virtual_path, title, size, mtime, links)
+        await self._run(self._sync_upsert_vault_note, owner_kind, owner_id, virtual_path, title, size, mtime, links, body, tags)
 
     def _sync_upsert_vault_note(
         self,
@@ -46,7 +94,9 @@ class VaultStoreMixin(StoreProtocol):
         title: str,
         size: int,
         mtime: float,
-        links: list[str]
+        links: list[str],
+        body: str = "",
+        tags: Optional[list[str]] = None,
     ) -> None:
         conn = self._get_conn()
         now = datetime.now(tz=timezone.utc).timestamp()
@@ -56,7 +106,7 @@ class VaultStoreMixin(StoreProtocol):
             """
             INSERT INTO vault_notes (owner_kind, owner_id, virtual_path, title, size, mtime, indexed_at)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(virtual_path) DO UPDATE SET
+            ON CONFLICT(owner_kind, owner_id, virtual_path) DO UPDATE SET
                 title = excluded.title,
                 size = excluded.size,
                 mtime = excluded.mtime,
@@ -65,11 +115,10 @@ class VaultStoreMixin(StoreProtocol):
             (owner_kind, owner_id, virtual_path, title, size, mtime, now)
         )
 
-        # Always fetch the ID by virtual_path to be safe (Task A.2)
+        # Always fetch the ID by owner and virtual_path to be safe (Task A.2)
         row = conn.execute(
-            "SELECT id FROM vault_notes WHERE virtual_path = ?",
-            (virtual_path,
-             )).fetchone()
+            "SELECT id FROM vault_notes WHERE owner_kind = ? AND owner_id = ? AND virtual_path = ?",
+            (owner_kind, owner_id, virtual_path)).fetchone()
         note_id = row["id"]
 
         # 2. Clear old links and insert new ones
@@ -81,43 +130,165 @@ class VaultStoreMixin(StoreProtocol):
                 (note_id,
                  target))
 
+        # 3. Replace the note's full-text row
+        try:
+            conn.execute(
+                "DELETE FROM vault_notes_fts WHERE rowid = ?", (note_id,))
+            conn.execute(
+                "INSERT INTO vault_notes_fts (rowid, title, body, tags) VALUES (?, ?, ?, ?)",
+                (note_id, title or "", body or "", " ".join(tags or [])))
+        except sqlite3.OperationalError as exc:
+            # SQLite built without FTS5; search falls back to titles.
+            logger.debug("vault_notes_fts not maintained: %s", exc)
+
+        conn.commit()
+
+    def _ensure_vault_fts(self, conn: sqlite3.Connection) -> None:
+        """Create the vault full-text index; called from _sync_initialize."""
+        try:
+            conn.executescript(_VAULT_FTS_DDL)
+        except sqlite3.OperationalError as exc:
+            logger.warning(
+                "SQLite has no FTS5 (%s); vault search will match titles only.", exc)
+
+    def _migrate_vault_notes_owner_unique(self, conn: sqlite3.Connection) -> None:
+        """
+        Rebuild `vault_notes` only while the legacy UNIQUE(virtual_path) exists.
+
+        Virtual paths are relative to a root ("personal/todo.md"), so two
+        users' notes share them; the key must include the owner. Ids are
+        kept, so vault_links and the full-text rows stay attached. Foreign
+        keys are off for the swap, or dropping the old table would cascade
+        into vault_links.
+        """
+        sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='table' AND name='vault_notes'"
+        ).fetchone()
+        if not sql or "UNIQUE(owner_kind, owner_id, virtual_path)" in sql[0]:
+            return  # already migrated
+        conn.commit()  # the pragma is a no-op inside a transaction
+        conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            conn.executescript(
+                """
+                BEGIN;
+                CREATE TABLE vault_notes_new (
+                    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                    owner_kind   TEXT NOT NULL,
+                    owner_id     TEXT NOT NULL,
+                    virtual_path TEXT NOT NULL,
+                    title        TEXT,
+                    size         INTEGER,
+                    mtime        REAL,
+                    indexed_at   REAL,
+                    UNIQUE(owner_kind, owner_id, virtual_path)
+                );
+                INSERT INTO vault_notes_new
+                    SELECT id, owner_kind, owner_id, virtual_path, title,
+                           size, mtime, indexed_at
+                    FROM vault_notes;
+                DROP TABLE vault_notes;
+                ALTER TABLE vault_notes_new RENAME TO vault_notes;
+                CREATE INDEX IF NOT EXISTS idx_vault_notes_owner ON vault_notes(owner_kind, owner_id);
+                COMMIT;
+                """
+            )
+        finally:
+            conn.execute("PRAGMA foreign_keys=ON")
+
+    async def rename_vault_note_path(
+            self, owner_kind: str, owner_id: str,
+            old_path: str, new_path: str) -> None:
+        await self._run(self._sync_rename_vault_note_path, owner_kind, owner_id, old_path, new_path)
+
+    def _sync_rename_vault_note_path(
+            self, owner_kind: str, owner_id: str,
+            old_path: str, new_path: str) -> None:
+        conn = self._get_conn()
+        # The note keeps its id, so links and the full-text row come along.
+        conn.execute(
+            "DELETE FROM vault_notes WHERE owner_kind = ? AND owner_id = ? AND virtual_path = ?",
+            (owner_kind, owner_id, new_path))
+        conn.execute(
+            "UPDATE vault_notes SET virtual_path = ? "
+            "WHERE owner_kind = ? AND owner_id = ? AND virtual_path = ?",
+            (new_path, owner_kind, owner_id, old_path))
         conn.commit()
 
-    async def delete_vault_note_by_path(self, virtual_path: str) -> None:
-        await self._run(self._sync_delete_vault_note_by_path, virtual_path)
+    async def delete_vault_note_by_path(
+            self, owner_kind: str, owner_id: str, virtual_path: str) -> None:
+        await self._run(self._sync_delete_vault_note_by_path, owner_kind, owner_id, virtual_path)
 
-    def _sync_delete_vault_note_by_path(self, virtual_path: str) -> None:
+    def _sync_delete_vault_note_by_path(
+            self, owner_kind: str, owner_id: str, virtual_path: str) -> None:
         conn = self._get_conn()
         conn.execute(
-            "DELETE FROM vault_notes WHERE virtual_path = ?", (virtual_path,))
+            "DELETE FROM vault_notes WHERE owner_kind = ? AND owner_id = ? AND virtual_path = ?",
+            (owner_kind, owner_id, virtual_path))
         conn.commit()
 
     async def get_vault_note_by_path(
-            self, virtual_path: str) -> Optional[dict]:
-        return await self._run(self._sync_get_vault_note_by_path, virtual_path)
+            self, owner_kind: str, owner_id: str,
+            virtual_path: str) -> Optional[dict]:
+        return await self._run(self._sync_get_vault_note_by_path, owner_kind, owner_id, virtual_path)
 
     def _sync_get_vault_note_by_path(
-            self, virtual_path: str) -> Optional[dict]:
+            self, owner_kind: str, owner_id: str,
+            virtual_path: str) -> Optional[dict]:
         conn = self._get_conn()
         row = conn.execute(
-            "SELECT * FROM vault_notes WHERE virtual_path = ?",
-            (virtual_path,
-             )).fetchone()
+            "SELECT * FROM vault_notes WHERE owner_kind = ? AND owner_id = ? AND virtual_path = ?",
+            (owner_kind, owner_id, virtual_path)).fetchone()
         return dict(row) if row else None
 
     async def search_vault_notes(
-            self, user_id: str, query: str, limit: int = 50) -> list[dict]:
-        # NOTE: This search doesn't strictly check permissions by owner_id yet.
-        # The caller (VaultProvider) is expected to filter or pass the right
-        # constraints.
-        return await self._run(self._sync_search_vault_notes, user_id, query, limit)
+            self, user_id: str, query: str, limit: int = 50,
+            household_id: Optional[str] = None) -> list[dict]:
+        """
+        Full-text search over the user's notes, the shared root, and their
+        household's when `household_id` is given; best match first.
+
+        Rows are vault_notes columns plus `rank` (bm25; more negative is a
+        better match) and `snippet` (body excerpt with hits in [brackets]).
+        Falls back to a title substring match when the query has no
+        searchable words or SQLite lacks FTS5.
+        """
+        return await self._run(self._sync_search_vault_notes, user_id, query, limit, household_id)
 
     def _sync_search_vault_notes(
-            self, user_id: str, query: str, limit: int) -> list[dict]:
+            self, user_id: str, query: str, limit: int,
+            household_id: Optional[str] = None) -> list[dict]:
         conn = self._get_conn()
+        owner_sql = "((vn.owner_kind = 'user' AND vn.owner_id = ?) OR vn.owner_kind = 'shared'"
+        owner_args: list = [user_id]
+        if household_id:
+            owner_sql += " OR (vn.owner_kind = 'household' AND vn.owner_id = ?)"
+            owner_args.append(household_id)
+        owner_sql += ")"
+
+        match = fts_query(query)
+        if match:
+            try:
+                rows = conn.execute(
+                    f"""
+                    SELECT vn.*,
+                           bm25(vault_notes_fts, {_BM25_WEIGHTS}) AS rank,
+                           snippet(vault_notes_fts, 1, '[', ']', '…', 12) AS snippet
+                    FROM vault_notes_fts
+                    JOIN vault_notes vn ON vn.id = vault_notes_fts.rowid
+                    WHERE vault_notes_fts MATCH ? AND {owner_sql}
+                    ORDER BY rank
+                    LIMIT ?
+                    """,
+                    (match, *owner_args, limit)
+                ).fetchall()
+                return [dict(r) for r in rows]
+            except sqlite3.OperationalError as exc:
+                logger.debug("Vault FTS search unavailable, using titles: %s", exc)
+
         rows = conn.execute(
-            "SELECT * FROM vault_notes WHERE title LIKE ? AND owner_kind = 'user' AND owner_id = ? LIMIT ?",
-            (f"%{query}%", user_id, limit)
+            f"SELECT vn.* FROM vault_notes vn WHERE vn.title LIKE ? AND {owner_sql} LIMIT ?",
+            (f"%{query}%", *owner_args, limit)
         ).fetchall()
         return [dict(r) for r in rows]
 
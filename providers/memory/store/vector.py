@@ -125,10 +125,19 @@ class VectorStoreMixin(StoreProtocol):
             sql = "UPDATE vector_commands SET status=? WHERE command_id=?"
             await self.execute_write_async(sql, (status, command_id))
 
+    @staticmethod
+    def telemetry_insert_sql(columns) -> str:
+        """INSERT statement for vector_telemetry rows with these columns.
+
+        The /telemetry route feeds it to core/telemetry_ingest, which writes
+        whole batches with executemany.
+        """
+        cols = _safe_cols(list(columns))
+        placeholders = ", ".join(["?"] * len(cols))
+        return f"INSERT INTO vector_telemetry ({', '.join(cols)}) VALUES ({placeholders})"
+
     async def insert_telemetry(self, fields: dict) -> None:
-        cols = ", ".join(_safe_cols(fields.keys()))
-        placeholders = ", ".join(["?"] * len(fields))
-        sql = f"INSERT INTO vector_telemetry ({cols}) VALUES ({placeholders})"
+        sql = self.telemetry_insert_sql(fields.keys())
         # High-volume telemetry ingestion runs on the isolated writer so it
         # cannot starve the shared pool used by memory/auth reads.
         await self.execute_write_isolated_async(sql, tuple(fields.values()))
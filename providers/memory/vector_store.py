@@ -8,7 +8,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from config.settings import get_settings
 from providers.memory.embedding_provider import EmbeddingProvider
@@ -23,6 +23,9 @@ except ImportError:
     chromadb = None  # type: ignore
     Where = Any  # type: ignore
 
+# Used when the Chroma client cannot tell us its own limit.
+_DEFAULT_MAX_BATCH = 5000
+
 
 class VectorStore:
     """
@@ -92,6 +95,59 @@ class VectorStore:
         except Exception as exc:
             logger.warning("ChromaDB upsert failed for id %s: %s", id, exc)
 
+    async def upsert_many(
+            self, items: List[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """
+        Embed and upsert many (id, text, metadata) items at once.
+
+        Embeddings come from EmbeddingProvider.embed_many and everything that
+        embedded cleanly is written with a single collection.upsert (split
+        only if it exceeds Chroma's max batch size). Items whose embedding
+        failed are skipped with a warning, like upsert() does.
+
+        Returns the number of items written.
+        """
+        coll = self._collection
+        if not self._enabled or coll is None or not items:
+            return 0
+
+        embeddings = await self._embedding_provider.embed_many(
+            [text for _, text, _ in items])
+        ready = [(item, emb) for item, emb in zip(items, embeddings) if emb is not None]
+        skipped = len(items) - len(ready)
+        if skipped:
+            logger.warning("Skipping %d of %d upserts: embedding failed.",
+                           skipped, len(items))
+        if not ready:
+            return 0
+
+        max_batch = _DEFAULT_MAX_BATCH
+        get_max = getattr(getattr(self, "_client", None), "get_max_batch_size", None)
+        if get_max is not None:
+            try:
+                max_batch = int(get_max())
+            except Exception:
+                pass
+
+        def write() -> None:
+            for start in range(0, len(ready), max_batch):
+                part = ready[start:start + max_batch]
+                coll.upsert(
+                    ids=[item[0] for item, _ in part],
+                    embeddings=[emb for _, emb in part],
+                    metadatas=[item[2] for item, _ in part],
+                    documents=[item[1] for item, _ in part],
+                )
+
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, write)
+        except Exception as exc:
+            logger.warning("ChromaDB bulk upsert of %d items failed: %s",
+                           len(ready), exc)
+            return 0
+        return len(ready)
+
     async def search(
         self,
         query_text: str,
@@ -0,0 +1,282 @@
+"""
+providers/print_matrix.py
+
+Enrolled voice and face prints as one contiguous matrix.
+
+VoiceIDProvider and FaceIDProvider keep each sample as its own
+`<root>/<user_id>/sample_N.npy`. Identification used to loop over every user
+and every sample in Python, re-normalising each stored embedding for every
+cosine. PrintMatrix holds all samples L2-normalised in one float32 (N, D)
+array, grouped by user, so identifying is:
+
+    sims = matrix @ query            # one BLAS call, (N,)
+    per_user = maximum.reduceat(sims, user_starts)
+
+and a batch of Q queries is one (N, D) x (D, Q) product.
+
+PERSISTENCE
+-----------
+The per-user .npy files stay the source of truth -- deleting an enrolment is
+still deleting a directory. The matrix is a derived index saved beside them
+in `<root>/.index/` (prints.npy plus index.json with the user order and each
+user's sample count) and memory-mapped on load. load() compares index.json
+against the sample files on disk and rebuilds from them whenever the two
+disagree, so an index can never outlive the prints it was built from.
+
+Several provider instances may share a root (the API route and the speaker
+identification path each hold one). refresh() re-maps the index when
+another instance has rewritten it; it costs one stat().
+
+Not thread-safe: the providers call it from their single-worker executors.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = ".index"
+_MATRIX_FILE = "prints.npy"
+_META_FILE = "index.json"
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise each row as float32; all-zero rows stay zero."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0.0, 1.0, norms)
+
+
+def _stamp(path: str) -> Tuple[int, int]:
+    # Saves replace the file, so the inode changes even when two writes land
+    # within the filesystem's mtime granularity.
+    st = os.stat(path)
+    return st.st_ino, st.st_mtime_ns
+
+
+class PrintMatrix:
+    """All enrolled samples under one root, pre-normalised and grouped by user."""
+
+    def __init__(self, root: str) -> None:
+        self._root = root
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._users: List[str] = []
+        self._counts: List[int] = []
+        self._starts = np.zeros(0, dtype=np.intp)
+        self._meta_stamp: Optional[Tuple[int, int]] = None
+        self.loaded = False
+
+    # -- inspection -------------------------------------------------------
+
+    def __len__(self) -> int:
+        """Number of enrolled users."""
+        return len(self._users)
+
+    @property
+    def users(self) -> List[str]:
+        return list(self._users)
+
+    def samples(self, user_id: str) -> np.ndarray:
+        """This user's normalised samples, (n, D); empty when not enrolled."""
+        if user_id not in self._users:
+            return np.zeros((0, self._matrix.shape[1]), dtype=np.float32)
+        i = self._users.index(user_id)
+        start = int(self._starts[i])
+        return np.asarray(self._matrix[start:start + self._counts[i]])
+
+    def self_similarity(self, user_id: str) -> float:
+        """Mean pairwise cosine between a user's samples; 1.0 with fewer than two."""
+        rows = self.samples(user_id)
+        n = len(rows)
+        if n < 2:
+            return 1.0
+        sims = rows @ rows.T
+        return float(sims[np.triu_indices(n, k=1)].mean())
+
+    # -- scoring ----------------------------------------------------------
+
+    def user_scores(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Best cosine per enrolled user for each query.
+
+        Args:
+            queries: (D,) or (Q, D) raw embeddings; normalised here.
+
+        Returns:
+            (U,) for a single query, (Q, U) for a batch, columns in `users`
+            order.
+        """
+        q = normalize_rows(queries)
+        if not self._users:
+            return np.zeros(q.shape[:-1] + (0,), dtype=np.float32)
+        sims = q @ self._matrix.T
+        return np.maximum.reduceat(sims, self._starts, axis=-1)
+
+    def rank(self, query: np.ndarray) -> List[Tuple[str, float]]:
+        """[(user_id, score)] for the best and runner-up users (at most two)."""
+        return self.rank_scores(self.user_scores(query))
+
+    def rank_scores(self, scores: np.ndarray) -> List[Tuple[str, float]]:
+        """Top two (user_id, score) from one row of user_scores()."""
+        if scores.size == 0:
+            return []
+        order = np.argsort(scores)[::-1][:2]
+        return [(self._users[i], float(scores[i])) for i in order]
+
+    # -- loading ----------------------------------------------------------
+
+    def _on_disk(self) -> Dict[str, List[str]]:
+        """user_id -> sorted sample .npy paths, from the per-user directories."""
+        found: Dict[str, List[str]] = {}
+        if not os.path.isdir(self._root):
+            return found
+        for user_id in sorted(os.listdir(self._root)):
+            user_dir = os.path.join(self._root, user_id)
+            if user_id.startswith(".") or not os.path.isdir(user_dir):
+                continue
+            names = sorted(n for n in os.listdir(user_dir) if n.endswith(".npy"))
+            if names:
+                found[user_id] = [os.path.join(user_dir, n) for n in names]
+        return found
+
+    def _paths(self) -> Tuple[str, str]:
+        index_dir = os.path.join(self._root, INDEX_DIR)
+        return (os.path.join(index_dir, _MATRIX_FILE),
+                os.path.join(index_dir, _META_FILE))
+
+    def load(self) -> None:
+        """Map the saved index, rebuilding it from the sample files if stale."""
+        on_disk = self._on_disk()
+        expected = {u: len(p) for u, p in on_disk.items()}
+        if not self._map_index(expected):
+            self._rebuild(on_disk)
+        self.loaded = True
+
+    def refresh(self) -> None:
+        """Load on first use; re-map if another instance rewrote the index."""
+        if not self.loaded:
+            self.load()
+            return
+        _, meta_path = self._paths()
+        try:
+            stamp = _stamp(meta_path)
+        except OSError:
+            return
+        if stamp != self._meta_stamp:
+            self.load()
+
+    def _map_index(self, expected: Dict[str, int]) -> bool:
+        matrix_path, meta_path = self._paths()
+        try:
+            stamp = _stamp(meta_path)
+            with open(meta_path) as handle:
+                meta = json.load(handle)
+            if dict(zip(meta["users"], meta["counts"])) != expected:
+                return False
+            matrix = np.load(matrix_path, mmap_mode="r")
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        if matrix.dtype != np.float32 or matrix.ndim != 2 \
+                or matrix.shape[0] != sum(meta["counts"]):
+            return False
+        self._set(matrix, list(meta["users"]), list(meta["counts"]))
+        self._meta_stamp = stamp
+        return True
+
+    def _rebuild(self, on_disk: Dict[str, List[str]]) -> None:
+        users, counts, blocks = [], [], []
+        for user_id, paths in on_disk.items():
+            rows = []
+            for path in paths:
+                try:
+                    rows.append(np.asarray(np.load(path), dtype=np.float32).reshape(-1))
+                except Exception as exc:
+                    logger.warning("Unreadable print %s: %s", path, exc)
+            if rows and len({r.shape for r in rows}) == 1:
+                users.append(user_id)
+                counts.append(len(rows))
+                blocks.append(normalize_rows(np.stack(rows)))
+            elif rows:
+                logger.warning("Prints for %s have mixed sizes; skipped.", user_id)
+        dims = {b.shape[1] for b in blocks}
+        if len(dims) > 1:
+            logger.warning("Prints under %s have mixed sizes; keeping the commonest.",
+                           self._root)
+            common = max(dims, key=lambda d: sum(b.shape[1] == d for b in blocks))
+            kept = [(u, c, b) for u, c, b in zip(users, counts, blocks)
+                    if b.shape[1] == common]
+            users, counts, blocks = ([k[0] for k in kept], [k[1] for k in kept],
+                                     [k[2] for k in kept])
+        matrix = (np.concatenate(blocks) if blocks
+                  else np.zeros((0, 0), dtype=np.float32))
+        self._set(matrix, users, counts)
+        self._save()
+
+    # -- incremental updates ----------------------------------------------
+
+    def append(self, user_id: str, embedding: np.ndarray) -> None:
+        """Add one sample at the end of its user's block and save."""
+        row = normalize_rows(np.asarray(embedding).reshape(1, -1))
+        matrix = np.asarray(self._matrix)
+        if matrix.shape[0] == 0:
+            matrix = np.zeros((0, row.shape[1]), dtype=np.float32)
+        if user_id in self._users:
+            i = self._users.index(user_id)
+            at = int(self._starts[i]) + self._counts[i]
+            counts = self._counts[:i] + [self._counts[i] + 1] + self._counts[i + 1:]
+            users = self._users
+        else:
+            at = matrix.shape[0]
+            users = self._users + [user_id]
+            counts = self._counts + [1]
+        self._set(np.insert(matrix, at, row, axis=0), users, counts)
+        self._save()
+
+    def remove_user(self, user_id: str) -> None:
+        """Drop every sample of one user and save."""
+        if user_id not in self._users:
+            return
+        i = self._users.index(user_id)
+        start = int(self._starts[i])
+        keep = np.ones(self._matrix.shape[0], dtype=bool)
+        keep[start:start + self._counts[i]] = False
+        self._set(np.asarray(self._matrix)[keep],
+                  self._users[:i] + self._users[i + 1:],
+                  self._counts[:i] + self._counts[i + 1:])
+        self._save()
+
+    def _set(self, matrix: np.ndarray, users: List[str], counts: List[int]) -> None:
+        self._matrix = matrix
+        self._users = users
+        self._counts = counts
+        self._starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.intp) \
+            if counts else np.zeros(0, dtype=np.intp)
+
+    def _save(self) -> None:
+        matrix_path, meta_path = self._paths()
+        index_dir = os.path.dirname(matrix_path)
+        try:
+            os.makedirs(index_dir, exist_ok=True, mode=0o700)
+            # Matrix first, then the metadata that vouches for it; both
+            # atomically, so a crash leaves an index load() rejects, never a
+            # half-written one it trusts.
+            fd, tmp = tempfile.mkstemp(dir=index_dir, suffix=".npy")
+            with os.fdopen(fd, "wb") as handle:
+                np.save(handle, np.ascontiguousarray(self._matrix, dtype=np.float32))
+            os.replace(tmp, matrix_path)
+            fd, tmp = tempfile.mkstemp(dir=index_dir, suffix=".json", text=True)
+            with os.fdopen(fd, "w") as handle:
+                json.dump({"users": self._users, "counts": self._counts}, handle)
+            os.replace(tmp, meta_path)
+            self._meta_stamp = _stamp(meta_path)
+        except OSError as exc:
+            # The index is only a cache of the sample files; the next load
+            # rebuilds it.
+            logger.warning("Could not save print index under %s: %s", self._root, exc)
@@ -73,18 +73,13 @@ class RAGProvider:
 
         chunks = chunk_text(full_text)
         doc_id = metadata.get('document_id') or str(uuid.uuid4())
-        for i, chunk in enumerate(chunks):
-            chunk_id = f"doc_{doc_id}_{i}"
-            chunk_metadata = {
-                **metadata,
-                "chunk_index": i,
-                "source_type": "document"
-            }
-            await self._vector_store.upsert(
-                id=chunk_id,
-                text=chunk,
-                metadata=chunk_metadata
-            )
+        # One batched embed + one Chroma write for the whole document,
+        # rather than a round trip per chunk.
+        await self._vector_store.upsert_many([
+            (f"doc_{doc_id}_{i}", chunk,
+             {**metadata, "chunk_index": i, "source_type": "document"})
+            for i, chunk in enumerate(chunks)
+        ])
 
         logger.info(
             "Ingested %d chunks from document: %s",
@@ -295,8 +295,8 @@ class HomeAssistantClient:
                                 new_s = edata.get("new_state")
                                 old_s = edata.get("old_state")
                                 if eid and new_s:
-                                    # Fire without blocking
-                                    asyncio.create_task(bus.emit(eid, new_s, old_s or {}))
+                                    # Only enqueues; subscribers run on their own workers.
+                                    bus.publish(eid, new_s, old_s or {})
             except Exception as e:
                 logger.error(f"HA WS disconnected: {e}. Reconnecting in 5s...")
                 await asyncio.sleep(5)
@@ -0,0 +1,235 @@
+"""
+providers/stt/streaming.py
+
+Incremental transcription for audio that arrives while the user is talking.
+
+The batch path waits for the whole clip, then decodes all of it: the user's
+trailing silence and the full decode both sit between "stopped talking" and
+"River Song starts thinking". StreamingTranscriber instead takes raw 16-bit
+16 kHz PCM chunks (what the AudioWorklet sends) as they arrive and:
+
+  - runs a frame-energy VAD over 30 ms frames;
+  - cuts speech into segments at short pauses and decodes each closed
+    segment straight away, while the user is still talking, so only the
+    last segment is left to decode at the end;
+  - re-decodes the open segment every STT_PARTIAL_INTERVAL_MS of new speech
+    and reports "committed segments + current guess" as a partial;
+  - declares the utterance over after STT_ENDPOINT_SILENCE_MS of silence,
+    so the turn can start without waiting for the client to stop recording.
+
+Decoding goes through the provider's own transcribe(), which runs inference
+on the provider's dedicated executor -- never the default one. Per stream at
+most one decode runs at a time; a partial is skipped rather than queued when
+a decode is already in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+import numpy as np
+
+from config.settings import get_settings
+from providers.base import STTProvider
+
+logger = logging.getLogger(__name__)
+
+# Same rate as providers.stt.audio.TARGET_SAMPLE_RATE; not imported from
+# there so the conversation loop does not pull in scipy/soundfile.
+TARGET_SAMPLE_RATE: int = 16_000
+FRAME_MS: int = 30
+FRAME_SAMPLES: int = TARGET_SAMPLE_RATE * FRAME_MS // 1000
+FRAME_BYTES: int = FRAME_SAMPLES * 2
+
+# Quiet frames kept ahead of a segment so soft word onsets are not clipped.
+_PRE_ROLL_FRAMES = 10
+
+PartialCallback = Callable[[str], Awaitable[None]]
+
+
+def frame_levels_db(pcm: bytes) -> np.ndarray:
+    """RMS level in dBFS of each whole 30 ms frame in 16-bit PCM `pcm`."""
+    usable = len(pcm) // FRAME_BYTES * FRAME_BYTES
+    if not usable:
+        return np.zeros(0, dtype=np.float32)
+    frames = np.frombuffer(pcm[:usable], dtype=np.int16).reshape(-1, FRAME_SAMPLES)
+    rms = np.sqrt(np.mean((frames.astype(np.float32) / 32768.0) ** 2, axis=1))
+    return 20.0 * np.log10(rms + 1e-10)
+
+
+class StreamingTranscriber:
+    """
+    One utterance's worth of streaming STT state. Not reusable.
+
+    Args:
+        stt:        Loaded STT provider; must accept raw 16 kHz PCM bytes.
+        on_partial: Awaited with the best transcript so far whenever it changes.
+    """
+
+    def __init__(self, stt: STTProvider,
+                 on_partial: Optional[PartialCallback] = None) -> None:
+        settings = get_settings()
+        self._stt = stt
+        self._on_partial = on_partial
+        self._threshold_db = settings.stt_vad_threshold_db
+        self._partial_interval_ms = settings.stt_partial_interval_ms
+        self._segment_silence_ms = settings.stt_segment_silence_ms
+        self._endpoint_silence_ms = settings.stt_endpoint_silence_ms
+        self._max_segment_bytes = int(
+            settings.stt_max_segment_seconds * TARGET_SAMPLE_RATE) * 2
+
+        self._audio = bytearray()
+        self._carry = b""
+        self._pre_roll: collections.deque = collections.deque(maxlen=_PRE_ROLL_FRAMES)
+        self._segment: Optional[bytearray] = None
+        self._generation = 0
+        self._silence_ms = 0
+        self._speech_since_partial_ms = 0
+        self._heard_speech = False
+
+        self._decode_lock = asyncio.Lock()
+        self._commits: List[asyncio.Task] = []
+        # Decoded text of each closed segment, None until its decode lands.
+        self._committed: List[Optional[str]] = []
+        self._partial_task: Optional[asyncio.Task] = None
+        self._partial_text = ""
+        self._last_emitted = ""
+        self._finished = False
+        self.endpointed = False
+
+    @property
+    def audio(self) -> bytes:
+        """Everything fed so far, as one PCM clip (for speaker ID)."""
+        return bytes(self._audio)
+
+    async def feed(self, pcm: bytes) -> bool:
+        """
+        Add a chunk of raw 16-bit 16 kHz mono PCM.
+
+        Returns:
+            True once the end of the utterance has been detected; the caller
+            should stop feeding and call finish().
+        """
+        if self._finished or self.endpointed or not pcm:
+            return self.endpointed
+        self._audio += pcm
+        data = self._carry + pcm
+        levels = frame_levels_db(data)
+        self._carry = data[len(levels) * FRAME_BYTES:]
+
+        for i, level in enumerate(levels):
+            self._step(data[i * FRAME_BYTES:(i + 1) * FRAME_BYTES],
+                       level >= self._threshold_db)
+            if self.endpointed:
+                break
+
+        if (self._segment is not None
+                and self._speech_since_partial_ms >= self._partial_interval_ms
+                and not self._decode_lock.locked()
+                and (self._partial_task is None or self._partial_task.done())):
+            self._speech_since_partial_ms = 0
+            self._partial_task = asyncio.create_task(
+                self._run_partial(bytes(self._segment), self._generation))
+        return self.endpointed
+
+    async def finish(self) -> str:
+        """
+        Decode whatever is still open and return the final transcript.
+
+        Raises:
+            RuntimeError: If decoding any segment failed.
+        """
+        self._finished = True
+        if self._segment is not None:
+            self._segment += self._carry
+            self._close_segment()
+        if self._partial_task is not None and not self._partial_task.done():
+            self._partial_task.cancel()
+        if not self._heard_speech and self._audio:
+            # The VAD never fired -- a quiet mic or a mistuned threshold.
+            # Decode the whole clip like the batch path would, rather than
+            # silently dropping the turn.
+            self._commits.append(asyncio.create_task(self._decode(self.audio)))
+        texts = await asyncio.gather(*self._commits)
+        return " ".join(t for t in texts if t).strip()
+
+    # -------------------------------------------------------------------------
+    # Segmentation
+    # -------------------------------------------------------------------------
+
+    def _step(self, frame: bytes, speech: bool) -> None:
+        if speech:
+            if self._segment is None:
+                self._segment = bytearray(b"".join(self._pre_roll))
+                self._pre_roll.clear()
+            self._segment += frame
+            self._heard_speech = True
+            self._silence_ms = 0
+            self._speech_since_partial_ms += FRAME_MS
+        else:
+            self._silence_ms += FRAME_MS
+            if self._segment is not None:
+                self._segment += frame
+                if self._silence_ms >= self._segment_silence_ms:
+                    self._close_segment()
+            else:
+                self._pre_roll.append(frame)
+            if self._heard_speech and self._silence_ms >= self._endpoint_silence_ms:
+                self.endpointed = True
+
+        if self._segment is not None and len(self._segment) >= self._max_segment_bytes:
+            self._close_segment()
+
+    def _close_segment(self) -> None:
+        pcm = bytes(self._segment or b"")
+        self._segment = None
+        self._generation += 1
+        self._speech_since_partial_ms = 0
+        self._partial_text = ""
+        self._committed.append(None)
+        self._commits.append(asyncio.create_task(
+            self._commit(pcm, len(self._committed) - 1)))
+
+    # -------------------------------------------------------------------------
+    # Decoding
+    # -------------------------------------------------------------------------
+
+    async def _decode(self, pcm: bytes) -> str:
+        async with self._decode_lock:
+            return (await self._stt.transcribe(pcm)).strip()
+
+    async def _commit(self, pcm: bytes, index: int) -> str:
+        text = await self._decode(pcm)
+        self._committed[index] = text
+        await self._emit()
+        return text
+
+    async def _run_partial(self, pcm: bytes, generation: int) -> None:
+        try:
+            text = await self._decode(pcm)
+        except Exception as exc:
+            logger.debug("Partial decode failed: %s", exc)
+            return
+        # The segment may have been committed while this was decoding.
+        if generation == self._generation and not self._finished:
+            self._partial_text = text
+            await self._emit()
+
+    async def _emit(self) -> None:
+        if self._on_partial is None:
+            return
+        committed: List[str] = []
+        for text in self._committed:
+            if text is None:
+                break
+            committed.append(text)
+        text = " ".join(t for t in committed + [self._partial_text] if t)
+        if text and text != self._last_emitted:
+            self._last_emitted = text
+            try:
+                await self._on_partial(text)
+            except Exception as exc:
+                logger.debug("Partial transcript callback failed: %s", exc)
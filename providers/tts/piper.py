@@ -4,32 +4,52 @@
 # Piper-backed Text-to-Speech provider for River Song AI.
 #
 # Piper (https://github.com/rhasspy/piper) is a fast, fully local neural
-# TTS engine. This provider shells out to the Piper binary, captures WAV
-# output to a temp file, reads the bytes, and returns them to the caller.
+# TTS engine. This provider keeps ONE resident Piper engine per voice model
+# and feeds it text for every sentence, so the ONNX voice is loaded once per
+# voice rather than once per sentence.
 #
-# The caller (ConversationLoop) base64-encodes the WAV bytes and sends them
-# to the browser over the WebSocket. Playback is handled entirely in the
-# browser via the Web Audio API. sounddevice is NOT used.
+# Two engines, same contract (text in, raw 16-bit mono PCM out):
+#
+#   binding -- the piper-tts Python package, loaded in-process. No pipes,
+#              no child process; PCM comes straight out of ONNX Runtime.
+#   process -- the Piper binary started once with --output_raw. Each line
+#              written to its stdin is one utterance; PCM streams back on
+#              stdout and Piper logs "Real-time factor" on stderr once the
+#              utterance is complete, which is the end-of-utterance marker.
+#
+# PIPER_ENGINE picks one (auto | binding | process). auto prefers the binding
+# and falls back to the binary, which is what every install had before.
+#
+# Nothing touches disk: WAV headers are built in memory around the PCM.
+#
+# The caller (ConversationLoop) forwards the PCM to the browser over the
+# WebSocket. Playback is handled entirely in the browser via the Web Audio
+# API. sounddevice is NOT used.
 #
 # Piper must be installed separately -- it is NOT available via pip.
 # Download from: https://github.com/rhasspy/piper/releases
 # Voice models: https://huggingface.co/rhasspy/piper-voices
 #
-# All subprocess calls run in a ThreadPoolExecutor to avoid blocking
-# the asyncio event loop.
+# All engine calls run in a single-worker ThreadPoolExecutor to avoid
+# blocking the asyncio event loop and to keep one utterance in flight per
+# engine.
 #
-# Required packages: (none beyond the standard library + subprocess)
+# Required packages: (none beyond the standard library; piper-tts optional)
 # =============================================================================
 
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 import os
+import selectors
+import struct
 import subprocess
-import tempfile
+import time
+import weakref
 from concurrent.futures import ThreadPoolExecutor
-from functools import partial
+from typing import AsyncGenerator, Iterator, List, Optional
 
 from config.settings import get_settings
 from providers.base import TTSProvider
@@ -37,41 +57,254 @@ from providers.base import TTSProvider
 
 logger = logging.getLogger(__name__)
 
+# Piper's voices are 22.05 kHz unless their .onnx.json says otherwise.
+_DEFAULT_SAMPLE_RATE = 22050
+# Seconds one utterance may take before the engine is considered wedged.
+_UTTERANCE_TIMEOUT = 60.0
+# Piper logs this on stderr after the last PCM byte of an utterance.
+_END_OF_UTTERANCE = b"Real-time factor"
+
+
+def _wav_header(sample_rate: int, data_len: Optional[int] = None) -> bytes:
+    """
+    Build a 44-byte PCM WAV header for 16-bit mono audio.
+
+    `data_len=None` produces a streaming header whose size fields are
+    0xFFFFFFFF, the conventional "length unknown" value that browsers and
+    soundfile both accept.
+    """
+    if data_len is None:
+        riff_len = data_len = 0xFFFFFFFF
+    else:
+        riff_len = 36 + data_len
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_len, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_len,
+    )
+
+
+def _read_sample_rate(model_path: str) -> int:
+    """Sample rate from the voice's .onnx.json sidecar, or Piper's default."""
+    try:
+        with open(model_path + ".json", "r", encoding="utf-8") as f:
+            return int(json.load(f)["audio"]["sample_rate"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return _DEFAULT_SAMPLE_RATE
+
+
+def _binding_available() -> bool:
+    try:
+        import piper  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class _BindingEngine:
+    """Piper loaded in-process through the piper-tts package."""
+
+    kind = "binding"
+
+    def __init__(self, model_path: str) -> None:
+        from piper import PiperVoice
+        self._voice = PiperVoice.load(model_path)
+        self.sample_rate = int(
+            getattr(self._voice.config, "sample_rate", 0)
+            or _read_sample_rate(model_path))
+
+    def synthesize_pcm(self, text: str) -> Iterator[bytes]:
+        # piper-tts 1.2 exposes raw bytes directly; 1.3+ yields AudioChunks.
+        if hasattr(self._voice, "synthesize_stream_raw"):
+            yield from self._voice.synthesize_stream_raw(text)
+            return
+        for chunk in self._voice.synthesize(text):
+            yield chunk.audio_int16_bytes
+
+    def close(self) -> None:
+        self._voice = None
+
+
+class _ProcessEngine:
+    """One long-lived Piper binary, fed one utterance per stdin line."""
+
+    kind = "process"
+
+    def __init__(self, piper_path: str, model_path: str) -> None:
+        self.sample_rate = _read_sample_rate(model_path)
+        try:
+            self._proc = subprocess.Popen(
+                [piper_path, "--model", model_path, "--output_raw"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=0,
+                shell=False,
+            )
+        except FileNotFoundError as exc:
+            raise RuntimeError(
+                f"Piper binary not found at '{piper_path}'. "
+                "Check PIPER_EXECUTABLE_PATH in .env."
+            ) from exc
+        os.set_blocking(self._proc.stdout.fileno(), False)
+        os.set_blocking(self._proc.stderr.fileno(), False)
+        self._stderr_tail: List[str] = []
+        # A finalizer rather than __del__: it runs even if the owner is
+        # collected mid-cycle, and never resurrects the object.
+        self._finalizer = weakref.finalize(self, _kill_process, self._proc)
+
+    def synthesize_pcm(self, text: str) -> Iterator[bytes]:
+        proc = self._proc
+        if proc.poll() is not None:
+            raise RuntimeError(self._exit_message())
+
+        # One line is one utterance -- embedded newlines would split it.
+        line = " ".join(text.split()) + "\n"
+        try:
+            proc.stdin.write(line.encode("utf-8"))
+            proc.stdin.flush()
+        except (BrokenPipeError, OSError) as exc:
+            raise RuntimeError(self._exit_message()) from exc
+
+        out_fd = proc.stdout.fileno()
+        err_fd = proc.stderr.fileno()
+        deadline = time.monotonic() + _UTTERANCE_TIMEOUT
+        err_buf = b""
+        with selectors.DefaultSelector() as sel:
+            sel.register(out_fd, selectors.EVENT_READ)
+            sel.register(err_fd, selectors.EVENT_READ)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.close()
+                    raise RuntimeError(
+                        f"Piper synthesis timed out after {_UTTERANCE_TIMEOUT:.0f} seconds.")
+                for key, _ in sel.select(timeout=remaining):
+                    if key.fd == out_fd:
+                        chunk = _read_available(out_fd)
+                        if chunk:
+                            yield chunk
+                        else:
+                            # EOF: stop polling it; stderr reports the exit.
+                            sel.unregister(out_fd)
+                        continue
+                    data = _read_available(err_fd)
+                    if not data:
+                        # EOF on stderr means the process is gone.
+                        proc.wait(timeout=5)
+                        raise RuntimeError(self._exit_message())
+                    err_buf += data
+                    *lines, err_buf = err_buf.split(b"\n")
+                    done = False
+                    for raw in lines:
+                        if _END_OF_UTTERANCE in raw:
+                            done = True
+                        else:
+                            self._remember_stderr(raw)
+                    if done:
+                        # The writer thread inside Piper has joined before
+                        # the log line is emitted, so every PCM byte is
+                        # already in the pipe -- drain it and stop.
+                        tail = _read_available(out_fd)
+                        while tail:
+                            yield tail
+                            tail = _read_available(out_fd)
+                        return
+
+    def _remember_stderr(self, raw: bytes) -> None:
+        text = raw.decode("utf-8", errors="replace").strip()
+        if text:
+            self._stderr_tail = (self._stderr_tail + [text])[-5:]
+
+    def _exit_message(self) -> str:
+        code = self._proc.poll()
+        detail = " | ".join(self._stderr_tail) or "no output"
+        return f"Piper exited with code {code}: {detail}"
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+def _read_available(fd: int) -> bytes:
+    """Non-blocking read of whatever is in the pipe right now."""
+    try:
+        return os.read(fd, 65536)
+    except BlockingIOError:
+        return b""
+
+
+def _kill_process(proc: subprocess.Popen) -> None:
+    if proc.poll() is not None:
+        return
+    try:
+        proc.stdin.close()
+        proc.wait(timeout=2)
+    except (OSError, subprocess.TimeoutExpired):
+        proc.kill()
+        proc.wait()
+
 
 class PiperTTS(TTSProvider):
     """
-    TTS provider that synthesizes speech using the local Piper binary.
+    TTS provider that synthesizes speech with a resident Piper engine.
 
-    synthesize() is fully async-safe. The Piper subprocess runs in a
-    worker thread so the event loop stays free during synthesis.
+    The engine is started on first use (or by warm_up()), reused for every
+    sentence after that, and stopped by close() -- ProviderPool calls that
+    once the voice has been idle long enough. A closed provider restarts its
+    engine transparently on the next call.
 
-    Returns raw WAV bytes -- no audio device is opened on the server.
+    synthesize() returns WAV bytes; stream_synthesize() yields a streaming
+    WAV header followed by PCM chunks as the engine produces them.
     """
 
     def __init__(self, model_path_override: str = "") -> None:
         settings = get_settings()
         self._piper_path: str = settings.piper_executable_path
         self._model_path: str = model_path_override or settings.piper_model_path
+        self._engine_choice: str = (
+            getattr(settings, "piper_engine", "auto") or "auto").lower()
 
-        # Single worker: TTS is sequential -- one response at a time.
+        # Single worker: one utterance in flight per engine.
         self._executor = ThreadPoolExecutor(
             max_workers=1, thread_name_prefix="piper"
         )
+        self._engine = None
+        self.last_used: float = time.monotonic()
 
         self._validate_configuration()
 
         logger.info(
-            "PiperTTS initialized (model=%s).",
+            "PiperTTS initialized (model=%s, engine=%s).",
             os.path.basename(self._model_path),
+            self._engine_choice,
         )
 
+    @property
+    def sample_rate(self) -> int:
+        if self._engine is not None:
+            return self._engine.sample_rate
+        return _read_sample_rate(self._model_path)
+
+    @property
+    def engine_running(self) -> bool:
+        """Whether a resident engine is up (close() or a crash stops it)."""
+        return self._engine is not None
+
+    async def warm_up(self) -> None:
+        """Start the resident engine now so the first sentence does not pay for it."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._ensure_engine)
+
+    async def close(self) -> None:
+        """Stop the resident engine. The next synthesis starts a fresh one."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._stop_engine)
+
     async def synthesize(self, text: str) -> bytes:
         """
         Synthesize text with Piper and return WAV file bytes.
 
-        The WAV bytes are sent to the browser over the WebSocket and played
-        there via the Web Audio API.
-
         Args:
             text: Plain text to synthesize. Empty strings return b"".
 
@@ -88,79 +321,113 @@ class PiperTTS(TTSProvider):
         logger.debug("Synthesizing %d characters with Piper.", len(cleaned))
 
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            self._executor,
-            partial(self._synthesize_to_bytes, cleaned),
-        )
+        pcm = await loop.run_in_executor(
+            self._executor, self._synthesize_to_bytes, cleaned)
+        if not pcm:
+            return b""
+        return _wav_header(self.sample_rate, len(pcm)) + pcm
 
-    def _synthesize_to_bytes(self, text: str) -> bytes:
+    async def stream_synthesize(
+            self, text: str) -> AsyncGenerator[bytes, None]:
         """
-        Shell out to Piper, write WAV to a temp file, read bytes, clean up.
+        Yield a streaming WAV header, then PCM chunks as Piper produces them.
+
+        The first PCM chunk reaches the caller while the rest of the sentence
+        is still being synthesized.
         """
-        wav_path: str | None = None
-        try:
-            with tempfile.NamedTemporaryFile(
-                suffix=".wav", delete=False, prefix="riversong_tts_"
-            ) as tmp:
-                wav_path = tmp.name
+        if not text or not text.strip():
+            return
 
-            self._run_piper(text, wav_path)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        abandoned = False
+        finished = object()
 
-            with open(wav_path, "rb") as f:
-                return f.read()
+        def _produce() -> None:
+            try:
+                for chunk in self._iter_pcm(text.strip()):
+                    # Keep draining after the consumer leaves: the process
+                    # engine must reach end-of-utterance or the next call
+                    # would read this sentence's leftovers.
+                    if chunk and not abandoned:
+                        loop.call_soon_threadsafe(queue.put_nowait, chunk)
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+            except BaseException as exc:  # noqa: BLE001 -- re-raised below
+                loop.call_soon_threadsafe(queue.put_nowait, exc)
 
+        loop.run_in_executor(self._executor, _produce)
+        header_sent = False
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                if not header_sent:
+                    header_sent = True
+                    yield _wav_header(self.sample_rate)
+                yield item
         finally:
-            if wav_path and os.path.exists(wav_path):
-                try:
-                    os.unlink(wav_path)
-                except OSError as exc:
-                    logger.warning(
-                        "Could not delete temp WAV '%s': %s", wav_path, exc)
-
-    def _run_piper(self, text: str, output_wav_path: str) -> None:
-        """
-        Invoke the Piper binary to synthesize text into a WAV file.
+            abandoned = True
 
-        Raises:
-            RuntimeError: If Piper times out or exits with a non-zero code.
-        """
-        command = [
-            self._piper_path,
-            "--model", self._model_path,
-            "--output_file", output_wav_path,
-        ]
+    def _synthesize_to_bytes(self, text: str) -> bytes:
+        """Run one utterance through the resident engine and return its PCM."""
+        return b"".join(self._iter_pcm(text))
 
+    def _iter_pcm(self, text: str) -> Iterator[bytes]:
+        """Executor-thread generator over one utterance's PCM chunks."""
+        engine = self._ensure_engine()
+        self.last_used = time.monotonic()
         try:
-            result = subprocess.run(
-                command,
-                input=text.encode("utf-8"),
-                capture_output=True,
-                timeout=60,
-                shell=False,
-            )
-        except subprocess.TimeoutExpired as exc:
-            raise RuntimeError(
-                "Piper synthesis timed out after 60 seconds.") from exc
-        except FileNotFoundError as exc:
-            raise RuntimeError(
-                f"Piper binary not found at '{self._piper_path}'. "
-                "Check PIPER_EXECUTABLE_PATH in .env."
-            ) from exc
+            yield from engine.synthesize_pcm(text)
+        except RuntimeError:
+            # A broken engine is not reused; the next call starts a new one.
+            self._stop_engine()
+            raise
+        finally:
+            self.last_used = time.monotonic()
 
-        if result.returncode != 0:
-            stderr = result.stderr.decode("utf-8", errors="replace")
-            raise RuntimeError(
-                f"Piper exited with code {result.returncode}: {stderr}")
+    def _ensure_engine(self):
+        if self._engine is not None:
+            return self._engine
+        started = time.monotonic()
+        use_binding = self._engine_choice == "binding" or (
+            self._engine_choice == "auto" and _binding_available())
+        if use_binding:
+            self._engine = _BindingEngine(self._model_path)
+        else:
+            self._engine = _ProcessEngine(self._piper_path, self._model_path)
+        logger.info(
+            "Piper %s engine started for %s in %.0f ms.",
+            self._engine.kind,
+            os.path.basename(self._model_path),
+            (time.monotonic() - started) * 1000,
+        )
+        return self._engine
 
-        logger.debug("Piper synthesis complete -> '%s'.", output_wav_path)
+    def _stop_engine(self) -> None:
+        engine, self._engine = self._engine, None
+        if engine is not None:
+            engine.close()
+            logger.info(
+                "Piper engine stopped for %s.",
+                os.path.basename(self._model_path))
 
     def _validate_configuration(self) -> None:
+        if self._engine_choice not in ("auto", "binding", "process"):
+            raise ValueError(
+                f"Unsupported PIPER_ENGINE '{self._engine_choice}'. "
+                "Supported values: auto | binding | process"
+            )
         if not self._model_path:
             raise ValueError(
                 "PIPER_MODEL_PATH is not set. "
                 "Add it to .env pointing to your .onnx voice model file."
             )
-        if not os.path.isfile(self._piper_path):
+        needs_binary = self._engine_choice == "process" or (
+            self._engine_choice == "auto" and not _binding_available())
+        if needs_binary and not os.path.isfile(self._piper_path):
             raise FileNotFoundError(
                 f"Piper executable not found at '{self._piper_path}'. "
                 "Install Piper and set PIPER_EXECUTABLE_PATH in .env."
@@ -102,6 +102,22 @@ class VaultProvider:
 
         return target
 
+    def _owner_of(self, user_id: str, virtual_path: str) -> tuple[str, str]:
+        """
+        (owner_kind, owner_id) of the vault_notes row behind a virtual path,
+        as VaultWatcher indexes it. Virtual paths are only unique per owner.
+        """
+        root_key = virtual_path.split("/", 1)[0].lower()
+        if root_key == VROOT_SHARED:
+            return "shared", VROOT_SHARED
+        if root_key == VROOT_HOUSEHOLD:
+            household = self._get_roots(user_id).get(VROOT_HOUSEHOLD)
+            if household is None:
+                raise PermissionError(
+                    f"Root '{root_key}' not found or access denied.")
+            return "household", household.name
+        return "user", user_id
+
     def _to_virtual(self, user_id: str, physical_path: Path) -> str:
         """Convert a physical path back to a virtual path."""
         roots = self._get_roots(user_id)
@@ -261,6 +277,8 @@ class VaultProvider:
         await loop.run_in_executor(None, os.replace, target, dest)
 
         if self.store:
+            await self.store.delete_vault_note_by_path(
+                *self._owner_of(user_id, virtual_path), virtual_path)
             await self.store.log_vault_audit(user_id, "DELETE", virtual_path)
 
     async def rename_note(self, user_id: str, old_vpath: str,
@@ -290,65 +308,48 @@ class VaultProvider:
 
         stat = new_target.stat()
         if self.store:
+            await self.store.rename_vault_note_path(
+                *self._owner_of(user_id, old_vpath), old_vpath, new_vpath)
             await self.store.log_vault_audit(user_id, "RENAME", f"{old_vpath} -> {new_vpath}")
 
         return {"mtime": stat.st_mtime, "size": stat.st_size}
 
     async def search_text(self, user_id: str, query: str,
                           limit: int = 50) -> list[dict]:
-        """Substring search over filename AND content."""
+        """
+        Full-text search over titles, bodies and tags of every note the user
+        can reach (personal, household, shared), best match first.
+
+        Backed by the vault_notes_fts index that VaultWatcher maintains, so
+        no files are read here. Each result carries `virtual_path`, `title`,
+        `rank` and a `snippet` of the matching body text.
+        """
         if not self.store:
             return []
 
-        # 1. Start with metadata search from DB
-        meta_results = await self.store.search_vault_notes(user_id, query, limit)
-
-        # 2. Augment with basic content grep
-        results = {r["virtual_path"]: r for r in meta_results}
-
-        # Use the same roots resolution as the rest of the provider
-        user_roots = self._get_roots(user_id)
-
-        for v_prefix, root_path in user_roots.items():
-            if not root_path.exists():
-                continue
-            for p in root_path.rglob("*.md"):
-                v_path = self._to_virtual(user_id, p)
-                if v_path in results:
-                    continue
-
-                try:
-                    stat = p.stat()
-                    if stat.st_size > 1_048_576:  # 1MB limit
-                        logger.debug("search_text: skipping large file %s", p)
-                        continue
-
-                    content = p.read_text("utf-8")
-                    if query.lower() in content.lower():
-                        results[v_path] = {
-                            "virtual_path": v_path,
-                            "title": p.stem,
-                        }
-                except (OSError, UnicodeDecodeError) as e:
-                    logger.debug("search_text: failed to read %s: %s", p, e)
-                    continue
-                except Exception as e:
-                    logger.warning(
-                        "search_text: unexpected error reading %s: %s", p, e)
-                    continue
-
-                if len(results) >= limit:
-                    break
-            if len(results) >= limit:
-                break
-
-        return list(results.values())[:limit]
+        household = self._get_roots(user_id).get(VROOT_HOUSEHOLD)
+        rows = await self.store.search_vault_notes(
+            user_id, query, limit,
+            household_id=household.name if household is not None else None)
+        return [
+            {
+                "virtual_path": r["virtual_path"],
+                "title": r.get("title") or Path(r["virtual_path"]).stem,
+                "rank": r.get("rank"),
+                "snippet": r.get("snippet") or "",
+            }
+            for r in rows
+        ]
 
     async def get_backlinks(self, user_id: str,
                             virtual_path: str) -> list[dict]:
         if not self.store:
             return []
-        note = await self.store.get_vault_note_by_path(virtual_path)
+        try:
+            owner = self._owner_of(user_id, virtual_path)
+        except PermissionError:
+            return []
+        note = await self.store.get_vault_note_by_path(*owner, virtual_path)
         if not note or not note.get("title"):
             return []
         return await self.list_vault_backlinks(note["title"])
@@ -378,18 +379,19 @@ class VaultWatcher(FileSystemEventHandler):
     def on_any_event(self, event):
         if event.is_directory:
             return
-        if event.event_type not in ("created", "modified", "moved"):
+        if event.event_type not in ("created", "modified", "moved", "deleted"):
             return
 
-        path = event.src_path
+        paths = [event.src_path]
         if event.event_type == "moved":
-            path = event.dest_path
-
-        if not path.endswith(".md"):
-            return
+            # The source is gone (a missing file is dropped from the index),
+            # the destination is new -- unless it went to .trash.
+            paths.append(event.dest_path)
 
-        # We use threadsafe methods because watchdog runs in its own thread
-        self.loop.call_soon_threadsafe(self._debounce, path)
+        for path in paths:
+            if path.endswith(".md"):
+                # We use threadsafe methods because watchdog runs in its own thread
+                self.loop.call_soon_threadsafe(self._debounce, path)
 
     def _debounce(self, path: str):
         if path in self.debounce_timer:
@@ -403,7 +405,15 @@ class VaultWatcher(FileSystemEventHandler):
                 Path(physical_path)),
             self.loop)
 
-    async def _index_file(self, p: Path):
+    async def _index_file(self, p: Path,
+                          pending_vectors: Optional[list] = None):
+        """
+        Index one note into SQLite and the vector store.
+
+        With `pending_vectors`, the note's (id, text, metadata) is appended
+        there instead of being embedded now, so a bulk walk can hand many
+        notes to VectorStore.upsert_many at once.
+        """
         logger.info("Indexing file: %s", p)
         if not self.provider.store:
             logger.warning("No store available for indexing")
@@ -420,24 +430,41 @@ class VaultWatcher(FileSystemEventHandler):
         if vault_idx == -1 or len(parts) <= vault_idx + 2:
             return
 
-        kind_dir = parts[vault_idx + 1]  # "users" or "households"
-        owner_id = parts[vault_idx + 2]
-        owner_kind = "user" if kind_dir == "users" else "household"
-
-        rel_parts = parts[vault_idx + 3:]
-        v_prefix = VROOT_PERSONAL if owner_kind == "user" else VROOT_HOUSEHOLD
+        kind_dir = parts[vault_idx + 1]  # "users", "households" or "shared"
+        if kind_dir == "shared":
+            owner_kind, owner_id = "shared", VROOT_SHARED
+            rel_parts = parts[vault_idx + 2:]
+            v_prefix = VROOT_SHARED
+        elif kind_dir in ("users", "households"):
+            owner_id = parts[vault_idx + 2]
+            owner_kind = "user" if kind_dir == "users" else "household"
+            rel_parts = parts[vault_idx + 3:]
+            v_prefix = VROOT_PERSONAL if owner_kind == "user" else VROOT_HOUSEHOLD
+        else:
+            return  # .trash and anything else outside the roots
         virtual_path = "/".join([v_prefix] + list(rel_parts))
 
-        if not p.exists():
+        def _read():
+            if not p.exists():
+                return None
+            return p.read_text("utf-8"), p.stat()
+
+        try:
+            loaded = await asyncio.to_thread(_read)
+        except Exception as e:
+            logger.error("Failed to read file %s: %s", p, e)
+            return
+        if loaded is None:
             # Likely deleted or moved
-            await self.provider.store.delete_vault_note_by_path(virtual_path)
+            await self.provider.store.delete_vault_note_by_path(
+                owner_kind, owner_id, virtual_path)
             return
 
         try:
-            content = p.read_text("utf-8")
+            content, stat = loaded
             title = self._extract_title(content, p.stem)
             links = self._extract_links(content)
-            stat = p.stat()
+            tags = self._extract_tags(content)
 
             await self.provider.store.upsert_vault_note(
                 owner_kind=owner_kind,
@@ -446,27 +473,32 @@ class VaultWatcher(FileSystemEventHandler):
                 title=title,
                 size=stat.st_size,
                 mtime=stat.st_mtime,
-                links=links
+                links=links,
+                body=content,
+                tags=tags,
             )
 
             # Semantic indexing (A.2.2)
             settings = get_settings()
             if settings.semantic_memory_enabled:
-                from providers.memory.vector_store import VectorStore
-                vstore = VectorStore()
                 # We use the virtual path as the ID for note segments
                 # For now, we embed the whole note if it's small, or just the title + snippet
                 # Actually, Chroma handles documents fine.
-                await vstore.upsert(
-                    id=f"note:{virtual_path}",
-                    text=f"Note: {title}\n\n{content}",
-                    metadata={
+                item = (
+                    f"note:{virtual_path}",
+                    f"Note: {title}\n\n{content}",
+                    {
                         "type": "note",
                         "user_id": owner_id if owner_kind == "user" else "household",
                         "path": virtual_path,
                         "title": title
-                    }
+                    },
                 )
+                if pending_vectors is not None:
+                    pending_vectors.append(item)
+                else:
+                    from providers.memory.vector_store import VectorStore
+                    await VectorStore().upsert(*item)
 
         except Exception as e:
             logger.error("Failed to index file %s: %s", p, e)
@@ -478,6 +510,26 @@ class VaultWatcher(FileSystemEventHandler):
             return match.group(1).strip()
         return default
 
+    def _extract_tags(self, content: str) -> list[str]:
+        # Front-matter `tags: [a, b]` / `tags: a, b` / a YAML list, plus
+        # inline #tags in the body.
+        tags: list[str] = []
+        fm = re.match(r"^---\n(.*?)\n---", content, re.DOTALL)
+        if fm:
+            block = re.search(r"^tags:[ \t]*(.*)$((?:\n[ \t]*-[ \t]*.+)*)",
+                              fm.group(1), re.MULTILINE)
+            if block:
+                inline = block.group(1).strip().strip("[]")
+                tags += [t.strip().strip("'\"") for t in inline.split(",")]
+                tags += re.findall(r"-[ \t]*(.+)", block.group(2))
+        tags += re.findall(r"(?:^|\s)#([\w/-]+)", content)
+        seen: dict = {}
+        for t in tags:
+            t = t.strip().lstrip("#")
+            if t:
+                seen.setdefault(t.lower(), t)
+        return list(seen.values())
+
     def _extract_links(self, content: str) -> list[str]:
         # Regex [[title]] or [[title|alias]]
         links = re.findall(r"\[\[([^\]|]+)(?:\|[^\]]+)?\]\]", content)
@@ -510,8 +562,18 @@ def start_vault_watcher(app):
     # Initial indexing walk (A.2.2)
     async def _walk():
         logger.info("CHRONOS: Performing initial vault indexing walk...")
+        from providers.memory.vector_store import VectorStore
+        vstore = None
+        pending: list = []
+        flush_at = settings.embedding_batch_size * settings.embedding_concurrency
         for p in base_vault.rglob("*.md"):
-            await handler._index_file(p)
+            await handler._index_file(p, pending_vectors=pending)
+            if len(pending) >= flush_at:
+                vstore = vstore or VectorStore()
+                await vstore.upsert_many(pending)
+                pending = []
+        if pending:
+            await (vstore or VectorStore()).upsert_many(pending)
         logger.info("CHRONOS: Initial walk complete.")
 
     asyncio.create_task(_walk())
@@ -3,6 +3,10 @@ providers/voice_id/voice_id_provider.py
 
 Speaker-identification provider using Resemblyzer.
 Local-only, no network calls, biometric data never leaves disk.
+
+Enrolled samples are scored as one matrix (providers/print_matrix.py): a
+single matrix-vector product and a per-user max, not a Python loop over
+every user and sample.
 """
 from __future__ import annotations
 
@@ -20,6 +24,8 @@ from typing import Optional
 import numpy as np
 import soundfile as sf
 
+from providers.print_matrix import PrintMatrix
+
 logger = logging.getLogger(__name__)
 
 VOICE_PRINTS_ROOT = "data/voice_prints"
@@ -45,9 +51,8 @@ class VoiceIDProvider:
     def __init__(self):
         self._encoder = None  # lazy-loaded Resemblyzer encoder
         self._executor = ThreadPoolExecutor(max_workers=1)
-        # In-memory cache: user_id -> list[np.ndarray] of embeddings
-        self._cache: dict[str, list[np.ndarray]] = {}
-        self._cache_loaded = False
+        # Every enrolled embedding, normalised, as one matrix.
+        self._prints = PrintMatrix(VOICE_PRINTS_ROOT)
         # Per-user async lock to serialize read-modify-write of manifest.json
         # (audit LOGIC-001). asyncio.Lock is fine here — enroll runs once per
         # HTTP request and the lock is held only across the executor call.
@@ -61,23 +66,12 @@ class VoiceIDProvider:
         return self._encoder
 
     def _load_cache(self) -> None:
-        """Walk VOICE_PRINTS_ROOT and load all .npy embeddings into RAM."""
-        if not os.path.isdir(VOICE_PRINTS_ROOT):
-            self._cache_loaded = True
-            return
-        for user_id in os.listdir(VOICE_PRINTS_ROOT):
-            user_dir = os.path.join(VOICE_PRINTS_ROOT, user_id)
-            if not os.path.isdir(user_dir):
-                continue
-            embeddings = []
-            for fname in sorted(os.listdir(user_dir)):
-                if fname.endswith(".npy"):
-                    embeddings.append(np.load(os.path.join(user_dir, fname)))
-            if embeddings:
-                self._cache[user_id] = embeddings
-        self._cache_loaded = True
-        logger.info(
-            f"Voice ID cache loaded: {len(self._cache)} enrolled users.")
+        """Map the print matrix (built from VOICE_PRINTS_ROOT if needed)."""
+        first = not self._prints.loaded
+        self._prints.refresh()
+        if first:
+            logger.info(
+                f"Voice ID cache loaded: {len(self._prints)} enrolled users.")
 
     def _wav_to_array(self, wav_bytes: bytes) -> np.ndarray:
         """Decode WAV bytes to a float32 numpy array at 16kHz mono."""
@@ -97,6 +91,10 @@ class VoiceIDProvider:
             wav = self._wav_to_array(wav_bytes)
             embedding = enc.embed_utterance(wav)  # shape (256,)
 
+            # Current before the sample file lands, so a rebuild cannot pick
+            # the new sample up from disk and append() add it a second time.
+            self._load_cache()
+
             user_dir = os.path.join(VOICE_PRINTS_ROOT, user_id)
             os.makedirs(user_dir, exist_ok=True, mode=0o700)
 
@@ -111,8 +109,7 @@ class VoiceIDProvider:
                 f.write(wav_bytes)
             np.save(npy_path, embedding)
 
-            # Update cache
-            self._cache.setdefault(user_id, []).append(embedding)
+            self._prints.append(user_id, embedding)
 
             # Update manifest atomically: read existing (if any), increment,
             # write to a tmp file, os.replace into place. The per-user
@@ -137,16 +134,7 @@ class VoiceIDProvider:
             _atomic_write_json(manifest_path, manifest)
 
             # Compute mean self-similarity for the response
-            embs = self._cache[user_id]
-            if len(embs) > 1:
-                sims = []
-                for i in range(len(embs)):
-                    for j in range(i + 1, len(embs)):
-                        sims.append(float(np.dot(embs[i], embs[j]) /
-                                          (np.linalg.norm(embs[i]) * np.linalg.norm(embs[j]))))
-                mean_sim = sum(sims) / len(sims)
-            else:
-                mean_sim = 1.0
+            mean_sim = self._prints.self_similarity(user_id)
 
             return {"sample_count": n, "mean_self_similarity": mean_sim}
 
@@ -157,30 +145,19 @@ class VoiceIDProvider:
     async def identify(self, wav_bytes: bytes,
                        threshold: float = 0.75) -> Optional[dict]:
         """Return {user_id, score, runner_up_user_id, runner_up_score} or None below threshold."""
-        if not self._cache_loaded:
-            await asyncio.get_running_loop().run_in_executor(self._executor, self._load_cache)
-        if not self._cache:
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._load_cache)
+        if not len(self._prints):
             return None
 
         def _sync():
             enc = self._ensure_encoder()
             wav = self._wav_to_array(wav_bytes)
             query_emb = enc.embed_utterance(wav)
-            qn = np.linalg.norm(query_emb)
-
-            best_user, best_score = None, -1.0
-            second_user, second_score = None, -1.0
-            for user_id, embs in self._cache.items():
-                # Max cosine across this user's samples
-                user_max = max(
-                    float(np.dot(query_emb, e) / (qn * np.linalg.norm(e)))
-                    for e in embs
-                )
-                if user_max > best_score:
-                    second_user, second_score = best_user, best_score
-                    best_user, best_score = user_id, user_max
-                elif user_max > second_score:
-                    second_user, second_score = user_id, user_max
+
+            # Best and runner-up users by max cosine over their samples
+            ranked = self._prints.rank(query_emb)
+            best_user, best_score = ranked[0] if ranked else (None, -1.0)
+            second_user, second_score = ranked[1] if len(ranked) > 1 else (None, -1.0)
 
             if best_user is None or best_score < threshold:
                 return {
@@ -206,7 +183,8 @@ class VoiceIDProvider:
                 return
             import shutil
             shutil.rmtree(user_dir)
-            self._cache.pop(user_id, None)
+            if self._prints.loaded:
+                self._prints.remove_user(user_id)
         loop = asyncio.get_running_loop()
         await loop.run_in_executor(self._executor, _sync)
 
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_intent_router.py
+
+Micro-benchmark for intent scoring, the step that runs on every voice turn
+before any LLM call. Compares the per-intent reference scorer
+(IntentRouter._compute_score, one substring test per phrase and keyword)
+with the compiled Aho-Corasick matcher the router actually uses, over the
+transcript corpus in scripts/intent_transcripts.txt, and checks the two
+agree on every score.
+
+Usage:
+  python scripts/bench_intent_router.py [--rounds 200] [--corpus PATH]
+
+Needs a configured .env (settings load on import), same as the server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.intent_router import (  # noqa: E402
+    INTENT_REGISTRY,
+    IntentRouter,
+    _IntentMatcher,
+)
+
+_DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "intent_transcripts.txt")
+
+
+def load_corpus(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f
+                if line.strip() and not line.startswith("#")]
+
+
+def reference_scores(transcript: str) -> list[float]:
+    lower = transcript.lower()
+    return [IntentRouter._compute_score(lower, i) for i in INTENT_REGISTRY]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--corpus", default=_DEFAULT_CORPUS)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    started = time.perf_counter()
+    matcher = _IntentMatcher(INTENT_REGISTRY)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    mismatches = [t for t in corpus
+                  if matcher.scores(t.lower()) != reference_scores(t)]
+    if mismatches:
+        print(f"MISMATCH on {len(mismatches)} transcripts, e.g. {mismatches[0]!r}")
+        return 1
+
+    def timed(fn) -> float:
+        t0 = time.perf_counter()
+        for _ in range(args.rounds):
+            for t in corpus:
+                fn(t)
+        return (time.perf_counter() - t0) / (args.rounds * len(corpus)) * 1e6
+
+    ref_us = timed(reference_scores)
+    compiled_us = timed(lambda t: matcher.scores(t.lower()))
+
+    patterns = sum(len(i.phrases) + len(i.keywords) for i in INTENT_REGISTRY)
+    print(f"{len(INTENT_REGISTRY)} intents, {patterns} phrases/keywords, "
+          f"{len(corpus)} transcripts x {args.rounds} rounds")
+    print(f"compile:   {build_ms:8.2f} ms (once)")
+    print(f"reference: {ref_us:8.2f} us/transcript")
+    print(f"compiled:  {compiled_us:8.2f} us/transcript "
+          f"({ref_us / compiled_us:.1f}x)")
+    print("scores identical on every transcript")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
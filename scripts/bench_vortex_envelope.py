@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+scripts/bench_vortex_envelope.py
+
+Micro-benchmark for the orb's amplitude envelope, computed for every spoken
+answer on a Vortex unit. Compares the per-sample Python loop the hub used to
+run (kept below as the reference, decimated as it was) with the vectorised
+amplitude_envelope, and times the streaming path that measures PCM chunks as
+they leave TTS. Checks the vectorised envelope against the reference run
+without decimation, where the two must agree.
+
+Usage:
+  python scripts/bench_vortex_envelope.py [--seconds 10] [--rate 22050] [--rounds 50]
+
+Needs a configured .env (settings load on import), same as the server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import math
+import os
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.vortex_hub import (  # noqa: E402
+    AMPLITUDE_HZ,
+    _LiveEnvelope,
+    amplitude_envelope,
+)
+
+# Roughly what one TTS stream_synthesize() chunk carries.
+_CHUNK_BYTES = 4096
+
+
+def speech_like_wav(seconds: float, rate: int) -> bytes:
+    """A tone under a syllable-rate envelope: loud, quiet, loud, like talking."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(rate)
+        frames = bytearray()
+        for i in range(int(seconds * rate)):
+            t = i / rate
+            level = 0.2 + 0.8 * abs(math.sin(2 * math.pi * 3 * t))
+            frames += int(28000 * level * math.sin(2 * math.pi * 180 * t)).to_bytes(
+                2, "little", signed=True)
+        handle.writeframes(bytes(frames))
+    return buffer.getvalue()
+
+
+def reference_envelope(wav_bytes: bytes, decimate: bool = True) -> list[float]:
+    """The loop amplitude_envelope used to be (decimate=True)."""
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+        channels = wav.getnchannels()
+        framerate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+    samples_per_window = max(1, int(framerate / AMPLITUDE_HZ))
+    bytes_per_frame = 2 * channels
+    total_frames = len(frames) // bytes_per_frame
+    stride = max(1, samples_per_window // 32) if decimate else 1
+    peaks = []
+    for start in range(0, total_frames, samples_per_window):
+        end = min(start + samples_per_window, total_frames)
+        peak = 0
+        for frame_index in range(start, end, stride):
+            offset = frame_index * bytes_per_frame
+            value = int.from_bytes(frames[offset:offset + 2], "little", signed=True)
+            peak = max(peak, -value if value < 0 else value)
+        peaks.append(peak / 32768.0)
+    loudest = max(peaks, default=0.0)
+    if loudest <= 0.001:
+        return []
+    return [round(min(1.0, (p / loudest) ** 0.7), 4) for p in peaks]
+
+
+def streamed(pcm: bytes, rate: int) -> list[float]:
+    live = _LiveEnvelope(rate, 1)
+    for i in range(0, len(pcm), _CHUNK_BYTES):
+        live.feed(pcm[i:i + _CHUNK_BYTES])
+    return live.values
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=int, default=22050)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    wav_bytes = speech_like_wav(args.seconds, args.rate)
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+        pcm = wav.readframes(wav.getnframes())
+
+    exact = reference_envelope(wav_bytes, decimate=False)
+    vectorised = amplitude_envelope(wav_bytes)
+    worst = max((abs(a - b) for a, b in zip(exact, vectorised)), default=0.0)
+    if len(exact) != len(vectorised) or worst > 1e-3:
+        print(f"MISMATCH: {len(exact)} vs {len(vectorised)} windows, "
+              f"max difference {worst:.4f}")
+        return 1
+
+    def timed(fn) -> float:
+        t0 = time.perf_counter()
+        for _ in range(args.rounds):
+            fn()
+        return (time.perf_counter() - t0) / args.rounds * 1000
+
+    async def _streamed() -> float:
+        # _LiveEnvelope owns an asyncio.Event, so build it inside a loop.
+        return timed(lambda: streamed(pcm, args.rate))
+
+    ref_ms = timed(lambda: reference_envelope(wav_bytes))
+    vec_ms = timed(lambda: amplitude_envelope(wav_bytes))
+    stream_ms = asyncio.run(_streamed())
+    chunks = math.ceil(len(pcm) / _CHUNK_BYTES)
+
+    print(f"{args.seconds:g}s of {args.rate} Hz mono, {len(exact)} windows, "
+          f"{args.rounds} rounds")
+    print(f"reference:  {ref_ms:8.3f} ms/utterance (decimated loop)")
+    print(f"vectorised: {vec_ms:8.3f} ms/utterance ({ref_ms / vec_ms:.0f}x)")
+    print(f"streamed:   {stream_ms:8.3f} ms/utterance over {chunks} chunks "
+          f"({stream_ms / chunks * 1000:.1f} us/chunk)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+tests/test_agent_loop.py
+
+core/agent_loop.run_agent_loop: several tool calls from one model response
+run concurrently where their concurrency class allows it, and history and
+receipts come back in the order the model asked for them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from core import agent_loop
+from core.agent_loop import _plan_waves, run_agent_loop
+from core.tools import (
+    TOOL_CONCURRENCY_EXCLUSIVE,
+    TOOL_CONCURRENCY_PARALLEL,
+    TOOL_CONCURRENCY_SERIAL,
+    tool_concurrency,
+)
+
+
+class _ScriptedLLM:
+    """Returns one batch of tool calls, then a text answer."""
+
+    def __init__(self, *calls):
+        self.calls = [
+            {"tool_name": name, "tool_input": args, "tool_use_id": f"toolu_{i}"}
+            for i, (name, args) in enumerate(calls)
+        ]
+        self.rounds = 0
+
+    async def chat_with_tools(self, messages, tools):
+        self.rounds += 1
+        if self.rounds == 1:
+            return {"type": "tool_call", **self.calls[0], "tool_calls": self.calls}
+        return {"type": "text", "content": "done"}
+
+
+class ClaudeAPILLM(_ScriptedLLM):
+    """Same script, but named like the provider whose history shape differs."""
+
+
+def _run(llm, execute):
+    events, history = [], []
+
+    async def on_event(evt):
+        events.append(evt)
+
+    async def append(role, content, extra=None):
+        history.append((role, content, extra))
+
+    text, receipts = asyncio.run(run_agent_loop(
+        llm, [{"role": "system", "content": "sys"}], [], execute,
+        on_event, append, user_id="u1"))
+    return text, receipts, history, events
+
+
+def test_concurrency_classes():
+    assert tool_concurrency("get_weather") == TOOL_CONCURRENCY_PARALLEL
+    assert tool_concurrency("control_device") == TOOL_CONCURRENCY_SERIAL
+    assert tool_concurrency("run_sandbox_code") == TOOL_CONCURRENCY_EXCLUSIVE
+    # Writers, and anything not classified, never run concurrently.
+    for name in ("add_shopping_list_item", "set_timer", "save_vault_note", "a_new_tool"):
+        assert tool_concurrency(name) == TOOL_CONCURRENCY_SERIAL
+
+
+def test_parallel_tools_overlap_and_history_keeps_model_order():
+    delays = {"web_search": 0.15, "get_weather": 0.01}
+
+    async def execute(name, args, ctx):
+        await asyncio.sleep(delays[name])
+        return f"{name} ok"
+
+    start = time.monotonic()
+    text, receipts, history, events = _run(
+        _ScriptedLLM(("web_search", {"q": "x"}), ("get_weather", {})), execute)
+    elapsed = time.monotonic() - start
+
+    assert text == "done"
+    assert elapsed < 0.15 + 0.01 + 0.1  # overlapped, not summed
+    # The faster tool finishes first...
+    results = [e["tool"] for e in events if e["type"] == "tool_result"]
+    assert results == ["get_weather", "web_search"]
+    # ...but history and receipts follow the model's order.
+    assert history[0][0] == "assistant"
+    assert [c["function"]["name"] for c in history[0][2]["tool_calls"]] == ["web_search", "get_weather"]
+    assert [h[1] for h in history[1:]] == ["web_search ok", "get_weather ok"]
+    assert [r["tool"] for r in receipts] == ["web_search", "get_weather"]
+
+
+def test_claude_gets_one_message_per_side_with_matching_ids():
+    async def execute(name, args, ctx):
+        return name
+
+    _, _, history, _ = _run(
+        ClaudeAPILLM(("web_search", {}), ("get_weather", {})), execute)
+    (a_role, uses, _), (u_role, results, _) = history
+    assert (a_role, u_role) == ("assistant", "user")
+    assert [b["id"] for b in uses] == [b["tool_use_id"] for b in results] == ["toolu_0", "toolu_1"]
+
+
+def test_serial_tools_never_overlap_each_other():
+    running = 0
+    peak = 0
+
+    async def execute(name, args, ctx):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return "ok"
+
+    _run(_ScriptedLLM(
+        ("control_device", {"id": 1}), ("control_device", {"id": 2}),
+        ("control_device", {"id": 3})), execute)
+    assert peak == 1
+
+
+def test_exclusive_tool_runs_alone():
+    assert _plan_waves([
+        {"tool_name": "get_weather"}, {"tool_name": "run_sandbox_code"},
+        {"tool_name": "web_search"}, {"tool_name": "search_vault"},
+    ]) == [[0], [1], [2, 3]]
+
+
+def test_a_write_splits_the_reads_around_it():
+    # Reads before the write finish first; the read after it sees the write.
+    assert _plan_waves([
+        {"tool_name": "read_shopping_list"}, {"tool_name": "get_weather"},
+        {"tool_name": "add_shopping_list_item"}, {"tool_name": "set_timer"},
+        {"tool_name": "read_shopping_list"}, {"tool_name": "web_search"},
+    ]) == [[0, 1], [2], [3], [4, 5]]
+
+
+def test_slow_tool_times_out_without_holding_up_the_rest(monkeypatch):
+    monkeypatch.setitem(agent_loop.TOOL_TIMEOUTS, "web_search", 0.05)
+
+    async def execute(name, args, ctx):
+        if name == "web_search":
+            await asyncio.sleep(5)
+        return "fine"
+
+    _, receipts, _, _ = _run(
+        _ScriptedLLM(("web_search", {}), ("get_weather", {})), execute)
+    assert [r["ok"] for r in receipts] == [False, True]
+    assert "timed out" in receipts[0]["summary"]
+
+
+def test_duplicate_call_in_one_batch_runs_once():
+    seen = []
+
+    async def execute(name, args, ctx):
+        seen.append(name)
+        return "22C"
+
+    _, receipts, history, _ = _run(
+        _ScriptedLLM(("get_weather", {"c": "x"}), ("get_weather", {"c": "x"})), execute)
+    assert seen == ["get_weather"]
+    assert [h[1] for h in history if h[0] == "tool"] == ["22C", "22C"]
+    assert len(receipts) == 2
+
+
+def test_a_repeated_write_runs_every_time():
+    seen = []
+
+    async def execute(name, args, ctx):
+        seen.append(args["item"])
+        return "added"
+
+    _run(_ScriptedLLM(("add_shopping_list_item", {"item": "milk"}),
+                      ("add_shopping_list_item", {"item": "milk"})), execute)
+    assert seen == ["milk", "milk"]
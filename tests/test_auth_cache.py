@@ -0,0 +1,169 @@
+"""
+tests/test_auth_cache.py
+
+decode_token's cached authorization checks: a burst of requests costs one
+revocation-list load and one user lookup; the Bloom filter never misses a
+revoked jti; logout, suspension, forced logout and password changes take
+effect on the next request, and a login in the same second as a forced
+logout still works; changes made behind the cache's back show up once the
+TTL runs out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import types
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.auth import create_access_token, decode_token
+from core.auth_cache import _Bloom, get_auth_cache
+from providers.memory.sqlite_store import SQLiteStore
+
+
+class _Counting:
+    """The real store, counting the calls decode_token's checks make."""
+
+    def __init__(self, store):
+        self._store = store
+        self.calls = collections.Counter()
+
+    def __getattr__(self, name):
+        fn = getattr(self._store, name)
+        if name in ("is_token_revoked", "get_user_auth_state", "list_revoked_jtis"):
+            async def _counted(*args):
+                self.calls[name] += 1
+                return await fn(*args)
+            return _counted
+        return fn
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    import main
+
+    real = SQLiteStore(str(tmp_path / "auth.db"))
+    asyncio.run(real.initialize())
+    counting = _Counting(real)
+    app = types.SimpleNamespace(state=types.SimpleNamespace(
+        memory_manager=types.SimpleNamespace(_store=counting)))
+    monkeypatch.setattr(main, "_app_instance", app)
+    get_auth_cache().clear()
+    yield counting
+    get_auth_cache().clear()
+
+
+def _user(store, suspended=False):
+    user_id = str(uuid.uuid4())
+
+    async def _create():
+        await store.create_user(user_id, f"{user_id}@example.com", "x", "U", is_approved=True)
+        if suspended:
+            await store.update_user(user_id, is_suspended=True)
+    asyncio.run(_create())
+    return user_id, create_access_token(user_id, f"{user_id}@example.com", "user")
+
+
+def _issued_at(user_id, moment):
+    """An access token for `user_id` whose iat is `moment`."""
+    import core.auth
+
+    class _At(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return moment
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(core.auth, "datetime", _At)
+        return create_access_token(user_id, f"{user_id}@example.com", "user")
+
+
+def test_a_page_load_costs_one_lookup_per_user(store):
+    user_id, token = _user(store)
+
+    async def _page():
+        return await asyncio.gather(*(decode_token(token) for _ in range(25)))
+
+    payloads = asyncio.run(_page())
+    assert all(p and p["sub"] == user_id for p in payloads)
+    assert asyncio.run(decode_token(token))
+    assert store.calls == {"list_revoked_jtis": 1, "get_user_auth_state": 1}
+
+
+def test_route_changes_apply_on_the_next_request(store):
+    cache = get_auth_cache()
+    user_id, token = _user(store)
+    assert asyncio.run(decode_token(token))
+
+    # Logout: the revoking process knows at once, without a re-read.
+    other_id, other = _user(store)
+    jti = asyncio.run(decode_token(other))["jti"]
+    expires = datetime.now(tz=timezone.utc) + timedelta(hours=1)
+    asyncio.run(store.revoke_token(jti, other_id, expires))
+    cache.revoked(jti, expires.timestamp())
+    assert asyncio.run(decode_token(other)) is None
+
+    # Suspension, and lifting it.
+    asyncio.run(store.update_user(user_id, is_suspended=True))
+    assert asyncio.run(decode_token(token))          # still cached
+    cache.invalidate_user(user_id)
+    assert asyncio.run(decode_token(token)) is None
+    asyncio.run(store.update_user(user_id, is_suspended=False))
+    cache.invalidate_user(user_id)
+    assert asyncio.run(decode_token(token))
+
+    # Forced logout invalidates tokens issued before it. iat is whole
+    # seconds, so "before" means an earlier second.
+    earlier = _issued_at(user_id, datetime.now(tz=timezone.utc) - timedelta(seconds=2))
+    assert asyncio.run(decode_token(earlier))
+    asyncio.run(store.force_logout(user_id))
+    cache.invalidate_user(user_id)
+    assert asyncio.run(decode_token(earlier)) is None
+
+
+def test_login_in_the_same_second_as_a_forced_logout_is_accepted(store):
+    user_id, _ = _user(store)
+    logout = datetime.now(tz=timezone.utc).replace(microsecond=400000)
+    asyncio.run(store.execute_write_async(
+        "UPDATE users SET tokens_valid_after = ? WHERE id = ?",
+        (logout.isoformat(), user_id)))
+
+    # iat is whole seconds: 0.5s after the logout still encodes that second.
+    after = _issued_at(user_id, logout.replace(microsecond=900000))
+    before = _issued_at(user_id, logout - timedelta(seconds=1))
+    assert asyncio.run(decode_token(after))
+    assert asyncio.run(decode_token(before)) is None
+
+
+def test_changes_behind_the_cache_show_after_the_ttl(store, monkeypatch):
+    from config.settings import get_settings
+
+    monkeypatch.setattr(get_settings(), "auth_cache_ttl_seconds", 0.05)
+    user_id, token = _user(store)
+    suspended_id, suspended = _user(store, suspended=True)
+    assert asyncio.run(decode_token(suspended)) is None
+    jti = asyncio.run(decode_token(token))["jti"]
+
+    # Revoked by another process: this one learns at the next reload.
+    asyncio.run(store.revoke_token(jti, user_id, datetime.now(tz=timezone.utc) + timedelta(hours=1)))
+    asyncio.run(asyncio.sleep(0.06))
+    assert asyncio.run(decode_token(token)) is None
+    assert store.calls["list_revoked_jtis"] == 2
+
+    # A TTL of 0 goes to the database every time.
+    monkeypatch.setattr(get_settings(), "auth_cache_ttl_seconds", 0)
+    before = store.calls["get_user_auth_state"]
+    for _ in range(3):
+        assert asyncio.run(decode_token(suspended)) is None
+    assert store.calls["get_user_auth_state"] == before + 3
+
+
+def test_bloom_filter_never_misses_a_member():
+    members = [str(uuid.uuid4()) for _ in range(2000)]
+    bloom = _Bloom(members, bits=1 << 15)
+    assert all(m in bloom for m in members)
+    others = [str(uuid.uuid4()) for _ in range(5000)]
+    assert sum(o in bloom for o in others) < 250
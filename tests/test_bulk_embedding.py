@@ -0,0 +1,124 @@
+"""
+tests/test_bulk_embedding.py
+
+EmbeddingProvider.embed_many and VectorStore.upsert_many: bulk ingestion
+embeds in bounded batches, keeps results aligned with the input, and writes
+a whole document to Chroma in one upsert.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import providers.memory.embedding_provider as ep
+from config.settings import get_settings
+from providers.memory.embedding_provider import EmbeddingProvider
+from providers.memory.vector_store import VectorStore
+
+
+@pytest.fixture(autouse=True)
+def _no_embedding_cache(monkeypatch):
+    # These tests count model calls; the cache has its own tests.
+    monkeypatch.setattr(get_settings(), "embedding_cache_enabled", False)
+
+
+class _FakeOllama:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    async def embeddings(self, model, prompt):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if prompt == "boom":
+            raise RuntimeError("model fell over")
+        return {"embedding": [float(len(prompt))]}
+
+
+class _FakeFastembed:
+    def __init__(self):
+        self.batches = []
+
+    def embed(self, texts, batch_size=256):
+        self.batches.append(list(texts))
+        for t in texts:
+            yield np.array([float(len(t))])
+
+
+def test_embed_many_aligns_and_bounds_ollama_concurrency():
+    provider = EmbeddingProvider()
+    fake = provider._ollama_client = _FakeOllama()
+
+    texts = ["a", "", "bbb", "boom", "cc", "   ", "dddd"]
+    out = asyncio.run(provider.embed_many(texts, batch_size=2, concurrency=2))
+
+    assert out == [[1.0], None, [3.0], None, [2.0], None, [4.0]]
+    assert fake.calls == 5  # blanks never reach the model
+    assert fake.peak <= 2
+
+
+def test_embed_many_uses_one_inference_call_per_fastembed_batch(monkeypatch):
+    fake = _FakeFastembed()
+    monkeypatch.setattr(ep, "_get_fastembed_model", lambda model_id: fake)
+    provider = EmbeddingProvider()
+    provider._backend = "fastembed"
+
+    out = asyncio.run(provider.embed_many(["x" * n for n in range(1, 8)], batch_size=3))
+
+    assert [v[0] for v in out] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+    assert sorted(len(b) for b in fake.batches) == [1, 3, 3]
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.upserts = []
+
+    def upsert(self, ids, embeddings, metadatas, documents):
+        self.upserts.append(list(ids))
+
+
+def test_upsert_many_writes_once_and_skips_failed_embeddings():
+    store = VectorStore.__new__(VectorStore)
+    store._enabled = True
+    store._collection = coll = _FakeCollection()
+
+    class _Embedder:
+        async def embed_many(self, texts):
+            return [None if t == "bad" else [1.0] for t in texts]
+
+    store._embedding_provider = _Embedder()
+    items = [(f"id{i}", "bad" if i == 2 else f"chunk {i}", {"i": i}) for i in range(5)]
+
+    assert asyncio.run(store.upsert_many(items)) == 4
+    assert coll.upserts == [["id0", "id1", "id3", "id4"]]
+
+
+def test_rag_ingest_hands_the_whole_document_over_at_once(monkeypatch):
+    import providers.rag.rag_provider as rp
+
+    monkeypatch.setattr(rp, "unstructured_extract",
+                        lambda file_bytes=None, filename=None, **kw:
+                        [{"text": "word " * 2000, "metadata": {}}])
+    monkeypatch.setattr(rp, "chunk_text", lambda text: ["one", "two", "three"])
+    batches = []
+
+    class _StubVS:
+        async def upsert_many(self, items):
+            batches.append(items)
+            return len(items)
+
+    provider = rp.RAGProvider()
+    provider._vector_store = _StubVS()
+    n = asyncio.run(provider.ingest_document(b"data", {"filename": "m.pdf", "document_id": "d"}))
+
+    assert n == 3
+    assert len(batches) == 1
+    assert [i[0] for i in batches[0]] == ["doc_d_0", "doc_d_1", "doc_d_2"]
+    assert batches[0][1][2]["chunk_index"] == 1
@@ -0,0 +1,132 @@
+"""
+tests/test_chat_search.py
+
+Chat history search and the session list: chat_messages_fts and
+chat_sessions.message_count are kept in step by triggers on every write,
+search_chat_messages keyset-pages newest-first through hits scoped to the
+caller's sessions, and databases from before the index are backfilled on startup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+
+from providers.memory.sqlite_store import SQLiteStore
+
+
+def _store(tmp_path, name="chat_search.db"):
+    store = SQLiteStore(str(tmp_path / name))
+    asyncio.run(store.initialize())
+    return store
+
+
+def _session(store, user_id, messages, meta=None):
+    async def _go():
+        sid = await store.create_chat_session(user_id, "", meta=meta)
+        for role, text in messages:
+            await store.add_chat_message(sid, role, text)
+        return sid
+    return asyncio.run(_go())
+
+
+def test_search_is_scoped_ranked_and_paginated(tmp_path):
+    store = _store(tmp_path)
+    mine = _session(store, "alice", [
+        ("user", "What temperature for sourdough?"),
+        ("assistant", "Bake sourdough at 230C with steam for the first 20 minutes."),
+        ("user", "And the boiler service date?"),
+    ])
+    _session(store, "bob", [("user", "sourdough starter tips")])
+
+    page = asyncio.run(store.search_chat_messages("alice", "sourdo"))
+    assert [r["session_id"] for r in page["results"]] == [mine, mine]
+    assert page["next_cursor"] is None
+    assert any("[sourdough]" in r["snippet"] for r in page["results"])
+
+    first = asyncio.run(store.search_chat_messages("alice", "sourdough", limit=1))
+    assert len(first["results"]) == 1 and first["next_cursor"]
+    second = asyncio.run(store.search_chat_messages(
+        "alice", "sourdough", cursor=first["next_cursor"], limit=1))
+    assert second["next_cursor"] is None
+    assert {first["results"][0]["id"], second["results"][0]["id"]} == {
+        r["id"] for r in page["results"]}
+
+    asyncio.run(store.archive_chat_session("alice", mine))
+    assert asyncio.run(store.search_chat_messages("alice", "sourdough"))["results"] == []
+    assert asyncio.run(store.search_chat_messages("alice", "  "))["results"] == []
+
+
+def test_pages_follow_a_keyset_cursor(tmp_path):
+    store = _store(tmp_path)
+    sid = _session(store, "alice", [("user", "boiler " * n + "pressure note") for n in range(1, 9)])
+    everything = asyncio.run(store.search_chat_messages("alice", "boiler", limit=50))
+    expected = [r["id"] for r in everything["results"]]
+    assert len(expected) == 8 and everything["next_cursor"] is None
+    assert expected == sorted(expected, reverse=True)
+
+    seen, cursor = [], None
+    while True:
+        page = asyncio.run(store.search_chat_messages(
+            "alice", "boiler", cursor=cursor, limit=3))
+        seen.extend(r["id"] for r in page["results"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        # New hits land above the cursor and cannot shift the pages still to come.
+        asyncio.run(store.add_chat_message(sid, "user", "boiler again"))
+    assert seen == expected
+
+    # A cursor that does not parse starts from the top.
+    first = asyncio.run(store.search_chat_messages("alice", "boiler", cursor="junk", limit=1))
+    assert len(first["results"]) == 1
+
+
+def test_message_count_follows_inserts_and_retention_deletes(tmp_path):
+    store = _store(tmp_path)
+    sid = _session(store, "alice", [("user", "one"), ("assistant", "two"), ("user", "three")])
+    scoped = _session(store, "alice", [("user", "car")], meta={"scope": "vehicle:1"})
+
+    sessions = asyncio.run(store.get_chat_sessions("alice"))
+    assert [(s["id"], s["message_count"]) for s in sessions] == [(sid, 3)]
+    assert [s["id"] for s in asyncio.run(store.get_chat_sessions("alice", scope="vehicle:1"))] == [scoped]
+
+    conn = sqlite3.connect(str(tmp_path / "chat_search.db"))
+    conn.execute("UPDATE chat_sessions SET distilled_at = 'x'")
+    conn.execute("UPDATE chat_messages SET created_at = '2000-01-01' WHERE content != 'three'")
+    conn.commit()
+    conn.close()
+    assert asyncio.run(store.delete_old_chat_messages(retention_days=1)) == 3
+
+    assert asyncio.run(store.get_chat_sessions("alice"))[0]["message_count"] == 1
+    assert asyncio.run(store.search_chat_messages("alice", "two"))["results"] == []
+    assert len(asyncio.run(store.search_chat_messages("alice", "three"))["results"]) == 1
+
+
+def test_existing_history_is_backfilled(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+        CREATE TABLE chat_sessions (
+            id TEXT PRIMARY KEY, user_id TEXT NOT NULL, title TEXT DEFAULT '',
+            created_at TEXT NOT NULL, updated_at TEXT NOT NULL,
+            distilled_at TEXT, archived INTEGER DEFAULT 0);
+        CREATE TABLE chat_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL,
+            role TEXT NOT NULL, content TEXT NOT NULL, meta TEXT DEFAULT '{}',
+            created_at TEXT NOT NULL);
+        INSERT INTO chat_sessions (id, user_id, created_at, updated_at) VALUES ('s1', 'alice', 't', 't');
+        INSERT INTO chat_messages (session_id, role, content, created_at) VALUES
+            ('s1', 'user', 'remind me about the dentist', 't'),
+            ('s1', 'assistant', 'Dentist is on Tuesday.', 't');
+    """)
+    conn.commit()
+    conn.close()
+
+    store = _store(tmp_path, "legacy.db")
+    assert asyncio.run(store.get_chat_sessions("alice"))[0]["message_count"] == 2
+    assert len(asyncio.run(store.search_chat_messages("alice", "dentist"))["results"]) == 2
+
+    # A second start must not count the history twice.
+    asyncio.run(store.initialize())
+    assert asyncio.run(store.get_chat_sessions("alice"))[0]["message_count"] == 2
@@ -0,0 +1,125 @@
+"""
+tests/test_context_window.py
+
+The token-budgeted history: fit keeps the system message and the newest
+turns that fit, never splits a tool call from its results, and holds the
+prompt roughly constant over a long session; evicted turns fold into a
+bounded summary off the turn's path; the budget follows the model's own
+context window.
+"""
+
+import asyncio
+
+from core.context_window import ContextWindow, estimate_tokens, split_turns, token_budget
+
+
+def _turn(n, words=40):
+    text = " ".join(["word"] * words)
+    return [{"role": "user", "content": f"q{n} {text}"},
+            {"role": "assistant", "content": f"a{n} {text}"}]
+
+
+def _tool_turn(n):
+    return [
+        {"role": "user", "content": f"q{n} what is on the calendar"},
+        {"role": "assistant", "content": [
+            {"type": "tool_use", "id": f"t{n}", "name": "calendar", "input": {}}]},
+        {"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": f"t{n}", "content": "x" * 300}]},
+        {"role": "assistant", "content": f"a{n} dentist at nine"},
+    ]
+
+
+def test_fit_keeps_tool_calls_with_their_results():
+    history = [{"role": "system", "content": "sys"}]
+    for n in range(6):
+        history.extend(_tool_turn(n) if n % 2 else _turn(n))
+    window = ContextWindow(budget=400)
+    evicted = window.fit(history)
+
+    assert history[0]["content"] == "sys"
+    assert evicted and evicted[0]["content"].startswith("q0")
+    for turn in split_turns(history[1:]):
+        assert isinstance(turn[0]["content"], str) and turn[0]["role"] == "user"
+    uses = [b["id"] for m in history if isinstance(m["content"], list)
+            for b in m["content"] if b["type"] == "tool_use"]
+    results = [b["tool_use_id"] for m in history if isinstance(m["content"], list)
+               for b in m["content"] if b["type"] == "tool_result"]
+    assert uses == results
+    assert window.prompt_tokens(history) <= 400
+
+
+def test_the_latest_turn_stays_even_over_budget():
+    history = [{"role": "system", "content": "sys"}] + _turn(0) + _turn(1, words=2000)
+    window = ContextWindow(budget=200)
+    window.fit(history)
+    assert [m["content"][:2] for m in history[1:]] == ["q1", "a1"]
+
+
+def test_prompt_stays_flat_over_a_long_session():
+    history = [{"role": "system", "content": "sys"}]
+    window = ContextWindow(budget=1000)
+    sizes = []
+    for n in range(200):
+        history.extend(_turn(n))
+        window.fit(history)
+        sizes.append(window.prompt_tokens(history))
+    assert max(sizes) <= 1000
+    assert min(sizes[50:]) > 800
+    # Only live messages stay in the count cache.
+    assert len(window._counts) == len(history)
+
+
+def test_counts_are_cached_until_the_content_changes():
+    window = ContextWindow(budget=1000)
+    message = {"role": "user", "content": "hello there"}
+    first = window.count(message)
+    assert window._counts[id(message)][2] == first
+    message["content"] = "hello " * 100
+    assert window.count(message) == estimate_tokens(message["content"]) + 4 > first
+
+
+def test_evicted_turns_fold_into_a_bounded_summary():
+    calls = []
+
+    async def _summarize(previous, messages):
+        calls.append((previous, [m["content"][:2] for m in messages]))
+        await asyncio.sleep(0)
+        return "summary " * 1000
+
+    async def _run():
+        window = ContextWindow(budget=1000, summarize=_summarize)
+        tasks = []
+
+        def _spawn(coro, label):
+            tasks.append(asyncio.ensure_future(coro))
+            return tasks[-1]
+
+        window.fold(_turn(0), _spawn)
+        window.fold(_turn(1), _spawn)   # joins the pending fold
+        assert window.summary == ""     # the turn did not wait for it
+        await tasks[0]
+        window.fold(_turn(2), _spawn)
+        await tasks[-1]
+        return window, tasks
+
+    window, tasks = asyncio.run(_run())
+    assert len(tasks) == 2
+    assert calls[0] == ("", ["q0", "a0", "q1", "a1"])
+    assert calls[1][0].startswith("summary") and calls[1][1] == ["q2", "a2"]
+    assert 0 < estimate_tokens(window.summary) <= window.summary_budget
+    window.reset()
+    assert window.summary == ""
+
+
+def test_budget_follows_the_model_window(monkeypatch):
+    from config.settings import get_settings
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "llm_context_window", 32768)
+    monkeypatch.setattr(settings, "llm_max_tokens", 512)
+    assert token_budget("google/gemma-2-27b-it", "nvidia_nim") == 8192 - 512
+    assert token_budget("phi4") == 16384 - 512
+    assert token_budget("not-in-the-registry") == 32768 - 512
+    monkeypatch.setattr(settings, "llm_context_window", 600)
+    assert token_budget("phi4") == 1024
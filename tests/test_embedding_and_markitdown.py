@@ -131,7 +131,7 @@ class TestRAGExtractorDispatch:
 
         # Stub VectorStore so we don't touch ChromaDB.
         class _StubVS:
-            async def upsert(self, **kw): pass
+            async def upsert_many(self, items): return len(items)
         provider = rp.RAGProvider()
         provider._vector_store = _StubVS()
 
@@ -155,7 +155,7 @@ class TestRAGExtractorDispatch:
         monkeypatch.setattr(rp, "markitdown_extract", fake_markitdown)
 
         class _StubVS:
-            async def upsert(self, **kw): pass
+            async def upsert_many(self, items): return len(items)
         provider = rp.RAGProvider()
         provider._vector_store = _StubVS()
         provider._settings.rag_extractor = "markitdown"
@@ -185,7 +185,7 @@ class TestRAGExtractorDispatch:
         monkeypatch.setattr(rp, "markitdown_extract", fake_markitdown)
 
         class _StubVS:
-            async def upsert(self, **kw): pass
+            async def upsert_many(self, items): return len(items)
         provider = rp.RAGProvider()
         provider._vector_store = _StubVS()
         provider._settings.rag_extractor = "markitdown"
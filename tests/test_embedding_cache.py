@@ -0,0 +1,140 @@
+"""
+tests/test_embedding_cache.py
+
+The content-addressed embedding cache: repeated text is served without
+calling the model, vectors survive a restart via the SQLite tier, switching
+the embedding model never returns the old model's vectors, and embed_many
+only sends the misses to the backend.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import providers.memory.embedding_cache as ec
+from config.settings import get_settings
+from core import metrics
+from providers.memory.embedding_cache import EmbeddingCache, cache_key
+from providers.memory.embedding_provider import EmbeddingProvider
+
+
+class _CountingOllama:
+    def __init__(self):
+        self.prompts = []
+
+    async def embeddings(self, model, prompt):
+        self.prompts.append(prompt)
+        return {"embedding": [float(len(prompt)), 0.5]}
+
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    settings = get_settings()
+    path = str(tmp_path / "embedding_cache.db")
+    monkeypatch.setattr(settings, "embedding_cache_enabled", True)
+    monkeypatch.setattr(settings, "embedding_cache_path", path)
+    monkeypatch.setattr(settings, "embedding_model", "nomic-embed-text")
+    metrics.reset()
+    yield path
+    if ec._cache is not None:
+        ec._cache.close()
+    ec._cache = None
+
+
+def _provider():
+    provider = EmbeddingProvider()
+    provider._backend = "ollama"
+    provider._ollama_client = _CountingOllama()
+    return provider
+
+
+def _restart():
+    ec._cache.close()
+    ec._cache = None
+
+
+def test_key_ignores_whitespace_but_not_model_or_backend():
+    base = cache_key("ollama", "m", "hello   world\n")
+    assert base == cache_key("ollama", "m", " hello world")
+    assert base != cache_key("ollama", "m2", "hello world")
+    assert base != cache_key("fastembed", "m", "hello world")
+
+
+def test_repeat_is_served_from_memory_then_from_disk(cache_file):
+    provider = _provider()
+    assert asyncio.run(provider.embed("turn on the lights")) == [18.0, 0.5]
+    assert asyncio.run(provider.embed("turn on  the lights")) == [18.0, 0.5]
+    assert provider._ollama_client.prompts == ["turn on the lights"]
+
+    _restart()
+    fresh = _provider()
+    assert asyncio.run(fresh.embed("turn on the lights")) == [18.0, 0.5]
+    assert fresh._ollama_client.prompts == []
+
+    counters = metrics.snapshot()["counters"]
+    assert counters["embedding_cache.miss"] == 1
+    assert counters["embedding_cache.hit_memory"] == 1
+    assert counters["embedding_cache.hit_disk"] == 1
+
+
+def test_model_change_invalidates(cache_file, monkeypatch):
+    asyncio.run(_provider().embed("hello"))
+    monkeypatch.setattr(get_settings(), "embedding_model", "mxbai-embed-large")
+    provider = _provider()
+    asyncio.run(provider.embed("hello"))
+    assert provider._ollama_client.prompts == ["hello"]
+
+    # Rows from the old model are purged once the new one writes.
+    _restart()
+    monkeypatch.setattr(get_settings(), "embedding_model", "nomic-embed-text")
+    provider = _provider()
+    asyncio.run(provider.embed("hello"))
+    assert provider._ollama_client.prompts == ["hello"]
+
+
+def test_reindex_after_restart_only_embeds_changed_chunks(cache_file):
+    chunks = ["alpha", "beta", "", "gamma", "beta"]
+    first = _provider()
+    out = asyncio.run(first.embed_many(chunks, batch_size=2))
+    assert out == [[5.0, 0.5], [4.0, 0.5], None, [5.0, 0.5], [4.0, 0.5]]
+    assert sorted(first._ollama_client.prompts) == ["alpha", "beta", "gamma"]
+
+    _restart()
+    second = _provider()
+    out = asyncio.run(second.embed_many(["alpha", "beta", "delta!", "gamma"]))
+    assert out == [[5.0, 0.5], [4.0, 0.5], [6.0, 0.5], [5.0, 0.5]]
+    assert second._ollama_client.prompts == ["delta!"]
+
+
+def test_lru_is_bounded(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "c.db"), memory_items=2)
+    asyncio.run(cache.put_many("m", {"a": [1.0], "b": [2.0], "c": [3.0]}))
+    assert list(cache._lru) == ["b", "c"]
+    # Evicted entries are still on disk.
+    assert asyncio.run(cache.get_many(["a"])) == {"a": [1.0]}
+    cache.close()
+
+
+
+def test_memory_hits_do_not_wait_for_disk_io(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "c.db"), memory_items=4)
+    asyncio.run(cache.put_many("m", {"a": [1.0]}))
+
+    async def _run():
+        # Stand in for slow SQLite I/O: the connection is busy.
+        cache._db_lock.acquire()
+        try:
+            write = asyncio.create_task(cache.put_many("m", {"b": [2.0]}))
+            await asyncio.sleep(0.01)
+            found = await asyncio.wait_for(cache.get_many(["a", "b"]), 0.5)
+        finally:
+            cache._db_lock.release()
+        await write
+        return found
+
+    assert asyncio.run(_run()) == {"a": [1.0], "b": [2.0]}
+    cache._lru.clear()
+    assert asyncio.run(cache.get_many(["b"])) == {"b": [2.0]}
+    cache.close()
@@ -0,0 +1,215 @@
+"""
+tests/test_feed_cache.py
+
+The shared feed cache: concurrent misses for one key share a single load,
+stale entries are served while one background refresh runs, failed refreshes
+fall back to the last good value, the in-memory LRU stays bounded, and the
+SQLite file gives a warm start to a fresh process. Flights reports `cached`
+from when its data was fetched, and the Reddit token lives outside the cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from providers.feeds.cache import FeedCache, _ttl_overrides, request_key
+
+
+def _counting_loader(value="v", delay=0.01):
+    calls = {"n": 0}
+
+    async def _load():
+        calls["n"] += 1
+        await asyncio.sleep(delay)
+        return {"value": value, "call": calls["n"]}
+    return _load, calls
+
+
+def test_concurrent_misses_share_one_load(tmp_path):
+    cache = FeedCache(16, path=str(tmp_path / "feeds.db"))
+    loader, calls = _counting_loader()
+
+    async def _go():
+        results = await asyncio.gather(*(cache.get("weather", "k", loader) for _ in range(10)))
+        again = await cache.get("weather", "k", loader)
+        return results, again
+
+    results, again = asyncio.run(_go())
+    assert calls["n"] == 1
+    assert all(r == {"value": "v", "call": 1} for r in results)
+    assert again == {"value": "v", "call": 1}
+    cache.close()
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    cache = FeedCache(16, stale_factor=10.0)
+    loader, calls = _counting_loader()
+
+    async def _go():
+        await cache.get("stocks", "AAPL", loader, ttl=0.05)
+        await asyncio.sleep(0.06)
+        stale = await asyncio.gather(*(cache.get("stocks", "AAPL", loader, ttl=0.05) for _ in range(5)))
+        await asyncio.sleep(0.05)
+        return stale, await cache.get("stocks", "AAPL", loader, ttl=0.05)
+
+    stale, fresh = asyncio.run(_go())
+    assert [s["call"] for s in stale] == [1] * 5
+    assert fresh["call"] == 2
+    assert calls["n"] == 2
+
+
+def test_failed_refresh_serves_last_value_and_empty_cache_raises():
+    cache = FeedCache(16, stale_factor=1.0)
+    good, _ = _counting_loader()
+
+    async def _broken():
+        raise RuntimeError("upstream down")
+
+    async def _go():
+        await cache.get("news", "world", good, ttl=0.01)
+        await asyncio.sleep(0.02)
+        served = await cache.get("news", "world", _broken, ttl=0.01)
+        with pytest.raises(RuntimeError):
+            await cache.get("news", "other", _broken)
+        return served
+
+    assert asyncio.run(_go())["call"] == 1
+
+
+def test_memory_is_lru_bounded():
+    cache = FeedCache(2)
+
+    async def _value(v):
+        return v
+
+    async def _go():
+        for key in ("a", "b"):
+            await cache.get("flights", key, lambda key=key: _value(key))
+        await cache.get("flights", "a", lambda: _value("x"))  # touch a
+        await cache.get("flights", "c", lambda: _value("c"))
+
+    asyncio.run(_go())
+    assert cache.peek("flights", "a") == "a"
+    assert cache.peek("flights", "b") is None
+    assert cache.peek("flights", "c") == "c"
+
+
+def test_persisted_entries_warm_a_new_instance(tmp_path):
+    path = str(tmp_path / "feeds.db")
+    first = FeedCache(16, path=path)
+    loader, calls = _counting_loader("launches")
+
+    async def _token():
+        return "secret-token"
+
+    asyncio.run(first.get("space_launches", "next", loader))
+    asyncio.run(first.get("reddit_token", "client", _token, persist=False))
+    first.close()
+
+    second = FeedCache(16, path=path)
+    assert asyncio.run(second.get("space_launches", "next", loader))["call"] == 1
+    assert calls["n"] == 1
+
+    async def _fresh_token():
+        return "new-token"
+    assert asyncio.run(second.get("reddit_token", "client", _fresh_token)) == "new-token"
+    second.close()
+
+
+def test_old_persisted_entries_are_not_served(tmp_path):
+    path = str(tmp_path / "feeds.db")
+    first = FeedCache(16, path=path, stale_factor=1.0)
+    loader, calls = _counting_loader()
+    asyncio.run(first.get("stocks", "MSFT", loader, ttl=0.01))
+    first.close()
+    time.sleep(0.02)
+
+    second = FeedCache(16, path=path, stale_factor=1.0)
+    assert asyncio.run(second.get("stocks", "MSFT", loader, ttl=0.01))["call"] == 2
+    second.close()
+
+
+def test_request_key_is_stable_and_hides_params():
+    a = request_key("https://api.example/q", {"symbol": "AAPL", "token": "abc123"})
+    b = request_key("https://api.example/q", {"token": "abc123", "symbol": "AAPL"})
+    assert a == b and "abc123" not in a
+    assert a != request_key("https://api.example/q", {"symbol": "MSFT", "token": "abc123"})
+
+
+def test_ttl_overrides_parse_and_ignore_garbage():
+    assert _ttl_overrides('{"stocks": 30, "news": "120"}') == {"stocks": 30.0, "news": 120.0}
+    assert _ttl_overrides("not json") == {}
+    assert _ttl_overrides("") == {}
+    cache = FeedCache(4, ttls={"stocks": 30})
+    assert cache.ttl("stocks") == 30.0
+    assert cache.ttl("weather") == 600.0
+
+
+class _Response:
+    def __init__(self, body):
+        self._body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._body
+
+
+def test_flights_cached_flag_follows_the_fetch_not_the_caller(monkeypatch):
+    from providers.feeds import flights
+
+    cache = FeedCache(16)
+    fetches = {"n": 0}
+
+    class _Client:
+        async def get(self, url, **_):
+            fetches["n"] += 1
+            await asyncio.sleep(0.01)
+            return _Response({"ac": []})
+
+    monkeypatch.setenv("ADSBX_RAPIDAPI_KEY", "test-key")
+    monkeypatch.setattr(flights, "get_feed_cache", lambda: cache)
+    monkeypatch.setattr(flights, "feed_client", lambda url: _Client())
+
+    async def _go():
+        together = await asyncio.gather(*(flights.fetch_overhead(51.5, -0.1) for _ in range(3)))
+        later = await flights.fetch_overhead(51.5, -0.1)
+        return together, later
+
+    together, later = asyncio.run(_go())
+    assert fetches["n"] == 1
+    # Every caller that waited on the one fetch got fresh data.
+    assert [r["cached"] for r in together] == [False, False, False]
+    assert later["cached"] is True
+    assert "fetched_at" not in later
+
+
+def test_reddit_token_is_renewed_from_expires_in(monkeypatch):
+    from providers.feeds import happenings
+
+    issued = []
+
+    class _Client:
+        async def post(self, url, **_):
+            issued.append(f"token-{len(issued)}")
+            return _Response({"access_token": issued[-1], "expires_in": 120})
+
+    monkeypatch.setenv("REDDIT_CLIENT_ID", "client")
+    monkeypatch.setenv("REDDIT_CLIENT_SECRET", "secret")
+    monkeypatch.setattr(happenings, "feed_client", lambda url: _Client())
+    monkeypatch.setattr(happenings, "_reddit_tokens", {})
+    monkeypatch.setattr(happenings, "_reddit_token_lock", asyncio.Lock())
+
+    assert asyncio.run(happenings._get_reddit_token()) == "token-0"
+    assert asyncio.run(happenings._get_reddit_token()) == "token-0"
+    token, expires = happenings._reddit_tokens["client"]
+    # Renewed a margin ahead of Reddit's own 120s expiry.
+    assert expires - time.monotonic() <= 120 - happenings._REDDIT_TOKEN_MARGIN_S
+
+    # Once that passes the token is never served again, not even as stale.
+    happenings._reddit_tokens["client"] = (token, time.monotonic() - 1)
+    assert asyncio.run(happenings._get_reddit_token()) == "token-1"
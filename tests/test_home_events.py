@@ -0,0 +1,130 @@
+"""
+tests/test_home_events.py
+
+HomeEventBus fan-out: publishing never waits on a handler, each subscriber
+sees its events in order on its own worker, a stuck subscriber does not
+delay the others, coalescing subscribers keep only the newest state per
+entity, and a full queue drops its oldest event.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from core import metrics
+from core.home_events import HomeEventBus
+
+
+def _state(value):
+    return {"state": value, "attributes": {}}
+
+
+def test_a_stuck_subscriber_does_not_delay_the_others():
+    async def _go():
+        bus = HomeEventBus()
+        release = asyncio.Event()
+        seen = []
+
+        async def _stuck(entity_id, new_state, old_state):
+            await release.wait()
+
+        async def _alerts(entity_id, new_state, old_state):
+            seen.append(entity_id)
+
+        bus.subscribe(_stuck, name="tts")
+        bus.subscribe(_alerts, name="alerts")
+        bus.publish("media_player.kitchen", _state("playing"), _state("idle"))
+        bus.publish("binary_sensor.leak", _state("on"), _state("off"))
+        await asyncio.wait_for(bus._subscribers[1].join(), 1.0)
+        assert seen == ["media_player.kitchen", "binary_sensor.leak"]
+        release.set()
+        await asyncio.wait_for(bus.join(), 1.0)
+
+    asyncio.run(_go())
+
+
+def test_each_subscriber_sees_events_in_order_one_at_a_time():
+    async def _go():
+        bus = HomeEventBus()
+        seen, running = [], []
+
+        async def _slow(entity_id, new_state, old_state):
+            running.append(1)
+            assert len(running) == 1
+            await asyncio.sleep(0.001)
+            seen.append(new_state["state"])
+            running.pop()
+
+        bus.subscribe(_slow)
+        for i in range(20):
+            bus.publish("sensor.power", _state(str(i)), _state(str(i - 1)))
+        await bus.join()
+        assert seen == [str(i) for i in range(20)]
+
+    asyncio.run(_go())
+
+
+def test_coalescing_keeps_the_newest_state_and_the_first_old_state():
+    async def _go():
+        bus = HomeEventBus()
+        seen = []
+
+        async def _ctx(entity_id, new_state, old_state):
+            seen.append((entity_id, old_state["state"], new_state["state"]))
+
+        bus.subscribe(_ctx, name="ctx", coalesce=True)
+        for i in range(1, 6):
+            bus.publish("sensor.power", _state(str(i)), _state(str(i - 1)))
+        bus.publish("light.hall", _state("on"), _state("off"))
+        await bus.join()
+        assert seen == [("sensor.power", "0", "5"), ("light.hall", "off", "on")]
+
+    metrics.reset()
+    asyncio.run(_go())
+    assert metrics.snapshot()["counters"]["home_bus.ctx.coalesced"] == 4
+
+
+def test_a_full_queue_drops_the_oldest_event():
+    async def _go():
+        bus = HomeEventBus()
+        seen = []
+
+        async def _sub(entity_id, new_state, old_state):
+            seen.append(new_state["state"])
+
+        bus.subscribe(_sub, name="small", maxsize=3)
+        for i in range(5):
+            bus.publish("sensor.x", _state(str(i)), _state(""))
+        await bus.join()
+        assert seen == ["2", "3", "4"]
+
+    metrics.reset()
+    asyncio.run(_go())
+    snap = metrics.snapshot()
+    assert snap["counters"]["home_bus.small.dropped"] == 2
+    assert snap["latency"]["home_bus.small.handler_ms"]["count"] == 3
+    assert snap["gauges"]["home_bus.small.queue_depth"] == 0
+
+
+def test_a_failing_handler_keeps_its_worker_and_unsubscribe_stops_it():
+    async def _go():
+        bus = HomeEventBus()
+        seen = []
+
+        async def _flaky(entity_id, new_state, old_state):
+            if new_state["state"] == "boom":
+                raise RuntimeError("handler exploded")
+            seen.append(new_state["state"])
+
+        bus.subscribe(_flaky)
+        await bus.emit("sensor.x", _state("boom"), _state(""))
+        await bus.emit("sensor.x", _state("ok"), _state("boom"))
+        await bus.join()
+        assert seen == ["ok"]
+
+        bus.unsubscribe(_flaky)
+        bus.publish("sensor.x", _state("late"), _state("ok"))
+        await asyncio.sleep(0.01)
+        assert seen == ["ok"]
+
+    asyncio.run(_go())
@@ -110,8 +110,11 @@ class FakeStore:
         self._routines = routines or []
         self._areas = areas or {}
         self.created = []
+        self.routines_version = 0
+        self.routine_loads = 0
 
     async def get_enabled_routines(self):
+        self.routine_loads += 1
         return list(self._routines)
 
     async def list_routines(self, user_id):
@@ -145,6 +148,11 @@ def make_engine(routines, areas=None):
     return engine, fired
 
 
+async def settle(engine):
+    """Wait for the firings on_event handed off to background tasks."""
+    await asyncio.gather(*engine._firing)
+
+
 def rule(**kw):
     base = {"id": "r1", "user_id": "u1", "name": "Test", "trigger": "device",
             "severity": "warning", "prompt": "", "trigger_config": {}}
@@ -159,6 +167,7 @@ async def test_fires_on_transition():
     await engine.on_event("binary_sensor.leak",
                           state("on", device_class="moisture"),
                           state("off", device_class="moisture"))
+    await settle(engine)
     assert fired == [("r1", "binary_sensor.leak", "on")]
 
 
@@ -172,6 +181,7 @@ async def test_repeat_updates_in_the_same_state_do_not_refire():
     await engine.on_event("binary_sensor.leak", on, state("off", device_class="moisture"))
     await engine.on_event("binary_sensor.leak", on, on)
     await engine.on_event("binary_sensor.leak", on, on)
+    await settle(engine)
     assert len(fired) == 1
 
 
@@ -220,6 +230,7 @@ async def test_area_selector_uses_the_synced_area():
         areas={"light.kitchen": "Kitchen", "light.garage": "Garage"})
     await engine.on_event("light.kitchen", state("on"), state("off"))
     await engine.on_event("light.garage", state("on"), state("off"))
+    await settle(engine)
     assert [f[1] for f in fired] == ["light.kitchen"]
 
 
@@ -248,6 +259,35 @@ async def test_a_failing_rule_does_not_kill_the_bus():
     await engine.on_event("binary_sensor.leak",
                           state("on", device_class="moisture"),
                           state("off", device_class="moisture"))
+    await settle(engine)
+
+
+@pytest.mark.asyncio
+async def test_a_slow_routine_does_not_hold_up_the_next_event():
+    """The bus worker is serial: awaiting a minute-long agent run inline
+    would queue the smoke alarm behind it."""
+    engine, _ = make_engine([
+        rule(id="slow", trigger_config={"entity_id": "light.porch", "to_state": "on"}),
+        rule(id="smoke", trigger_config={"device_class": "smoke", "to_state": "on"}),
+    ])
+    release = asyncio.Event()
+    fired = []
+
+    async def _fire(routine, entity_id, new_state, area):
+        if routine["id"] == "slow":
+            await release.wait()
+        fired.append(routine["id"])
+    engine._fire = _fire
+
+    await asyncio.wait_for(engine.on_event("light.porch", state("on"), state("off")), 1)
+    await asyncio.wait_for(engine.on_event("binary_sensor.smoke",
+                                           state("on", device_class="smoke"),
+                                           state("off", device_class="smoke")), 1)
+    await asyncio.sleep(0)
+    assert fired == ["smoke"]
+    release.set()
+    await settle(engine)
+    assert fired == ["smoke", "slow"]
 
 
 # ---------------------------------------------------------------------------
@@ -398,3 +438,80 @@ async def test_a_replacement_timer_survives_the_cancelled_one(monkeypatch):
     await engine.on_event("binary_sensor.door", off, on)    # cancel again
     await asyncio.sleep(0.15)
     assert fired == [], "a timer outlived the close that should have cancelled it"
+
+
+# ---------------------------------------------------------------------------
+# the compiled trigger index
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_routines_are_loaded_once_not_per_event():
+    engine, fired = make_engine([rule(
+        trigger_config={"device_class": "moisture", "to_state": "on"})])
+    store = engine._store
+    for i in range(50):
+        await engine.on_event(f"sensor.power_{i}", state(str(i), device_class="power"),
+                              state(str(i - 1), device_class="power"))
+    await engine.on_event("binary_sensor.leak",
+                          state("on", device_class="moisture"),
+                          state("off", device_class="moisture"))
+    await settle(engine)
+    assert store.routine_loads == 1
+    assert fired == [("r1", "binary_sensor.leak", "on")]
+
+
+@pytest.mark.asyncio
+async def test_a_routine_write_rebuilds_the_index():
+    engine, fired = make_engine([rule(
+        trigger_config={"entity_id": "light.porch", "to_state": "on"})])
+    store = engine._store
+    await engine.on_event("light.porch", state("on"), state("off"))
+    store._routines.append(rule(id="r2", trigger_config={"domain": "lock",
+                                                         "to_state": "unlocked"}))
+    store.routines_version += 1
+    await engine.on_event("lock.front", state("unlocked"), state("locked"))
+    await settle(engine)
+    assert [f[0] for f in fired] == ["r1", "r2"]
+    assert store.routine_loads == 2
+
+
+@pytest.mark.asyncio
+async def test_a_countdown_is_cancelled_even_when_the_index_skips_the_event():
+    engine, fired = make_engine([rule(
+        trigger_config={"device_class": "door", "to_state": "on",
+                        "for_seconds": 0.05})])
+    await engine.on_event("binary_sensor.door",
+                          state("on", device_class="door"),
+                          state("off", device_class="door"))
+    # The follow-up update carries no device_class at all.
+    await engine.on_event("binary_sensor.door", state("unavailable"),
+                          state("on", device_class="door"))
+    await asyncio.sleep(0.1)
+    assert fired == []
+
+
+@pytest.mark.asyncio
+async def test_evaluation_latency_is_recorded():
+    from core import metrics
+    metrics.reset()
+    engine, _ = make_engine([rule(
+        trigger_config={"device_class": "moisture", "to_state": "on"})])
+    await engine.on_event("light.a", state("on"), state("off"))
+    snap = metrics.snapshot()
+    assert snap["latency"]["home_triggers.eval_ms"]["count"] == 1
+    assert snap["counters"]["home_triggers.rejected"] == 1
+
+
+def test_store_versions_routine_writes_but_not_run_bookkeeping(tmp_path):
+    from providers.memory.sqlite_store import SQLiteStore
+    store = SQLiteStore(str(tmp_path / "routines.db"))
+    asyncio.run(store.initialize())
+    v0 = store.routines_version
+    r = asyncio.run(store.create_routine(rule(id=None, trigger_config={"domain": "lock"})))
+    assert store.routines_version == v0 + 1
+    asyncio.run(store.update_routine(r["id"], "u1", {"last_run": "now"}))
+    assert store.routines_version == v0 + 1
+    asyncio.run(store.update_routine(r["id"], "u1", {"enabled": False}))
+    asyncio.run(store.delete_routine(r["id"], "u1"))
+    store.mark_routines_changed()
+    assert store.routines_version == v0 + 4
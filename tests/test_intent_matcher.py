@@ -0,0 +1,63 @@
+"""
+tests/test_intent_matcher.py
+
+The compiled intent matcher must give exactly the scores of the reference
+per-intent scorer (IntentRouter._compute_score), and must pick up registry
+changes without anyone remembering to rebuild it.
+"""
+
+from __future__ import annotations
+
+import os
+
+from core import intent_router
+from core.intent_router import (
+    INTENT_REGISTRY,
+    Intent,
+    IntentRouter,
+    _get_matcher,
+    _IntentMatcher,
+)
+
+_CORPUS = os.path.join(os.path.dirname(__file__), "..", "scripts",
+                       "intent_transcripts.txt")
+
+
+def _reference(intents, transcript):
+    lower = transcript.lower()
+    return [IntentRouter._compute_score(lower, i) for i in intents]
+
+
+def test_scores_match_reference_on_corpus():
+    with open(_CORPUS, encoding="utf-8") as f:
+        corpus = [l.strip() for l in f if l.strip() and not l.startswith("#")]
+    matcher = _IntentMatcher(INTENT_REGISTRY)
+    for transcript in corpus:
+        assert matcher.scores(transcript.lower()) == _reference(INTENT_REGISTRY, transcript), transcript
+
+
+def test_overlaps_duplicates_and_case():
+    intents = [
+        Intent(name="a", phrases=["Intercom", "intercom the"]),
+        Intent(name="b", keywords=["light", "lights", "light", "door"]),
+        Intent(name="c", keywords=["", "zzz"]),
+        Intent(name="d", phrases=["the weather"], keywords=["weather is"]),
+    ]
+    matcher = _IntentMatcher(intents)
+    for transcript in ("INTERCOM THE kitchen", "turn the lights off",
+                       "what the weather is", "nothing here", ""):
+        assert matcher.scores(transcript.lower()) == _reference(intents, transcript)
+
+
+def test_registry_change_rebuilds_matcher(monkeypatch):
+    registry = list(INTENT_REGISTRY)
+    monkeypatch.setattr(intent_router, "INTENT_REGISTRY", registry)
+    router = IntentRouter(confidence_threshold=0.7)
+    assert router._score("engage the flux capacitor")[0].name == "conversation"
+
+    registry.insert(0, Intent(name="flux", phrases=["flux capacitor"]))
+    assert router._score("engage the flux capacitor")[0].name == "flux"
+
+    registry[0].phrases.append("time circuits")
+    assert router._score("time circuits on")[0].name == "flux"
+    assert _get_matcher().intents[0].name == "flux"
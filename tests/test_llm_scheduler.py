@@ -0,0 +1,198 @@
+"""
+tests/test_llm_scheduler.py
+
+The local model scheduler: waiters are served voice, text, proactive,
+background; background work waits while anything interactive runs; an
+interactive call preempts a background stream, which retries if it had not
+produced anything and raises Preempted if it had; background work in another
+process (the scribe daemon) waits for this one's interactive work too; roles
+carry their priority into the queue.
+"""
+
+import asyncio
+
+import pytest
+
+from core import metrics
+from providers.llm.agent_roles import AgentRole, Priority
+from providers.llm.ollama import OllamaLLM
+from providers.llm.scheduler import (
+    LocalLLMScheduler,
+    Preempted,
+    current_priority,
+    get_llm_scheduler,
+    llm_priority,
+)
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    from config.settings import get_settings
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ollama_num_parallel", 1)
+    monkeypatch.setattr(settings, "ollama_model_parallel", {})
+    return settings
+
+
+def test_waiters_are_served_by_priority(parallel):
+    async def _run():
+        scheduler = LocalLLMScheduler()
+        held = await scheduler.acquire("m", Priority.PROACTIVE)
+        order = []
+
+        async def _call(priority):
+            slot = await scheduler.acquire("m", priority)
+            order.append(priority)
+            scheduler.release(slot)
+
+        tasks = []
+        for p in (Priority.BACKGROUND, Priority.PROACTIVE,
+                  Priority.INTERACTIVE_TEXT, Priority.INTERACTIVE_VOICE):
+            tasks.append(asyncio.create_task(_call(p)))
+            await asyncio.sleep(0)
+        # Another model is not held up by the queue on this one.
+        other = await asyncio.wait_for(scheduler.acquire("n", Priority.PROACTIVE), 1)
+        scheduler.release(other)
+
+        scheduler.release(held)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(_run()) == sorted(Priority)
+
+
+def test_background_waits_while_interactive_work_runs(parallel):
+    parallel.ollama_model_parallel = {"m": 2}
+
+    async def _run():
+        scheduler = LocalLLMScheduler()
+        turn = await scheduler.acquire("m", Priority.INTERACTIVE_VOICE)
+        background = asyncio.create_task(scheduler.acquire("n", Priority.BACKGROUND))
+        proactive = asyncio.create_task(scheduler.acquire("m", Priority.PROACTIVE))
+        await asyncio.sleep(0.01)
+        assert proactive.done() and not background.done()
+        scheduler.release(turn)
+        await asyncio.wait_for(background, 1)
+        assert scheduler.snapshot()["active"] == {"m": ["proactive"], "n": ["background"]}
+
+    asyncio.run(_run())
+
+
+def test_background_in_another_process_waits_for_interactive_work(parallel, monkeypatch):
+    import providers.llm.scheduler as sched
+
+    monkeypatch.setattr(sched, "_EXTERNAL_POLL_SECONDS", 0.01)
+
+    async def _run():
+        # Two schedulers stand in for the server and the scribe daemon; they
+        # share nothing but the lock file.
+        server, scribe = LocalLLMScheduler(), LocalLLMScheduler()
+        turn = await server.acquire("m", Priority.INTERACTIVE_VOICE)
+        background = asyncio.create_task(scribe.acquire("n", Priority.BACKGROUND))
+        await asyncio.sleep(0.05)
+        assert not background.done()
+        # Other classes in that process are not held back.
+        proactive = await asyncio.wait_for(scribe.acquire("n", Priority.PROACTIVE), 1)
+        scribe.release(proactive)
+
+        server.release(turn)
+        scribe.release(await asyncio.wait_for(background, 1))
+
+    asyncio.run(_run())
+
+
+class _Stream:
+    """Four chunks. A held stream waits for `gate` before each one."""
+
+    def __init__(self, held):
+        self._chunks = ["a", "b", "c", "d"]
+        self.gate = asyncio.Event()
+        self.held = held
+        if not held:
+            self.gate.set()
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._chunks:
+            raise StopAsyncIteration
+        await self.gate.wait()
+        if self.held:
+            self.gate.clear()
+        return {"message": {"content": self._chunks.pop(0)}}
+
+    async def aclose(self):
+        self.closed = True
+
+
+class _Client:
+    def __init__(self):
+        self.hold_next = False
+        self.streams = []
+
+    async def chat(self, **kwargs):
+        stream = _Stream(self.hold_next)
+        self.hold_next = False
+        self.streams.append(stream)
+        return stream
+
+
+async def _collect(llm, priority):
+    with llm_priority(priority):
+        return "".join([c async for c in llm.stream_response(
+            [{"role": "user", "content": "hi"}])])
+
+
+async def _until(predicate):
+    while not predicate():
+        await asyncio.sleep(0.001)
+
+
+def test_interactive_turn_preempts_a_background_stream(parallel):
+    async def _run():
+        client = _Client()
+        llm = OllamaLLM(model="m")
+        llm._client = client
+
+        # Preempted before producing anything: it retries, and completes.
+        client.hold_next = True
+        background = asyncio.create_task(_collect(llm, AgentRole.SCRIBE))
+        await _until(lambda: client.streams)
+        turn = asyncio.create_task(_collect(llm, Priority.INTERACTIVE_VOICE))
+        await asyncio.sleep(0.01)
+        client.streams[0].gate.set()
+        assert await turn == "abcd"
+        assert await background == "abcd"
+        assert client.streams[0].closed and len(client.streams) == 3
+
+        # Preempted after producing: the caller hears about it.
+        client.hold_next = True
+        slow = asyncio.create_task(_collect(llm, Priority.BACKGROUND))
+        await _until(lambda: len(client.streams) == 4)
+        client.streams[3].gate.set()
+        await _until(lambda: len(client.streams[3]._chunks) == 3)
+        turn = asyncio.create_task(_collect(llm, Priority.INTERACTIVE_TEXT))
+        await asyncio.sleep(0.01)
+        client.streams[3].gate.set()
+        with pytest.raises(Preempted):
+            await slow
+        assert await turn == "abcd"
+        assert not get_llm_scheduler().snapshot()["active"].get("m")
+
+    before = metrics.snapshot()["counters"].get("llm_scheduler.preempted", 0)
+    asyncio.run(_run())
+    assert metrics.snapshot()["counters"]["llm_scheduler.preempted"] == before + 2
+
+
+def test_roles_carry_their_priority():
+    assert current_priority() is Priority.INTERACTIVE_TEXT
+    with llm_priority(AgentRole.SCRIBE):
+        assert current_priority() is Priority.BACKGROUND
+        with llm_priority(Priority.INTERACTIVE_VOICE):
+            assert current_priority() is Priority.INTERACTIVE_VOICE
+    with llm_priority(AgentRole.PRIMARY):
+        assert current_priority() is Priority.INTERACTIVE_TEXT
+    assert current_priority() is Priority.INTERACTIVE_TEXT
@@ -0,0 +1,138 @@
+"""
+tests/test_memory_context_cache.py
+
+MemoryManager keeps a per-user snapshot of the SQLite memory tiers: a stable
+user's context is assembled without touching the database, every write path
+drops the snapshot, and summary TTL extensions are queued and flushed in one
+batch instead of one UPDATE per summary per turn.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from core.memory_manager import MemoryManager
+from providers.memory.models import MemorySettings
+from providers.memory.sqlite_store import SQLiteStore
+
+
+def _manager(tmp_path):
+    store = SQLiteStore(str(tmp_path / "memory.db"))
+    manager = MemoryManager(store)
+    asyncio.run(manager.initialize())
+    reads = []
+    for name in ("get_memory_settings", "get_facts", "get_preferences",
+                 "get_recent_summaries", "update_summary_ttl"):
+        original = getattr(store, name)
+
+        async def counted(*args, _name=name, _original=original, **kwargs):
+            reads.append(_name)
+            return await _original(*args, **kwargs)
+
+        setattr(store, name, counted)
+    return manager, reads
+
+
+def _summary_row(manager, summary_id):
+    def query():
+        return manager._store._get_conn().execute(
+            "SELECT reference_count, expires_at FROM conversation_summaries "
+            "WHERE id = ?", (summary_id,)).fetchone()
+    return asyncio.run(manager._store._run(query))
+
+
+def test_stable_user_is_served_from_snapshot(tmp_path):
+    manager, reads = _manager(tmp_path)
+    asyncio.run(manager.upsert_fact("alice", "name", "Alice"))
+    asyncio.run(manager.record_summary("alice", "Talked about tea."))
+    reads.clear()
+
+    first = asyncio.run(manager.build_context_block("alice"))
+    assert "name: Alice" in first and "Talked about tea." in first
+    assert sorted(reads) == ["get_facts", "get_memory_settings",
+                             "get_preferences", "get_recent_summaries"]
+
+    reads.clear()
+    assert asyncio.run(manager.build_context_block("alice")) == first
+    assert reads == []
+
+
+def test_writes_invalidate_snapshot(tmp_path):
+    manager, _ = _manager(tmp_path)
+    asyncio.run(manager.build_context_block("bob"))
+
+    asyncio.run(manager.upsert_preference("bob", "tone", "dry"))
+    assert "tone: dry" in asyncio.run(manager.build_context_block("bob"))
+
+    pref = asyncio.run(manager.get_preferences("bob"))[0]
+    asyncio.run(manager.delete_preference(pref.id, "bob"))
+    assert "tone: dry" not in asyncio.run(manager.build_context_block("bob"))
+
+    asyncio.run(manager.record_summary("bob", "Fixed the boiler."))
+    assert "Fixed the boiler." in asyncio.run(manager.build_context_block("bob"))
+
+    asyncio.run(manager.save_memory_settings(
+        MemorySettings(user_id="bob", summaries_enabled=False)))
+    assert "Fixed the boiler." not in asyncio.run(manager.build_context_block("bob"))
+
+
+def test_summary_ttl_change_invalidates_snapshot(tmp_path):
+    manager, reads = _manager(tmp_path)
+    asyncio.run(manager.record_summary("erin", "Booked the dentist."))
+    summary = asyncio.run(manager._store.get_recent_summaries("erin"))[0]
+    asyncio.run(manager.build_context_block("erin"))
+
+    assert asyncio.run(manager.set_summary_ttl(summary.id, "erin", "forever"))
+    assert _summary_row(manager, summary.id)[1] is None
+    reads.clear()
+    asyncio.run(manager.build_context_block("erin"))
+    assert "get_recent_summaries" in reads
+
+    assert not asyncio.run(manager.set_summary_ttl(summary.id, "mallory", "short"))
+
+
+def test_ttl_extensions_are_coalesced_into_one_flush(tmp_path):
+    manager, reads = _manager(tmp_path)
+    asyncio.run(manager.save_memory_settings(
+        MemorySettings(user_id="carol", auto_extend=True)))
+    asyncio.run(manager.record_summary("carol", "Planned the garden."))
+    summary = asyncio.run(manager._store.get_recent_summaries("carol"))[0]
+
+    for _ in range(3):
+        asyncio.run(manager.build_context_block("carol"))
+    assert "update_summary_ttl" not in reads
+    assert _summary_row(manager, summary.id)[0] == 0
+
+    assert asyncio.run(manager.flush_ttl_extensions()) == 1
+    refs, expires_at = _summary_row(manager, summary.id)
+    assert refs == 3
+    assert expires_at is not None
+    assert asyncio.run(manager.flush_ttl_extensions()) == 0
+
+
+def test_semantic_search_runs_alongside_sqlite_reads(tmp_path, monkeypatch):
+    manager, _ = _manager(tmp_path)
+    asyncio.run(manager.save_memory_settings(
+        MemorySettings(user_id="dave", auto_extend=True)))
+    monkeypatch.setattr(manager._settings, "semantic_memory_enabled", True)
+    started = []
+
+    class _SlowVectorStore:
+        async def search(self, query_text, n_results, where):
+            started.append("search")
+            await asyncio.sleep(0.05)
+            return [{"id": "s1", "text": "A relevant memory",
+                     "metadata": {"type": "summary"}}]
+
+    manager._vector_store = _SlowVectorStore()
+    original = manager._get_snapshot
+
+    async def snapshot(user_id):
+        # The search must already be in flight when SQLite is consulted.
+        assert started == ["search"]
+        return await original(user_id)
+
+    monkeypatch.setattr(manager, "_get_snapshot", snapshot)
+    block = asyncio.run(manager.build_context_block("dave", query_text="garden"))
+    assert "A relevant memory" in block
+    assert "s1" in manager._pending_ttl
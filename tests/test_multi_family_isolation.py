@@ -262,6 +262,7 @@ def test_usage_summary_is_filtered_by_account(tmp_path, monkeypatch):
     # Patch _db_path rather than a settings object: the real one imports
     # config.settings, which pulls in the whole application configuration for
     # a test that only needs a table.
+    tt.flush()  # rows buffered by earlier tests belong to the real database
     monkeypatch.setattr(tt, "_db_path", lambda: tmp_path / "usage.db")
     monkeypatch.setattr(tt, "_schema_ready", False)
     if hasattr(tt._local, "conn"):
@@ -0,0 +1,166 @@
+"""
+tests/test_piper_tts.py
+
+Resident Piper engine. The real binary is not installed in CI, so a tiny
+Python script stands in for it: it speaks the same --output_raw protocol
+(one utterance per stdin line, raw PCM on stdout, "Real-time factor" on
+stderr when the utterance is done) and counts how often it was started.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import stat
+import sys
+import wave
+
+import pytest
+
+from config.settings import get_settings
+from core.provider_pool import ProviderPool
+from providers.tts import piper as piper_mod
+from providers.tts.piper import PiperTTS, _wav_header
+
+
+_FAKE_PIPER = """#!{python}
+import sys
+with open({starts!r}, "a") as f:
+    f.write("start\\n")
+for line in sys.stdin:
+    text = line.strip()
+    if text == "crash":
+        sys.exit(3)
+    # 100 samples per character, in two writes to exercise chunking.
+    pcm = (len(text) * 100) * b"\\x01\\x00"
+    half = len(pcm) // 2
+    sys.stdout.buffer.write(pcm[:half]); sys.stdout.buffer.flush()
+    sys.stdout.buffer.write(pcm[half:]); sys.stdout.buffer.flush()
+    sys.stderr.write("[piper] [info] Real-time factor: 0.1 (infer=0.1 sec, audio=1 sec)\\n")
+    sys.stderr.flush()
+"""
+
+
+@pytest.fixture()
+def fake_piper(tmp_path, monkeypatch):
+    starts = tmp_path / "starts.log"
+    binary = tmp_path / "piper"
+    binary.write_text(_FAKE_PIPER.format(python=sys.executable, starts=str(starts)))
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+
+    model = tmp_path / "voice.onnx"
+    model.write_bytes(b"onnx")
+    (tmp_path / "voice.onnx.json").write_text(json.dumps({"audio": {"sample_rate": 16000}}))
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "piper_executable_path", str(binary))
+    monkeypatch.setattr(settings, "piper_model_path", str(model))
+    monkeypatch.setattr(settings, "piper_engine", "process")
+
+    def start_count() -> int:
+        return len(starts.read_text().splitlines()) if starts.exists() else 0
+    return start_count
+
+
+def test_wav_header_round_trips_through_wave():
+    pcm = b"\x00\x01" * 50
+    with wave.open(io.BytesIO(_wav_header(16000, len(pcm)) + pcm)) as w:
+        assert w.getframerate() == 16000
+        assert w.getnchannels() == 1
+        assert w.getsampwidth() == 2
+        assert w.readframes(1000) == pcm
+
+
+def test_process_engine_started_once_for_many_sentences(fake_piper):
+    async def go():
+        tts = PiperTTS()
+        try:
+            first = await tts.synthesize("Hello there.")
+            second = await tts.synthesize("How are you?")
+        finally:
+            await tts.close()
+        return first, second
+
+    first, second = asyncio.run(go())
+    assert first.startswith(b"RIFF")
+    assert len(first) == 44 + len("Hello there.") * 200
+    assert len(second) == 44 + len("How are you?") * 200
+    assert fake_piper() == 1
+
+
+def test_stream_yields_header_then_pcm_without_leaking_into_next_call(fake_piper):
+    async def go():
+        tts = PiperTTS()
+        try:
+            chunks = [c async for c in tts.stream_synthesize("one two")]
+            after = await tts.synthesize("abc")
+        finally:
+            await tts.close()
+        return chunks, after
+
+    chunks, after = asyncio.run(go())
+    assert chunks[0][:4] == b"RIFF" and len(chunks[0]) == 44
+    assert sum(len(c) for c in chunks[1:]) == len("one two") * 200
+    assert len(after) == 44 + 3 * 200
+
+
+def test_crashed_engine_raises_and_restarts(fake_piper):
+    async def go():
+        tts = PiperTTS()
+        try:
+            with pytest.raises(RuntimeError, match="exited with code 3"):
+                await tts.synthesize("crash")
+            return await tts.synthesize("ok")
+        finally:
+            await tts.close()
+
+    assert len(asyncio.run(go())) == 44 + 2 * 200
+    assert fake_piper() == 2
+
+
+def test_pool_shares_voice_and_reaps_idle_engine(fake_piper, monkeypatch):
+    monkeypatch.setattr(
+        "core.conversation_loop._build_tts_provider",
+        lambda voice_id_override=None: PiperTTS())
+
+    async def go():
+        pool = ProviderPool()
+        a = await pool.get_tts("river")
+        b = await pool.get_tts("river")
+        assert a is b
+        assert await pool.reap_idle_tts(3600) == 0
+        a.last_used -= 7200
+        assert await pool.reap_idle_tts(3600) == 1
+        # Already stopped: later passes leave it alone.
+        assert not a.engine_running
+        assert await pool.reap_idle_tts(3600) == 0
+        # A reaped voice keeps working; its engine restarts on demand.
+        wav = await a.synthesize("hi")
+        await pool.close_all()
+        return wav
+
+    assert len(asyncio.run(go())) == 44 + 2 * 200
+    # Warm-up start, then the restart after reaping.
+    assert fake_piper() == 2
+
+
+def test_unknown_engine_is_rejected(fake_piper, monkeypatch):
+    monkeypatch.setattr(get_settings(), "piper_engine", "gpu")
+    with pytest.raises(ValueError, match="PIPER_ENGINE"):
+        PiperTTS()
+
+
+def test_auto_uses_binary_when_binding_missing(fake_piper, monkeypatch):
+    monkeypatch.setattr(get_settings(), "piper_engine", "auto")
+    monkeypatch.setattr(piper_mod, "_binding_available", lambda: False)
+
+    async def go():
+        tts = PiperTTS()
+        try:
+            await tts.warm_up()
+            return tts._engine.kind, tts.sample_rate
+        finally:
+            await tts.close()
+
+    assert asyncio.run(go()) == ("process", 16000)
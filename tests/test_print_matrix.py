@@ -0,0 +1,151 @@
+"""
+tests/test_print_matrix.py
+
+PrintMatrix: vectorised per-user scores match the per-sample cosine loop they
+replace, single and batched; append/remove keep users' blocks contiguous; the
+saved index is memory-mapped back, rebuilt when the sample files disagree with
+it, and picked up by another instance sharing the root. Also the face
+provider's batch identify over those scores.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from providers.print_matrix import INDEX_DIR, PrintMatrix
+
+
+def _cos(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def _enrol(root, prints):
+    for user_id, samples in prints.items():
+        user_dir = os.path.join(root, user_id)
+        os.makedirs(user_dir, exist_ok=True)
+        for i, s in enumerate(samples):
+            np.save(os.path.join(user_dir, f"sample_{i}.npy"), s.astype(np.float32))
+
+
+@pytest.fixture
+def prints():
+    rng = np.random.default_rng(7)
+    return {u: [rng.normal(size=16) for _ in range(n)]
+            for u, n in (("ann", 3), ("bob", 1), ("cat", 4))}
+
+
+def test_scores_match_the_naive_loop(tmp_path, prints):
+    _enrol(tmp_path, prints)
+    pm = PrintMatrix(str(tmp_path))
+    pm.load()
+    query = np.random.default_rng(1).normal(size=16)
+
+    expected = {u: max(_cos(query, s) for s in samples) for u, samples in prints.items()}
+    got = dict(zip(pm.users, pm.user_scores(query)))
+    assert got == pytest.approx(expected, abs=1e-5)
+
+    ranked = pm.rank(query)
+    order = sorted(expected, key=expected.get, reverse=True)
+    assert [u for u, _ in ranked] == order[:2]
+
+    batch = np.stack([query, -query, prints["bob"][0]])
+    scores = pm.user_scores(batch)
+    assert scores.shape == (3, 3)
+    assert scores[0] == pytest.approx(pm.user_scores(query), abs=1e-6)
+    assert pm.rank_scores(scores[2])[0] == ("bob", pytest.approx(1.0, abs=1e-5))
+
+    pairs = [_cos(a, b) for i, a in enumerate(prints["ann"]) for b in prints["ann"][i + 1:]]
+    assert pm.self_similarity("ann") == pytest.approx(sum(pairs) / len(pairs), abs=1e-5)
+    assert pm.self_similarity("bob") == 1.0
+
+
+def test_append_and_remove_keep_blocks_contiguous(tmp_path, prints):
+    _enrol(tmp_path, prints)
+    pm = PrintMatrix(str(tmp_path))
+    pm.load()
+    extra = np.random.default_rng(3).normal(size=16)
+
+    pm.append("ann", extra)
+    assert len(pm.samples("ann")) == 4
+    assert pm.rank(extra)[0] == ("ann", pytest.approx(1.0, abs=1e-5))
+    assert pm.samples("bob")[0] == pytest.approx(
+        prints["bob"][0] / np.linalg.norm(prints["bob"][0]), abs=1e-6)
+
+    pm.append("dan", -extra)
+    pm.remove_user("ann")
+    assert pm.users == ["bob", "cat", "dan"]
+    assert pm.rank(-extra)[0][0] == "dan"
+
+    pm.remove_user("bob")
+    pm.remove_user("cat")
+    pm.remove_user("dan")
+    assert len(pm) == 0 and pm.rank(extra) == []
+
+
+def test_index_is_saved_mapped_and_rebuilt_when_stale(tmp_path, prints):
+    _enrol(tmp_path, prints)
+    first = PrintMatrix(str(tmp_path))
+    first.load()
+    assert os.path.isfile(tmp_path / INDEX_DIR / "prints.npy")
+
+    mapped = PrintMatrix(str(tmp_path))
+    mapped.load()
+    assert isinstance(mapped._matrix, np.memmap)
+    assert mapped.users == first.users
+
+    # A sample added behind the index's back: the counts disagree, so the
+    # next load rebuilds from the files rather than trusting the index.
+    np.save(tmp_path / "bob" / "sample_9.npy", np.ones(16, dtype=np.float32))
+    rebuilt = PrintMatrix(str(tmp_path))
+    rebuilt.load()
+    assert not isinstance(rebuilt._matrix, np.memmap)
+    assert len(rebuilt.samples("bob")) == 2
+
+
+def test_refresh_sees_another_instances_writes(tmp_path, prints):
+    _enrol(tmp_path, prints)
+    api, speaker = PrintMatrix(str(tmp_path)), PrintMatrix(str(tmp_path))
+    api.refresh()
+    speaker.refresh()
+
+    shutil.rmtree(tmp_path / "cat")
+    api.remove_user("cat")
+    speaker.refresh()
+    assert "cat" not in speaker.users
+
+
+def test_face_identify_batch_scores_every_frame_at_once(tmp_path, prints, monkeypatch):
+    import providers.face_id.face_id_provider as face
+
+    _enrol(tmp_path, prints)
+    monkeypatch.setattr(face, "FACE_PRINTS_ROOT", str(tmp_path))
+    provider = face.FaceIDProvider()
+    provider._prints = PrintMatrix(str(tmp_path))
+    frames = {b"ann": prints["ann"][1], b"noise": -prints["cat"][0]}
+
+    def _embed(image_bytes):
+        if image_bytes not in frames:
+            raise ValueError("No face detected in the image.")
+        return np.asarray(frames[image_bytes], dtype=np.float32), None
+
+    monkeypatch.setattr(provider, "_ensure_models", lambda: (None, None))
+    monkeypatch.setattr(provider, "_embed", _embed)
+    calls = []
+    user_scores = provider._prints.user_scores
+    monkeypatch.setattr(provider._prints, "user_scores",
+                        lambda q: calls.append(q.shape) or user_scores(q))
+
+    results = asyncio.run(provider.identify_batch([b"ann", b"blank", b"noise"]))
+    assert calls == [(2, 16)]
+    assert results[0]["matched"] and results[0]["user_id"] == "ann"
+    assert results[1]["reason"] == "no_face"
+    assert not results[2]["matched"] and results[2]["reason"] == "below_threshold"
+
+    monkeypatch.setattr(face, "get_face_id_provider", lambda: provider)
+    best = asyncio.run(face.match_frames([b"noise", b"ann"], "owner"))
+    assert best["user_id"] == "ann" and best["confidence"] == pytest.approx(1.0, abs=1e-3)
@@ -0,0 +1,199 @@
+"""
+tests/test_prompt_cache.py
+
+Prompt-prefix caching against a local stub server: the system prompt is
+built stable-first with the per-turn blocks after VOLATILE_MARKER; Anthropic
+receives the stable half and the tool list with cache_control, and the cache
+reads and writes it reports land in the token tracker, priced; Ollama calls
+carry keep_alive and the same stable prefix every turn.
+"""
+
+import asyncio
+import collections
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import anthropic
+import ollama
+import pytest
+
+import core.token_tracker as tt
+from core.conversation_loop import ConversationLoop
+from providers.llm.claude_api import ClaudeAPILLM
+from providers.llm.ollama import OllamaLLM
+from providers.llm.prompt_cache import VOLATILE_MARKER, anthropic_system, split_system
+
+STABLE = "You are River. " * 200
+
+
+class _Stub(BaseHTTPRequestHandler):
+    """Anthropic /v1/messages and Ollama /api/chat, caching like the real ones."""
+
+    requests = []
+    cached = set()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append((self.path, body))
+        if self.path == "/api/chat":
+            lines = [{"model": body["model"], "message": {"role": "assistant", "content": c},
+                      "done": False} for c in ("Hel", "lo")]
+            lines.append({"model": body["model"], "message": {"role": "assistant", "content": ""},
+                          "done": True, "done_reason": "stop"})
+            self._send("".join(json.dumps(l) + "\n" for l in lines).encode(),
+                       "application/x-ndjson")
+            return
+
+        system = body.get("system")
+        prefix = system[0]["text"] if isinstance(system, list) and "cache_control" in system[0] else ""
+        hit = prefix in self.cached
+        if prefix:
+            self.cached.add(prefix)
+        usage = {"input_tokens": 20, "output_tokens": 5,
+                 "cache_read_input_tokens": 800 if hit else 0,
+                 "cache_creation_input_tokens": 0 if hit or not prefix else 800}
+        message = {"id": "msg_1", "type": "message", "role": "assistant",
+                   "model": body["model"], "stop_sequence": None, "usage": usage}
+        if not body.get("stream"):
+            message.update(content=[{"type": "text", "text": "Hello"}], stop_reason="end_turn")
+            self._send(json.dumps(message).encode(), "application/json")
+            return
+        events = [
+            ("message_start", {"message": {**message, "content": [], "stop_reason": None}}),
+            ("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}}),
+            ("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": "Hello"}}),
+            ("content_block_stop", {"index": 0}),
+            ("message_delta", {"delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                               "usage": {"output_tokens": 5}}),
+            ("message_stop", {}),
+        ]
+        self._send("".join(f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n"
+                           for name, data in events).encode(), "text/event-stream")
+
+
+@pytest.fixture
+def stub():
+    _Stub.requests, _Stub.cached = [], set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tracker(tmp_path, monkeypatch):
+    tt.flush()  # rows buffered by earlier tests belong to the real database
+    monkeypatch.setattr(tt, "_db_path", lambda: tmp_path / "usage.db")
+    monkeypatch.setattr(tt, "_schema_ready", False)
+    monkeypatch.setattr(tt, "_local", threading.local())
+    monkeypatch.setattr(tt, "_pending", collections.deque(maxlen=tt._MAX_PENDING))
+    monkeypatch.setattr(tt, "_flusher", None)
+
+
+def _turn(memory):
+    return [{"role": "system", "content": STABLE + VOLATILE_MARKER + memory},
+            {"role": "user", "content": "hi"}]
+
+
+def test_anthropic_caches_the_stable_prefix_and_records_it(stub, tracker):
+    llm = ClaudeAPILLM(model="claude-haiku-4-5")
+    llm._client = anthropic.AsyncAnthropic(api_key="test", base_url=stub, max_retries=0)
+
+    async def _run():
+        for memory in ("\n\nKNOWN FACTS: tea", "\n\nKNOWN FACTS: coffee"):
+            assert "".join([c async for c in llm.stream_response(_turn(memory))]) == "Hello"
+        tools = [{"name": n, "description": n, "input_schema": {"type": "object"}}
+                 for n in ("weather", "calendar")]
+        return await llm.chat_with_tools(_turn("\n\nKNOWN FACTS: tea"), tools)
+
+    assert asyncio.run(_run()) == {"type": "text", "content": "Hello"}
+
+    bodies = [b for _, b in _Stub.requests]
+    for body in bodies:
+        stable, volatile = body["system"]
+        assert stable == {"type": "text", "text": STABLE, "cache_control": {"type": "ephemeral"}}
+        assert volatile["text"].startswith(VOLATILE_MARKER) and "cache_control" not in volatile
+    assert [t.get("cache_control") for t in bodies[2]["tools"]] == [None, {"type": "ephemeral"}]
+
+    summary = tt.get_summary(days=1)
+    assert (summary["total_cache_write"], summary["total_cache_read"]) == (800, 1600)
+    row = summary["by_model"][0]
+    assert row["cache_read_tokens"] == 1600
+    # Writes at 1.25x, reads at 0.1x the input rate.
+    expected = (60 * 0.80 + 15 * 4.00 + 800 * 0.80 * 1.25 + 1600 * 0.80 * 0.10) / 1e6
+    assert row["estimated_cost_usd"] == pytest.approx(expected, abs=1e-6)
+
+
+def test_ollama_keeps_the_model_loaded(stub, monkeypatch):
+    from config.settings import get_settings
+
+    llm = OllamaLLM(model="llama3.2:3b")
+    llm._client = ollama.AsyncClient(host=stub)
+
+    async def _run():
+        for memory in ("\n\nKNOWN FACTS: tea", "\n\nKNOWN FACTS: coffee"):
+            assert "".join([c async for c in llm.stream_response(_turn(memory))]) == "Hello"
+
+    asyncio.run(_run())
+    monkeypatch.setattr(get_settings(), "ollama_keep_alive", "-1")
+    asyncio.run(_run())
+    assert [b["keep_alive"] for _, b in _Stub.requests] == ["30m", "30m", -1, -1]
+    prefixes = {split_system(b["messages"][0]["content"])[0] for _, b in _Stub.requests}
+    assert prefixes == {STABLE}
+
+
+def test_system_prompt_puts_per_turn_blocks_after_the_marker(monkeypatch):
+    class _Memory:
+        async def build_context_block(self, user_id, query_text=None):
+            return f"\n\nKNOWN FACTS: asked about {query_text}"
+
+    loop = ConversationLoop(mode="text")
+    loop._memory = _Memory()
+    loop._thinking_mode = "thinking"
+
+    async def _run():
+        for query in ("the boiler", "the car"):
+            await loop._rebuild_system_prompt(query_text=query)
+            loop._splice_system_block(loop._RAG_BLOCK_MARKER, "\nmanual p. 4")
+            yield loop._history[0]["content"]
+
+    async def _collect():
+        return [p async for p in _run()]
+
+    first, second = asyncio.run(_collect())
+    stable, volatile = split_system(first)
+    assert stable == split_system(second)[0]
+    assert "REASONING MODE" in stable and "KNOWN FACTS" not in stable
+    assert "the boiler" in volatile and volatile.endswith("manual p. 4")
+
+    # A prompt with no per-turn blocks gains the marker with its first one.
+    loop._history = [{"role": "system", "content": "persona"}]
+    loop._splice_system_block(loop._SKILLS_BLOCK_MARKER, "\n- skill")
+    assert split_system(loop._history[0]["content"]) == (
+        "persona", VOLATILE_MARKER + loop._SKILLS_BLOCK_MARKER + "\n- skill")
+
+
+def test_caching_can_be_switched_off(monkeypatch):
+    from config.settings import get_settings
+
+    monkeypatch.setattr(get_settings(), "llm_prompt_cache_enabled", False)
+    assert anthropic_system("persona" + VOLATILE_MARKER) == "persona" + VOLATILE_MARKER
+
+
+def test_a_prompt_with_no_stable_part_sends_no_empty_cached_block():
+    volatile_only = VOLATILE_MARKER + "\nroom: kitchen"
+    assert anthropic_system(volatile_only) == volatile_only
+    blocks = anthropic_system("persona" + volatile_only)
+    assert [b["text"] for b in blocks] == ["persona", volatile_only]
@@ -0,0 +1,227 @@
+"""
+tests/test_routines_scheduler.py
+
+The heap-driven routine scheduler: TimerHeap ordering and wake-ups, fire
+instants in the owner's timezone (days, DST gaps and repeats), incremental
+resync when routines change, the missed-run policy after a restart, and
+stopping with runs still in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+import zoneinfo
+
+import core.routines_scheduler as rs
+from core.routines_scheduler import (
+    RoutineScheduler,
+    last_fire_before,
+    next_fire_after,
+)
+from core.timer_heap import TimerHeap
+
+UTC = zoneinfo.ZoneInfo("UTC")
+NY = zoneinfo.ZoneInfo("America/New_York")
+
+
+# ---------------------------------------------------------------------------
+# TimerHeap
+# ---------------------------------------------------------------------------
+
+def test_timer_heap_pops_due_keys_in_order_and_honours_reschedules():
+    heap = TimerHeap()
+    heap.set("a", 30)
+    heap.set("b", 10)
+    heap.set("c", 20)
+    heap.set("a", 5)       # moved earlier
+    heap.remove("c")
+    assert len(heap) == 2 and heap.next_due() == 5
+    assert heap.pop_due(now=15) == [("a", 5), ("b", 10)]
+    assert heap.pop_due(now=100) == []
+    assert len(heap) == 0 and heap.next_due() is None
+
+
+def test_wait_due_wakes_for_an_earlier_timer():
+    async def _go():
+        heap = TimerHeap()
+        heap.set("later", time.time() + 60)
+        waiter = asyncio.create_task(heap.wait_due(max_wait=60))
+        await asyncio.sleep(0.01)
+        started = time.monotonic()
+        heap.set("soon", time.time() + 0.02)
+        first = await asyncio.wait_for(waiter, 1.0)
+        if not first:  # woken by set(); the next wait sleeps until "soon"
+            first = await asyncio.wait_for(heap.wait_due(max_wait=60), 1.0)
+        assert [k for k, _ in first] == ["soon"]
+        assert time.monotonic() - started < 0.5
+
+    asyncio.run(_go())
+
+
+# ---------------------------------------------------------------------------
+# fire instants
+# ---------------------------------------------------------------------------
+
+def test_next_fire_honours_days_and_the_owner_timezone():
+    weekdays = {"time": "07:30", "days": ["mon", "tue", "wed", "thu", "fri"]}
+    # Friday 2026-08-21 08:00 in New York -> next is Monday 07:30 local.
+    after = datetime(2026, 8, 21, 8, 0, tzinfo=NY)
+    fire = next_fire_after(weekdays, NY, after)
+    assert fire.astimezone(NY) == datetime(2026, 8, 24, 7, 30, tzinfo=NY)
+    assert next_fire_after({"time": "bogus"}, NY, after) is None
+    assert next_fire_after({"time": "07:30", "days": ["funday"]}, NY, after) is None
+
+
+def test_dst_gap_and_repeat():
+    # 2026-03-08 02:30 does not exist in New York; it fires at 03:30 EDT.
+    spring = next_fire_after({"time": "02:30"}, NY, datetime(2026, 3, 8, 1, 0, tzinfo=NY))
+    assert spring == datetime(2026, 3, 8, 7, 30, tzinfo=UTC)
+    # 2026-11-01 01:30 happens twice; it fires once, at the first.
+    autumn = next_fire_after({"time": "01:30"}, NY, datetime(2026, 11, 1, 0, 0, tzinfo=NY))
+    assert autumn == datetime(2026, 11, 1, 5, 30, tzinfo=UTC)
+    again = next_fire_after({"time": "01:30"}, NY, autumn)
+    assert again.astimezone(NY).date() == datetime(2026, 11, 2).date()
+
+
+def test_last_fire_before():
+    now = datetime(2026, 8, 19, 9, 0, tzinfo=UTC)
+    assert last_fire_before({"time": "08:00"}, UTC, now) == now - timedelta(hours=1)
+    assert last_fire_before({"time": "10:00"}, UTC, now) == now - timedelta(hours=23)
+
+
+# ---------------------------------------------------------------------------
+# RoutineScheduler
+# ---------------------------------------------------------------------------
+
+class FakeStore:
+    def __init__(self, routines):
+        self.routines = routines
+        self.routines_version = 0
+        self.loads = 0
+
+    async def get_enabled_routines(self):
+        self.loads += 1
+        return [dict(r) for r in self.routines]
+
+    async def get_llm_settings(self, user_id):
+        return {"timezone": "UTC"}
+
+
+class FakeApp:
+    def __init__(self, store):
+        self.state = type("S", (), {})()
+        self.state.memory_manager = type("M", (), {"_store": store})()
+
+
+def routine(rid, hhmm, **kw):
+    base = {"id": rid, "user_id": "u1", "name": rid, "trigger": "schedule",
+            "time": hhmm, "days": [], "prompt": "go", "last_run": None,
+            "created_at": "2026-01-01T00:00:00+00:00"}
+    base.update(kw)
+    return base
+
+
+def _hhmm(dt):
+    return dt.strftime("%H:%M")
+
+
+def _scheduler(routines, monkeypatch):
+    store = FakeStore(routines)
+    sched = RoutineScheduler(FakeApp(store))
+    fired = []
+
+    async def _capture(app, user_id, r):
+        fired.append(r["id"])
+    monkeypatch.setattr(rs, "_run_proactive_routine", _capture)
+    return sched, store, fired
+
+
+def test_sync_schedules_only_changed_routines(monkeypatch):
+    now = datetime.now(UTC)
+    soon = now + timedelta(minutes=5)
+    sched, store, _ = _scheduler([routine("r1", _hhmm(soon)),
+                                  routine("manual", None, trigger="manual")], monkeypatch)
+    asyncio.run(sched.sync())
+    assert "manual" not in sched._heap
+    first = sched.next_due("r1")
+    assert first is not None and first > now
+
+    store.routines.append(routine("r2", _hhmm(now + timedelta(hours=2))))
+    store.routines_version += 1
+    assert sched._needs_sync()
+    sched._heap.set("r1", 123.0)   # marker: an unchanged routine is not recomputed
+    asyncio.run(sched.sync())
+    assert sched._heap.due_at("r1") == 123.0
+    assert sched.next_due("r2") is not None
+
+    store.routines = [r for r in store.routines if r["id"] != "r1"]
+    store.routines_version += 1
+    asyncio.run(sched.sync())
+    assert "r1" not in sched._heap and not sched._needs_sync()
+
+
+def test_missed_slot_is_caught_up_once_within_the_window(monkeypatch):
+    now = datetime.now(UTC)
+    missed = now - timedelta(minutes=20)
+    sched, _, fired = _scheduler([
+        routine("recent", _hhmm(missed), last_run=(missed - timedelta(days=1)).isoformat()),
+        routine("ran", _hhmm(missed), last_run=(missed + timedelta(minutes=1)).isoformat()),
+    ], monkeypatch)
+
+    async def _go():
+        await sched.sync(recovering=True)
+        for rid, due_at in sched._heap.pop_due():
+            sched._fire(rid, due_at)
+        await asyncio.sleep(0)
+
+    asyncio.run(_go())
+    assert fired == ["recent"]
+    # Rescheduled for the next real slot, not re-fired.
+    assert sched.next_due("recent") > now
+
+
+def test_skip_policy_and_the_catchup_window(monkeypatch):
+    now = datetime.now(UTC)
+    settings = rs.get_settings()
+    sched, _, fired = _scheduler([routine("r1", _hhmm(now))], monkeypatch)
+
+    async def _go():
+        await sched.sync()
+        sched._fire("r1", time.time() - 600)          # 10 min late
+        monkeypatch.setattr(settings, "routines_catchup_minutes", 5)
+        sched._fire("r1", time.time() - 600)
+        monkeypatch.setattr(settings, "routines_catchup_minutes", 60)
+        monkeypatch.setattr(settings, "routines_missed_run_policy", "skip")
+        sched._fire("r1", time.time() - 600)
+        sched._fire("r1", time.time() - 5)             # on time always runs
+        await asyncio.sleep(0)
+
+    asyncio.run(_go())
+    assert fired == ["r1", "r1"]
+
+
+def test_stop_cancels_runs_in_flight(monkeypatch):
+    now = datetime.now(UTC)
+    sched, _, _ = _scheduler([routine("r1", _hhmm(now))], monkeypatch)
+    cancelled = []
+
+    async def _slow(app, user_id, r):
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(r["id"])
+            raise
+    monkeypatch.setattr(rs, "_run_proactive_routine", _slow)
+
+    async def _go():
+        await sched.sync()
+        sched._fire("r1", time.time())
+        await asyncio.sleep(0)
+        assert len(sched._running) == 1
+        await sched.stop()
+
+    asyncio.run(_go())
+    assert cancelled == ["r1"]
+    assert not sched._running
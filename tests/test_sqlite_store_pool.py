@@ -0,0 +1,69 @@
+"""
+tests/test_sqlite_store_pool.py
+
+SQLiteStore is shared per database file: constructing it per request must not
+build new thread pools or connections, connections carry the tuned PRAGMAs,
+and pool wait/queue depth reach core.metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from core import metrics
+from providers.memory.sqlite_store import SQLiteStore, get_store
+
+
+def test_one_instance_per_database_file(tmp_path):
+    path = str(tmp_path / "shared.db")
+    a = SQLiteStore(path)
+    b = SQLiteStore(path)
+    other = SQLiteStore(str(tmp_path / "other.db"))
+    assert a is b
+    assert a._executor is b._executor
+    assert other is not a
+    assert get_store() is SQLiteStore()
+
+
+def test_connections_get_tuned_pragmas(tmp_path):
+    store = SQLiteStore(str(tmp_path / "pragmas.db"))
+
+    def read_pragmas():
+        conn = store._get_conn()
+        return {
+            name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+            for name in ("journal_mode", "synchronous", "cache_size", "busy_timeout")
+        }
+
+    pragmas = asyncio.run(store._run(read_pragmas))
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["cache_size"] < 0   # sized in KiB, not pages
+    assert pragmas["busy_timeout"] == 5000
+
+
+def test_pool_is_bounded_and_reports_wait(tmp_path):
+    metrics.reset()
+    store = SQLiteStore(str(tmp_path / "bounded.db"))
+
+    async def go():
+        await asyncio.gather(*(
+            store.execute_read_async("SELECT 1") for _ in range(50)))
+
+    asyncio.run(go())
+    assert len(store._conns) <= store._pool_size
+    snap = metrics.snapshot()
+    assert snap["latency"]["sqlite.pool_wait_ms"]["count"] == 50
+    assert snap["gauges"]["sqlite.pool_queue_depth"] == 0
+
+
+def test_closed_store_keeps_working(tmp_path):
+    store = SQLiteStore(str(tmp_path / "reopen.db"))
+
+    async def go():
+        await store.execute_write_async("CREATE TABLE t (x INTEGER)", ())
+        store.close()
+        await store.execute_write_async("INSERT INTO t VALUES (1)", ())
+        return await SQLiteStore(store._db_path).execute_read_async("SELECT x FROM t")
+
+    assert asyncio.run(go()) == [{"x": 1}]
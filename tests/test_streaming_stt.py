@@ -0,0 +1,115 @@
+"""
+tests/test_streaming_stt.py
+
+StreamingTranscriber: closed segments are decoded while audio is still
+arriving, partials carry committed text plus the current guess, the end of
+speech is detected from trailing silence, and the final transcript only
+waits for the last open segment. Also covers partial pre-scoring in the
+intent router.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+
+from core.intent_router import IntentRouter
+from providers.base import STTProvider
+from providers.stt.streaming import FRAME_BYTES, StreamingTranscriber
+
+
+def _tone(ms: int) -> bytes:
+    t = np.arange(16 * ms) / 16_000
+    return (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16).tobytes()
+
+
+def _silence(ms: int) -> bytes:
+    return b"\0\0" * (16 * ms)
+
+
+class _FakeSTT(STTProvider):
+    """Returns one word per 100 ms of loud audio; records each decode."""
+
+    def __init__(self):
+        self.decoded = []
+
+    async def transcribe(self, audio_bytes: bytes) -> str:
+        await asyncio.sleep(0.005)
+        pcm = np.frombuffer(audio_bytes, dtype=np.int16)
+        loud_ms = int((pcm != 0).sum() / 16)
+        self.decoded.append(len(audio_bytes))
+        return " ".join(["word"] * round(loud_ms / 100))
+
+
+async def _feed(stream, pcm, chunk=FRAME_BYTES * 3 + 7):
+    # Odd chunk size: frames straddle websocket messages.
+    for start in range(0, len(pcm), chunk):
+        if await stream.feed(pcm[start:start + chunk]):
+            return True
+    return False
+
+
+def test_segments_decode_during_speech_and_endpoint_on_silence():
+    async def scenario():
+        stt = _FakeSTT()
+        partials = []
+
+        async def on_partial(text):
+            partials.append(text)
+
+        stream = StreamingTranscriber(stt, on_partial=on_partial)
+        # Two phrases with a pause between them, then a long silence.
+        assert not await _feed(stream, _silence(200) + _tone(300) + _silence(400))
+        await asyncio.sleep(0.05)
+        assert stt.decoded, "first segment should be decoded before speech ends"
+        assert partials[-1] == "word word word"
+
+        ended = await _feed(stream, _tone(500) + _silence(1000))
+        assert ended and stream.endpointed
+        assert await stream.finish() == "word word word word word word word word"
+        return partials
+
+    partials = asyncio.run(scenario())
+    assert any(p.startswith("word word word word") for p in partials)
+
+
+def test_partials_while_talking():
+    async def scenario():
+        stt = _FakeSTT()
+        partials = []
+
+        async def on_partial(text):
+            partials.append(text)
+
+        stream = StreamingTranscriber(stt, on_partial=on_partial)
+        for _ in range(4):
+            await _feed(stream, _tone(400))
+            await asyncio.sleep(0.02)
+        assert partials, "long speech should yield partial hypotheses"
+        assert not stream.endpointed
+        final = await stream.finish()
+        assert final.split() == ["word"] * 16
+
+    asyncio.run(scenario())
+
+
+def test_no_detected_speech_falls_back_to_whole_clip():
+    async def scenario():
+        stt = _FakeSTT()
+        stream = StreamingTranscriber(stt)
+        await _feed(stream, _silence(500))
+        assert await stream.finish() == ""
+        assert stt.decoded == [len(_silence(500))]
+
+    asyncio.run(scenario())
+
+
+def test_prescore_partial_and_reuse_for_final():
+    router = IntentRouter(confidence_threshold=0.7)
+    assert router.prescore("") == ("conversation", 0.0)
+    name, score = router.prescore("what's the weather")
+    assert name == "weather" and score >= 0.7
+    # The final transcript equal to the last partial is not scored again.
+    assert router._last_scored[1] == "what's the weather"
+    assert router._score("What's the weather")[0].name == "weather"
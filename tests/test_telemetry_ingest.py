@@ -0,0 +1,112 @@
+"""
+tests/test_telemetry_ingest.py
+
+core/telemetry_ingest: batches from many units land in one transaction, each
+submitter returns only after its rows are committed, a bad row fails only
+the batch it came in, and a full queue is refused with 429 + Retry-After
+instead of growing without bound.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from config.settings import get_settings
+from core.telemetry_ingest import (
+    TelemetryBackpressure,
+    TelemetryIngest,
+    ingest_telemetry,
+)
+from providers.memory.sqlite_store import SQLiteStore
+
+_SQL = "INSERT INTO t (unit, n) VALUES (?, ?)"
+
+
+@pytest.fixture()
+def store(tmp_path):
+    s = SQLiteStore(db_path=str(tmp_path / "ingest.db"))
+    s._get_write_conn().execute("CREATE TABLE t (unit TEXT, n INTEGER NOT NULL)")
+    commits = []
+    real = s.execute_many_isolated_async
+
+    async def counting(statements):
+        commits.append(sum(len(rows) for _, rows in statements))
+        await real(statements)
+
+    s.execute_many_isolated_async = counting
+    s.commits = commits
+    return s
+
+
+def _count(store) -> int:
+    return store._get_write_conn().execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+
+def test_concurrent_batches_share_one_commit(store):
+    ingest = TelemetryIngest(store)
+
+    async def go():
+        return await asyncio.gather(*(
+            ingest.submit(_SQL, [(f"u{u}", n) for n in range(50)])
+            for u in range(12)
+        ))
+
+    assert asyncio.run(go()) == [50] * 12
+    assert store.commits == [600]
+    assert _count(store) == 600
+
+
+def test_a_bad_row_fails_only_the_batch_that_sent_it(store):
+    ingest = TelemetryIngest(store)
+
+    async def go():
+        return await asyncio.gather(
+            ingest.submit(_SQL, [("good", 1), ("good", 2)]),
+            ingest.submit(_SQL, [("bad", 1), ("bad", None)]),
+            ingest.submit(_SQL, [("also good", 1)]),
+            return_exceptions=True,
+        )
+
+    good, bad, also_good = asyncio.run(go())
+    assert (good, also_good) == (2, 1)
+    assert isinstance(bad, Exception)
+    # The group commit rolled back whole; the retries are one per submitter.
+    assert store.commits == [5, 2, 2, 1]
+    assert _count(store) == 3
+    assert ingest.queued_rows == 0
+
+
+def test_a_lone_failing_batch_is_not_retried(store):
+    ingest = TelemetryIngest(store)
+    with pytest.raises(Exception):
+        asyncio.run(ingest.submit(_SQL, [("bad", None)]))
+    assert store.commits == [1]
+    assert _count(store) == 0
+
+
+def test_full_queue_is_refused_without_queueing(store, monkeypatch):
+    monkeypatch.setattr(get_settings(), "telemetry_max_pending_rows", 60)
+    ingest = TelemetryIngest(store)
+
+    async def go():
+        first = asyncio.ensure_future(ingest.submit(_SQL, [("a", n) for n in range(50)]))
+        await asyncio.sleep(0)
+        with pytest.raises(TelemetryBackpressure) as exc:
+            await ingest.submit(_SQL, [("b", n) for n in range(20)])
+        await first
+        return exc.value.retry_after
+
+    assert asyncio.run(go()) >= 1
+    assert _count(store) == 50
+
+
+def test_route_helper_maps_backpressure_to_429(store, monkeypatch):
+    monkeypatch.setattr(get_settings(), "telemetry_max_pending_rows", 1)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(ingest_telemetry(store, _SQL, [("a", 1), ("a", 2)]))
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "1"
@@ -0,0 +1,189 @@
+"""
+tests/test_token_tracker_buffer.py
+
+The buffered token recorder: record_usage never writes on the event loop and
+one flush commits a burst together; readers see every recorded call; the
+hourly/daily rollups give the same summaries as scanning token_usage, for
+rows from before they existed too; provider rates come from the in-memory
+minute counters and survive a restart by seeding from the table.
+"""
+
+import asyncio
+import collections
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import core.token_tracker as tt
+
+
+@pytest.fixture()
+def tracker(tmp_path, monkeypatch):
+    tt.flush()  # rows buffered by earlier tests belong to the real database
+    monkeypatch.setattr(tt, "_db_path", lambda: tmp_path / "usage.db")
+    monkeypatch.setattr(tt, "_schema_ready", False)
+    monkeypatch.setattr(tt, "_local", threading.local())
+    monkeypatch.setattr(tt, "_pending", collections.deque(maxlen=tt._MAX_PENDING))
+    monkeypatch.setattr(tt, "_flusher", None)
+    monkeypatch.setattr(tt, "_rates", {})
+    monkeypatch.setattr(tt, "_rates_seeded", False)
+    return tmp_path / "usage.db"
+
+
+def _rows(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM token_usage").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+
+
+def test_recording_on_the_loop_is_buffered_and_flushed_together(tracker, monkeypatch):
+    monkeypatch.setattr(tt, "_FLUSH_INTERVAL", 0.05)
+    flushed = []
+    real_flush = tt.flush
+    monkeypatch.setattr(tt, "flush", lambda: flushed.append(real_flush()) or flushed[-1])
+
+    async def _run():
+        with tt.usage_source("chat"), tt.usage_user("alice"):
+            for _ in range(5):
+                tt.record_usage("nvidia_nim", "moonshotai/kimi-k2", 10, 4)
+        assert _rows(tracker) == 0
+        await tt._flusher
+
+    asyncio.run(_run())
+    assert flushed == [5]
+    summary = tt.get_summary(days=1)
+    assert summary["total_input"] == 50
+    assert summary["by_source"][0]["source"] == "chat"
+    users = {u["user_id"] for m in tt.get_model_usage(days=1)["models"]
+             for u in m["by_user"]}
+    assert users == {"alice"}
+
+
+def test_readers_flush_first_and_failed_writes_are_kept(tracker, monkeypatch):
+    tt._pending.append((time.time(), "ollama", "llama3.2:3b", 7, 3,
+                        "system", "stream", "other", 0, 0))
+    with monkeypatch.context() as m:
+        m.setattr(tt, "ensure_table", lambda: 1 / 0)
+        assert tt.flush() == 0
+    assert len(tt._pending) == 1
+    assert tt.get_summary(days=1)["total_input"] == 7
+    assert not tt._pending
+
+
+def test_a_failed_flush_into_a_full_buffer_counts_what_it_drops(tracker, monkeypatch):
+    from core import metrics
+
+    monkeypatch.setattr(tt, "_MAX_PENDING", 4)
+    monkeypatch.setattr(tt, "_pending", collections.deque(maxlen=4))
+    dropped = []
+    monkeypatch.setattr(metrics, "incr", lambda name, n=1: dropped.append((name, n)))
+    for tokens in (1, 2, 3):
+        tt._pending.append((time.time(), "ollama", "llama3.2:3b", tokens, 0,
+                            "system", "stream", "other", 0, 0))
+
+    def _busy():
+        # Two more rows arrive while the failing flush holds its batch.
+        for tokens in (4, 5):
+            tt._pending.append((time.time(), "ollama", "llama3.2:3b", tokens, 0,
+                                "system", "stream", "other", 0, 0))
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(tt, "ensure_table", _busy)
+    assert tt.flush() == 0
+    assert dropped == [("token_usage.dropped_rows", 1)]
+    assert [row[3] for row in tt._pending] == [2, 3, 4, 5]
+
+
+def _insert(conn, rows):
+    conn.executemany(
+        "INSERT INTO token_usage (ts, provider, model, input_tokens, output_tokens, "
+        "user_id, call_type, source) VALUES (?,?,?,?,?,?,?,?)", rows)
+
+
+def _naive(conn, cutoff):
+    return {
+        (p, m): (i, o, c)
+        for p, m, i, o, c in conn.execute(
+            "SELECT provider, model, SUM(input_tokens), SUM(output_tokens), COUNT(*) "
+            "FROM token_usage WHERE ts >= ? GROUP BY provider, model", (cutoff,))
+    }
+
+
+def test_rollups_agree_with_a_table_scan(tracker):
+    now = time.time()
+    # Some rows predate the rollups: ensure_table must backfill them.
+    conn = sqlite3.connect(str(tracker))
+    conn.execute("""CREATE TABLE token_usage (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL,
+        provider TEXT NOT NULL, model TEXT NOT NULL,
+        input_tokens INTEGER NOT NULL DEFAULT 0, output_tokens INTEGER NOT NULL DEFAULT 0,
+        user_id TEXT NOT NULL DEFAULT 'system', call_type TEXT NOT NULL DEFAULT 'stream',
+        source TEXT NOT NULL DEFAULT 'other')""")
+    _insert(conn, [(now - k * 2711.0, "anthropic", "claude-haiku-4-5", k, 1,
+                    "alice", "stream", "chat") for k in range(0, 120, 2)])
+    conn.commit()
+    conn.close()
+
+    tt.ensure_table()
+    _insert(tt._connect(), [(now - k * 2711.0, "ollama" if k % 3 else "anthropic",
+                             "llama3.2:3b" if k % 3 else "claude-haiku-4-5", k, 2,
+                             "bob", "stream", "voice") for k in range(1, 120, 2)])
+
+    scan = sqlite3.connect(str(tracker))
+    for days in (1, 2, 3, 4):
+        expected = _naive(scan, now - days * 86400)
+        # get_summary reads the clock a moment later; nothing sits on the edge.
+        got = {(m["provider"], m["model"]): (m["input_tokens"], m["output_tokens"], m["calls"])
+               for m in tt.get_summary(days=days)["by_model"]}
+        assert got == expected, days
+        for m in tt.get_model_usage(days=days)["models"]:
+            first, last = scan.execute(
+                "SELECT MIN(ts), MAX(ts) FROM token_usage WHERE model = ? AND ts >= ?",
+                (m["model"], now - days * 86400)).fetchone()
+            assert m["first_used_ts"] == pytest.approx(first)
+            assert m["last_used_ts"] == pytest.approx(last)
+    scan.close()
+
+    hourly = tt._connect().execute("SELECT SUM(calls) FROM token_usage_hourly").fetchone()[0]
+    assert hourly == 120
+
+
+def test_provider_rate_uses_minute_counters_and_seeds_after_restart(tracker, monkeypatch):
+    for _ in range(3):
+        tt.record_usage("nvidia_nim", "moonshotai/kimi-k2", 100, 10)
+    tt.record_usage("ollama", "llama3.2:3b", 5, 5)
+
+    rate = tt.get_provider_rate("nvidia_nim", window_seconds=60)
+    assert (rate["calls"], rate["input_tokens"], rate["output_tokens"]) == (3, 300, 30)
+
+    # The counters answer without touching the database.
+    with monkeypatch.context() as m:
+        m.setattr(tt, "_connect", lambda: 1 / 0)
+        tt._pending.append((time.time(), "nvidia_nim", "moonshotai/kimi-k2", 100, 10,
+                            "system", "stream", "other", 0, 0))
+        tt._count_rate(time.time(), "nvidia_nim", 100, 10)
+        assert tt.get_provider_rate("nvidia_nim", window_seconds=60)["calls"] == 4
+
+    # A restart: the counters rebuild from the table.
+    monkeypatch.setattr(tt, "_rates", {})
+    monkeypatch.setattr(tt, "_rates_seeded", False)
+    tt.flush()
+    assert tt.get_provider_rate("nvidia_nim", window_seconds=60)["calls"] == 4
+    assert tt.get_provider_rate("nvidia_nim", window_seconds=7200)["calls"] == 4
+
+
+def test_the_minute_the_window_starts_in_counts_pro_rata(tracker, monkeypatch):
+    monkeypatch.setattr(tt, "_rates_seeded", True)
+    now = 1_000_000 * 60 + 30.0            # half way through a minute
+    monkeypatch.setattr(tt.time, "time", lambda: now)
+    tt._count_rate(now - 600, "nvidia_nim", 0, 0, calls=99)  # long gone
+    tt._count_rate(now - 60, "nvidia_nim", 0, 0, calls=10)   # previous minute
+    tt._count_rate(now - 5, "nvidia_nim", 0, 0, calls=4)     # this one
+    # 60 s back reaches half of the previous minute: 4 + 10 / 2.
+    assert tt.get_provider_rate("nvidia_nim", window_seconds=60)["calls"] == 9
@@ -14,6 +14,7 @@ import core.token_tracker as tt
 
 @pytest.fixture()
 def tmp_tracker(tmp_path, monkeypatch):
+    tt.flush()  # rows buffered by earlier tests belong to the real database
     monkeypatch.setattr(tt, "_db_path", lambda: tmp_path / "usage.db")
     monkeypatch.setattr(tt, "_schema_ready", False)
     monkeypatch.setattr(tt, "_local", threading.local())
@@ -0,0 +1,150 @@
+"""
+tests/test_tts_pipeline.py
+
+ConversationLoop._process_tts_stream: sentence splitting, synthesis and
+WebSocket emission run as a pipeline. A fake TTS engine records when each
+sentence starts and finishes so the tests can see the overlap directly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+
+import pytest
+
+from config.settings import get_settings
+from core import metrics
+from core.conversation_loop import ConversationLoop, _PcmFramer
+from providers.base import TTSProvider
+
+
+class _FakeTTS(TTSProvider):
+    """Yields a WAV header, then two PCM chunks per sentence, slowly."""
+
+    sample_rate = 22050
+
+    def __init__(self, delay: float = 0.01, fail_on: str = "") -> None:
+        self.delay = delay
+        self.fail_on = fail_on
+        self.log: list[tuple[str, str]] = []
+
+    async def synthesize(self, text: str) -> bytes:
+        raise AssertionError("pipeline must stream")
+
+    async def stream_synthesize(self, text):
+        self.log.append(("start", text))
+        if text == self.fail_on:
+            raise RuntimeError("engine fell over")
+        yield b"RIFF" + b"\x00" * 40
+        for _ in range(2):
+            await asyncio.sleep(self.delay)
+            yield b"\x01\x00" * 10
+        self.log.append(("end", text))
+
+
+async def _sentences(*items):
+    for item in items:
+        await asyncio.sleep(0)
+        yield item
+
+
+def _loop_with(tts) -> ConversationLoop:
+    loop = ConversationLoop(mode="text")
+    loop._tts = tts
+    loop._gen_id = 7
+    return loop
+
+
+def test_frames_carry_header_and_pcm_only():
+    events = []
+
+    async def on_event(evt):
+        events.append(evt)
+
+    loop = _loop_with(_FakeTTS())
+    asyncio.run(loop._process_tts_stream(_sentences("One.", "Two."), on_event))
+
+    assert events[0] == {"type": "speaking"}
+    frames = events[1:]
+    assert len(frames) == 4
+    assert all(isinstance(f, bytes) for f in frames)
+    seqs = [struct.unpack("<HH", f[:4]) for f in frames]
+    assert seqs == [(7, 0), (7, 1), (7, 2), (7, 3)]
+    # WAV headers never reach the browser.
+    assert all(f[4:] == b"\x01\x00" * 10 for f in frames)
+
+
+def test_next_sentence_synthesizes_while_previous_is_sent():
+    tts = _FakeTTS()
+    slow_socket_saw: list[list] = []
+
+    async def on_event(evt):
+        if isinstance(evt, bytes):
+            # A slow socket: by the time one frame is out, synthesis of the
+            # next sentence must already have begun.
+            await asyncio.sleep(0.05)
+            slow_socket_saw.append(list(tts.log))
+
+    loop = _loop_with(tts)
+    asyncio.run(loop._process_tts_stream(_sentences("A.", "B."), on_event))
+    assert ("start", "B.") in slow_socket_saw[0]
+
+
+def test_lookahead_caps_sentences_waiting_for_the_socket(monkeypatch):
+    monkeypatch.setattr(get_settings(), "tts_lookahead_sentences", 1)
+    tts = _FakeTTS(delay=0)
+    started_before_release: list[int] = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def on_event(evt):
+            if isinstance(evt, bytes) and not release.is_set():
+                await asyncio.sleep(0.05)
+                started_before_release.append(
+                    sum(1 for kind, _ in tts.log if kind == "start"))
+                release.set()
+
+        loop = _loop_with(tts)
+        await loop._process_tts_stream(
+            _sentences("1.", "2.", "3.", "4.", "5."), on_event)
+
+    asyncio.run(run())
+    # Sentence 1 is being sent, one more may wait, one more may be in
+    # synthesis -- never the whole answer.
+    assert started_before_release[0] <= 3
+
+
+def test_synthesis_error_surfaces_to_the_turn():
+    async def on_event(evt):
+        pass
+
+    loop = _loop_with(_FakeTTS(fail_on="Bad."))
+    with pytest.raises(RuntimeError, match="fell over"):
+        asyncio.run(loop._process_tts_stream(_sentences("Good.", "Bad."), on_event))
+
+
+def test_first_audio_is_measured():
+    metrics.reset()
+
+    async def on_event(evt):
+        pass
+
+    loop = _loop_with(_FakeTTS())
+    asyncio.run(loop._process_tts_stream(_sentences("One.", "Two."), on_event))
+    snap = metrics.snapshot()["latency"]
+    assert snap["tts.first_audio_ms"]["count"] == 1
+    assert snap["tts.sentence_gap_ms"]["count"] == 1
+
+
+def test_framer_handles_split_header_and_odd_chunks():
+    framer = _PcmFramer()
+    assert framer.feed(b"RIFF" + b"\x00" * 10) == b""
+    assert framer.feed(b"\x00" * 30 + b"\x01") == b""
+    assert framer.feed(b"\x02\x03") == b"\x01\x02"
+    assert framer.feed(b"\x04") == b"\x03\x04"
+
+
+def test_framer_passes_compressed_audio_through():
+    assert _PcmFramer(pcm=False).feed(b"ID3\x01") == b"ID3\x01"
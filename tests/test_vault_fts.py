@@ -0,0 +1,127 @@
+"""
+tests/test_vault_fts.py
+
+Vault search goes through the vault_notes_fts index: VaultWatcher keeps it in
+step with note writes, moves and deletes, and search_text returns BM25-ranked
+hits with snippets for plain, prefix and phrase queries -- without reading
+any files.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from providers.memory.sqlite_store import SQLiteStore
+from providers.memory.store.vault import fts_query
+from providers.vault.vault_provider import VaultProvider, VaultWatcher
+
+
+def _setup(tmp_path, monkeypatch):
+    store = SQLiteStore(str(tmp_path / "vault_fts.db"))
+    asyncio.run(store.initialize())
+    provider = VaultProvider(store=store)
+    personal = tmp_path / "vault" / "users" / "alice"
+    personal.mkdir(parents=True)
+    monkeypatch.setattr(provider, "_get_roots", lambda user_id: {"personal": personal})
+    watcher = VaultWatcher(provider, loop=None)
+    return provider, watcher, personal
+
+
+def _write(watcher, path: Path, text: str):
+    path.write_text(text, encoding="utf-8")
+    asyncio.run(watcher._index_file(path))
+
+
+def test_fts_query_quotes_user_input():
+    assert fts_query('boiler "annual service" ser') == '"boiler" AND "annual service" AND "ser"*'
+    assert fts_query("garden* plans") == '"garden"* AND "plans"*'
+    assert fts_query("NOT OR (") == '"NOT" AND "OR"*'
+    assert fts_query("  -- ") == ""
+
+
+def test_search_ranks_title_hits_and_returns_snippets(tmp_path, monkeypatch):
+    provider, watcher, personal = _setup(tmp_path, monkeypatch)
+    _write(watcher, personal / "boiler.md",
+           "# Boiler\n\nAnnual service booked with the plumber in March.\n")
+    _write(watcher, personal / "house.md",
+           "# House jobs\n\nBleed radiators, check the boiler pressure.\n")
+    _write(watcher, personal / "garden.md",
+           "---\ntags: [outdoors, spring]\n---\n# Garden\n\nPlant tomatoes. #veg\n")
+
+    results = asyncio.run(provider.search_text("alice", "boiler"))
+    assert [r["virtual_path"] for r in results] == ["personal/boiler.md", "personal/house.md"]
+    assert "[boiler]" in results[1]["snippet"]
+
+    # Prefix of the last word, an exact phrase, and tags.
+    assert [r["title"] for r in asyncio.run(provider.search_text("alice", "plumb"))] == ["Boiler"]
+    assert asyncio.run(provider.search_text("alice", '"service booked"'))[0]["title"] == "Boiler"
+    assert asyncio.run(provider.search_text("alice", '"booked service"')) == []
+    assert asyncio.run(provider.search_text("alice", "spring"))[0]["title"] == "Garden"
+    assert asyncio.run(provider.search_text("alice", "veg"))[0]["title"] == "Garden"
+
+
+def test_edits_and_deletes_keep_index_in_step(tmp_path, monkeypatch):
+    provider, watcher, personal = _setup(tmp_path, monkeypatch)
+    note = personal / "list.md"
+    _write(watcher, note, "# List\n\nBuy lemons.\n")
+    assert asyncio.run(provider.search_text("alice", "lemons"))
+
+    _write(watcher, note, "# List\n\nBuy limes.\n")
+    assert asyncio.run(provider.search_text("alice", "lemons")) == []
+    assert asyncio.run(provider.search_text("alice", "limes"))
+
+    note.unlink()
+    asyncio.run(watcher._index_file(note))
+    assert asyncio.run(provider.search_text("alice", "limes")) == []
+
+
+def test_other_users_notes_are_not_returned(tmp_path, monkeypatch):
+    provider, watcher, personal = _setup(tmp_path, monkeypatch)
+    bob = tmp_path / "vault" / "users" / "bob"
+    bob.mkdir(parents=True)
+    _write(watcher, bob / "secret.md", "# Secret\n\nSurprise party plans.\n")
+    assert asyncio.run(provider.search_text("alice", "party")) == []
+
+
+def test_same_path_under_two_owners_stays_separate(tmp_path, monkeypatch):
+    provider, watcher, personal = _setup(tmp_path, monkeypatch)
+    bob = tmp_path / "vault" / "users" / "bob"
+    bob.mkdir(parents=True)
+    _write(watcher, personal / "todo.md", "# Todo\n\nBuy lemons.\n")
+    _write(watcher, bob / "todo.md", "# Todo\n\nHide the party hats.\n")
+
+    # Both are personal/todo.md; bob's must not overwrite alice's row.
+    assert asyncio.run(provider.search_text("alice", "lemons"))
+    assert asyncio.run(provider.search_text("alice", "party")) == []
+    assert asyncio.run(provider.search_text("bob", "party"))
+
+    # Deleting or renaming alice's note leaves bob's alone.
+    store = provider.store
+    asyncio.run(store.rename_vault_note_path("user", "alice", "personal/todo.md", "personal/done.md"))
+    assert asyncio.run(store.get_vault_note_by_path("user", "bob", "personal/todo.md"))
+    asyncio.run(store.delete_vault_note_by_path("user", "alice", "personal/done.md"))
+    assert asyncio.run(provider.search_text("alice", "lemons")) == []
+    assert asyncio.run(provider.search_text("bob", "party"))
+
+
+def test_legacy_path_unique_table_is_rebuilt(tmp_path):
+    import sqlite3
+
+    db = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        """
+        CREATE TABLE vault_notes (id INTEGER PRIMARY KEY AUTOINCREMENT, owner_kind TEXT NOT NULL, owner_id TEXT NOT NULL, virtual_path TEXT NOT NULL UNIQUE, title TEXT, size INTEGER, mtime REAL, indexed_at REAL);
+        CREATE TABLE vault_links (id INTEGER PRIMARY KEY AUTOINCREMENT, src_note_id INTEGER NOT NULL, target_title TEXT NOT NULL, FOREIGN KEY(src_note_id) REFERENCES vault_notes(id) ON DELETE CASCADE);
+        INSERT INTO vault_notes VALUES (7, 'user', 'alice', 'personal/todo.md', 'Todo', 1, 1.0, 1.0);
+        INSERT INTO vault_links (src_note_id, target_title) VALUES (7, 'Shopping');
+        """)
+    conn.close()
+
+    store = SQLiteStore(str(db))
+    asyncio.run(store.initialize())
+    asyncio.run(store.upsert_vault_note("user", "bob", "personal/todo.md", "Todo", 1, 1.0, []))
+    assert asyncio.run(store.get_vault_note_by_path("user", "alice", "personal/todo.md"))["id"] == 7
+    assert asyncio.run(store.list_vault_backlinks("Shopping")) == [
+        {"virtual_path": "personal/todo.md", "title": "Todo"}]
@@ -292,6 +292,23 @@ def test_ws_authenticates_and_pushes_presence(user_headers):
             pytest.fail("no pong received")
 
 
+def test_ws_negotiates_binary_audio_and_old_firmware_keeps_json(user_headers):
+    from core.vortex_hub import get_vortex_hub
+
+    unit_id, token = _pair(_code(), user_headers)
+
+    with client.websocket_connect(f"/api/vortex/ws?unit_id={unit_id}") as ws:
+        ws.send_json({"type": "auth", "unit_id": unit_id, "token": token,
+                      "audio": {"binary": True, "codecs": ["flac", "pcm_s16le"]}})
+        hello = ws.receive_json()
+        assert hello["audio"] == {"transport": "binary", "codec": "pcm_s16le"}
+        assert get_vortex_hub().connection(unit_id).audio_codec == "pcm_s16le"
+
+    with client.websocket_connect(f"/api/vortex/ws?unit_id={unit_id}") as ws:
+        ws.send_json({"type": "auth", "unit_id": unit_id, "token": token})
+        assert ws.receive_json()["audio"] == {"transport": "json"}
+
+
 def test_presence_vocabulary_is_fixed():
     from core.vortex_hub import PRESENCE_STATES, VortexHub
 
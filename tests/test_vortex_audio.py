@@ -0,0 +1,204 @@
+"""
+tests/test_vortex_audio.py
+
+Binary speech frames to Vortex units: the frame header, codec negotiation,
+PCM chunking and resampling, the vectorised and streaming envelopes, speak()
+and streamed turns reaching a binary unit as START/DATA/END frames, and the
+JSON `audio` fallback for firmware that never asked for binary.
+"""
+
+import asyncio
+import base64
+import struct
+
+import numpy as np
+
+from core import vortex_audio
+from core.vortex_audio import (
+    AUDIO_DATA,
+    AUDIO_END,
+    AUDIO_START,
+    CODEC_PCM,
+    HEADER_SIZE,
+    MAX_PAYLOAD,
+    negotiate,
+    pack_header,
+    parse_header,
+    pcm_from_wav,
+    wav_from_pcm,
+)
+from core.vortex_hub import VortexHub
+
+
+class _Socket:
+    def __init__(self):
+        self.json = []
+        self.binary = []
+
+    async def send_json(self, frame):
+        self.json.append(frame)
+
+    async def send_bytes(self, data):
+        self.binary.append(data)
+
+    async def close(self):
+        pass
+
+
+def _speech(seconds=0.2, rate=16000):
+    t = np.arange(int(seconds * rate)) / rate
+    return (np.sin(2 * np.pi * 220 * t) * 12000).astype("<i2").tobytes()
+
+
+def _frames(socket):
+    return [(parse_header(f), f[HEADER_SIZE:]) for f in socket.binary]
+
+
+def test_header_round_trip_and_negotiation(monkeypatch):
+    header = parse_header(pack_header(AUDIO_DATA, CODEC_PCM, 70000, 5, 22050) + b"xx")
+    assert (header.kind, header.stream, header.seq, header.sample_rate) == \
+        (AUDIO_DATA, 70000 & 0xFFFF, 5, 22050)
+    assert parse_header(b"RIFF" + bytes(20)) is None
+
+    monkeypatch.setattr(vortex_audio, "_opus_ok", False)
+    assert negotiate(None) is None
+    assert negotiate({"codecs": ["pcm_s16le"]}) is None          # binary not asked for
+    assert negotiate({"binary": True}) == "pcm_s16le"
+    assert negotiate({"binary": True, "codecs": ["opus", "pcm_s16le"]}) == "pcm_s16le"
+    assert negotiate({"binary": True, "codecs": ["opus"]}) is None
+    monkeypatch.setattr(vortex_audio, "_opus_ok", True)
+    assert negotiate({"binary": True, "codecs": ["opus", "pcm_s16le"]}) == "opus"
+
+
+def test_pcm_encoder_chunks_on_sample_boundaries():
+    encoder = vortex_audio.PcmEncoder(22050)
+    pcm = _speech(0.5)
+    out = encoder.feed(pcm[:1001]) + encoder.feed(pcm[1001:])
+    assert all(len(p) <= MAX_PAYLOAD and len(p) % 2 == 0 for p in out)
+    assert b"".join(out) == pcm
+
+
+def test_resampler_keeps_length_across_chunks():
+    resampler = vortex_audio._Resampler(22050, 24000)
+    samples = np.frombuffer(_speech(1.0, 22050), dtype="<i2")
+    out = np.concatenate([resampler.feed(samples[i:i + 777])
+                          for i in range(0, len(samples), 777)])
+    assert abs(len(out) - 24000) <= 2
+
+
+def test_speak_streams_binary_frames_to_a_binary_unit():
+    pcm = _speech()
+
+    async def _run():
+        hub = VortexHub()
+        socket = _Socket()
+        await hub.register("u1", socket, audio_codec="pcm_s16le")
+        assert await hub.speak("u1", wav_from_pcm(pcm, 16000), text="Hello")
+        await hub._speaking_tasks["u1"]
+        return socket
+
+    socket = asyncio.run(_run())
+    frames = _frames(socket)
+    kinds = [h.kind for h, _ in frames]
+    assert kinds[0] == AUDIO_START and kinds[-1] == AUDIO_END
+    assert set(kinds[1:-1]) == {AUDIO_DATA}
+    assert [h.seq for h, _ in frames] == list(range(len(frames)))
+    assert all(h.sample_rate == 16000 and h.stream == frames[0][0].stream
+               for h, _ in frames)
+    assert b"".join(p for _, p in frames) == pcm
+
+    types = [f["type"] for f in socket.json]
+    assert "audio" not in types
+    assert "amplitude" in types
+    assert socket.json[0]["caption"] == "Hello"
+    assert socket.json[-1]["state"] == "idle"
+
+
+def test_open_audio_falls_back_to_one_json_frame_for_old_firmware():
+    pcm = _speech()
+
+    async def _run():
+        hub = VortexHub()
+        socket = _Socket()
+        await hub.register("old", socket)
+        stream = hub.open_audio("old", 16000, text="Hi")
+        assert not stream.binary
+        for i in range(0, len(pcm), 1000):
+            await stream.write(pcm[i:i + 1000])
+        assert socket.json == []            # nothing until the utterance is whole
+        assert await stream.close()
+        await hub.stop_amplitude_stream("old")
+        return socket
+
+    socket = asyncio.run(_run())
+    assert socket.binary == []
+    audio = [f for f in socket.json if f["type"] == "audio"]
+    assert len(audio) == 1 and audio[0]["format"] == "wav"
+    assert pcm_from_wav(base64.b64decode(audio[0]["audio"]))[0] == pcm
+
+
+def test_a_streamed_turn_reaches_the_unit_as_it_is_synthesized(monkeypatch):
+    """The loop's bytes events used to reach `event.get` and end the turn."""
+    import core.vortex_voice as voice
+
+    chunks = [_speech(0.1), _speech(0.1)]
+
+    class _TTS:
+        sample_rate = 16000
+
+    class _Loop:
+        _tts = _TTS()
+
+        async def run_once(self, audio_bytes, on_event):
+            await on_event({"type": "speaking"})
+            for seq, chunk in enumerate(chunks):
+                await on_event(struct.pack("<HH", 1, seq) + chunk)
+            await on_event({"type": "idle"})
+
+    async def _fake_get_loop(unit_id, user_id):
+        return _Loop()
+
+    hub = VortexHub()
+    socket = _Socket()
+    monkeypatch.setattr(voice, "_get_loop", _fake_get_loop)
+    monkeypatch.setattr("core.vortex_hub.get_vortex_hub", lambda: hub)
+
+    async def _run():
+        await hub.register("unit-s", socket, audio_codec="pcm_s16le")
+        await voice.handle_unit_utterance(unit_id="unit-s", user_id="owner",
+                                          audio=b"\x01\x00" * 1600)
+        task = hub._speaking_tasks.get("unit-s")
+        if task is not None:
+            await task
+
+    asyncio.run(_run())
+    frames = _frames(socket)
+    assert frames[0][0].kind == AUDIO_START and frames[-1][0].kind == AUDIO_END
+    assert b"".join(p for _, p in frames) == b"".join(chunks)
+    assert not any(f["type"] == "presence" and f["state"] == "error"
+                   for f in socket.json)
+
+
+def test_envelope_counts_every_sample_and_streams_in_step():
+    from core.vortex_hub import _LiveEnvelope, amplitude_envelope
+
+    rate = 16000
+    samples = (np.sin(np.arange(rate) * 0.05) * np.linspace(1000, 20000, rate)).astype("<i2")
+    samples[rate // 2 + 7] = 32000      # one click between the old decimation strides
+    pcm = samples.tobytes()
+    whole = amplitude_envelope(wav_from_pcm(pcm, rate))
+    window = int(rate / 30)
+    click = (rate // 2 + 7) // window
+    assert whole[click] == 1.0
+
+    async def _stream():
+        live = _LiveEnvelope(rate, 1)
+        for i in range(0, len(pcm), 1234):
+            live.feed(pcm[i:i + 1234])
+        return live.values
+
+    streamed = asyncio.run(_stream())
+    # Whole windows only while streaming; from the loudest window on, the
+    # running normalisation equals the whole-utterance one.
+    assert len(streamed) == len(pcm) // (2 * window)
+    assert streamed[click:] == whole[click:len(streamed)]
@@ -0,0 +1,162 @@
+"""
+tests/test_vortex_replica.py
+
+Element deltas on the Vortex replica: one device changing is one upsert,
+removals arrive as ids, a unit too far behind or from before a restart gets a
+full snapshot, units sharing a base receive one serialized frame, and units
+that never acknowledge keep the section-level frames they always had.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import core.vortex_replica as vr
+from core.vortex_hub import VortexHub
+
+
+def _lights(n, on=()):
+    return [{"entity_id": f"light.l{i}", "state": "on" if i in on else "off"}
+            for i in range(n)]
+
+
+def test_element_deltas_against_a_base_version():
+    replica = vr._HouseholdReplica("owner")
+    assert replica.apply("devices", _lights(200))
+    assert replica.apply("wake_word", {"model": "hey_river"})
+    base = replica.version
+
+    assert not replica.apply("devices", _lights(200))
+    assert replica.apply("devices", _lights(200, on={7}))
+    delta = replica.delta(base)
+    assert delta["changed"] == ["devices"]
+    assert delta["deltas"]["devices"] == {
+        "upsert": [{"entity_id": "light.l7", "state": "on"}], "remove": []}
+    assert "wake_word" not in delta
+
+    after_toggle = replica.version
+    assert replica.apply("devices", _lights(199, on={7}))
+    assert replica.delta(after_toggle)["deltas"]["devices"] == {
+        "upsert": [], "remove": ["light.l199"]}
+    # From the older base both changes are there.
+    assert replica.delta(base)["deltas"]["devices"]["remove"] == ["light.l199"]
+
+    # Before the section existed the unit needs it whole.
+    assert replica.delta(0)["devices"] == replica.payloads["devices"]
+    assert replica.delta(replica.version + 1) is None
+
+
+def test_pruned_tombstones_force_a_snapshot(monkeypatch):
+    monkeypatch.setattr(vr, "_MAX_TOMBSTONES", 4)
+    replica = vr._HouseholdReplica("owner")
+    replica.apply("devices", _lights(10))
+    base = replica.version
+    for n in range(9, 3, -1):
+        replica.apply("devices", _lights(n))
+    assert replica.floor > base
+    assert replica.delta(base) is None
+    assert replica.delta(replica.version - 1)["deltas"]["devices"]["remove"] == ["light.l4"]
+
+
+class _Socket:
+    def __init__(self):
+        self.text = []
+        self.json = []
+
+    async def send_text(self, text):
+        self.text.append(text)
+
+    async def send_json(self, frame):
+        self.json.append(frame)
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def household(monkeypatch):
+    hub = VortexHub()
+    service = vr.ReplicaService()
+    devices = {"now": _lights(200)}
+
+    async def _devices(owner):
+        return devices["now"]
+
+    async def _profiles(owner):
+        return [{"unit_id": u} for u in ("kitchen", "hall", "old")]
+
+    async def _unit_block(unit_id):
+        return {"unit_id": unit_id}
+
+    monkeypatch.setattr(service, "_section_devices", _devices)
+    monkeypatch.setattr(service, "_unit_block", _unit_block)
+    monkeypatch.setattr("core.vortex_hub.get_vortex_hub", lambda: hub)
+    monkeypatch.setattr("core.vortex_units.list_profiles", _profiles)
+    sockets = {u: _Socket() for u in ("kitchen", "hall", "old")}
+
+    async def _connect():
+        for unit_id, socket in sockets.items():
+            await hub.register(unit_id, socket)
+
+    asyncio.run(_connect())
+    return service, devices, sockets
+
+
+def test_push_serializes_once_per_base_and_keeps_legacy_units(household):
+    service, devices, sockets = household
+
+    async def _run():
+        await service.refresh("owner", ["devices"])
+        replica = service._household("owner")
+        for unit_id in ("kitchen", "hall"):
+            service.acknowledge(unit_id, replica.version, replica.epoch)
+        devices["now"] = _lights(200, on={3})
+        return await service.push_updates("owner", ["devices"])
+
+    assert asyncio.run(_run()) == 3
+    kitchen, hall = sockets["kitchen"].text, sockets["hall"].text
+    assert len(kitchen) == 1 and kitchen[0] is hall[0]
+    frame = json.loads(kitchen[0])
+    assert frame["type"] == "replica"
+    assert frame["deltas"]["devices"]["upsert"] == [{"entity_id": "light.l3", "state": "on"}]
+    assert "devices" not in frame
+
+    legacy = [json.loads(t) for t in sockets["old"].text]
+    assert [f["type"] for f in legacy] == ["replica", "devices_update"]
+    assert len(legacy[0]["devices"]) == 200 and len(legacy[1]["data"]) == 200
+
+
+def test_a_unit_from_another_epoch_gets_a_full_snapshot(household):
+    service, devices, sockets = household
+
+    async def _run():
+        await service.refresh("owner", ["devices"])
+        service.acknowledge("kitchen", 1, "from-before-a-restart")
+        devices["now"] = _lights(200, on={5})
+        await service.push_updates("owner", ["devices"])
+
+    asyncio.run(_run())
+    assert sockets["kitchen"].text == []
+    full = sockets["kitchen"].json[0]
+    assert full["type"] == "replica" and full["full"] is True
+    assert len(full["devices"]) == 200
+
+
+def test_a_reconnect_snapshot_clears_the_old_ack(household):
+    service, devices, sockets = household
+
+    async def _run():
+        await service.refresh("owner", ["devices"])
+        replica = service._household("owner")
+        service.acknowledge("kitchen", replica.version, replica.epoch)
+        await service.push_to_unit("kitchen", "owner")
+        sockets["kitchen"].json.clear()
+        devices["now"] = _lights(200, on={7})
+        await service.push_updates("owner", ["devices"])
+
+    asyncio.run(_run())
+    # No ack for the reconnect snapshot yet, so no deltas against the old one.
+    frames = [json.loads(t) for t in sockets["kitchen"].text]
+    assert [f["type"] for f in frames] == ["replica", "devices_update"]
+    assert "deltas" not in frames[0]